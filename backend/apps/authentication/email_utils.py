@@ -9,3 +9,27 @@ def send_verification_email(user, token):
     from_email = settings.DEFAULT_FROM_EMAIL
     recipient_list = [user.email]
     send_mail(subject, message, from_email, recipient_list)
+
+def send_task_reminder_email(user, upcoming, overdue):
+    """Envia um único e-mail com as tasks do usuário que vencem em breve ou estão atrasadas"""
+    def task_lines(tasks):
+        return "\n".join(
+            f"- {task['title']} ({task['board_name']}) - prazo {task['due_date']:%d/%m/%Y %H:%M}"
+            for task in tasks
+        )
+
+    sections = []
+    if overdue:
+        sections.append(f"Tasks atrasadas:\n{task_lines(overdue)}")
+    if upcoming:
+        sections.append(f"Tasks que vencem em breve:\n{task_lines(upcoming)}")
+
+    total = len(upcoming) + len(overdue)
+    subject = f"Você tem {total} task(s) com prazo próximo ou vencido"
+    message = (
+        f"Olá {user.username},\n\n" + "\n\n".join(sections)
+        + f"\n\nAcesse o quadro: {settings.FRONTEND_URL}/kanban"
+    )
+    from_email = settings.DEFAULT_FROM_EMAIL
+    recipient_list = [user.email]
+    send_mail(subject, message, from_email, recipient_list)
@@ -48,6 +48,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
         
+        # Grupo pessoal para notificações (ex.: lembretes de prazo das tasks)
+        self.user_group_name = f'user_{user.id}'
+        await self.channel_layer.group_add(
+            self.user_group_name,
+            self.channel_name
+        )
+        
         await self.accept()
         
         # Atualizar status online do usuário
@@ -75,6 +82,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 self.room_group_name,
                 self.channel_name
             )
+            if hasattr(self, 'user_group_name'):
+                await self.channel_layer.group_discard(
+                    self.user_group_name,
+                    self.channel_name
+                )
             
             # Notificar outros usuários que este usuário saiu
             if hasattr(self, 'user'):
@@ -346,6 +358,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'is_typing': event['is_typing']
             }))
     
+    async def task_reminders(self, event):
+        """Envia lembretes de prazo das tasks para o WebSocket"""
+        await self.send(text_data=json.dumps({
+            'type': 'task_reminders',
+            'upcoming': event['upcoming'],
+            'overdue': event['overdue'],
+            'timestamp': event['timestamp']
+        }))
+    
     # Métodos auxiliares com acesso ao banco de dados
     @database_sync_to_async
     def get_chat_room(self, room_id):
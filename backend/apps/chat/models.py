@@ -1,5 +1,5 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 from apps.communities.models import Community
@@ -236,10 +236,12 @@ class ChatMessage(models.Model):
             return False
 
     def soft_delete(self):
-        """Marca mensagem como deletada sem remover do banco"""
-        self.is_deleted = True
-        self.content = "[Mensagem deletada]"
-        self.save()
+        """Marca mensagem como deletada sem remover do banco; os anexos (e seus arquivos) são removidos"""
+        with transaction.atomic():
+            self.is_deleted = True
+            self.content = "[Mensagem deletada]"
+            self.save()
+            self.attachments.all().delete()
 
 
 class ChatMessageRead(models.Model):
@@ -1,7 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from apps.communities.models import Community, CommunityMember
-from apps.chat.models import ChatRoom, ChatRoomMember
+from apps.chat.models import ChatRoom, ChatRoomMember, ChatAttachment
+from apps.kanban import storage_gc
 import logging
 
 logger = logging.getLogger(__name__)
@@ -123,3 +124,11 @@ def sync_community_role_with_chat(sender, instance, created, **kwargs):
                 
         except Exception as e:
             logger.error(f"Erro ao sincronizar role do chat: {e}")
+
+
+@receiver(post_delete, sender=ChatAttachment)
+def delete_chat_attachment_file(sender, instance, **kwargs):
+    """
+    Remove o arquivo do anexo do storage após o commit
+    """
+    storage_gc.schedule_delete(storage_gc.CHAT_ATTACHMENTS, [instance.file.name])
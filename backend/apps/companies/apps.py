@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CompaniesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.companies'
+
+    def ready(self):
+        """
+        Registra os signals que mantêm o índice de busca de empresas
+        """
+        import apps.companies.signals
@@ -0,0 +1,85 @@
+"""
+Contato principal das empresas.
+
+Cada empresa tem no máximo um contato com ``is_primary`` (restrição unique
+parcial em CompanyContact) e ``Company.primary_contact`` aponta para ele, o
+que permite às listagens trazer o contato principal com ``select_related``.
+
+Toda mudança de contato principal passa por aqui: em uma transação, a linha
+da empresa é travada (``select_for_update``), o principal anterior perde a
+marca e o ponteiro é atualizado; um contato que muda de empresa deixa de ser
+o principal da anterior. Requisições concorrentes para a mesma
+empresa são serializadas pela trava; a restrição unique impede dois
+principais mesmo em caminhos que não usem estas funções.
+"""
+from django.db import transaction
+
+from .models import Company, CompanyContact
+
+
+def _lock_company(company_id):
+    return Company.objects.select_for_update().only('id', 'primary_contact').get(pk=company_id)
+
+
+def _sync_pointer(company, contact):
+    """Atualiza ``company.primary_contact`` conforme ``contact.is_primary``"""
+    if contact.is_primary:
+        primary_id = contact.pk
+    elif company.primary_contact_id == contact.pk:
+        primary_id = None
+    else:
+        return
+    if company.primary_contact_id != primary_id:
+        # update() não dispara os signals de Company (contadores e índice de busca não mudam)
+        Company.objects.filter(pk=company.pk).update(primary_contact=primary_id)
+        company.primary_contact_id = primary_id
+
+
+def save_contact(serializer, **kwargs):
+    """
+    Salva o contato de um CompanyContactSerializer (criação ou edição)
+    mantendo um único contato principal por empresa; ``kwargs`` vão para
+    ``serializer.save()`` (ex.: ``company=``)
+    """
+    instance = serializer.instance
+    company = kwargs.get('company') or serializer.validated_data.get('company')
+    company_id = company.pk if company is not None else getattr(instance, 'company_id', None)
+    if company_id is None:
+        return serializer.save(**kwargs)
+
+    previous_id = getattr(instance, 'company_id', None)
+    if previous_id not in (None, company_id) and 'is_primary' not in serializer.validated_data:
+        # O principal da empresa anterior não toma o lugar do principal da nova
+        kwargs['is_primary'] = False
+    with transaction.atomic():
+        # Ao mudar de empresa a anterior também é travada (sempre na ordem dos
+        # IDs, para duas mudanças cruzadas não se travarem mutuamente)
+        locked = {pk: _lock_company(pk) for pk in sorted({company_id, previous_id} - {None})}
+        if serializer.validated_data.get('is_primary'):
+            others = CompanyContact.objects.filter(company_id=company_id, is_primary=True)
+            if instance is not None:
+                others = others.exclude(pk=instance.pk)
+            others.update(is_primary=False)
+        contact = serializer.save(**kwargs)
+        _sync_pointer(locked[company_id], contact)
+        if previous_id not in (None, company_id):
+            # A empresa anterior fica sem contato principal em vez de apontar para outra empresa
+            previous = locked[previous_id]
+            if previous.primary_contact_id == contact.pk:
+                Company.objects.filter(pk=previous.pk).update(primary_contact=None)
+                previous.primary_contact_id = None
+    return contact
+
+
+def set_primary_contact(contact):
+    """Torna ``contact`` o contato principal da empresa dele"""
+    with transaction.atomic():
+        company = _lock_company(contact.company_id)
+        CompanyContact.objects.filter(company_id=company.pk, is_primary=True).exclude(pk=contact.pk).update(
+            is_primary=False
+        )
+        if not contact.is_primary:
+            CompanyContact.objects.filter(pk=contact.pk).update(is_primary=True)
+            contact.is_primary = True
+        _sync_pointer(company, contact)
+    return contact
@@ -0,0 +1,322 @@
+"""
+Detecção e fusão de empresas duplicadas.
+
+Comparar todas as empresas entre si é O(n²). A varredura usa *blocking*:
+cada empresa gera chaves de bloco e só empresas que compartilham uma chave
+são comparadas.
+
+- ``t:<token>``: cada token do nome normalizado (sem acentos, caixa,
+  pontuação, sufixos societários como "Ltda" e "S.A." e preposições);
+- ``d:<domínio>``: domínio do e-mail e do site (exceto provedores gratuitos);
+- ``p:<telefone>``: últimos 8 dígitos do telefone;
+- ``c:<raiz>``: raiz do CNPJ (8 primeiros dígitos, matriz e filiais).
+
+Blocos maiores que ``MAX_BLOCK_SIZE`` (tokens comuns como "comercio") são
+descartados, o que limita o número de pares a O(n · MAX_BLOCK_SIZE). Um par
+que compartilha vários blocos é gerado só pelo menor deles, sem guardar os
+pares já vistos. Os pares são pontuados em lotes com NumPy: similaridade de
+trigramas dos nomes (0,7), calculada sobre os trigramas codificados uma vez
+por empresa, mais um sinal de contato em comum: domínio, telefone ou raiz do
+CNPJ (0,3). Pares a partir de ``SCORE_THRESHOLD`` vão para a fila de revisão
+(DuplicateCandidate).
+
+A fusão move para a empresa mantida todas as chaves estrangeiras que apontam
+para a duplicata (contatos, boards, perfis de usuário...) com um ``UPDATE``
+por tabela, completa os campos vazios e remove a duplicata.
+"""
+import logging
+import re
+from collections import defaultdict
+from itertools import combinations
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.kanban.models import Board
+
+from .models import Company, CompanyContact, DuplicateCandidate
+from .search import normalize_text
+
+logger = logging.getLogger(__name__)
+
+MAX_BLOCK_SIZE = getattr(settings, 'COMPANY_DEDUP_MAX_BLOCK_SIZE', 100)
+SCORE_THRESHOLD = getattr(settings, 'COMPANY_DEDUP_THRESHOLD', 0.6)
+BATCH_SIZE = 10000
+NAME_WEIGHT = 0.7
+SIGNAL_WEIGHT = 0.3
+
+LEGAL_SUFFIXES = {
+    'ltda', 'limitada', 'sa', 'me', 'epp', 'eireli', 'mei', 'cia', 'companhia', 'inc', 'llc', 'ltd',
+}
+STOPWORDS = {'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'the', 'and', 'of'}
+FREE_EMAIL_DOMAINS = {
+    'gmail.com', 'hotmail.com', 'outlook.com', 'live.com', 'yahoo.com', 'yahoo.com.br', 'icloud.com',
+    'bol.com.br', 'uol.com.br', 'terra.com.br', 'ig.com.br',
+}
+# Campos copiados da duplicata quando vazios na empresa mantida
+MERGED_FIELDS = ['cnpj', 'email', 'phone', 'website', 'industry', 'size', 'address']
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_DOMAIN_RE = re.compile(r'^(?:[a-z]+://)?(?:www\.)?([^/:?#]+)')
+
+
+class DedupError(ValueError):
+    """Fusão inválida"""
+
+
+def name_tokens(name):
+    """Tokens significativos do nome: "Construtora Alfa S.A." -> ['construtora', 'alfa']"""
+    text = normalize_text(name).replace('.', '').replace('/', '')
+    return [
+        token for token in _TOKEN_RE.findall(text)
+        if len(token) > 1 and token not in LEGAL_SUFFIXES and token not in STOPWORDS
+    ]
+
+
+def _domains(email, website):
+    domains = set()
+    if email and '@' in email:
+        domains.add(email.rsplit('@', 1)[1].strip().lower())
+    if website:
+        match = _DOMAIN_RE.match(website.strip().lower())
+        if match:
+            domains.add(match.group(1))
+    return frozenset(domain for domain in domains if domain and domain not in FREE_EMAIL_DOMAINS)
+
+
+def _phone_key(phone):
+    digits = ''.join(char for char in phone or '' if char.isdigit())
+    return digits[-8:] if len(digits) >= 8 else ''
+
+
+def name_trigrams(name_key):
+    """Trigramas distintos do nome normalizado, cada um codificado como inteiro (array ordenado)"""
+    if not name_key:
+        return np.empty(0, dtype=np.int64)
+    padded = f'  {name_key} '
+    codes = {
+        (ord(padded[index]) << 42) | (ord(padded[index + 1]) << 21) | ord(padded[index + 2])
+        for index in range(len(padded) - 2)
+    }
+    return np.array(sorted(codes), dtype=np.int64)
+
+
+def company_features(name, email, website, phone, cnpj):
+    """(nome normalizado, domínios, telefone, raiz do CNPJ, trigramas do nome) de uma empresa"""
+    name_key = ' '.join(sorted(set(name_tokens(name))))
+    return (name_key, _domains(email, website), _phone_key(phone), (cnpj or '')[:8], name_trigrams(name_key))
+
+
+def blocking_keys(features):
+    name_key, domains, phone, cnpj_root, _ = features
+    keys = {f't:{token}' for token in name_key.split() if len(token) >= 3}
+    keys.update(f'd:{domain}' for domain in domains)
+    if phone:
+        keys.add(f'p:{phone}')
+    if cnpj_root:
+        keys.add(f'c:{cnpj_root}')
+    return keys
+
+
+def name_similarities(pairs, features):
+    """
+    Similaridade de Jaccard dos trigramas dos nomes de cada par, em um array
+
+    Os trigramas dos dois lados de todos os pares são concatenados e
+    ordenados por (par, trigrama); um trigrama em comum aparece duas vezes
+    seguidas, então a interseção de cada par é uma contagem.
+    """
+    left = [features[a][4] for a, _ in pairs]
+    right = [features[b][4] for _, b in pairs]
+    left_sizes = np.fromiter(map(len, left), dtype=np.int64, count=len(pairs))
+    right_sizes = np.fromiter(map(len, right), dtype=np.int64, count=len(pairs))
+
+    positions = np.arange(len(pairs))
+    owners = np.concatenate([np.repeat(positions, left_sizes), np.repeat(positions, right_sizes)])
+    codes = np.concatenate(left + right)
+    order = np.lexsort((codes, owners))
+    owners, codes = owners[order], codes[order]
+    shared = (owners[1:] == owners[:-1]) & (codes[1:] == codes[:-1])
+
+    intersection = np.bincount(owners[1:][shared], minlength=len(pairs))
+    union = left_sizes + right_sizes - intersection
+    return np.divide(intersection, union, out=np.zeros(len(pairs)), where=union > 0)
+
+
+def _signals(left, right):
+    return (
+        bool(left[1] & right[1]),
+        bool(left[2]) and left[2] == right[2],
+        bool(left[3]) and left[3] == right[3],
+    )
+
+
+def score_pairs(pairs, features, threshold=SCORE_THRESHOLD):
+    """
+    Pontua um lote de pares ``(id_a, id_b)``; retorna ``[(id_a, id_b, score, reasons)]``
+    dos pares com score a partir de ``threshold``
+    """
+    if not pairs:
+        return []
+    names = name_similarities(pairs, features)
+    signals = [_signals(features[a], features[b]) for a, b in pairs]
+
+    matrix = np.array(signals, dtype=bool).reshape(-1, 3)
+    scores = NAME_WEIGHT * names + SIGNAL_WEIGHT * matrix.any(axis=1)
+    selected = np.flatnonzero(scores >= threshold).tolist()
+    scores = scores.tolist()
+
+    results = []
+    for index in selected:
+        a, b = pairs[index]
+        reasons = [
+            reason for reason, matched in zip(('email_domain', 'phone', 'cnpj_root'), signals[index]) if matched
+        ]
+        if names[index] >= 0.8:
+            reasons.insert(0, 'name')
+        results.append((a, b, round(scores[index], 4), reasons))
+    return results
+
+
+def _load_features(queryset):
+    features = {}
+    blocks = defaultdict(list)
+    rows = queryset.values_list('id', 'name', 'email', 'website', 'phone', 'cnpj').order_by()
+    for company_id, *values in rows.iterator(chunk_size=5000):
+        features[company_id] = company_features(*values)
+        for key in blocking_keys(features[company_id]):
+            blocks[key].append(company_id)
+    return features, blocks
+
+
+def candidate_pairs(blocks, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Pares (menor id, maior id) que compartilham algum bloco, sem repetição
+
+    Cada par é gerado apenas pelo menor bloco (chave) que as duas empresas
+    compartilham entre os blocos comparados, então a memória usada é a das
+    chaves de cada empresa, não a do conjunto de pares.
+    """
+    compared = {key: ids for key, ids in blocks.items() if 2 <= len(ids) <= max_block_size}
+    keys_by_company = defaultdict(set)
+    for key, ids in compared.items():
+        for company_id in ids:
+            keys_by_company[company_id].add(key)
+
+    for key, ids in compared.items():
+        for a, b in combinations(sorted(ids), 2):
+            if min(keys_by_company[a] & keys_by_company[b]) == key:
+                yield a, b
+
+
+def _save_candidates(results):
+    candidates = [
+        DuplicateCandidate(company_a_id=a, company_b_id=b, score=score, reasons=reasons)
+        for a, b, score, reasons in results
+    ]
+    # Pares já conhecidos têm score e motivos atualizados; status e revisão são mantidos
+    DuplicateCandidate.objects.bulk_create(
+        candidates,
+        update_conflicts=True,
+        unique_fields=None if connection.vendor == 'mysql' else ['company_a', 'company_b'],
+        update_fields=['score', 'reasons', 'updated_at'],
+    )
+
+
+def find_duplicates(queryset=None, threshold=SCORE_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Varre as empresas e atualiza a fila de revisão.
+
+    Pares pendentes que não atingem mais o limiar são removidos da fila;
+    pares descartados continuam descartados. Retorna um resumo da varredura.
+    """
+    started_at = timezone.now()
+    features, blocks = _load_features(queryset if queryset is not None else Company.objects.all())
+    summary = {'companies': len(features), 'blocks': len(blocks), 'pairs': 0, 'candidates': 0}
+
+    batch = []
+    for pair in candidate_pairs(blocks, max_block_size):
+        batch.append(pair)
+        if len(batch) >= BATCH_SIZE:
+            summary['pairs'] += len(batch)
+            results = score_pairs(batch, features, threshold)
+            _save_candidates(results)
+            summary['candidates'] += len(results)
+            batch = []
+    summary['pairs'] += len(batch)
+    results = score_pairs(batch, features, threshold)
+    _save_candidates(results)
+    summary['candidates'] += len(results)
+
+    if queryset is None:
+        DuplicateCandidate.objects.filter(status='pending', updated_at__lt=started_at).delete()
+    logger.info(f"Varredura de empresas duplicadas: {summary}")
+    return summary
+
+
+def _rename_conflicting_boards(target, duplicate):
+    """Boards da duplicata com nome já usado na empresa mantida ganham o nome da duplicata"""
+    taken = set(Board.objects.filter(company=target).values_list('name', flat=True))
+    for board_id, name in Board.objects.filter(company=duplicate, name__in=taken).values_list('id', 'name'):
+        new_name = f"{name} ({duplicate.name})"[:255]
+        suffix = 2
+        while new_name in taken:
+            new_name = f"{name} ({duplicate.name} {suffix})"[:255]
+            suffix += 1
+        taken.add(new_name)
+        Board.objects.filter(pk=board_id).update(name=new_name)
+
+
+def _company_relations():
+    """Chaves estrangeiras de outros modelos para Company (exceto a fila de duplicatas)"""
+    return [
+        relation for relation in Company._meta.related_objects
+        if relation.one_to_many and relation.related_model is not DuplicateCandidate
+    ]
+
+
+def merge_companies(target, duplicate):
+    """
+    Funde ``duplicate`` em ``target`` e remove ``duplicate``.
+
+    Retorna ``(target, moved)``, com o número de linhas movidas por modelo.
+    """
+    if target.pk == duplicate.pk:
+        raise DedupError("Uma empresa não pode ser mesclada com ela mesma")
+
+    with transaction.atomic():
+        locked = Company.objects.select_for_update().in_bulk([target.pk, duplicate.pk])
+        if len(locked) != 2:
+            raise DedupError("Empresa não encontrada")
+        target, duplicate = locked[target.pk], locked[duplicate.pk]
+
+        _rename_conflicting_boards(target, duplicate)
+        # Um único contato principal por empresa: o da empresa mantida prevalece
+        if CompanyContact.objects.filter(company=target, is_primary=True).exists():
+            CompanyContact.objects.filter(company=duplicate, is_primary=True).update(is_primary=False)
+        else:
+            target.primary_contact = CompanyContact.objects.filter(company=duplicate, is_primary=True).first()
+        moved = {}
+        for relation in _company_relations():
+            field = relation.field.name
+            count = relation.related_model._base_manager.filter(**{field: duplicate}).update(**{field: target})
+            if count:
+                moved[relation.related_model._meta.label] = count
+
+        for field in MERGED_FIELDS:
+            if not getattr(target, field) and getattr(duplicate, field):
+                setattr(target, field, getattr(duplicate, field))
+        target.is_client = target.is_client or duplicate.is_client
+        target.is_active = target.is_active or duplicate.is_active
+        if duplicate.notes:
+            target.notes = '\n\n'.join(filter(None, [target.notes, duplicate.notes]))
+
+        # Remove antes de salvar: o CNPJ copiado da duplicata é unique
+        duplicate_name = duplicate.name
+        duplicate.delete()
+        target.save()
+
+    logger.info(f"Empresa {duplicate_name} mesclada em {target.name} (id {target.pk}): {moved}")
+    return target, moved
@@ -0,0 +1,114 @@
+"""
+Diretório de contatos: "de quem é este e-mail/telefone?".
+
+E-mails e telefones são comparados pelas chaves normalizadas e indexadas
+(``normalize_email``/``normalize_phone`` em models.py) de CompanyContact e
+Company: "+55 (11) 3333-4444" encontra "11 3333-4444" e "Ana@Alfa.com.br"
+encontra "ana@alfa.com.br". Um lote de até ``MAX_IDENTIFIERS`` identificadores
+é resolvido com no máximo quatro queries (contatos e empresas, por e-mail e
+por telefone), qualquer que seja o tamanho do lote.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+
+from .models import Company, CompanyContact, normalize_email, normalize_phone
+
+MAX_IDENTIFIERS = getattr(settings, 'COMPANY_LOOKUP_MAX_IDENTIFIERS', 1000)
+
+COMPANY_CONTEXT_FIELDS = ('id', 'name', 'cnpj', 'is_client', 'is_active')
+KEY_FIELDS = {'email': 'normalized_email', 'phone': 'normalized_phone'}
+NORMALIZERS = {'email': normalize_email, 'phone': normalize_phone}
+
+
+class DirectoryLookupError(ValueError):
+    """Lote de identificadores inválido"""
+
+
+def _company_context(company):
+    return {
+        'id': company.id,
+        'name': company.name,
+        'formatted_cnpj': company.formatted_cnpj,
+        'is_client': company.is_client,
+        'is_active': company.is_active,
+    }
+
+
+def _contact_match(contact):
+    return {
+        'type': 'contact',
+        'id': contact.id,
+        'name': contact.name,
+        'email': contact.email,
+        'phone': contact.phone,
+        'position': contact.position,
+        'is_primary': contact.is_primary,
+        'company': _company_context(contact.company),
+    }
+
+
+def _company_match(company):
+    return {
+        'type': 'company',
+        'id': company.id,
+        'name': company.name,
+        'email': company.email,
+        'phone': company.phone,
+        'company': _company_context(company),
+    }
+
+
+def _find(kind, keys):
+    """``{chave: [matches]}`` dos contatos e empresas com a chave ``kind``"""
+    field = KEY_FIELDS[kind]
+    found = defaultdict(list)
+    contacts = CompanyContact.objects.filter(**{f'{field}__in': keys}).select_related('company').only(
+        'id', 'name', 'email', 'phone', 'position', 'is_primary', field,
+        *(f'company__{name}' for name in COMPANY_CONTEXT_FIELDS)
+    ).order_by('-is_primary', 'id')
+    for contact in contacts:
+        found[getattr(contact, field)].append(_contact_match(contact))
+
+    companies = Company.objects.filter(**{f'{field}__in': keys}).only(
+        'email', 'phone', field, *COMPANY_CONTEXT_FIELDS
+    ).order_by('id')
+    for company in companies:
+        found[getattr(company, field)].append(_company_match(company))
+    return found
+
+
+def lookup(emails=(), phones=()):
+    """
+    Resolve e-mails e telefones para contatos/empresas.
+
+    Retorna um item por identificador distinto, na ordem recebida:
+    ``{'identifier', 'type', 'normalized', 'matches'}``; os contatos vêm antes
+    das empresas e o contato principal antes dos demais.
+    """
+    identifiers = []
+    seen = set()
+    for kind, values in (('email', emails), ('phone', phones)):
+        for value in values:
+            if not isinstance(value, str):
+                raise DirectoryLookupError(f'Identificador inválido: {value!r}')
+            if (kind, value) not in seen:
+                seen.add((kind, value))
+                identifiers.append((kind, value, NORMALIZERS[kind](value)))
+    if len(identifiers) > MAX_IDENTIFIERS:
+        raise DirectoryLookupError(f'Máximo de {MAX_IDENTIFIERS} identificadores por consulta')
+
+    found = {}
+    for kind in KEY_FIELDS:
+        keys = {normalized for identifier_kind, _, normalized in identifiers if identifier_kind == kind and normalized}
+        found[kind] = _find(kind, keys) if keys else {}
+
+    return [
+        {
+            'identifier': value,
+            'type': kind,
+            'normalized': normalized,
+            'matches': found[kind].get(normalized, []) if normalized else [],
+        }
+        for kind, value, normalized in identifiers
+    ]
@@ -0,0 +1,122 @@
+"""
+Exportação de empresas e contatos em CSV ou XLSX.
+
+As linhas saem de ``.iterator(chunk_size=CHUNK_SIZE)`` sobre o queryset já
+filtrado pela view: o criador vem no mesmo SELECT (``select_related``) e os
+contatos de cada lote em uma query (``prefetch_related`` por lote). A memória
+usada não depende do número de empresas.
+
+O CSV é gerado linha a linha em uma resposta streaming. O XLSX (openpyxl) é
+escrito em modo ``write_only`` em um arquivo temporário e enviado em seguida. Os cabeçalhos de empresas são os aceitos pela importação
+(``importer.COLUMNS``), então um arquivo exportado pode ser reimportado.
+"""
+import csv
+from tempfile import TemporaryFile
+
+import openpyxl
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .models import CompanyContact
+
+CHUNK_SIZE = getattr(settings, 'COMPANY_EXPORT_CHUNK_SIZE', 2000)
+FORMATS = ('csv', 'xlsx')
+
+
+def _date(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M') if value else ''
+
+
+def _yes_no(value):
+    return 'sim' if value else 'não'
+
+
+def _contacts(company):
+    return '; '.join(
+        ' '.join(filter(None, [contact.name, f'<{contact.email}>' if contact.email else '', contact.phone]))
+        for contact in company.contacts.all()
+    )
+
+
+COMPANY_COLUMNS = [
+    ('ID', lambda company: company.id),
+    ('Nome', lambda company: company.name),
+    ('CNPJ', lambda company: company.formatted_cnpj or ''),
+    ('E-mail', lambda company: company.email or ''),
+    ('Telefone', lambda company: company.phone or ''),
+    ('Site', lambda company: company.website or ''),
+    ('Setor', lambda company: company.industry or ''),
+    ('Porte', lambda company: company.size or ''),
+    ('Endereço', lambda company: company.address or ''),
+    ('Observações', lambda company: company.notes or ''),
+    ('Cliente', lambda company: _yes_no(company.is_client)),
+    ('Ativa', lambda company: _yes_no(company.is_active)),
+    ('Contatos', _contacts),
+    ('Criado por', lambda company: company.created_by.username if company.created_by else ''),
+    ('Criado em', lambda company: _date(company.created_at)),
+]
+
+CONTACT_COLUMNS = [
+    ('ID', lambda contact: contact.id),
+    ('Empresa', lambda contact: contact.company.name),
+    ('CNPJ da empresa', lambda contact: contact.company.formatted_cnpj or ''),
+    ('Nome', lambda contact: contact.name),
+    ('E-mail', lambda contact: contact.email or ''),
+    ('Telefone', lambda contact: contact.phone or ''),
+    ('Cargo', lambda contact: contact.position or ''),
+    ('Principal', lambda contact: _yes_no(contact.is_primary)),
+    ('Criado em', lambda contact: _date(contact.created_at)),
+]
+
+
+def _rows(queryset, columns):
+    yield [header for header, _ in columns]
+    for obj in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield [value(obj) for _, value in columns]
+
+
+def company_rows(queryset):
+    """Cabeçalho e linhas das empresas de ``queryset`` (com criador e contatos)"""
+    queryset = queryset.select_related('created_by').prefetch_related(
+        Prefetch('contacts', queryset=CompanyContact.objects.only(
+            'id', 'company_id', 'name', 'email', 'phone'
+        ).order_by('-is_primary', 'name'))
+    )
+    return _rows(queryset, COMPANY_COLUMNS)
+
+
+def contact_rows(queryset):
+    """Cabeçalho e linhas dos contatos de ``queryset`` (com a empresa)"""
+    return _rows(queryset.select_related('company'), CONTACT_COLUMNS)
+
+
+class _Echo:
+    """Arquivo de escrita que devolve o que recebe (para csv.writer em streaming)"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    """Gera o CSV (UTF-8 com BOM, para o Excel reconhecer a codificação) linha a linha"""
+    writer = csv.writer(_Echo())
+    yield '\ufeff'
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(rows, title):
+    """Escreve as linhas em um XLSX temporário; retorna o arquivo posicionado no início"""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    for row in rows:
+        sheet.append(row)
+    output = TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def export_filename(prefix, file_format):
+    return f"{prefix}-{timezone.localdate().strftime('%Y%m%d')}.{file_format}"
@@ -0,0 +1,393 @@
+"""
+Importação de empresas em lote a partir de planilhas CSV ou XLSX.
+
+O upload cria um ``CompanyImportJob`` e o processamento roda em uma thread de
+fundo depois do commit (ou no comando ``run_company_imports``, ou na própria
+thread quando ``COMPANY_IMPORT_ASYNC`` é False). A planilha é lida em fluxo e
+processada em lotes de ``CHUNK_SIZE`` linhas; a memória não depende do tamanho
+do arquivo. Para cada lote:
+
+- os valores são normalizados e validados de uma vez: dígitos verificadores
+  dos CNPJs com NumPy (uma matriz por lote), e-mails e telefones com
+  expressões pré-compiladas;
+- duplicatas são detectadas com uma query ``cnpj IN (...)`` no índice unique
+  e contra os CNPJs já vistos no arquivo;
+- as linhas válidas entram com ``bulk_create``, no índice de busca e nos
+  contadores de estatísticas;
+- o progresso do job é atualizado (uma query ``UPDATE``).
+
+Linhas rejeitadas (erros e duplicatas) vão para um relatório CSV com o
+número da linha, o motivo e os valores originais, disponível para download
+ao final.
+"""
+import csv
+import io
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from tempfile import TemporaryFile
+
+import numpy as np
+import openpyxl
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.validators import URLValidator
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from apps.dashboard.feed import invalidate_feeds
+
+from . import search
+from .models import CNPJ_LENGTH, Company, CompanyImportJob, normalize_cnpj, normalize_email, normalize_phone
+from .statistics import apply_companies
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = getattr(settings, 'COMPANY_IMPORT_CHUNK_SIZE', 1000)
+
+# Colunas aceitas no cabeçalho (comparadas sem acentos e em minúsculas)
+COLUMNS = {
+    'name': ('name', 'nome', 'empresa', 'razao social'),
+    'cnpj': ('cnpj',),
+    'email': ('email', 'e-mail'),
+    'phone': ('phone', 'telefone'),
+    'website': ('website', 'site'),
+    'industry': ('industry', 'setor', 'segmento'),
+    'size': ('size', 'porte', 'tamanho'),
+    'address': ('address', 'endereco'),
+    'notes': ('notes', 'observacoes'),
+    'is_client': ('is_client', 'cliente'),
+}
+_HEADER_ALIASES = {alias: field for field, aliases in COLUMNS.items() for alias in aliases}
+
+CNPJ_WEIGHTS_1 = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+CNPJ_WEIGHTS_2 = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+EMAIL_RE = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s.]+')
+PHONE_RE = re.compile(r'\+?1?\d{9,15}')  # mesmo formato do validador de Company.phone
+_PHONE_PUNCTUATION_RE = re.compile(r'[\s().-]')
+
+TRUE_VALUES = {'1', 'true', 'sim', 's', 'yes', 'y', 'x'}
+_SIZES = {
+    **{key: key for key, _ in Company.COMPANY_SIZES},
+    **{search.normalize_text(label.split(' (')[0]): key for key, label in Company.COMPANY_SIZES},
+    'pequena': 'small', 'media': 'medium', 'grande': 'large',
+}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='company-import')
+_validate_url = URLValidator()
+
+
+class CompanyImportError(ValueError):
+    """Planilha de importação inválida"""
+
+
+def detect_format(filename):
+    """Formato da planilha pela extensão do arquivo"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension not in ('csv', 'xlsx'):
+        raise CompanyImportError("Formato não suportado: envie um arquivo .csv ou .xlsx")
+    return extension
+
+
+def _read_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    first_line = text.readline()
+    # Planilhas exportadas em português costumam usar ';'
+    delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
+    yield from csv.reader(chain([first_line], text), delimiter=delimiter)
+
+
+def _read_xlsx(fileobj):
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield [_cell_text(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _estimate_rows(job):
+    """Número aproximado de linhas de dados, para o percentual de progresso"""
+    with job.file.open('rb') as fileobj:
+        if job.file_format == 'xlsx':
+            workbook = openpyxl.load_workbook(fileobj, read_only=True)
+            rows = workbook.active.max_row
+            workbook.close()
+            return max(rows - 1, 0) if rows else None
+        lines = sum(block.count(b'\n') for block in iter(lambda: fileobj.read(1 << 20), b''))
+        return max(lines - 1, 0)
+
+
+def map_header(header):
+    """Campo de Company de cada coluna do cabeçalho (None para colunas ignoradas)"""
+    fields = [_HEADER_ALIASES.get(search.normalize_text(column)) for column in header]
+    if 'name' not in fields:
+        raise CompanyImportError("A planilha precisa de uma coluna 'nome' (ou 'name')")
+    return fields
+
+
+def valid_cnpj_digits(cnpjs):
+    """
+    Confere os dígitos verificadores de uma lista de CNPJs de 14 dígitos.
+
+    O lote vira uma matriz NumPy (linhas x 14) e as somas ponderadas saem de
+    dois produtos matriciais. Retorna uma lista de booleanos.
+    """
+    if not cnpjs:
+        return []
+    digits = np.frombuffer(''.join(cnpjs).encode('ascii'), dtype=np.uint8)
+    digits = digits.reshape(-1, CNPJ_LENGTH).astype(np.int64) - ord('0')
+    first = digits[:, :12] @ np.array(CNPJ_WEIGHTS_1) % 11
+    second = digits[:, :13] @ np.array(CNPJ_WEIGHTS_2) % 11
+    first = np.where(first < 2, 0, 11 - first)
+    second = np.where(second < 2, 0, 11 - second)
+    return ((digits[:, 12] == first) & (digits[:, 13] == second)).tolist()
+
+
+def _clean_row(values):
+    """Normaliza uma linha; retorna (dados, erro)"""
+    name = values.get('name', '').strip()
+    if len(name) < 2:
+        return None, "Nome da empresa deve ter pelo menos 2 caracteres"
+    if len(name) > 255:
+        return None, "Nome da empresa deve ter no máximo 255 caracteres"
+
+    data = {'name': name}
+    raw_cnpj = values.get('cnpj', '').strip()
+    cnpj = normalize_cnpj(raw_cnpj)
+    # Planilhas guardam o CNPJ como número e perdem os zeros à esquerda
+    if cnpj and cnpj == raw_cnpj and len(cnpj) < CNPJ_LENGTH:
+        cnpj = cnpj.zfill(CNPJ_LENGTH)
+    if raw_cnpj and (cnpj is None or len(cnpj) != CNPJ_LENGTH):
+        return None, "CNPJ deve ter 14 dígitos"
+    data['cnpj'] = cnpj
+
+    email = values.get('email', '').strip().lower()
+    if email and (len(email) > 254 or not EMAIL_RE.fullmatch(email)):
+        return None, f"E-mail inválido: {email}"
+    data['email'] = email or None
+
+    phone = _PHONE_PUNCTUATION_RE.sub('', values.get('phone', ''))
+    if phone and not PHONE_RE.fullmatch(phone):
+        return None, f"Telefone inválido: {values['phone']}"
+    data['phone'] = phone or None
+
+    website = values.get('website', '').strip()
+    if website:
+        if not website.startswith(('http://', 'https://')):
+            website = f"https://{website}"
+        try:
+            _validate_url(website)
+        except ValidationError:
+            return None, f"Site inválido: {values['website']}"
+        if len(website) > 200:
+            return None, "Site deve ter no máximo 200 caracteres"
+    data['website'] = website or None
+
+    size = values.get('size', '').strip()
+    if size:
+        data['size'] = _SIZES.get(search.normalize_text(size))
+        if data['size'] is None:
+            return None, f"Porte inválido: {size}"
+
+    industry = values.get('industry', '').strip()
+    if len(industry) > 100:
+        return None, "Setor deve ter no máximo 100 caracteres"
+    data['industry'] = industry or None
+    data['address'] = values.get('address', '').strip() or None
+    data['notes'] = values.get('notes', '').strip() or None
+    data['is_client'] = search.normalize_text(values.get('is_client', '')) in TRUE_VALUES
+    return data, None
+
+
+class _CompanyImporter:
+    """Processa a planilha de um job, lote a lote"""
+
+    def __init__(self, job):
+        self.job = job
+        self.user = job.created_by
+        self.header = None
+        self.fields = None
+        self.seen_cnpjs = {}
+        self.counts = {'processed_rows': 0, 'created_count': 0, 'duplicate_count': 0, 'error_count': 0}
+        self.rejected = []
+        self.report = None
+
+    def reject(self, line, raw, message, duplicate=False):
+        self.rejected.append([line, message] + raw)
+        self.counts['duplicate_count' if duplicate else 'error_count'] += 1
+
+    def write_report(self):
+        """Grava as linhas rejeitadas do lote no relatório, em ordem de linha"""
+        if not self.rejected:
+            return
+        if self.report is None:
+            self.report = io.TextIOWrapper(TemporaryFile(), encoding='utf-8', newline='')
+            csv.writer(self.report).writerow(['linha', 'erro'] + self.header)
+        csv.writer(self.report).writerows(sorted(self.rejected, key=lambda row: row[0]))
+        self.rejected = []
+
+    def process_chunk(self, chunk):
+        cleaned = []
+        for line, raw in chunk:
+            values = {field: value for field, value in zip(self.fields, raw) if field}
+            data, error = _clean_row(values)
+            if error:
+                self.reject(line, raw, error)
+            else:
+                cleaned.append((line, raw, data))
+
+        with_cnpj = [item for item in cleaned if item[2]['cnpj']]
+        valid = valid_cnpj_digits([data['cnpj'] for _, _, data in with_cnpj])
+        invalid_lines = {line for (line, _, _), ok in zip(with_cnpj, valid) if not ok}
+
+        rows = []
+        for line, raw, data in cleaned:
+            cnpj = data['cnpj']
+            if line in invalid_lines:
+                self.reject(line, raw, "CNPJ inválido")
+            elif cnpj and cnpj in self.seen_cnpjs:
+                self.reject(line, raw, f"CNPJ repetido na planilha (linha {self.seen_cnpjs[cnpj]})", duplicate=True)
+            else:
+                if cnpj:
+                    self.seen_cnpjs[cnpj] = line
+                rows.append((line, raw, data))
+
+        self.save_rows(rows)
+        self.write_report()
+        self.counts['processed_rows'] += len(chunk)
+        CompanyImportJob.objects.filter(pk=self.job.pk).update(**self.counts)
+
+    def save_rows(self, rows):
+        # Uma nova tentativa cobre empresas criadas por outra requisição entre a checagem e o insert
+        for attempt in range(2):
+            existing = set(Company.objects.filter(
+                cnpj__in=[data['cnpj'] for _, _, data in rows if data['cnpj']]
+            ).values_list('cnpj', flat=True))
+            companies = [
+                Company(
+                    search_name=search.normalize_text(data['name']),
+                    normalized_email=normalize_email(data.get('email')),
+                    normalized_phone=normalize_phone(data.get('phone')),
+                    created_by=self.user,
+                    **data
+                )
+                for _, _, data in rows if data['cnpj'] not in existing
+            ]
+            try:
+                with transaction.atomic():
+                    created = Company.objects.bulk_create(companies)
+                    # bulk_create não chama save() nem signals
+                    search.index_companies(created)
+                    apply_companies(created)
+            except IntegrityError:
+                if attempt:
+                    raise
+                continue
+            break
+
+        for line, raw, data in rows:
+            if data['cnpj'] in existing:
+                self.reject(line, raw, "CNPJ já cadastrado", duplicate=True)
+        self.counts['created_count'] += len(created)
+
+    def run(self):
+        job = self.job
+        total = _estimate_rows(job)
+        CompanyImportJob.objects.filter(pk=job.pk).update(total_rows=total)
+
+        reader = _read_xlsx if job.file_format == 'xlsx' else _read_csv
+        with job.file.open('rb') as fileobj:
+            rows = reader(fileobj)
+            self.header = next(rows, None)
+            if not self.header:
+                raise CompanyImportError("Planilha vazia")
+            self.fields = map_header(self.header)
+
+            numbered = (
+                (line, row) for line, row in enumerate(rows, start=2) if any(value.strip() for value in row)
+            )
+            while True:
+                chunk = list(islice(numbered, CHUNK_SIZE))
+                if not chunk:
+                    break
+                self.process_chunk(chunk)
+
+        if self.report is not None:
+            self.report.flush()
+            report = self.report.detach()
+            report.seek(0)
+            stem = job.filename.rsplit('.', 1)[0]
+            job.error_report.save(f'{stem}-rejeitadas.csv', File(report), save=False)
+            report.close()
+
+        CompanyImportJob.objects.filter(pk=job.pk).update(
+            status='completed', finished_at=timezone.now(), error_report=job.error_report.name or '',
+            **self.counts
+        )
+        if self.counts['created_count']:
+            invalidate_feeds([self.user.id])
+        logger.info(f"Importação {job.pk} ({job.filename}) concluída: {self.counts}")
+
+
+def run_import(job_id):
+    """
+    Processa um job pendente; retorna o job atualizado, ou None se outro
+    worker já o assumiu
+    """
+    claimed = CompanyImportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now()
+    )
+    if not claimed:
+        return None
+
+    job = CompanyImportJob.objects.select_related('created_by').get(pk=job_id)
+    try:
+        _CompanyImporter(job).run()
+    except Exception as e:
+        if not isinstance(e, CompanyImportError):
+            logger.exception(f"Erro na importação {job_id}")
+        CompanyImportJob.objects.filter(pk=job_id).update(
+            status='failed', error_message=str(e), finished_at=timezone.now()
+        )
+    job.refresh_from_db()
+    return job
+
+
+def _run_in_background(job_id):
+    try:
+        run_import(job_id)
+    finally:
+        # A thread abre a própria conexão; fecha ao terminar
+        connections.close_all()
+
+
+def create_import_job(uploaded_file, user):
+    """
+    Cria o job para a planilha enviada e agenda o processamento.
+
+    Com ``COMPANY_IMPORT_ASYNC`` (padrão) roda em uma thread de fundo após o
+    commit; sem ele, antes de retornar.
+    """
+    job = CompanyImportJob.objects.create(
+        file=uploaded_file,
+        filename=uploaded_file.name[:255],
+        file_format=detect_format(uploaded_file.name),
+        created_by=user,
+    )
+    if getattr(settings, 'COMPANY_IMPORT_ASYNC', True):
+        transaction.on_commit(lambda: _executor.submit(_run_in_background, job.pk))
+    else:
+        job = run_import(job.pk)
+    return job
@@ -0,0 +1,109 @@
+import statistics
+import time
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.pagination import Cursor
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.companies.models import Company
+from apps.companies.pagination import CompanyPagination, CreatedAtCursorPagination
+from apps.companies.views import LIST_FIELDS, annotate_contact_count
+
+
+class _Rollback(Exception):
+    pass
+
+
+def summarize(timings):
+    """p50 e p95 das medições (interpolação linear)"""
+    if len(timings) < 2:
+        return {'p50': timings[0], 'p95': timings[0]}
+    cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94]}
+
+
+class Command(BaseCommand):
+    help = 'Compara a latência da listagem de empresas na primeira e em uma página profunda (OFFSET x cursor)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page', type=int, default=10000, help='Página profunda medida')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--runs', type=int, default=20, help='Medições por cenário (mínimo 1)')
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Cria N empresas sintéticas (padrão: o necessário para chegar à página) e as descarta ao final'
+        )
+
+    def handle(self, *args, **options):
+        page, page_size = options['page'], options['page_size']
+        seed = options['seed']
+        if seed is None:
+            seed = max(0, page * page_size - Company.objects.count())
+        try:
+            with transaction.atomic():
+                if seed:
+                    self.seed(seed)
+                # As requisições simuladas usam o host "testserver"
+                with override_settings(ALLOWED_HOSTS=['testserver']):
+                    self.measure(page, page_size, max(1, options['runs']))
+                if seed:
+                    raise _Rollback
+        except _Rollback:
+            pass
+
+    def seed(self, total):
+        Company.objects.bulk_create(
+            (Company(name=f'Empresa {index}', search_name=f'empresa {index}') for index in range(total)),
+            batch_size=5000,
+        )
+        self.stderr.write(f'{total} empresas sintéticas criadas')
+
+    def queryset(self):
+        return annotate_contact_count(Company.objects.select_related('created_by').only(*LIST_FIELDS))
+
+    def cursor_for_page(self, page, page_size):
+        """Cursor que aponta para o início de ``page`` (calculado fora da medição)"""
+        if page <= 1:
+            return None
+        last = Company.objects.order_by('-created_at', '-id').only('id', 'created_at')[(page - 1) * page_size - 1]
+        paginator = CreatedAtCursorPagination()
+        paginator.base_url = 'http://testserver/api/companies/companies/'
+        url = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=paginator._position(last)))
+        return parse_qs(urlparse(url).query)[paginator.cursor_query_param][0]
+
+    def timed(self, params, runs):
+        factory = APIRequestFactory()
+        timings = []
+        rows = 0
+        for _ in range(runs):
+            request = Request(factory.get('/api/companies/companies/', params))
+            started = time.perf_counter()
+            paginator = CompanyPagination()
+            rows = len(paginator.paginate_queryset(self.queryset(), request) or [])
+            paginator.get_paginated_response([])
+            timings.append((time.perf_counter() - started) * 1000)
+        return summarize(timings), rows
+
+    def measure(self, page, page_size, runs):
+        total = Company.objects.count()
+        last_page = max(1, (total + page_size - 1) // page_size)
+        page = min(page, last_page)
+        scenarios = [
+            ('offset', 1, {'page': 1, 'page_size': page_size}),
+            ('offset', page, {'page': page, 'page_size': page_size}),
+            ('offset+estimated', page, {'page': page, 'page_size': page_size, 'count': 'estimated'}),
+            ('cursor', 1, {'pagination': 'cursor', 'page_size': page_size}),
+            ('cursor', page, {'cursor': self.cursor_for_page(page, page_size), 'page_size': page_size}),
+        ]
+
+        self.stdout.write(f'{total} empresas, {page_size} por página')
+        for mode, number, params in scenarios:
+            summary, rows = self.timed(params, runs)
+            self.stdout.write(
+                f"{mode:>17} página {number:>6}: {rows} linhas "
+                f"p50={summary['p50']:.2f}ms p95={summary['p95']:.2f}ms"
+            )
@@ -0,0 +1,68 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.companies import search
+from apps.companies.models import Company
+from apps.kanban.analytics import percentiles
+
+WORDS = [
+    'construtora', 'são', 'paulo', 'logística', 'tecnologia', 'alimentos', 'açúcar', 'comércio',
+    'engenharia', 'saúde', 'educação', 'transportes', 'consultoria', 'varejo', 'indústria', 'brasil',
+]
+QUERIES = ['constr', 'sao paulo', 'logistica', 'tecno brasil', 'acucar', 'saude', 'engenharia sao', 'var']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência (p50/p95) da busca de empresas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=200, help='Número de buscas')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Cria N empresas sintéticas para a medição (descartadas ao final)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self.seed(options['seed'])
+                self.measure(options['runs'])
+                if options['seed']:
+                    raise _Rollback
+        except _Rollback:
+            pass
+
+    def seed(self, total):
+        rng = random.Random(42)
+        companies = Company.objects.bulk_create([
+            Company(name=' '.join(rng.sample(WORDS, 3)).title(), notes=' '.join(rng.sample(WORDS, 5)))
+            for _ in range(total)
+        ], batch_size=2000)
+        # bulk_create não chama save() nem signals
+        for company in companies:
+            company.search_name = search.normalize_text(company.name)
+        Company.objects.bulk_update(companies, ['search_name'], batch_size=2000)
+        search.index_companies(companies)
+        self.stderr.write(f'{total} empresas sintéticas criadas')
+
+    def measure(self, runs):
+        timings = []
+        for index in range(runs):
+            query = QUERIES[index % len(QUERIES)]
+            started = time.perf_counter()
+            search.search_company_ids(query, limit=50)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        summary = percentiles(timings, qs=(50, 95, 99))
+        self.stdout.write(
+            f"{summary['count']} buscas em {Company.objects.count()} empresas: "
+            f"p50={summary['p50']:.2f}ms p95={summary['p95']:.2f}ms p99={summary['p99']:.2f}ms"
+        )
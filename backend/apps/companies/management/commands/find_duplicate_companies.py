@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.companies.dedup import MAX_BLOCK_SIZE, SCORE_THRESHOLD, find_duplicates
+
+
+class Command(BaseCommand):
+    help = 'Procura empresas possivelmente duplicadas e atualiza a fila de revisão'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=SCORE_THRESHOLD, help='Score mínimo de um par')
+        parser.add_argument(
+            '--max-block-size', type=int, default=MAX_BLOCK_SIZE,
+            help='Blocos com mais empresas que isso são ignorados',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        summary = find_duplicates(threshold=options['threshold'], max_block_size=options['max_block_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['candidates']} pares candidatos entre {summary['companies']} empresas "
+            f"({summary['pairs']} pares comparados em {summary['blocks']} blocos, {elapsed:.1f}s)"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.companies.search import is_indexed, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Recria o índice de busca das empresas a partir da tabela de empresas'
+
+    def handle(self, *args, **options):
+        if not is_indexed():
+            self.stdout.write(self.style.WARNING('Banco sem índice de busca; a busca usa o nome normalizado'))
+            return
+        total = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'{total} empresas indexadas'))
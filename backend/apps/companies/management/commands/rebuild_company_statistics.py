@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.companies.statistics import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores de estatísticas das empresas a partir da tabela de empresas'
+
+    def handle(self, *args, **options):
+        counts = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"Contadores recalculados: {counts[('total', '')]} empresas"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from apps.companies.importer import run_import
+from apps.companies.models import CompanyImportJob
+
+
+class Command(BaseCommand):
+    help = (
+        'Processa as importações de empresas pendentes (worker dedicado ou '
+        'jobs que ficaram na fila, ex.: após reiniciar o servidor)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', help='Processa apenas o job com este ID')
+
+    def handle(self, *args, **options):
+        pending = CompanyImportJob.objects.filter(status='pending').order_by('created_at')
+        if options['job']:
+            pending = pending.filter(pk=options['job'])
+
+        for job_id in pending.values_list('id', flat=True):
+            job = run_import(job_id)
+            if job is None:
+                continue  # assumido por outro worker
+            self.stdout.write(
+                f"{job.filename}: {job.get_status_display()} - {job.created_count} criadas, "
+                f"{job.duplicate_count} duplicadas, {job.error_count} com erro"
+                + (f" ({job.error_message})" if job.error_message else '')
+            )
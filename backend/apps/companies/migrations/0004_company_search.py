@@ -0,0 +1,127 @@
+# Generated by Django 4.2.5 on 2026-10-19 12:51
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Índice de busca de empresas. Em SQLite é uma tabela virtual FTS5; em
+# PostgreSQL uma tabela com tsvector (GIN) e trigramas do nome (pg_trgm).
+# Outros bancos não têm tabela e a busca usa Company.search_name (ver
+# apps/companies/search.py). A normalização e a indexação abaixo são cópias
+# de search.py no momento desta migração: mudanças no app não a alteram.
+
+SQLITE_CREATE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS companies_search USING fts5(
+    company_id UNINDEXED, name, cnpj, contact, industry, notes,
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+)
+"""
+
+POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE TABLE IF NOT EXISTS companies_search (
+        company_id bigint PRIMARY KEY REFERENCES companies (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        name text NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS companies_search_document_idx ON companies_search USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS companies_search_name_trgm_idx ON companies_search USING GIN (name gin_trgm_ops)",
+]
+
+SQLITE_INSERT = (
+    "INSERT INTO companies_search (company_id, name, cnpj, contact, industry, notes) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+
+POSTGRES_INSERT = """
+INSERT INTO companies_search (company_id, name, document)
+VALUES (%s, %s,
+        setweight(to_tsvector('portuguese', %s), 'A')
+        || setweight(to_tsvector('portuguese', %s), 'A')
+        || setweight(to_tsvector('portuguese', %s), 'B')
+        || setweight(to_tsvector('portuguese', %s), 'B')
+        || setweight(to_tsvector('portuguese', %s), 'D'))
+ON CONFLICT (company_id) DO UPDATE SET name = EXCLUDED.name, document = EXCLUDED.document
+"""
+
+BATCH_SIZE = 2000
+
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_text(value):
+    """Minúsculas, sem acentos e com espaços simples"""
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', str(value))
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return _SPACES_RE.sub(' ', value).strip().lower()
+
+
+def index_companies(schema_editor, companies):
+    """Grava as empresas no índice: (id, nome, cnpj, contato, setor, observações)"""
+    rows = [
+        (
+            company.pk,
+            normalize_text(company.name),
+            company.cnpj or '',
+            normalize_text(' '.join(filter(None, [company.email, company.website]))),
+            normalize_text(company.industry),
+            normalize_text(company.notes),
+        )
+        for company in companies
+    ]
+    vendor = schema_editor.connection.vendor
+    if not rows or vendor not in ('sqlite', 'postgresql'):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.executemany(SQLITE_INSERT, rows)
+        else:
+            cursor.executemany(POSTGRES_INSERT, [(row[0], row[1]) + row[1:] for row in rows])
+
+
+def create_search_index(apps, schema_editor):
+    Company = apps.get_model('companies', 'Company')
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+    elif vendor == 'postgresql':
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+
+    batch = []
+    for company in Company.objects.order_by().iterator(chunk_size=BATCH_SIZE):
+        company.search_name = normalize_text(company.name)
+        batch.append(company)
+        if len(batch) >= BATCH_SIZE:
+            Company.objects.bulk_update(batch, ['search_name'])
+            index_companies(schema_editor, batch)
+            batch = []
+    Company.objects.bulk_update(batch, ['search_name'])
+    index_companies(schema_editor, batch)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS companies_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_alter_company_options_company_cnpj_company_is_active_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.5 on 2026-10-19 12:54
+
+import apps.companies.models
+from django.db import migrations, models
+
+CNPJ_LENGTH = 14
+BATCH_SIZE = 2000
+
+
+def normalize_cnpj(cnpj):
+    """CNPJ canônico: só os dígitos, ou None quando vazio (cópia de models.normalize_cnpj)"""
+    if not cnpj:
+        return None
+    digits = ''.join(char for char in str(cnpj) if '0' <= char <= '9')
+    return digits or None
+
+
+def canonicalize_cnpjs(apps, schema_editor):
+    """
+    Converte os CNPJs gravados para os 14 dígitos.
+
+    Valores que não têm 14 dígitos e formatos diferentes do mesmo CNPJ (que
+    a restrição unique não detectava) viram NULL; a empresa mais antiga fica
+    com o CNPJ e o valor removido é anotado em notes das demais.
+    """
+    Company = apps.get_model('companies', 'Company')
+    keepers = {}
+    cleared = []
+    updated = []
+    companies = Company.objects.exclude(cnpj__isnull=True).only('id', 'cnpj', 'notes').order_by('id')
+    for company in companies.iterator(chunk_size=BATCH_SIZE):
+        cnpj = normalize_cnpj(company.cnpj)
+        if cnpj is None:
+            company.cnpj = None
+            updated.append(company)
+        elif len(cnpj) != CNPJ_LENGTH or cnpj in keepers:
+            reason = 'inválido' if len(cnpj) != CNPJ_LENGTH else 'duplicado'
+            note = f'CNPJ {reason} removido na normalização: {company.cnpj}'
+            company.notes = f'{company.notes}\n{note}' if company.notes else note
+            company.cnpj = None
+            cleared.append(company)
+        else:
+            keepers[cnpj] = company.id
+            if cnpj != company.cnpj:
+                company.cnpj = cnpj
+                updated.append(company)
+
+    # Libera os valores duplicados antes de gravar os normalizados (unique)
+    Company.objects.bulk_update(cleared, ['cnpj', 'notes'], batch_size=BATCH_SIZE)
+    Company.objects.bulk_update(updated, ['cnpj'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0004_company_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_cnpjs, migrations.RunPython.noop),
+        # O índice unique de cnpj já atende as buscas; o índice extra só custava escrita
+        migrations.RemoveIndex(
+            model_name='company',
+            name='companies_cnpj_0deb88_idx',
+        ),
+        migrations.AlterField(
+            model_name='company',
+            name='cnpj',
+            field=models.CharField(blank=True, help_text='CNPJ da empresa (14 dígitos, sem pontuação)', max_length=14, null=True, unique=True, validators=[apps.companies.models.validate_cnpj]),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.5 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_company_import_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('active', 'Active'), ('client', 'Client'), ('size', 'Size'), ('industry', 'Industry')], max_length=20)),
+                ('value', models.CharField(blank=True, default='', max_length=100)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'company_counters',
+                'unique_together': {('dimension', 'value')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.5 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0008_duplicate_candidates'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='company',
+            name='companies_created_c84a3d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['created_at', 'id'], name='companies_created_7bb5d7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companycontact',
+            index=models.Index(fields=['created_at', 'id'], name='company_con_created_77f992_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.5 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+# Cópias de models.normalize_email/normalize_phone no momento desta migração
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone):
+    digits = ''.join(char for char in str(phone or '') if '0' <= char <= '9')
+    if digits.startswith('55') and len(digits) in (12, 13):
+        digits = digits[2:]
+    elif digits.startswith('0') and len(digits) in (11, 12):
+        digits = digits[1:]
+    return digits
+
+
+def fill_lookup_keys(apps, schema_editor):
+    """Preenche normalized_email/normalized_phone de empresas e contatos existentes"""
+    for model_name in ('Company', 'CompanyContact'):
+        model = apps.get_model('companies', model_name)
+        rows = model.objects.exclude(email__isnull=True, phone__isnull=True).only('id', 'email', 'phone')
+        batch = []
+        for row in rows.order_by('id').iterator(chunk_size=BATCH_SIZE):
+            row.normalized_email = normalize_email(row.email)
+            row.normalized_phone = normalize_phone(row.phone)
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, ['normalized_email', 'normalized_phone'])
+                batch = []
+        model.objects.bulk_update(batch, ['normalized_email', 'normalized_phone'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0009_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='normalized_email',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='normalized_phone',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='companycontact',
+            name='normalized_email',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='companycontact',
+            name='normalized_phone',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_lookup_keys, migrations.RunPython.noop),
+    ]
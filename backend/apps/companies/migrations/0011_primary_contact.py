@@ -0,0 +1,49 @@
+# Generated by Django 4.2.5 on 2026-10-19 13:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 2000
+
+
+def fill_primary_contacts(apps, schema_editor):
+    """
+    Deixa um contato principal por empresa (o mais recente marcado, como no
+    antigo perform_create, que desmarcava os anteriores) e aponta
+    Company.primary_contact para ele
+    """
+    Company = apps.get_model('companies', 'Company')
+    CompanyContact = apps.get_model('companies', 'CompanyContact')
+    primaries = {}
+    demoted = []
+    rows = CompanyContact.objects.filter(is_primary=True).order_by('company_id', '-id').values_list('id', 'company_id')
+    for contact_id, company_id in rows.iterator(chunk_size=BATCH_SIZE):
+        if company_id in primaries:
+            demoted.append(contact_id)
+        else:
+            primaries[company_id] = contact_id
+
+    for start in range(0, len(demoted), BATCH_SIZE):
+        CompanyContact.objects.filter(pk__in=demoted[start:start + BATCH_SIZE]).update(is_primary=False)
+    companies = [Company(pk=company_id, primary_contact_id=contact_id) for company_id, contact_id in primaries.items()]
+    Company.objects.bulk_update(companies, ['primary_contact'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0010_contact_lookup_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='primary_contact',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='companies.companycontact'),
+        ),
+        migrations.RunPython(fill_primary_contacts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='companycontact',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_primary', True)), fields=('company',), name='company_contacts_one_primary'),
+        ),
+    ]
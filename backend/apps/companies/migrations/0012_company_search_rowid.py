@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# No FTS5 só o rowid é indexado: apagar por company_id (UNINDEXED) percorria
+# o índice inteiro a cada alteração de empresa. O índice é recriado com
+# rowid = id da empresa. Só o SQLite muda; no PostgreSQL company_id já é a
+# PRIMARY KEY da tabela de busca.
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE companies_search_new USING fts5(
+        company_id UNINDEXED, name, cnpj, contact, industry, notes,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO companies_search_new (rowid, company_id, name, cnpj, contact, industry, notes)
+    SELECT CAST(company_id AS integer), company_id, name, cnpj, contact, industry, notes
+    FROM companies_search
+    WHERE rowid IN (SELECT max(rowid) FROM companies_search GROUP BY company_id)
+    """,
+    "DROP TABLE companies_search",
+    "ALTER TABLE companies_search_new RENAME TO companies_search",
+]
+
+
+def use_company_rowid(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_FORWARD:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0011_primary_contact'),
+    ]
+
+    operations = [
+        # A versão anterior continua lendo o índice com rowid = id
+        migrations.RunPython(use_company_rowid, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,41 @@ from django.db import models
 from django.conf import settings
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
-import re
+import uuid
+
+CNPJ_LENGTH = 14
+
+
+def normalize_cnpj(cnpj):
+    """Canonical CNPJ: only the 14 digits, or None when empty"""
+    if not cnpj:
+        return None
+    digits = ''.join(char for char in str(cnpj) if '0' <= char <= '9')
+    return digits or None
+
+
+def normalize_email(email):
+    """Lookup key for an e-mail: trimmed and lowercased, '' when empty"""
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone):
+    """
+    Lookup key for a phone: national number digits (area code + number), '' when empty.
+    "+55 (11) 3333-4444", "011 3333-4444" and "1133334444" share the key "1133334444".
+    """
+    digits = ''.join(char for char in str(phone or '') if '0' <= char <= '9')
+    if digits.startswith('55') and len(digits) in (12, 13):
+        digits = digits[2:]
+    elif digits.startswith('0') and len(digits) in (11, 12):
+        digits = digits[1:]
+    return digits
+
+
+def with_derived_fields(update_fields, derived):
+    """update_fields plus the fields computed in save() from the ones being updated"""
+    update_fields = set(update_fields)
+    return update_fields | {derived[field] for field in update_fields if field in derived}
 
 
 def validate_cnpj(cnpj):
@@ -11,9 +45,9 @@ def validate_cnpj(cnpj):
         return
     
     # Remove non-numeric characters
-    cnpj = re.sub(r'[^\d]', '', cnpj)
+    cnpj = normalize_cnpj(cnpj) or ''
     
-    if len(cnpj) != 14:
+    if len(cnpj) != CNPJ_LENGTH:
         raise ValidationError('CNPJ deve ter 14 dígitos')
     
     # Basic CNPJ validation algorithm
@@ -46,15 +80,17 @@ class Company(models.Model):
         help_text="Nome da empresa",
         db_index=True  # Index for search performance
     )
+    # Nome em minúsculas e sem acentos (ver search.normalize_text), mantido em save()
+    search_name = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
     
-    # CNPJ with validation
+    # CNPJ stored as 14 digits (normalized in save); the unique index serves exact and prefix lookups
     cnpj = models.CharField(
-        max_length=18,  # Format: XX.XXX.XXX/XXXX-XX
+        max_length=CNPJ_LENGTH,
         blank=True,
         null=True,
         unique=True,
         validators=[validate_cnpj],
-        help_text="CNPJ da empresa (formato: XX.XXX.XXX/XXXX-XX)"
+        help_text="CNPJ da empresa (14 dígitos, sem pontuação)"
     )
     
     email = models.EmailField(
@@ -75,6 +111,10 @@ class Company(models.Model):
         ]
     )
     
+    # Lookup keys kept in save() (normalize_email/normalize_phone), indexed for the contact directory
+    normalized_email = models.CharField(max_length=254, blank=True, default='', editable=False, db_index=True)
+    normalized_phone = models.CharField(max_length=20, blank=True, default='', editable=False, db_index=True)
+
     website = models.URLField(blank=True, null=True)
     industry = models.CharField(max_length=100, blank=True, null=True)
     size = models.CharField(
@@ -93,6 +133,15 @@ class Company(models.Model):
         help_text="Marca se a empresa é cliente ativo"
     )
     
+    # Kept by contacts.py together with CompanyContact.is_primary, so lists can select_related it
+    primary_contact = models.ForeignKey(
+        'CompanyContact',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+
     # Metadata
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -106,6 +155,20 @@ class Company(models.Model):
     def __str__(self):
         return self.name
     
+    # Fields computed in save() from another field
+    DERIVED_FIELDS = {'name': 'search_name', 'email': 'normalized_email', 'phone': 'normalized_phone'}
+
+    def save(self, *args, **kwargs):
+        from .search import normalize_text
+        self.search_name = normalize_text(self.name)
+        self.cnpj = normalize_cnpj(self.cnpj)
+        self.normalized_email = normalize_email(self.email)
+        self.normalized_phone = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = with_derived_fields(update_fields, self.DERIVED_FIELDS)
+        super().save(*args, **kwargs)
+
     def clean(self):
         """Custom validation"""
         super().clean()
@@ -116,18 +179,11 @@ class Company(models.Model):
     
     @property
     def formatted_cnpj(self):
-        """Return formatted CNPJ"""
-        if not self.cnpj:
-            return None
-        cnpj = re.sub(r'[^\d]', '', self.cnpj)
-        if len(cnpj) == 14:
-            return f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:14]}"
-        return self.cnpj
-    
-    @property
-    def contact_count(self):
-        """Return number of contacts"""
-        return self.contacts.count()
+        """Return formatted CNPJ (XX.XXX.XXX/XXXX-XX)"""
+        cnpj = self.cnpj
+        if cnpj and len(cnpj) == CNPJ_LENGTH:
+            return f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}"
+        return cnpj or None
     
     class Meta:
         db_table = 'companies'
@@ -136,9 +192,9 @@ class Company(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['name']),
-            models.Index(fields=['cnpj']),
             models.Index(fields=['is_active', 'is_client']),
-            models.Index(fields=['created_at']),
+            # Ordenação padrão e cursor da paginação keyset (pagination.py)
+            models.Index(fields=['created_at', 'id']),
         ]
 
 
@@ -154,11 +210,148 @@ class CompanyContact(models.Model):
     phone = models.CharField(max_length=20, blank=True, null=True)
     position = models.CharField(max_length=100, blank=True, null=True)
     is_primary = models.BooleanField(default=False)
+    normalized_email = models.CharField(max_length=254, blank=True, default='', editable=False, db_index=True)
+    normalized_phone = models.CharField(max_length=20, blank=True, default='', editable=False, db_index=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
 
+    DERIVED_FIELDS = {'email': 'normalized_email', 'phone': 'normalized_phone'}
+
     def __str__(self):
         return f"{self.name} - {self.company.name}"
 
+    def save(self, *args, **kwargs):
+        self.normalized_email = normalize_email(self.email)
+        self.normalized_phone = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = with_derived_fields(update_fields, self.DERIVED_FIELDS)
+        super().save(*args, **kwargs)
+
     class Meta:
         db_table = 'company_contacts'
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['company'],
+                condition=models.Q(is_primary=True),
+                name='company_contacts_one_primary',
+            ),
+        ]
+
+
+class CompanyCounter(models.Model):
+    """Company count for one statistics dimension/value, kept current by Company signals (see statistics.py)"""
+    DIMENSION_CHOICES = [
+        ('total', 'Total'),
+        ('active', 'Active'),
+        ('client', 'Client'),
+        ('size', 'Size'),
+        ('industry', 'Industry'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    value = models.CharField(max_length=100, blank=True, default='')
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.dimension}:{self.value} = {self.count}"
+
+    class Meta:
+        db_table = 'company_counters'
+        unique_together = ['dimension', 'value']
+
+class CompanyImportJob(models.Model):
+    """Bulk import of companies from a CSV/XLSX spreadsheet (see importer.py)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pendente'),
+        ('running', 'Em andamento'),
+        ('completed', 'Concluída'),
+        ('failed', 'Falhou'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'XLSX'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file = models.FileField(upload_to='company_imports/%Y/%m/')
+    filename = models.CharField(max_length=255)
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+
+    # Progress, updated after each chunk; total_rows is an estimate for CSV
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    error_report = models.FileField(upload_to='company_imports/reports/%Y/%m/', blank=True)
+    error_message = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='company_imports'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        """Percentage of processed rows (None while the total is unknown)"""
+        if self.status == 'completed':
+            return 100.0
+        if not self.total_rows:
+            return None
+        return round(min(self.processed_rows / self.total_rows, 1) * 100, 1)
+
+    class Meta:
+        db_table = 'company_import_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_by', 'created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+
+class DuplicateCandidate(models.Model):
+    """Pair of companies that may be the same, queued for review (see dedup.py)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pendente'),
+        ('dismissed', 'Descartada'),
+    ]
+
+    # company_a is always the one with the lower id
+    company_a = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='+')
+    company_b = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    reasons = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    reviewed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.company_a_id} ~ {self.company_b_id} ({self.score:.2f})"
+
+    class Meta:
+        db_table = 'company_duplicate_candidates'
+        unique_together = ['company_a', 'company_b']
+        indexes = [
+            models.Index(fields=['status', '-score']),
+        ]
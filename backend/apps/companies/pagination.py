@@ -0,0 +1,200 @@
+"""
+Paginação das listagens de empresas e contatos.
+
+Por padrão a paginação é por número de página (``?page=``), compatível com o
+frontend, com um ``COUNT(*)`` por página e ``OFFSET``. Dois modos opcionais:
+
+- ``?pagination=cursor``: paginação keyset por ``(created_at, id)``. O cursor
+  guarda a posição da última linha, então a página 10.000 custa o mesmo que a
+  primeira (índice ``(created_at, id)``) e inserções concorrentes não deslocam
+  os resultados. Aceita ``?ordering=created_at`` (mais antigas primeiro); o
+  padrão é do mais recente para o mais antigo.
+- ``?count=estimated``: troca o ``COUNT(*)`` exato por uma estimativa (plano
+  do PostgreSQL; nos outros bancos, contagem limitada a ``ESTIMATED_COUNT_CAP``
+  linhas). A resposta traz ``count_is_estimate``.
+"""
+import json
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+ESTIMATED_COUNT_CAP = getattr(settings, 'COMPANY_ESTIMATED_COUNT_CAP', 10000)
+
+
+def estimate_count(queryset):
+    """
+    Número aproximado de linhas de ``queryset`` sem percorrer a tabela toda
+
+    No PostgreSQL usa a estimativa do planejador (``EXPLAIN``); nos demais
+    bancos conta no máximo ``ESTIMATED_COUNT_CAP`` linhas.
+    """
+    queryset = queryset.order_by().values('pk')
+    if connection.vendor == 'postgresql':
+        plan = json.loads(queryset.explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    return queryset[:ESTIMATED_COUNT_CAP].count()
+
+
+class EstimatedPage(Page):
+    """Página cuja existência de uma próxima vem da própria query, não do total"""
+    has_more = False
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator do Django com ``count`` estimado (ver ``estimate_count``).
+
+    Como a estimativa pode ficar abaixo do total real, páginas além dela não
+    são rejeitadas e a próxima página é detectada lendo uma linha a mais.
+    """
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            number = int(number)
+            if number < 1:
+                raise
+            return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        page = self._get_page(rows[:self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Paginação keyset por ``(created_at, id)``.
+
+    O ``CursorPagination`` do DRF posiciona o cursor só pelo primeiro campo e
+    usa OFFSET para desempatar; aqui a posição é o par completo, então a query
+    de cada página é sempre ``WHERE (created_at, id) < (...) LIMIT n``.
+    """
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get('ordering') == 'created_at':
+            return ('created_at', 'id')
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        descending = self.ordering[0].startswith('-')
+
+        if self.cursor is not None and self.cursor.position is not None:
+            created_at, pk = self._parse_position(self.cursor.position)
+            # Avançando em ordem decrescente (ou voltando em crescente) as linhas seguintes são "menores"
+            lookup = 'lt' if descending != reverse else 'gt'
+            # O limite redundante em created_at permite ao banco buscar direto no índice (created_at, id)
+            queryset = queryset.filter(
+                Q(**{f'created_at__{lookup}e': created_at}),
+                Q(**{f'created_at__{lookup}': created_at}) | Q(**{f'id__{lookup}': pk}),
+            )
+
+        order = self.ordering
+        if reverse:
+            order = tuple(field[1:] if field.startswith('-') else f'-{field}' for field in order)
+        results = list(queryset.order_by(*order)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        came_from_cursor = self.cursor is not None
+        self.has_next = came_from_cursor if reverse else has_more
+        self.has_previous = has_more if reverse else came_from_cursor
+        return self.page
+
+    def _position(self, obj):
+        return f'{obj.created_at.isoformat()}|{obj.pk}'
+
+    def _parse_position(self, position):
+        created_at, _, pk = position.rpartition('|')
+        try:
+            parsed = parse_datetime(created_at)
+            pk = int(pk)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise NotFound(self.invalid_cursor_message)
+        return parsed, pk
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self._position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self._position(self.page[0])))
+
+
+class CompanyPagination(PageNumberPagination):
+    """
+    Paginação por página das listagens de empresas/contatos, com os modos
+    opcionais ``?pagination=cursor`` e ``?count=estimated``
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def _use_cursor(self, request):
+        return request.query_params.get('pagination') == 'cursor' or 'cursor' in request.query_params
+
+    def _use_estimate(self, request):
+        return request.query_params.get('count') == 'estimated'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimated = self._use_estimate(request)
+        self.cursor_paginator = CreatedAtCursorPagination() if self._use_cursor(request) else None
+        if self.cursor_paginator is not None:
+            page = self.cursor_paginator.paginate_queryset(queryset, request, view)
+            if page is not None and self.estimated:
+                self.estimated_count = estimate_count(queryset)
+            return page
+
+        self.django_paginator_class = EstimatedCountPaginator if self.estimated else Paginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            response = self.cursor_paginator.get_paginated_response(data)
+            if self.estimated:
+                response.data = {'count': self.estimated_count, 'count_is_estimate': True, **response.data}
+            return response
+
+        response = super().get_paginated_response(data)
+        if self.estimated:
+            response.data = {**response.data, 'count_is_estimate': True}
+        return response
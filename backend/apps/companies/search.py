@@ -0,0 +1,174 @@
+"""
+Busca de empresas por nome, CNPJ, e-mail, site, setor e observações.
+
+O índice fica na tabela ``companies_search`` criada pela migração 0004:
+FTS5 no SQLite (o rowid é o id da empresa, migração 0012) e ``tsvector``
+(GIN) mais trigramas (``pg_trgm``) sobre o nome normalizado no PostgreSQL;
+a gravação é a de ``apps.fulltext``. Os textos são normalizados em Python antes
+de indexar e de consultar (minúsculas, sem acentos), então "sao paulo"
+encontra "São Paulo" nos dois bancos sem depender da extensão ``unaccent``.
+
+Cada termo casa por prefixo (typeahead) e todos os termos precisam
+aparecer; acertos no nome pesam mais. No PostgreSQL nomes parecidos
+(erros de digitação) também entram pela similaridade de trigramas. Os
+signals de Company mantêm o índice; operações set-based chamam
+``index_companies``/``remove_companies`` explicitamente. Em outros bancos a
+busca procura os termos em ``Company.search_name`` (nome normalizado).
+"""
+import re
+import unicodedata
+
+from django.db import connection
+
+from apps.fulltext import SearchTable, postgres_tsquery, sqlite_match
+
+SEARCH_TABLE = 'companies_search'
+SEARCH_CONFIG = 'portuguese'
+MAX_TERMS = 8
+
+INDEX = SearchTable(
+    SEARCH_TABLE, 'company_id', columns=['name', 'cnpj', 'contact', 'industry', 'notes'],
+    weights={'name': 'A', 'cnpj': 'A', 'contact': 'B', 'industry': 'B', 'notes': 'D'}, stored=['name'],
+    config=SEARCH_CONFIG,
+)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_SPACES_RE = re.compile(r'\s+')
+# Pontuação entre dígitos (CNPJ formatado): "12.345.678/0001-90" vira um único termo
+_DIGIT_PUNCTUATION_RE = re.compile(r'(?<=\d)[./-](?=\d)')
+
+
+def normalize_text(value):
+    """Minúsculas, sem acentos e com espaços simples"""
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', str(value))
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return _SPACES_RE.sub(' ', value).strip().lower()
+
+
+def parse_terms(query):
+    """Termos normalizados da consulta (no máximo MAX_TERMS)"""
+    query = _DIGIT_PUNCTUATION_RE.sub('', normalize_text(query))
+    return _TOKEN_RE.findall(query)[:MAX_TERMS]
+
+
+def _vendor():
+    return connection.vendor
+
+
+def is_indexed():
+    """Se o banco atual tem índice de busca de empresas"""
+    return _vendor() in ('sqlite', 'postgresql')
+
+
+def _document(company):
+    """Colunas indexadas de uma empresa: (nome, cnpj, contato, setor, observações)"""
+    return (
+        normalize_text(company.name),
+        company.cnpj or '',
+        normalize_text(' '.join(filter(None, [company.email, company.website]))),
+        normalize_text(company.industry),
+        normalize_text(company.notes),
+    )
+
+
+def remove_companies(company_ids):
+    """Remove empresas do índice"""
+    INDEX.remove(company_ids)
+
+
+def index_companies(companies):
+    """Grava ou atualiza empresas no índice"""
+    INDEX.write((company.pk,) + _document(company) for company in companies)
+
+
+def rebuild_index(batch_size=2000):
+    """Recria o índice a partir da tabela de empresas; retorna o número de empresas indexadas"""
+    from .models import Company
+
+    if not is_indexed():
+        return 0
+    INDEX.clear()
+
+    batch = []
+    total = 0
+    companies = Company.objects.only(
+        'id', 'name', 'cnpj', 'email', 'website', 'industry', 'notes'
+    ).order_by().iterator(chunk_size=batch_size)
+    for company in companies:
+        batch.append(company)
+        if len(batch) >= batch_size:
+            index_companies(batch)
+            total += len(batch)
+            batch = []
+    index_companies(batch)
+    return total + len(batch)
+
+
+def _restrict(sql, params, queryset):
+    """Limita a busca às empresas de ``queryset`` (filtros da view)"""
+    if queryset is None:
+        return sql, params
+    subquery, subparams = queryset.order_by().values('id').query.sql_with_params()
+    return f"{sql} AND company_id IN ({subquery})", params + list(subparams)
+
+
+def _search_sqlite(terms, queryset, limit):
+    match = sqlite_match(terms)
+    sql = (
+        f"SELECT company_id, -bm25({SEARCH_TABLE}, 0, 10.0, 8.0, 2.0, 2.0, 0.5) AS rank "
+        f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+    )
+    sql, params = _restrict(sql, [match], queryset)
+    sql += " ORDER BY rank DESC LIMIT %s"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit])
+        return cursor.fetchall()
+
+
+def _search_postgres(terms, queryset, limit):
+    tsquery = postgres_tsquery(terms)
+    phrase = ' '.join(terms)
+    sql = (
+        f"SELECT company_id, ts_rank(document, query) + similarity(name, %s) AS rank "
+        f"FROM {SEARCH_TABLE}, to_tsquery('{SEARCH_CONFIG}', %s) query "
+        # name % termo usa o índice de trigramas (limiar padrão do pg_trgm: 0.3)
+        f"WHERE (document @@ query OR name %% %s)"
+    )
+    sql, params = _restrict(sql, [phrase, tsquery, phrase], queryset)
+    sql += " ORDER BY rank DESC LIMIT %s"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit])
+        return cursor.fetchall()
+
+
+def _search_fallback(terms, queryset, limit):
+    from .models import Company
+
+    queryset = Company.objects.all() if queryset is None else queryset
+    for term in terms:
+        queryset = queryset.filter(search_name__contains=term)
+    company_ids = queryset.order_by('search_name').values_list('id', flat=True)[:limit]
+    return [(company_id, 0.0) for company_id in company_ids]
+
+
+def search_company_ids(query, queryset=None, limit=50):
+    """
+    IDs das empresas que casam com ``query``, do mais relevante para o menos.
+
+    ``queryset`` (opcional) restringe a busca, por exemplo aos filtros da
+    view; é aplicado como subquery antes do LIMIT. Retorna uma lista de
+    tuplas ``(company_id, rank)``.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return []
+
+    if _vendor() == 'sqlite':
+        rows = _search_sqlite(terms, queryset, limit)
+    elif _vendor() == 'postgresql':
+        rows = _search_postgres(terms, queryset, limit)
+    else:
+        rows = _search_fallback(terms, queryset, limit)
+    return [(int(company_id), round(float(rank), 4)) for company_id, rank in rows]
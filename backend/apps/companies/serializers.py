@@ -1,7 +1,39 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.validators import validate_email
-from .models import Company, CompanyContact, validate_cnpj
-import re
+from .models import (
+    Company, CompanyContact, CompanyImportJob, DuplicateCandidate, normalize_cnpj, validate_cnpj
+)
+
+
+class CNPJField(serializers.CharField):
+    """
+    CNPJ aceito com ou sem pontuação e convertido para os 14 dígitos
+    antes da validação de unicidade
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('required', False)
+        kwargs.setdefault('allow_null', True)
+        kwargs.setdefault('allow_blank', True)
+        kwargs.setdefault('max_length', 18)  # XX.XXX.XXX/XXXX-XX
+        kwargs.setdefault('validators', [
+            UniqueValidator(queryset=Company.objects.all(), message='Já existe uma empresa com este CNPJ')
+        ])
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        cnpj = normalize_cnpj(value)
+        # Texto sem dígitos ("abc") não é um CNPJ vazio
+        if value and cnpj is None:
+            raise serializers.ValidationError('CNPJ deve ter 14 dígitos')
+        try:
+            validate_cnpj(cnpj)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return cnpj
 
 
 class CompanyContactSerializer(serializers.ModelSerializer):
@@ -22,10 +54,20 @@ class CompanyContactSerializer(serializers.ModelSerializer):
         return value
 
 
+class PrimaryContactSerializer(serializers.ModelSerializer):
+    """Contato principal exibido junto da empresa"""
+
+    class Meta:
+        model = CompanyContact
+        fields = ['id', 'name', 'email', 'phone', 'position']
+        read_only_fields = fields
+
+
 class CompanyListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for company lists"""
+    """Lightweight serializer for company lists (expects the contact_count annotation)"""
     created_by_name = serializers.CharField(source='created_by.username', read_only=True)
-    contact_count = serializers.IntegerField(source='contacts.count', read_only=True)
+    primary_contact = PrimaryContactSerializer(read_only=True)
+    contact_count = serializers.IntegerField(read_only=True)
     formatted_cnpj = serializers.ReadOnlyField()
     
     class Meta:
@@ -33,15 +75,17 @@ class CompanyListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'email', 'phone', 'website', 'industry',
             'size', 'formatted_cnpj', 'is_active', 'is_client',
-            'contact_count', 'created_by_name', 'created_at'
+            'contact_count', 'primary_contact', 'created_by_name', 'created_at'
         ]
 
 
 class CompanyDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for single company view"""
     contacts = CompanyContactSerializer(many=True, read_only=True)
+    primary_contact = PrimaryContactSerializer(read_only=True)
     created_by_name = serializers.CharField(source='created_by.username', read_only=True)
     contact_count = serializers.IntegerField(source='contacts.count', read_only=True)
+    cnpj = CNPJField()
     formatted_cnpj = serializers.ReadOnlyField()
     
     class Meta:
@@ -49,21 +93,11 @@ class CompanyDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'cnpj', 'formatted_cnpj', 'email', 'phone', 
             'website', 'industry', 'size', 'address', 'notes', 
-            'is_active', 'is_client', 'contacts', 'contact_count',
+            'is_active', 'is_client', 'contacts', 'contact_count', 'primary_contact',
             'created_by', 'created_by_name', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_by', 'formatted_cnpj', 'created_at', 'updated_at']
     
-    def validate_cnpj(self, value):
-        """Validate CNPJ format and digits"""
-        if value:
-            # Clean CNPJ for validation
-            cleaned_cnpj = re.sub(r'[^\d]', '', value)
-            validate_cnpj(cleaned_cnpj)
-            # Store in clean format for consistent storage
-            return cleaned_cnpj
-        return value
-    
     def validate_email(self, value):
         """Validate email format"""
         if value:
@@ -84,6 +118,7 @@ class CompanySerializer(CompanyDetailSerializer):
 
 class CompanyCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating companies"""
+    cnpj = CNPJField()
     
     class Meta:
         model = Company
@@ -93,15 +128,6 @@ class CompanyCreateSerializer(serializers.ModelSerializer):
             'is_active', 'is_client'
         ]
     
-    def validate_cnpj(self, value):
-        """Validate CNPJ format and digits"""
-        if value:
-            # Clean CNPJ for validation
-            cleaned_cnpj = re.sub(r'[^\d]', '', value)
-            validate_cnpj(cleaned_cnpj)
-            return cleaned_cnpj
-        return value
-    
     def validate_name(self, value):
         """Validate company name"""
         if len(value.strip()) < 2:
@@ -121,10 +147,6 @@ class CompanyCreateSerializer(serializers.ModelSerializer):
             validated_data['created_by'] = request.user
         return super().create(validated_data)
     
-    def get_contact_count(self, obj):
-        """Retorna o número de contatos da empresa"""
-        return obj.contacts.count()
-    
     def create(self, validated_data):
         """Criar empresa com usuário atual como criador"""
         user = self.context['request'].user
@@ -132,22 +154,6 @@ class CompanyCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class CompanyListSerializer(serializers.ModelSerializer):
-    """Serializer resumido para listagem de empresas"""
-    created_by_name = serializers.CharField(source='created_by.username', read_only=True)
-    contact_count = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = Company
-        fields = [
-            'id', 'name', 'email', 'phone', 'website', 'industry', 
-            'size', 'contact_count', 'created_by_name', 'created_at'
-        ]
-    
-    def get_contact_count(self, obj):
-        return obj.contacts.count()
-
-
 class CompanyCreateUpdateSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         print(f'[DEBUG][validate] Dados recebidos: {attrs}')
@@ -188,3 +194,45 @@ class CompanyCreateUpdateSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Insira um URL válido.")
         print(f'[DEBUG][validate_website] Valor final: {value}')
         return value
+
+
+class CompanyImportJobSerializer(serializers.ModelSerializer):
+    """Estado e progresso de uma importação de empresas"""
+    progress = serializers.FloatField(read_only=True)
+    has_error_report = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CompanyImportJob
+        fields = [
+            'id', 'filename', 'file_format', 'status', 'progress', 'total_rows',
+            'processed_rows', 'created_count', 'duplicate_count', 'error_count',
+            'has_error_report', 'error_message', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_has_error_report(self, obj):
+        return bool(obj.error_report)
+
+
+class DuplicateCompanySerializer(serializers.ModelSerializer):
+    """Dados de uma empresa exibidos na revisão de duplicatas"""
+    formatted_cnpj = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Company
+        fields = ['id', 'name', 'formatted_cnpj', 'email', 'phone', 'website', 'industry', 'created_at']
+
+
+class DuplicateCandidateSerializer(serializers.ModelSerializer):
+    """Par de empresas possivelmente duplicadas"""
+    company_a = DuplicateCompanySerializer(read_only=True)
+    company_b = DuplicateCompanySerializer(read_only=True)
+    reviewed_by_name = serializers.CharField(source='reviewed_by.username', read_only=True, default=None)
+
+    class Meta:
+        model = DuplicateCandidate
+        fields = [
+            'id', 'company_a', 'company_b', 'score', 'reasons', 'status',
+            'reviewed_by_name', 'reviewed_at', 'created_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,54 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from apps.companies.models import Company
+from apps.companies import search, statistics
+
+# Campos de Company presentes no índice de busca
+SEARCH_FIELDS = {'name', 'cnpj', 'email', 'website', 'industry', 'notes'}
+
+
+@receiver(pre_save, sender=Company)
+def capture_company_previous_counters(sender, instance, update_fields=None, **kwargs):
+    """
+    Guarda a parcela da empresa nas estatísticas antes de salvar
+    """
+    instance._previous_contribution = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(statistics.COUNTED_FIELDS).intersection(update_fields):
+        instance._previous_contribution = 'unchanged'
+        return
+    previous = Company.objects.filter(pk=instance.pk).values_list(*statistics.COUNTED_FIELDS).first()
+    if previous is not None:
+        instance._previous_contribution = statistics.company_contribution(*previous)
+
+
+@receiver(post_save, sender=Company)
+def update_company_counters_on_save(sender, instance, created, **kwargs):
+    """
+    Aplica a mudança da empresa nos contadores de estatísticas
+    """
+    previous = getattr(instance, '_previous_contribution', None)
+    if previous == 'unchanged':
+        return
+    statistics.apply_delta(removed=previous, added=statistics.contribution_of(instance))
+
+
+@receiver(post_save, sender=Company)
+def update_company_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Mantém o índice de busca da empresa atualizado
+    """
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    search.index_companies([instance])
+
+
+@receiver(post_delete, sender=Company)
+def remove_company_from_search_index(sender, instance, **kwargs):
+    search.remove_companies([instance.pk])
+
+
+@receiver(post_delete, sender=Company)
+def update_company_counters_on_delete(sender, instance, **kwargs):
+    statistics.apply_delta(removed=statistics.contribution_of(instance))
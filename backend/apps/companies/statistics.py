@@ -0,0 +1,191 @@
+"""
+Estatísticas globais das empresas a partir de contadores incrementais.
+
+Cada contagem é uma linha de CompanyCounter (``dimension``, ``value``):
+total, ativas, clientes, por porte e por setor. Os signals de Company
+aplicam a diferença entre o estado anterior e o novo com ``UPDATE count =
+count ± 1`` nas linhas afetadas, sem agregar a tabela de empresas.
+Operações set-based (importação) chamam ``apply_companies`` explicitamente.
+
+Enquanto a linha ``total`` não existe os contadores são considerados não
+inicializados: as escritas não fazem nada e a próxima leitura recalcula tudo
+com uma única agregação (o mesmo vale para o comando
+``rebuild_company_statistics``).
+
+O resumo lido dos contadores fica em cache sob uma chave versionada. Depois
+do commit de qualquer mudança a versão é incrementada; uma leitura que
+começou antes grava o resumo (possivelmente desatualizado) na versão antiga,
+que ninguém mais consulta.
+"""
+import logging
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import Company, CompanyCounter
+
+logger = logging.getLogger(__name__)
+
+STATISTICS_CACHE_KEY = 'companies:statistics:{version}'
+STATISTICS_VERSION_KEY = 'companies:statistics:version'
+STATISTICS_CACHE_TTL = getattr(settings, 'COMPANY_STATISTICS_CACHE_TTL', 60 * 60)
+
+# Campos de Company que entram nas contagens
+COUNTED_FIELDS = ('is_active', 'is_client', 'size', 'industry')
+
+
+def company_contribution(is_active, is_client, size, industry):
+    """Contadores ``(dimension, value)`` aos quais uma empresa soma 1"""
+    keys = {('total', ''), ('size', size or ''), ('industry', (industry or '')[:100])}
+    if is_active:
+        keys.add(('active', ''))
+    if is_client:
+        keys.add(('client', ''))
+    return frozenset(keys)
+
+
+def contribution_of(company):
+    return company_contribution(company.is_active, company.is_client, company.size, company.industry)
+
+
+def _statistics_version():
+    version = cache.get(STATISTICS_VERSION_KEY)
+    if version is None:
+        # Uma versão nova (e não 1) não reaproveita resumos antigos se a chave foi descartada
+        cache.add(STATISTICS_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(STATISTICS_VERSION_KEY)
+    return version
+
+
+def _bump_version():
+    try:
+        cache.incr(STATISTICS_VERSION_KEY)
+    except ValueError:
+        cache.add(STATISTICS_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_statistics():
+    """Invalida o resumo em cache (nova versão) depois do commit da transação atual"""
+    transaction.on_commit(_bump_version)
+
+
+def _is_initialized():
+    return CompanyCounter.objects.filter(dimension='total', value='').exists()
+
+
+def apply_deltas(deltas):
+    """Soma ``deltas`` (``{(dimension, value): n}``) aos contadores"""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        if not _is_initialized():
+            return
+        for (dimension, value), delta in deltas.items():
+            counters = CompanyCounter.objects.filter(dimension=dimension, value=value)
+            if counters.update(count=F('count') + delta) or delta < 0:
+                continue
+            try:
+                with transaction.atomic():
+                    CompanyCounter.objects.create(dimension=dimension, value=value, count=delta)
+            except IntegrityError:
+                # Criada por outra transação entre o UPDATE e o INSERT
+                counters.update(count=F('count') + delta)
+
+        # Porte/setor que ficaram sem empresas deixam de aparecer
+        emptied = Q()
+        for (dimension, value), delta in deltas.items():
+            if delta < 0 and dimension in ('size', 'industry'):
+                emptied |= Q(dimension=dimension, value=value)
+        if emptied:
+            CompanyCounter.objects.filter(emptied, count__lte=0).delete()
+    invalidate_statistics()
+
+
+def apply_delta(removed=None, added=None):
+    """Aplica a mudança de uma empresa (parcelas de ``company_contribution``)"""
+    removed = removed or frozenset()
+    added = added or frozenset()
+    if removed == added:
+        return
+    deltas = Counter({key: 1 for key in added - removed})
+    deltas.update({key: -1 for key in removed - added})
+    apply_deltas(deltas)
+
+
+def apply_companies(companies, sign=1):
+    """Soma (ou subtrai, com ``sign=-1``) várias empresas aos contadores"""
+    deltas = Counter()
+    for company in companies:
+        for key in contribution_of(company):
+            deltas[key] += sign
+    apply_deltas(deltas)
+
+
+def compute_counters():
+    """Contagens calculadas a partir da tabela de empresas (uma agregação)"""
+    counts = Counter()
+    rows = Company.objects.values(*COUNTED_FIELDS).annotate(count=Count('id')).order_by()
+    for row in rows:
+        for key in company_contribution(row['is_active'], row['is_client'], row['size'], row['industry']):
+            counts[key] += row['count']
+    counts.setdefault(('total', ''), 0)
+    return counts
+
+
+def rebuild_counters():
+    """Recalcula e grava todos os contadores; retorna as contagens"""
+    counts = compute_counters()
+    with transaction.atomic():
+        CompanyCounter.objects.all().delete()
+        CompanyCounter.objects.bulk_create([
+            CompanyCounter(dimension=dimension, value=value, count=count)
+            for (dimension, value), count in counts.items()
+        ])
+    invalidate_statistics()
+    logger.info(f"Contadores de empresas recalculados: {counts[('total', '')]} empresas")
+    return counts
+
+
+def _summary(counts):
+    by_size = {value: count for (dimension, value), count in counts.items() if dimension == 'size' and value}
+    by_industry = {
+        value: count for (dimension, value), count in counts.items() if dimension == 'industry' and value
+    }
+    return {
+        'total': counts.get(('total', ''), 0),
+        'active': counts.get(('active', ''), 0),
+        'clients': counts.get(('client', ''), 0),
+        'by_size': dict(sorted(by_size.items(), key=lambda item: (-item[1], item[0]))),
+        'by_industry': dict(sorted(by_industry.items(), key=lambda item: (-item[1], item[0]))),
+    }
+
+
+def get_statistics():
+    """
+    Resumo das contagens: ``total``, ``active``, ``clients``, ``by_size`` e
+    ``by_industry`` (ordenados do maior para o menor).
+
+    Lido do cache global; sem cache, dos contadores (recalculados se ainda
+    não existem).
+    """
+    # A versão é lida antes dos contadores: uma invalidação no meio da leitura a torna obsoleta
+    key = STATISTICS_CACHE_KEY.format(version=_statistics_version())
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    counts = {
+        (dimension, value): count
+        for dimension, value, count in CompanyCounter.objects.values_list('dimension', 'value', 'count')
+    }
+    if ('total', '') not in counts:
+        counts = rebuild_counters()
+    summary = _summary(counts)
+    cache.set(key, summary, STATISTICS_CACHE_TTL)
+    return summary
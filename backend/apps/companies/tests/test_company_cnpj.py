@@ -0,0 +1,139 @@
+import importlib
+
+import pytest
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company, normalize_cnpj
+
+COMPANIES_URL = '/api/companies/companies/'
+BY_CNPJ_URL = '/api/companies/companies/by_cnpj/'
+PREFIX_URL = '/api/companies/companies/cnpj_prefix/'
+
+
+@pytest.fixture
+def client():
+    User = get_user_model()
+    user = User.objects.create_user(username='cnpj', password='test123')
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def test_normalize_cnpj():
+    assert normalize_cnpj('11.222.333/0001-81') == '11222333000181'
+    assert normalize_cnpj(' 11222333000181 ') == '11222333000181'
+    assert normalize_cnpj('') is None
+    assert normalize_cnpj('./-') is None
+
+
+@pytest.mark.django_db
+def test_save_stores_digits_and_formats_without_regex():
+    company = Company.objects.create(name='Alfa', cnpj='11.222.333/0001-81')
+    blank = Company.objects.create(name='Sem CNPJ', cnpj='')
+
+    company.refresh_from_db()
+    assert company.cnpj == '11222333000181'
+    assert company.formatted_cnpj == '11.222.333/0001-81'
+    # '' vira NULL: várias empresas sem CNPJ não colidem no unique
+    assert Company.objects.get(pk=blank.pk).cnpj is None
+    assert Company.objects.create(name='Outra sem CNPJ', cnpj='').formatted_cnpj is None
+
+
+@pytest.mark.django_db
+def test_api_accepts_formatted_and_rejects_duplicates_in_any_format(client):
+    response = client.post(COMPANIES_URL, {'name': 'Alfa', 'cnpj': '11.222.333/0001-81'})
+    assert response.status_code == 201
+    assert Company.objects.get(name='Alfa').cnpj == '11222333000181'
+
+    response = client.post(COMPANIES_URL, {'name': 'Beta', 'cnpj': '11222333000181'})
+    assert response.status_code == 400
+    assert 'cnpj' in response.data
+
+    response = client.post(COMPANIES_URL, {'name': 'Gama', 'cnpj': '11.222.333/0001-82'})
+    assert response.status_code == 400
+    assert 'cnpj' in response.data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cnpj', ['abc', './-', '1122233300018', '11.222.333/0001-810'])
+def test_api_rejects_cnpj_without_14_digits(client, cnpj):
+    response = client.post(COMPANIES_URL, {'name': 'Beta', 'cnpj': cnpj})
+
+    assert response.status_code == 400
+    assert response.data['cnpj'] == ['CNPJ deve ter 14 dígitos']
+    assert not Company.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cnpj', ['', '   '])
+def test_api_accepts_blank_cnpj(client, cnpj):
+    response = client.post(COMPANIES_URL, {'name': 'Beta', 'cnpj': cnpj})
+
+    assert response.status_code == 201
+    assert Company.objects.get(name='Beta').cnpj is None
+
+
+@pytest.mark.django_db
+def test_by_cnpj(client):
+    company = Company.objects.create(name='Alfa', cnpj='11222333000181')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(BY_CNPJ_URL, {'cnpj': '11.222.333/0001-81'})
+    assert response.status_code == 200
+    assert response.data['id'] == company.id
+    assert response.data['formatted_cnpj'] == '11.222.333/0001-81'
+    assert '"companies"."cnpj" = ' in queries.captured_queries[-1]['sql']
+
+    assert client.get(BY_CNPJ_URL, {'cnpj': '11444777000161'}).status_code == 404
+    assert client.get(BY_CNPJ_URL, {'cnpj': '1122'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_cnpj_prefix(client):
+    Company.objects.create(name='Alfa', cnpj='11222333000181')
+    Company.objects.create(name='Alfa Filial', cnpj='11222333000262')
+    Company.objects.create(name='Beta', cnpj='11444777000161')
+
+    response = client.get(PREFIX_URL, {'prefix': '11.222.333'})
+
+    assert response.status_code == 200
+    assert [item['name'] for item in response.data['results']] == ['Alfa', 'Alfa Filial']
+    assert response.data['prefix'] == '11222333'
+    assert client.get(PREFIX_URL, {'prefix': '11'}).data['count'] == 3
+    assert client.get(PREFIX_URL, {'prefix': ''}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_search_matches_formatted_cnpj():
+    from apps.companies import search
+
+    company = Company.objects.create(name='Alfa', cnpj='11222333000181')
+
+    assert [company_id for company_id, _ in search.search_company_ids('11.222.333/0001')] == [company.id]
+
+
+@pytest.mark.django_db
+def test_migration_canonicalizes_existing_values():
+    migration = importlib.import_module('apps.companies.migrations.0005_canonical_cnpj')
+    canonical = Company.objects.create(name='Nova', cnpj='11444777000161')
+    formatted = Company.objects.create(name='Antiga')
+    duplicate = Company.objects.create(name='Duplicada', notes='Filial')
+    invalid = Company.objects.create(name='Inválida')
+    # Valores gravados antes da normalização (sem passar por save)
+    Company.objects.filter(pk=formatted.pk).update(cnpj='11.222.333/0001-81')
+    Company.objects.filter(pk=duplicate.pk).update(cnpj='11222333/0001-81')
+    Company.objects.filter(pk=invalid.pk).update(cnpj='123')
+
+    migration.canonicalize_cnpjs(apps, None)
+
+    values = dict(Company.objects.values_list('name', 'cnpj'))
+    assert values == {'Nova': '11444777000161', 'Antiga': '11222333000181', 'Duplicada': None, 'Inválida': None}
+    assert Company.objects.get(pk=duplicate.pk).notes == (
+        'Filial\nCNPJ duplicado removido na normalização: 11222333/0001-81'
+    )
+    assert 'CNPJ inválido' in Company.objects.get(pk=invalid.pk).notes
+    assert Company.objects.get(pk=canonical.pk).cnpj == '11444777000161'
@@ -0,0 +1,133 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from apps.companies import directory, importer
+from apps.companies.models import Company, CompanyContact, normalize_email, normalize_phone
+
+LOOKUP_URL = '/api/companies/contacts/lookup/'
+CONTACTS_URL = '/api/companies/contacts/'
+
+
+@pytest.fixture
+def client():
+    User = get_user_model()
+    user = User.objects.create_user(username='diretorio', password='test123')
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    api_client.user = user
+    return api_client
+
+
+@pytest.fixture
+def alfa():
+    company = Company.objects.create(
+        name='Alfa Ltda', email='Contato@Alfa.com.br', phone='1140041234', cnpj='11222333000181', is_client=True
+    )
+    CompanyContact.objects.create(company=company, name='Ana', email=' ANA@alfa.com.br ', phone='(11) 98888-7777')
+    CompanyContact.objects.create(
+        company=company, name='Bruno', email='bruno@alfa.com.br', phone='+55 11 98888-7777', is_primary=True
+    )
+    return company
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('+55 (11) 98888-7777', '11988887777'),
+    ('011 3333-4444', '1133334444'),
+    ('(11) 3333-4444', '1133334444'),
+    ('5511333344', '5511333344'),
+    ('', ''),
+    (None, ''),
+])
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw) == expected
+
+
+def test_normalize_email():
+    assert normalize_email('  Ana@Alfa.COM.br ') == 'ana@alfa.com.br'
+    assert normalize_email(None) == ''
+
+
+@pytest.mark.django_db
+def test_save_keeps_lookup_keys_current(alfa):
+    assert (alfa.normalized_email, alfa.normalized_phone) == ('contato@alfa.com.br', '1140041234')
+
+    contact = CompanyContact.objects.get(name='Ana')
+    contact.phone = '0 11 3222-1111'
+    contact.save(update_fields=['phone'])
+
+    contact.refresh_from_db()
+    assert contact.normalized_phone == '1132221111'
+
+
+@pytest.mark.django_db
+def test_lookup_resolves_contacts_and_companies_in_constant_queries(alfa, django_assert_num_queries):
+    with django_assert_num_queries(4):
+        results = directory.lookup(
+            emails=['ana@ALFA.com.br', 'contato@alfa.com.br', 'ninguem@beta.com'],
+            phones=['11 98888 7777', '', '+55 11 4004-1234'],
+        )
+
+    by_identifier = {result['identifier']: result for result in results}
+    assert [match['name'] for match in by_identifier['ana@ALFA.com.br']['matches']] == ['Ana']
+    assert by_identifier['contato@alfa.com.br']['matches'][0]['type'] == 'company'
+    assert by_identifier['ninguem@beta.com']['matches'] == []
+    assert by_identifier['']['matches'] == []
+    # Contato principal primeiro
+    assert [match['name'] for match in by_identifier['11 98888 7777']['matches']] == ['Bruno', 'Ana']
+    assert by_identifier['+55 11 4004-1234']['matches'] == [{
+        'type': 'company', 'id': alfa.id, 'name': 'Alfa Ltda', 'email': 'Contato@Alfa.com.br', 'phone': '1140041234',
+        'company': {
+            'id': alfa.id, 'name': 'Alfa Ltda', 'formatted_cnpj': '11.222.333/0001-81',
+            'is_client': True, 'is_active': True,
+        },
+    }]
+
+
+@pytest.mark.django_db
+def test_lookup_limits_batch_size(monkeypatch):
+    monkeypatch.setattr(directory, 'MAX_IDENTIFIERS', 2)
+
+    with pytest.raises(directory.DirectoryLookupError):
+        directory.lookup(emails=['a@x.com', 'b@x.com'], phones=['1133334444'])
+    # Repetidos contam uma vez
+    assert len(directory.lookup(emails=['a@x.com', 'a@x.com'], phones=['1133334444'])) == 2
+
+
+@pytest.mark.django_db
+def test_lookup_endpoint(client, alfa):
+    response = client.post(
+        LOOKUP_URL, {'emails': ['BRUNO@alfa.com.br'], 'phones': ['(11) 4004-1234']}, format='json'
+    )
+
+    assert response.status_code == 200
+    assert response.data['matched'] == 2
+    contact = response.data['results'][0]['matches'][0]
+    assert (contact['type'], contact['name'], contact['company']['name']) == ('contact', 'Bruno', 'Alfa Ltda')
+
+    response = client.post(LOOKUP_URL, {'emails': 'ana@alfa.com.br'}, format='json')
+    assert response.status_code == 400
+    response = client.post(LOOKUP_URL, {'emails': [f'{index}@x.com' for index in range(1001)]}, format='json')
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_contact_list_filters_by_normalized_email_and_phone(client, alfa):
+    response = client.get(CONTACTS_URL, {'email': 'Ana@Alfa.com.br'})
+    assert [contact['name'] for contact in response.data['results']] == ['Ana']
+
+    response = client.get(CONTACTS_URL, {'phone': '011 98888-7777', 'ordering': 'created_at', 'pagination': 'cursor'})
+    assert [contact['name'] for contact in response.data['results']] == ['Ana', 'Bruno']
+
+
+@pytest.mark.django_db
+def test_import_fills_lookup_keys(client):
+    upload = SimpleUploadedFile(
+        'empresas.csv', 'nome,email,telefone\nGama,VENDAS@gama.com.br,(21) 3555-0000\n'.encode(), content_type='text/csv'
+    )
+
+    importer.create_import_job(upload, client.user)
+
+    company = Company.objects.get(name='Gama')
+    assert (company.normalized_email, company.normalized_phone) == ('vendas@gama.com.br', '2135550000')
@@ -0,0 +1,224 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.authentication.models import UserProfile
+from apps.companies import dedup, search, statistics
+from apps.companies.models import Company, CompanyContact, DuplicateCandidate
+from apps.kanban.models import Board
+
+DUPLICATES_URL = '/api/companies/duplicates/'
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(username='revisor', password='test123')
+
+
+@pytest.fixture
+def client(user):
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def pair_ids():
+    return set(DuplicateCandidate.objects.values_list('company_a_id', 'company_b_id'))
+
+
+def test_name_tokens_ignore_case_accents_and_legal_suffixes():
+    assert dedup.name_tokens('CONSTRUTORA ALFA S.A.') == ['construtora', 'alfa']
+    assert dedup.name_tokens('Construtora Alfa Ltda') == ['construtora', 'alfa']
+    assert dedup.name_tokens('Comércio de Peças São João ME') == ['comercio', 'pecas', 'sao', 'joao']
+
+
+def test_score_pairs_combines_name_and_shared_signals():
+    features = {
+        1: dedup.company_features('Padaria Pão Quente', 'contato@paoquente.com.br', '', '', None),
+        2: dedup.company_features('Padaria Pao Quente Ltda', '', 'https://www.paoquente.com.br/', '', None),
+        3: dedup.company_features('Mercado Central', 'joao@gmail.com', '', '', None),
+        4: dedup.company_features('Supermercado do Centro', 'maria@gmail.com', '', '', None),
+    }
+
+    results = dedup.score_pairs([(1, 2), (3, 4)], features, threshold=0.6)
+
+    assert [(a, b, reasons) for a, b, _, reasons in results] == [(1, 2, ['name', 'email_domain'])]
+    assert results[0][2] == 1.0
+
+
+def test_name_similarities_match_trigram_jaccard():
+    names = {1: 'Padaria Pão Quente', 2: 'Padaria Pao Quente Ltda', 3: 'Panificadora Quente', 4: '', 5: 'S.A.'}
+    features = {company_id: dedup.company_features(name, '', '', '', None) for company_id, name in names.items()}
+    pairs = [(1, 2), (1, 3), (2, 3), (1, 4), (4, 5)]
+
+    def jaccard(left, right):
+        if not left or not right:
+            return 0.0
+        trigrams = [{f'  {key} '[index:index + 3] for index in range(len(key) + 1)} for key in (left, right)]
+        return len(trigrams[0] & trigrams[1]) / len(trigrams[0] | trigrams[1])
+
+    expected = [jaccard(features[a][0], features[b][0]) for a, b in pairs]
+    assert dedup.name_similarities(pairs, features).tolist() == pytest.approx(expected)
+    assert expected[0] == 1.0 and 0 < expected[1] < 1
+
+
+def test_candidate_pairs_emit_each_pair_once_from_smallest_compared_block():
+    blocks = {
+        't:alfa': [1, 2, 3],
+        't:construtora': [1, 2],
+        'd:alfa.com.br': [2, 3],
+        't:comercio': [1, 2, 3, 4],
+    }
+
+    assert sorted(dedup.candidate_pairs(blocks, max_block_size=3)) == [(1, 2), (1, 3), (2, 3)]
+    pairs = list(dedup.candidate_pairs(blocks, max_block_size=4))
+    assert sorted(pairs) == [(1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)]
+
+
+@pytest.mark.django_db
+def test_find_duplicates_pairs_similar_companies_only():
+    alfa = Company.objects.create(name='Construtora Alfa Ltda', email='obras@alfa.com.br')
+    alfa_sa = Company.objects.create(name='CONSTRUTORA ALFA S.A.', website='alfa.com.br')
+    Company.objects.create(name='Beta Tecnologia', phone='(11) 3333-4444')
+    Company.objects.create(name='Gama Alimentos', phone='11 3333 4444')
+    Company.objects.create(name='Delta Transportes')
+
+    summary = dedup.find_duplicates()
+
+    assert pair_ids() == {(alfa.id, alfa_sa.id)}
+    assert summary['companies'] == 5
+    assert summary['candidates'] == 1
+    candidate = DuplicateCandidate.objects.get()
+    assert candidate.status == 'pending'
+    assert candidate.reasons == ['name', 'email_domain']
+
+
+@pytest.mark.django_db
+def test_blocks_larger_than_limit_are_not_compared():
+    for index in range(4):
+        Company.objects.create(name=f'Comercial {index} Norte')
+
+    assert dedup.find_duplicates(threshold=0.0, max_block_size=3)['pairs'] == 0
+    assert dedup.find_duplicates(threshold=0.0, max_block_size=4)['pairs'] == 6
+
+
+@pytest.mark.django_db
+def test_rescan_keeps_dismissed_pairs_and_drops_stale_pending():
+    alfa = Company.objects.create(name='Construtora Alfa Ltda')
+    alfa_sa = Company.objects.create(name='Construtora Alfa S.A.')
+    beta = Company.objects.create(name='Beta Tecnologia')
+    beta_me = Company.objects.create(name='Beta Tecnologia ME')
+    dedup.find_duplicates()
+    assert pair_ids() == {(alfa.id, alfa_sa.id), (beta.id, beta_me.id)}
+
+    DuplicateCandidate.objects.filter(company_a=alfa).update(status='dismissed')
+    beta_me.name = 'Omega Logística'
+    beta_me.save()
+    dedup.find_duplicates()
+
+    assert list(DuplicateCandidate.objects.values_list('company_a_id', 'status')) == [(alfa.id, 'dismissed')]
+
+
+@pytest.mark.django_db
+def test_merge_moves_relations_fills_fields_and_removes_duplicate(user, django_capture_on_commit_callbacks):
+    statistics.get_statistics()
+    target = Company.objects.create(name='Construtora Alfa Ltda', email='obras@alfa.com.br', notes='Cliente antigo')
+    duplicate = Company.objects.create(
+        name='CONSTRUTORA ALFA S.A.', cnpj='11.222.333/0001-81', phone='11 3333-4444',
+        industry='Construção', is_client=True, notes='Cadastro duplicado'
+    )
+    CompanyContact.objects.create(company=target, name='Ana')
+    CompanyContact.objects.create(company=duplicate, name='Bruno')
+    Board.objects.create(name='Vendas', company=target, created_by=user)
+    Board.objects.create(name='Vendas', company=duplicate, created_by=user)
+    Board.objects.create(name='Pós-venda', company=duplicate, created_by=user)
+    profile = UserProfile.objects.create(user=user, company=duplicate)
+    dedup.find_duplicates()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        merged, moved = dedup.merge_companies(target, duplicate)
+
+    assert not Company.objects.filter(pk=duplicate.pk).exists()
+    assert not DuplicateCandidate.objects.exists()
+    assert moved == {'companies.CompanyContact': 1, 'kanban.Board': 2, 'authentication.UserProfile': 1}
+    assert set(merged.contacts.values_list('name', flat=True)) == {'Ana', 'Bruno'}
+    assert set(Board.objects.filter(company=target).values_list('name', flat=True)) == {
+        'Vendas', 'Vendas (CONSTRUTORA ALFA S.A.)', 'Pós-venda'
+    }
+    profile.refresh_from_db()
+    assert profile.company_id == target.pk
+
+    target.refresh_from_db()
+    assert (target.email, target.cnpj, target.phone, target.industry) == (
+        'obras@alfa.com.br', '11222333000181', '11 3333-4444', 'Construção'
+    )
+    assert target.is_client
+    assert target.notes == 'Cliente antigo\n\nCadastro duplicado'
+
+    summary = statistics.get_statistics()
+    assert (summary['total'], summary['clients'], summary['by_industry']) == (1, 1, {'Construção': 1})
+    assert [company_id for company_id, _ in search.search_company_ids('11222333')] == [target.pk]
+
+
+@pytest.mark.django_db
+def test_merge_with_itself_is_rejected():
+    company = Company.objects.create(name='Alfa')
+    with pytest.raises(dedup.DedupError):
+        dedup.merge_companies(company, company)
+
+
+@pytest.mark.django_db
+def test_api_lists_merges_and_dismisses_candidates(client, user):
+    alfa = Company.objects.create(name='Construtora Alfa Ltda')
+    alfa_sa = Company.objects.create(name='Construtora Alfa S.A.', email='obras@alfa.com.br')
+    beta = Company.objects.create(name='Beta Tecnologia')
+    beta_me = Company.objects.create(name='Beta Tecnologia ME')
+    dedup.find_duplicates()
+
+    response = client.get(DUPLICATES_URL)
+    assert response.status_code == 200
+    rows = response.data['results'] if isinstance(response.data, dict) else response.data
+    assert {row['company_a']['id'] for row in rows} == {alfa.id, beta.id}
+
+    beta_pair = DuplicateCandidate.objects.get(company_a=beta)
+    response = client.post(f'{DUPLICATES_URL}{beta_pair.id}/dismiss/')
+    assert response.status_code == 200
+    assert response.data['status'] == 'dismissed'
+    assert response.data['reviewed_by_name'] == 'revisor'
+    assert Company.objects.filter(pk=beta_me.pk).exists()
+
+    alfa_pair = DuplicateCandidate.objects.get(company_a=alfa)
+    response = client.post(f'{DUPLICATES_URL}{alfa_pair.id}/merge/', {'keep': beta.id}, format='json')
+    assert response.status_code == 400
+
+    response = client.post(f'{DUPLICATES_URL}{alfa_pair.id}/merge/', {'keep': alfa_sa.id}, format='json')
+    assert response.status_code == 200
+    assert response.data['company']['id'] == alfa_sa.id
+    assert not Company.objects.filter(pk=alfa.pk).exists()
+
+    response = client.get(DUPLICATES_URL, {'status': 'dismissed'})
+    rows = response.data['results'] if isinstance(response.data, dict) else response.data
+    assert [row['id'] for row in rows] == [beta_pair.id]
+
+
+@pytest.mark.django_db
+def test_find_duplicate_companies_command():
+    Company.objects.create(name='Construtora Alfa Ltda')
+    Company.objects.create(name='Construtora Alfa S.A.')
+    out = StringIO()
+
+    call_command('find_duplicate_companies', '--threshold', '0.5', stdout=out)
+
+    assert '1 pares candidatos entre 2 empresas' in out.getvalue()
+    assert DuplicateCandidate.objects.count() == 1
@@ -0,0 +1,132 @@
+import csv
+import io
+from unittest import mock
+
+import openpyxl
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from apps.companies import exports, importer
+from apps.companies.models import Company, CompanyContact
+
+EXPORT_URL = '/api/companies/companies/export/'
+CONTACTS_EXPORT_URL = '/api/companies/contacts/export/'
+
+
+@pytest.fixture
+def client():
+    User = get_user_model()
+    user = User.objects.create_user(username='exportador', password='test123')
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    api_client.user = user
+    return api_client
+
+
+def read_csv(response):
+    assert response.status_code == 200
+    assert response.streaming
+    content = b''.join(response.streaming_content).decode('utf-8-sig')
+    return list(csv.reader(io.StringIO(content)))
+
+
+@pytest.mark.django_db
+def test_export_honors_filters_search_and_ordering(client):
+    alfa = Company.objects.create(
+        name='Alfa Tech', cnpj='11222333000181', is_client=True, industry='Tecnologia', created_by=client.user
+    )
+    Company.objects.create(name='Beta Tech', is_client=True)
+    Company.objects.create(name='Gama Tech', is_client=False)
+    Company.objects.create(name='Delta Alimentos', is_client=True)
+    CompanyContact.objects.create(company=alfa, name='Bruno', phone='11999990000')
+    CompanyContact.objects.create(company=alfa, name='Ana', email='ana@alfa.com', is_primary=True)
+
+    response = client.get(EXPORT_URL, {'is_client': 'true', 'search': 'tech', 'ordering': 'name'})
+
+    assert response['Content-Disposition'].startswith('attachment; filename="empresas-')
+    rows = read_csv(response)
+    header = rows[0]
+    assert [row[header.index('Nome')] for row in rows[1:]] == ['Alfa Tech', 'Beta Tech']
+    alfa_row = dict(zip(header, rows[1]))
+    assert alfa_row['CNPJ'] == '11.222.333/0001-81'
+    assert alfa_row['Contatos'] == 'Ana <ana@alfa.com>; Bruno 11999990000'
+    assert (alfa_row['Cliente'], alfa_row['Criado por']) == ('sim', 'exportador')
+
+
+@pytest.mark.django_db
+def test_export_reads_in_chunks(client, django_assert_num_queries):
+    companies = Company.objects.bulk_create([Company(name=f'Empresa {index}') for index in range(5)])
+    CompanyContact.objects.bulk_create([CompanyContact(company=company, name='Contato') for company in companies])
+
+    with mock.patch.object(exports, 'CHUNK_SIZE', 2):
+        response = client.get(EXPORT_URL)
+        # Empresas (com criador) em uma query lida por lotes + contatos de cada lote (3 lotes)
+        with django_assert_num_queries(4):
+            rows = read_csv(response)
+
+    assert len(rows) == 6
+    assert all(row[rows[0].index('Contatos')] == 'Contato' for row in rows[1:])
+
+
+@pytest.mark.django_db
+def test_exported_file_can_be_imported_again(client):
+    Company.objects.create(name='Alfa', cnpj='11222333000181', size='small', is_client=True)
+    content = b''.join(client.get(EXPORT_URL).streaming_content)
+    Company.objects.all().delete()
+
+    job = importer.create_import_job(SimpleUploadedFile('empresas.csv', content), client.user)
+
+    assert (job.created_count, job.error_count) == (1, 0)
+    company = Company.objects.get()
+    assert (company.cnpj, company.size, company.is_client) == ('11222333000181', 'small', True)
+
+
+@pytest.mark.django_db
+def test_contacts_export(client):
+    alfa = Company.objects.create(name='Alfa', cnpj='11222333000181')
+    beta = Company.objects.create(name='Beta')
+    CompanyContact.objects.create(company=alfa, name='Ana', position='Compras', is_primary=True)
+    CompanyContact.objects.create(company=beta, name='Bruno')
+
+    rows = read_csv(client.get(CONTACTS_EXPORT_URL, {'company': alfa.id}))
+
+    assert rows[0][:4] == ['ID', 'Empresa', 'CNPJ da empresa', 'Nome']
+    assert [row[1:4] + row[6:8] for row in rows[1:]] == [['Alfa', '11.222.333/0001-81', 'Ana', 'Compras', 'sim']]
+
+
+@pytest.mark.django_db
+def test_invalid_format(client):
+    response = client.get(EXPORT_URL, {'file_format': 'pdf'})
+
+    assert response.status_code == 400
+    assert 'file_format' in response.data['error']
+
+
+@pytest.mark.django_db
+def test_xlsx_export_can_be_imported_again(client):
+    alfa = Company.objects.create(
+        name='Alfa', cnpj='11222333000181', email='contato@alfa.com.br', size='small', is_client=True
+    )
+    CompanyContact.objects.create(company=alfa, name='Ana')
+    Company.objects.create(name='Beta', industry='Varejo')
+
+    response = client.get(EXPORT_URL, {'file_format': 'xlsx', 'ordering': 'name'})
+
+    assert response.status_code == 200
+    assert response['Content-Disposition'].startswith('attachment; filename="empresas-')
+    content = b''.join(response.streaming_content)
+    sheet = openpyxl.load_workbook(io.BytesIO(content), read_only=True).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert [row[1] for row in rows[1:]] == ['Alfa', 'Beta']
+
+    Company.objects.all().delete()
+    job = importer.create_import_job(SimpleUploadedFile('empresas.xlsx', content), client.user)
+
+    assert (job.created_count, job.error_count) == (2, 0)
+    alfa = Company.objects.get(name='Alfa')
+    assert (alfa.cnpj, alfa.email, alfa.size, alfa.is_client) == (
+        '11222333000181', 'contato@alfa.com.br', 'small', True
+    )
+    assert Company.objects.get(name='Beta').industry == 'Varejo'
@@ -0,0 +1,201 @@
+import csv
+import io
+from io import StringIO
+from unittest import mock
+
+import openpyxl
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.companies import importer, search
+from apps.companies.models import Company, CompanyImportJob, validate_cnpj
+
+IMPORTS_URL = '/api/companies/imports/'
+
+SPREADSHEET = (
+    'Nome;CNPJ;E-mail;Telefone;Site;Setor;Porte;Cliente\n'
+    'Alfa Ltda;11.222.333/0001-81;contato@alfa.com.br;(11) 99999-0000;alfa.com.br;Varejo;Pequena;sim\n'
+    'Beta SA;11444777000161;;;;;enterprise;\n'
+    'Gama;11.222.333/0001-81;;;;;;\n'
+    'Delta;12345678000100;;;;;;\n'
+    'Épsilon;;email-invalido;;;;;\n'
+    'Zeta;;;;;;gigante;\n'
+    ';;;;;;;\n'
+    'X;;;;;;;\n'
+    'Existente;12345678000195;;;;;;\n'
+)
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(username='importador', password='test123')
+
+
+@pytest.fixture
+def client(user):
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def upload(content, name='empresas.csv'):
+    return SimpleUploadedFile(name, content.encode('utf-8'), content_type='text/csv')
+
+
+def xlsx_upload(rows, name='empresas.xlsx'):
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    content = io.BytesIO()
+    workbook.save(content)
+    return SimpleUploadedFile(
+        name, content.getvalue(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+
+def report_rows(job):
+    with job.error_report.open('rb') as report:
+        return list(csv.reader(io.TextIOWrapper(report, encoding='utf-8')))
+
+
+@pytest.mark.django_db
+def test_import_creates_valid_rows_and_reports_the_rest(user):
+    Company.objects.create(name='Já cadastrada', cnpj='12345678000195')
+
+    job = importer.create_import_job(upload(SPREADSHEET), user)
+
+    assert job.status == 'completed'
+    assert (job.processed_rows, job.created_count, job.duplicate_count, job.error_count) == (8, 2, 2, 4)
+    assert job.progress == 100.0
+
+    alfa = Company.objects.get(cnpj='11222333000181')
+    assert (alfa.name, alfa.email, alfa.phone, alfa.website) == (
+        'Alfa Ltda', 'contato@alfa.com.br', '11999990000', 'https://alfa.com.br'
+    )
+    assert (alfa.size, alfa.is_client, alfa.created_by) == ('small', True, user)
+    assert Company.objects.get(name='Beta SA').size == 'enterprise'
+    # Índice de busca e nome normalizado preenchidos apesar do bulk_create
+    assert [company_id for company_id, _ in search.search_company_ids('alfa')] == [alfa.id]
+    assert Company.objects.get(name='Beta SA').search_name == 'beta sa'
+
+    rows = report_rows(job)
+    assert rows[0] == ['linha', 'erro', 'Nome', 'CNPJ', 'E-mail', 'Telefone', 'Site', 'Setor', 'Porte', 'Cliente']
+    assert [(row[0], row[1]) for row in rows[1:]] == [
+        ('4', 'CNPJ repetido na planilha (linha 2)'),
+        ('5', 'CNPJ inválido'),
+        ('6', 'E-mail inválido: email-invalido'),
+        ('7', 'Porte inválido: gigante'),
+        ('9', 'Nome da empresa deve ter pelo menos 2 caracteres'),
+        ('10', 'CNPJ já cadastrado'),
+    ]
+
+
+@pytest.mark.django_db
+def test_progress_is_updated_per_chunk(user, django_assert_max_num_queries):
+    lines = ['name,cnpj'] + [f'Empresa {index},' for index in range(10)]
+    updates = []
+    original = importer._CompanyImporter.process_chunk
+
+    def spy(self, chunk):
+        original(self, chunk)
+        updates.append(CompanyImportJob.objects.get(pk=self.job.pk).processed_rows)
+
+    with mock.patch.object(importer, 'CHUNK_SIZE', 4), \
+            mock.patch.object(importer._CompanyImporter, 'process_chunk', spy):
+        job = importer.create_import_job(upload('\n'.join(lines) + '\n'), user)
+
+    assert updates == [4, 8, 10]
+    assert job.total_rows == 10
+    assert Company.objects.count() == 10
+    assert not job.error_report
+
+
+def test_cnpj_without_digits_is_rejected():
+    assert importer._clean_row({'name': 'Beta', 'cnpj': 'abc'}) == (None, 'CNPJ deve ter 14 dígitos')
+    assert importer._clean_row({'name': 'Beta', 'cnpj': ' '})[0]['cnpj'] is None
+
+
+@pytest.mark.django_db
+def test_vectorized_cnpj_check_matches_validator():
+    cnpjs = ['11222333000181', '11444777000161', '12345678000195', '12345678000100', '00000000000000']
+    expected = []
+    for cnpj in cnpjs:
+        try:
+            validate_cnpj(cnpj)
+            expected.append(True)
+        except Exception:
+            expected.append(False)
+
+    assert importer.valid_cnpj_digits(cnpjs) == expected
+
+
+@pytest.mark.django_db
+def test_invalid_spreadsheets(user, client):
+    job = importer.create_import_job(upload('cnpj,email\n11222333000181,a@b.com\n'), user)
+    assert job.status == 'failed'
+    assert 'nome' in job.error_message
+
+    response = client.post(IMPORTS_URL, {'file': upload('nome\nAlfa\n', 'empresas.txt')}, format='multipart')
+    assert response.status_code == 400
+    assert CompanyImportJob.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_api_upload_progress_and_error_report(client):
+    response = client.post(IMPORTS_URL, {'file': upload(SPREADSHEET)}, format='multipart')
+
+    assert response.status_code == 202
+    job_id = response.data['id']
+    response = client.get(f'{IMPORTS_URL}{job_id}/')
+    assert response.data['status'] == 'completed'
+    assert response.data['created_count'] == 3
+    assert response.data['has_error_report'] is True
+
+    response = client.get(f'{IMPORTS_URL}{job_id}/errors/')
+    assert response.status_code == 200
+    assert response['Content-Disposition'].startswith('attachment; filename="empresas-rejeitadas')
+    assert b'CNPJ inv\xc3\xa1lido' in b''.join(response.streaming_content)
+
+    other = APIClient()
+    other.force_authenticate(user=get_user_model().objects.create_user(username='outro', password='x'))
+    assert other.get(f'{IMPORTS_URL}{job_id}/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_background_job_and_worker_command(user, settings):
+    settings.COMPANY_IMPORT_ASYNC = True
+
+    with mock.patch.object(importer._executor, 'submit') as submit:
+        with mock.patch('django.db.transaction.on_commit', side_effect=lambda callback: callback()):
+            job = importer.create_import_job(upload('nome\nAlfa\nBeta\n'), user)
+    submit.assert_called_once_with(importer._run_in_background, job.pk)
+    assert CompanyImportJob.objects.get(pk=job.pk).status == 'pending'
+
+    stdout = StringIO()
+    call_command('run_company_imports', stdout=stdout)
+
+    assert '2 criadas' in stdout.getvalue()
+    assert CompanyImportJob.objects.get(pk=job.pk).status == 'completed'
+    assert importer.run_import(job.pk) is None
+
+
+@pytest.mark.django_db
+def test_import_xlsx(user):
+    job = importer.create_import_job(xlsx_upload([
+        ['Nome', 'CNPJ', 'E-mail', 'Telefone', 'Porte', 'Cliente'],
+        ['Alfa Ltda', '11.222.333/0001-81', 'contato@alfa.com.br', 11999990000, 'Pequena', 'sim'],
+        ['Beta SA', 11444777000161, None, None, 'enterprise', None],
+        ['Gama', '12345678000100', None, None, None, None],
+    ]), user)
+
+    assert job.file_format == 'xlsx'
+    assert job.status == 'completed'
+    assert (job.total_rows, job.created_count, job.error_count) == (3, 2, 1)
+    alfa = Company.objects.get(name='Alfa Ltda')
+    assert (alfa.cnpj, alfa.phone, alfa.size, alfa.is_client) == ('11222333000181', '11999990000', 'small', True)
+    # Números vindos como células numéricas não ganham ".0"
+    assert Company.objects.get(name='Beta SA').cnpj == '11444777000161'
+    assert [row[0] for row in report_rows(job)[1:]] == ['4']
@@ -0,0 +1,94 @@
+import tracemalloc
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company, CompanyContact
+
+LIST_URL = '/api/companies/companies/'
+
+
+@pytest.fixture
+def client():
+    User = get_user_model()
+    user = User.objects.create_user(username='lista', password='test123')
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    api_client.user = user
+    return api_client
+
+
+def create_companies(user, count, contacts_per_company):
+    companies = Company.objects.bulk_create([
+        Company(name=f'Empresa {index}', created_by=user, notes='x' * 2000) for index in range(count)
+    ])
+    CompanyContact.objects.bulk_create([
+        CompanyContact(company=company, name=f'Contato {index}')
+        for company in companies for index in range(contacts_per_company)
+    ])
+    return companies
+
+
+def list_peak_memory(client):
+    tracemalloc.start()
+    response = client.get(LIST_URL)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert response.status_code == 200
+    return peak
+
+
+@pytest.mark.django_db
+def test_list_annotates_contact_count(client):
+    companies = create_companies(client.user, 3, 0)
+    CompanyContact.objects.bulk_create([
+        CompanyContact(company=companies[0], name=f'Contato {index}') for index in range(4)
+    ])
+
+    response = client.get(LIST_URL)
+
+    assert response.status_code == 200
+    counts = {item['name']: item['contact_count'] for item in response.data['results']}
+    assert counts == {'Empresa 0': 4, 'Empresa 1': 0, 'Empresa 2': 0}
+    assert response.data['results'][0]['created_by_name'] == 'lista'
+
+
+@pytest.mark.django_db
+def test_list_query_count_is_constant(client, django_assert_num_queries):
+    create_companies(client.user, 30, 5)
+
+    # COUNT da paginação + página (contagem de contatos e criador na mesma query)
+    with django_assert_num_queries(2):
+        response = client.get(LIST_URL)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_list_does_not_load_contacts_or_unused_columns(client):
+    create_companies(client.user, 10, 5)
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(LIST_URL)
+
+    page_query = queries.captured_queries[-1]['sql']
+    # Dos contatos, só o principal vem junto (JOIN por primary_contact), com os campos exibidos
+    assert 'JOIN "company_contacts" ON ("companies"."primary_contact_id" = "company_contacts"."id")' in page_query
+    assert '"company_contacts"."normalized_email"' not in page_query
+    assert '"companies"."notes"' not in page_query
+    assert not any(query['sql'].startswith('SELECT "company_contacts"') for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_list_memory_does_not_grow_with_contacts(client):
+    create_companies(client.user, 100, 0)
+    baseline = list_peak_memory(client)
+
+    Company.objects.all().delete()
+    create_companies(client.user, 100, 20)
+    with_contacts = list_peak_memory(client)
+
+    # 2.000 contatos a mais não devem mudar o custo da página
+    assert with_contacts < baseline * 1.25
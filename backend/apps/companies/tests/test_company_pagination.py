@@ -0,0 +1,141 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.companies import pagination
+from apps.companies.models import Company, CompanyContact
+
+LIST_URL = '/api/companies/companies/'
+CONTACTS_URL = '/api/companies/contacts/'
+
+
+@pytest.fixture
+def client():
+    User = get_user_model()
+    user = User.objects.create_user(username='paginacao', password='test123')
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def create_companies(count, same_timestamp=False):
+    companies = Company.objects.bulk_create([Company(name=f'Empresa {index}') for index in range(count)])
+    # Empresas criadas no mesmo instante exercitam o desempate por id
+    base = timezone.now() - timedelta(days=1)
+    for index, company in enumerate(companies):
+        company.created_at = base if same_timestamp else base + timedelta(seconds=index)
+    Company.objects.bulk_update(companies, ['created_at'])
+    return companies
+
+
+def walk(client, url, params):
+    """Segue os links ``next`` e devolve os ids na ordem recebida"""
+    ids = []
+    response = client.get(url, params)
+    while True:
+        assert response.status_code == 200
+        ids.extend(item['id'] for item in response.data['results'])
+        if not response.data['next']:
+            return ids, response
+        response = client.get(response.data['next'])
+
+
+@pytest.mark.django_db
+def test_default_pagination_is_unchanged(client):
+    create_companies(3)
+
+    response = client.get(LIST_URL)
+
+    assert set(response.data) == {'count', 'next', 'previous', 'results'}
+    assert response.data['count'] == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('same_timestamp', [False, True])
+def test_cursor_walks_every_company_once_newest_first(client, same_timestamp):
+    companies = create_companies(7, same_timestamp=same_timestamp)
+
+    ids, _ = walk(client, LIST_URL, {'pagination': 'cursor', 'page_size': 3})
+
+    expected = sorted(companies, key=lambda company: (company.created_at, company.id), reverse=True)
+    assert ids == [company.id for company in expected]
+
+
+@pytest.mark.django_db
+def test_cursor_ascending_order_and_previous_link(client):
+    companies = create_companies(5)
+
+    first = client.get(LIST_URL, {'pagination': 'cursor', 'ordering': 'created_at', 'page_size': 2})
+    assert first.data['previous'] is None
+    second = client.get(first.data['next'])
+    assert [item['id'] for item in second.data['results']] == [companies[2].id, companies[3].id]
+
+    back = client.get(second.data['previous'])
+    assert [item['id'] for item in back.data['results']] == [companies[0].id, companies[1].id]
+    assert back.data['previous'] is None
+
+
+@pytest.mark.django_db
+def test_inserts_do_not_shift_cursor_pages(client):
+    create_companies(4)
+    first = client.get(LIST_URL, {'pagination': 'cursor', 'page_size': 2})
+    seen = [item['id'] for item in first.data['results']]
+
+    Company.objects.create(name='Nova')
+    second = client.get(first.data['next'])
+
+    assert not set(seen) & {item['id'] for item in second.data['results']}
+    assert len(second.data['results']) == 2
+
+
+@pytest.mark.django_db
+def test_cursor_page_skips_count_query(client):
+    create_companies(5)
+    first = client.get(LIST_URL, {'pagination': 'cursor', 'page_size': 2})
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(first.data['next'])
+
+    assert response.status_code == 200
+    assert not [query for query in queries.captured_queries if query['sql'].upper().startswith('SELECT COUNT(')]
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_404(client):
+    response = client.get(LIST_URL, {'cursor': 'invalido'})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_estimated_count_is_capped_and_allows_pages_beyond_it(client, monkeypatch):
+    monkeypatch.setattr(pagination, 'ESTIMATED_COUNT_CAP', 3)
+    create_companies(6)
+
+    response = client.get(LIST_URL, {'count': 'estimated', 'page_size': 2})
+    assert (response.data['count'], response.data['count_is_estimate']) == (3, True)
+
+    response = client.get(LIST_URL, {'count': 'estimated', 'page_size': 2, 'page': 3})
+    assert response.status_code == 200
+    assert len(response.data['results']) == 2
+    assert response.data['next'] is None
+
+    response = client.get(LIST_URL, {'pagination': 'cursor', 'count': 'estimated', 'page_size': 2})
+    assert (response.data['count'], response.data['count_is_estimate']) == (3, True)
+
+
+@pytest.mark.django_db
+def test_contacts_support_cursor_pagination(client):
+    company = Company.objects.create(name='Alfa')
+    contacts = CompanyContact.objects.bulk_create([
+        CompanyContact(company=company, name=f'Contato {index}') for index in range(5)
+    ])
+
+    ids, _ = walk(client, CONTACTS_URL, {'pagination': 'cursor', 'ordering': 'created_at', 'page_size': 2})
+
+    assert ids == [contact.id for contact in sorted(contacts, key=lambda contact: (contact.created_at, contact.id))]
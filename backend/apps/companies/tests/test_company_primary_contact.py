@@ -0,0 +1,150 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework.test import APIClient
+
+from apps.companies import dedup
+from apps.companies.contacts import save_contact, set_primary_contact
+from apps.companies.models import Company, CompanyContact
+from apps.companies.serializers import CompanyContactSerializer
+
+LIST_URL = '/api/companies/companies/'
+CONTACTS_URL = '/api/companies/contacts/'
+
+
+@pytest.fixture
+def client():
+    User = get_user_model()
+    user = User.objects.create_user(username='principal', password='test123')
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def company():
+    return Company.objects.create(name='Alfa')
+
+
+def primary_names(company):
+    return list(CompanyContact.objects.filter(company=company, is_primary=True).values_list('name', flat=True))
+
+
+def add_contact(client, company, **data):
+    response = client.post(f'{LIST_URL}{company.id}/add_contact/', data, format='json')
+    assert response.status_code == 201
+    return response.data
+
+
+@pytest.mark.django_db
+def test_add_contact_keeps_a_single_primary(client, company):
+    add_contact(client, company, name='Ana', is_primary=True)
+    bruno = add_contact(client, company, name='Bruno', is_primary=True)
+    add_contact(client, company, name='Carla')
+
+    company.refresh_from_db()
+    assert primary_names(company) == ['Bruno']
+    assert company.primary_contact_id == bruno['id']
+
+
+@pytest.mark.django_db
+def test_update_and_set_primary_move_the_pointer(client, company):
+    ana = add_contact(client, company, name='Ana', is_primary=True)
+    bruno = add_contact(client, company, name='Bruno')
+
+    response = client.patch(f"{CONTACTS_URL}{bruno['id']}/", {'is_primary': True}, format='json')
+    assert response.status_code == 200
+    company.refresh_from_db()
+    assert (primary_names(company), company.primary_contact_id) == (['Bruno'], bruno['id'])
+
+    client.patch(f"{CONTACTS_URL}{bruno['id']}/", {'is_primary': False}, format='json')
+    company.refresh_from_db()
+    assert (primary_names(company), company.primary_contact_id) == ([], None)
+
+    response = client.post(f"{CONTACTS_URL}{ana['id']}/set_primary/")
+    assert response.status_code == 200
+    assert response.data['is_primary'] is True
+    company.refresh_from_db()
+    assert (primary_names(company), company.primary_contact_id) == (['Ana'], ana['id'])
+
+
+@pytest.mark.django_db
+def test_deleting_the_primary_clears_the_pointer(company):
+    contact = CompanyContact.objects.create(company=company, name='Ana')
+    set_primary_contact(contact)
+
+    contact.delete()
+
+    company.refresh_from_db()
+    assert company.primary_contact_id is None
+
+
+@pytest.mark.django_db
+def test_database_rejects_two_primaries(company):
+    CompanyContact.objects.create(company=company, name='Ana', is_primary=True)
+    CompanyContact.objects.create(company=Company.objects.create(name='Beta'), name='Bia', is_primary=True)
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        CompanyContact.objects.create(company=company, name='Bruno', is_primary=True)
+
+
+@pytest.mark.django_db
+def test_list_includes_primary_contact_without_extra_queries(client, django_assert_num_queries):
+    for index in range(5):
+        company = Company.objects.create(name=f'Empresa {index}')
+        contact = CompanyContact.objects.create(company=company, name=f'Contato {index}', email=f'c{index}@x.com')
+        set_primary_contact(contact)
+    Company.objects.create(name='Sem contato')
+    client.get(LIST_URL)
+
+    with django_assert_num_queries(2):
+        response = client.get(LIST_URL)
+
+    primaries = {item['name']: item['primary_contact'] for item in response.data['results']}
+    assert primaries['Sem contato'] is None
+    assert primaries['Empresa 3'] == {
+        'id': primaries['Empresa 3']['id'], 'name': 'Contato 3', 'email': 'c3@x.com', 'phone': None, 'position': None,
+    }
+
+
+@pytest.mark.django_db
+def test_merge_keeps_the_target_primary(company):
+    duplicate = Company.objects.create(name='Alfa S.A.')
+    set_primary_contact(CompanyContact.objects.create(company=company, name='Ana'))
+    set_primary_contact(CompanyContact.objects.create(company=duplicate, name='Bruno'))
+
+    target, _ = dedup.merge_companies(company, duplicate)
+
+    target.refresh_from_db()
+    assert primary_names(target) == ['Ana']
+    assert target.primary_contact.name == 'Ana'
+
+
+@pytest.mark.django_db
+def test_merge_adopts_the_duplicate_primary(company):
+    duplicate = Company.objects.create(name='Alfa S.A.')
+    bruno = set_primary_contact(CompanyContact.objects.create(company=duplicate, name='Bruno'))
+
+    target, _ = dedup.merge_companies(company, duplicate)
+
+    target.refresh_from_db()
+    assert target.primary_contact_id == bruno.pk
+    assert primary_names(target) == ['Bruno']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('data, new_primary', [({}, 'Bia'), ({'is_primary': True}, 'Ana')])
+def test_moving_the_primary_to_another_company(company, data, new_primary):
+    ana = set_primary_contact(CompanyContact.objects.create(company=company, name='Ana'))
+    other = Company.objects.create(name='Beta')
+    set_primary_contact(CompanyContact.objects.create(company=other, name='Bia'))
+
+    serializer = CompanyContactSerializer(ana, data=data, partial=True)
+    assert serializer.is_valid()
+    save_contact(serializer, company=other)
+
+    company.refresh_from_db()
+    other.refresh_from_db()
+    assert (primary_names(company), company.primary_contact_id) == ([], None)
+    assert primary_names(other) == [new_primary]
+    assert other.primary_contact.name == new_primary
@@ -0,0 +1,165 @@
+import re
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.companies import search
+from apps.companies.models import Company
+
+SEARCH_URL = '/api/companies/companies/search/'
+AUTOCOMPLETE_URL = '/api/companies/companies/autocomplete/'
+
+
+@pytest.fixture
+def client():
+    User = get_user_model()
+    user = User.objects.create_user(username='busca', password='test123')
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def names(ranked):
+    found = dict(Company.objects.values_list('id', 'name'))
+    return [found[company_id] for company_id, _ in ranked]
+
+
+def test_normalize_text():
+    assert search.normalize_text('  São   PAULO Açúcar ') == 'sao paulo acucar'
+    assert search.parse_terms('Construtora, São-Paulo!') == ['construtora', 'sao', 'paulo']
+
+
+@pytest.mark.django_db
+def test_accent_insensitive_prefix_match():
+    Company.objects.create(name='Construtora São Paulo')
+    Company.objects.create(name='Açúcar União')
+
+    assert names(search.search_company_ids('sao paulo')) == ['Construtora São Paulo']
+    assert names(search.search_company_ids('constr')) == ['Construtora São Paulo']
+    assert names(search.search_company_ids('ACUC')) == ['Açúcar União']
+    assert search.search_company_ids('construtora rio') == []
+    assert Company.objects.get(name='Açúcar União').search_name == 'acucar uniao'
+
+
+@pytest.mark.django_db
+def test_name_ranks_above_notes_and_other_fields():
+    Company.objects.create(name='Alfa Comércio', notes='parceira da logística')
+    Company.objects.create(name='Beta', email='contato@beta.com.br', industry='Logística')
+    Company.objects.create(name='Logística Gama')
+
+    assert names(search.search_company_ids('logist')) == ['Logística Gama', 'Beta', 'Alfa Comércio']
+
+
+@pytest.mark.django_db
+def test_cnpj_and_email_are_searchable():
+    Company.objects.create(name='Delta', cnpj='12.345.678/0001-90', email='vendas@delta.com')
+
+    assert names(search.search_company_ids('12345678')) == ['Delta']
+    assert names(search.search_company_ids('vendas')) == ['Delta']
+
+
+@pytest.mark.django_db
+def test_index_follows_save_and_delete():
+    company = Company.objects.create(name='Antigo Nome')
+    company.name = 'Novo Nome'
+    company.save(update_fields=['name'])
+
+    assert names(search.search_company_ids('novo')) == ['Novo Nome']
+    assert search.search_company_ids('antigo') == []
+
+    company.delete()
+    assert search.search_company_ids('novo') == []
+
+
+@pytest.mark.django_db
+def test_rebuild_command():
+    companies = Company.objects.bulk_create([Company(name='Épsilon'), Company(name='Zeta')])
+    assert search.search_company_ids('zeta') == []
+
+    stdout = StringIO()
+    call_command('rebuild_company_search_index', stdout=stdout)
+
+    assert '2 empresas indexadas' in stdout.getvalue()
+    assert [company_id for company_id, _ in search.search_company_ids('zeta')] == [companies[1].id]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='Plano de consulta do FTS5')
+def test_index_writes_do_not_scan_the_fts_table():
+    Company.objects.bulk_create([Company(name=f'Empresa {index}') for index in range(20)])
+    search.rebuild_index()
+    company = Company.objects.create(name='Construtora Sigma')
+
+    with CaptureQueriesContext(connection) as queries:
+        company.name = 'Construtora Tau'
+        company.save()
+        company.delete()
+
+    statements = [
+        query['sql'] for query in queries.captured_queries if query['sql'].startswith('DELETE FROM companies_search')
+    ]
+    assert statements
+    for sql in statements:
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[3] for row in cursor.fetchall()]
+        scans = [
+            step for step in plan if step.startswith('SCAN') and not re.search(r'VIRTUAL TABLE INDEX \d+:=', step)
+        ]
+        assert scans == [], sql
+    assert search.search_company_ids('construtora') == []
+
+
+@pytest.mark.django_db
+def test_fallback_uses_search_name():
+    Company.objects.create(name='Construtora São Paulo')
+    Company.objects.create(name='Paulista Alimentos')
+
+    with mock.patch.object(search, '_vendor', return_value='mysql'):
+        assert names(search.search_company_ids('paul')) == ['Construtora São Paulo', 'Paulista Alimentos']
+        assert names(search.search_company_ids('sao paulo')) == ['Construtora São Paulo']
+
+
+@pytest.mark.django_db
+def test_search_endpoint_applies_filters_and_keeps_rank(client):
+    Company.objects.create(name='Tech Brasil', notes='tecnologia', industry='Tecnologia', is_client=True)
+    Company.objects.create(name='Alimentos Tech', industry='Alimentos', is_client=True)
+    Company.objects.create(name='Tech Prospect', is_client=False)
+
+    response = client.get(SEARCH_URL, {'q': 'tech', 'is_client': 'true'})
+
+    assert response.status_code == 200
+    assert response.data['count'] == 2
+    assert {item['name'] for item in response.data['results']} == {'Tech Brasil', 'Alimentos Tech'}
+    assert 'contact_count' in response.data['results'][0]
+
+    response = client.get(SEARCH_URL, {'q': 'tech', 'industry': 'alimentos'})
+    assert [item['name'] for item in response.data['results']] == ['Alimentos Tech']
+
+    assert client.get(SEARCH_URL, {'q': '  '}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_autocomplete(client):
+    company = Company.objects.create(name='Construtora Ômega')
+
+    response = client.get(AUTOCOMPLETE_URL, {'q': 'constru ome'})
+
+    assert response.status_code == 200
+    assert response.data == [{'id': company.id, 'name': 'Construtora Ômega'}]
+
+
+@pytest.mark.django_db
+def test_benchmark_command():
+    stdout = StringIO()
+    call_command('benchmark_company_search', runs=20, seed=200, stdout=stdout, stderr=StringIO())
+
+    assert '20 buscas em 200 empresas' in stdout.getvalue()
+    assert 'p95=' in stdout.getvalue()
+    assert not Company.objects.exists()
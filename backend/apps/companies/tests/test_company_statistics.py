@@ -0,0 +1,162 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.companies import importer, statistics
+from apps.companies.models import Company, CompanyCounter
+
+STATISTICS_URL = '/api/companies/companies/statistics/'
+STATS_URL = '/api/companies/companies/stats/'
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def client():
+    User = get_user_model()
+    user = User.objects.create_user(username='estatisticas', password='test123')
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    api_client.user = user
+    return api_client
+
+
+def counters():
+    return {(row.dimension, row.value): row.count for row in CompanyCounter.objects.all()}
+
+
+def expected_summary():
+    """Resumo calculado direto da tabela, para comparar com os contadores"""
+    return statistics._summary(statistics.compute_counters())
+
+
+@pytest.mark.django_db
+def test_first_read_builds_counters_and_signals_keep_them(django_capture_on_commit_callbacks):
+    Company.objects.create(name='Alfa', size='small', industry='Varejo', is_client=True)
+    assert not CompanyCounter.objects.exists()
+
+    summary = statistics.get_statistics()
+    assert (summary['total'], summary['active'], summary['clients']) == (1, 1, 1)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        beta = Company.objects.create(name='Beta', size='small', industry='Tecnologia')
+        gama = Company.objects.create(name='Gama', size='large', industry='Tecnologia', is_active=False)
+    assert statistics.get_statistics() == expected_summary()
+    assert counters()[('industry', 'Tecnologia')] == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        beta.industry = 'Varejo'
+        beta.is_client = True
+        beta.save()
+        gama.delete()
+    summary = statistics.get_statistics()
+    assert summary == expected_summary()
+    assert summary['by_size'] == {'small': 2}
+    assert summary['by_industry'] == {'Varejo': 2}
+    # Setor e porte sem empresas saem dos contadores
+    assert ('industry', 'Tecnologia') not in counters()
+    assert ('size', 'large') not in counters()
+
+
+@pytest.mark.django_db
+def test_read_racing_an_invalidation_does_not_cache_a_stale_summary(django_capture_on_commit_callbacks):
+    Company.objects.create(name='Alfa')
+    statistics.get_statistics()
+    cache.clear()
+    summary_of = statistics._summary
+
+    def summary_then_concurrent_write(counts):
+        # Outra requisição cria uma empresa entre a leitura dos contadores e o cache.set
+        with django_capture_on_commit_callbacks(execute=True):
+            Company.objects.create(name='Beta')
+        return summary_of(counts)
+
+    with mock.patch.object(statistics, '_summary', side_effect=summary_then_concurrent_write):
+        assert statistics.get_statistics()['total'] == 1
+
+    assert statistics.get_statistics()['total'] == 2
+
+
+@pytest.mark.django_db
+def test_saves_that_do_not_touch_counted_fields_skip_the_counters(django_assert_num_queries):
+    company = Company.objects.create(name='Alfa', size='small')
+    statistics.get_statistics()
+
+    company.notes = 'Nova observação'
+    # UPDATE da empresa + índice de busca; nenhuma consulta aos contadores
+    with django_assert_num_queries(3):
+        company.save(update_fields=['notes'])
+
+
+@pytest.mark.django_db
+def test_one_global_cache_entry(client, django_assert_num_queries):
+    Company.objects.create(name='Alfa', size='medium', industry='Varejo', is_client=True)
+    Company.objects.create(name='Beta', size='medium')
+    other = APIClient()
+    other.force_authenticate(user=get_user_model().objects.create_user(username='outro', password='x'))
+
+    response = client.get(STATISTICS_URL)
+    with django_assert_num_queries(0):
+        other_response = other.get(STATISTICS_URL)
+        stats_response = client.get(STATS_URL)
+
+    assert response.data == other_response.data
+    assert response.data['total_companies'] == 2
+    assert response.data['clients'] == 1
+    assert response.data['conversion_rate'] == 50.0
+    assert response.data['size_distribution'] == [{'size': 'medium', 'count': 2}]
+    assert response.data['top_industries'] == [{'industry': 'Varejo', 'count': 1}]
+    assert stats_response.data == {
+        'total_companies': 2,
+        'by_size': {'medium': {'label': 'Medium (51-200)', 'count': 2}},
+        'by_industry': {'Varejo': 1},
+        'recent_companies': 2,
+    }
+
+
+@pytest.mark.django_db
+def test_cache_is_invalidated_on_change(client, django_capture_on_commit_callbacks):
+    Company.objects.create(name='Alfa')
+    assert client.get(STATS_URL).data['total_companies'] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Company.objects.create(name='Beta')
+
+    assert client.get(STATS_URL).data['total_companies'] == 2
+
+
+@pytest.mark.django_db
+def test_bulk_import_updates_counters(client, django_capture_on_commit_callbacks):
+    statistics.get_statistics()
+    upload = SimpleUploadedFile('empresas.csv', b'nome,porte,cliente\nAlfa,small,sim\nBeta,small,\n')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        importer.create_import_job(upload, client.user)
+
+    summary = statistics.get_statistics()
+    assert summary == expected_summary()
+    assert (summary['total'], summary['clients'], summary['by_size']) == (2, 1, {'small': 2})
+
+
+@pytest.mark.django_db
+def test_rebuild_command_fixes_drift():
+    Company.objects.create(name='Alfa', industry='Varejo')
+    statistics.get_statistics()
+    CompanyCounter.objects.filter(dimension='total').update(count=99)
+
+    stdout = StringIO()
+    call_command('rebuild_company_statistics', stdout=stdout)
+
+    assert '1 empresas' in stdout.getvalue()
+    assert counters()[('total', '')] == 1
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CompanyViewSet, CompanyContactViewSet
+from .views import CompanyViewSet, CompanyContactViewSet, CompanyImportJobViewSet, DuplicateCandidateViewSet
 
 router = DefaultRouter()
 router.register(r'companies', CompanyViewSet)
 router.register(r'contacts', CompanyContactViewSet)
+router.register(r'imports', CompanyImportJobViewSet, basename='company-import')
+router.register(r'duplicates', DuplicateCandidateViewSet, basename='company-duplicate')
 
 urlpatterns = [
     path('', include(router.urls)),
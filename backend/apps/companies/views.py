@@ -1,49 +1,126 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.core.cache import cache
-from .models import Company, CompanyContact
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from .models import (
+    CNPJ_LENGTH, Company, CompanyContact, CompanyImportJob, DuplicateCandidate,
+    normalize_cnpj, normalize_email, normalize_phone
+)
+from . import directory, exports, search
+from .contacts import save_contact, set_primary_contact
+from .pagination import CompanyPagination
+from .dedup import DedupError, merge_companies
+from .importer import CompanyImportError, create_import_job
+from .statistics import get_statistics
 from .serializers import (
     CompanySerializer, 
     CompanyListSerializer,
     CompanyDetailSerializer,
     CompanyCreateSerializer,
-    CompanyContactSerializer
+    CompanyContactSerializer,
+    CompanyImportJobSerializer,
+    DuplicateCandidateSerializer
 )
 
+# Campos carregados na listagem e na busca (CompanyListSerializer)
+LIST_FIELDS = [
+    'id', 'name', 'cnpj', 'email', 'phone', 'website', 'industry', 'size',
+    'is_active', 'is_client', 'created_at', 'created_by__username',
+    'primary_contact__id', 'primary_contact__name', 'primary_contact__email',
+    'primary_contact__phone', 'primary_contact__position',
+]
+
+
+def export_response(rows, prefix, file_format):
+    """Resposta com as linhas exportadas em CSV (streaming) ou XLSX"""
+    filename = exports.export_filename(prefix, file_format)
+    if file_format == 'xlsx':
+        return FileResponse(
+            exports.write_xlsx(rows, prefix),
+            as_attachment=True,
+            filename=filename,
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    response = StreamingHttpResponse(exports.stream_csv(rows), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_format_error(file_format):
+    """Mensagem de erro para um formato de exportação inválido (ou None)"""
+    if file_format not in exports.FORMATS:
+        return 'file_format deve ser csv ou xlsx'
+    return None
+
+
+def annotate_contact_count(queryset):
+    """
+    Anota contact_count com uma subquery por empresa, sem join nem GROUP BY
+    na query principal: só as linhas da página têm os contatos contados
+    """
+    return queryset.annotate(
+        contact_count=Coalesce(
+            Subquery(
+                CompanyContact.objects.filter(company=OuterRef('pk')).order_by().values('company').annotate(
+                    total=Count('id')
+                ).values('total'),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+    )
+
 
 class CompanyViewSet(viewsets.ModelViewSet):
     """
     ViewSet para gerenciamento de empresas
     
     Endpoints disponíveis:
-    - GET /api/companies/ - Lista todas as empresas
+    - GET /api/companies/ - Lista todas as empresas (?pagination=cursor, ?count=estimated)
     - POST /api/companies/ - Cria nova empresa
     - GET /api/companies/{id}/ - Detalhe de uma empresa
     - PUT /api/companies/{id}/ - Atualiza empresa completa
     - PATCH /api/companies/{id}/ - Atualiza empresa parcial
     - DELETE /api/companies/{id}/ - Remove empresa
     - GET /api/companies/statistics/ - Estatísticas das empresas
+    - GET /api/companies/search/?q= - Busca por relevância
+    - GET /api/companies/autocomplete/?q= - Sugestões para typeahead
+    - GET /api/companies/export/?file_format=csv|xlsx - Exporta as empresas filtradas
+    - GET /api/companies/by_cnpj/?cnpj= - Empresa pelo CNPJ exato
+    - GET /api/companies/cnpj_prefix/?prefix= - Empresas pelo prefixo do CNPJ
     - GET /api/companies/{id}/contacts/ - Lista contatos da empresa
     - POST /api/companies/{id}/add_contact/ - Adiciona contato à empresa
     """
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CompanyPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['industry', 'size', 'is_active', 'is_client']
     search_fields = ['name', 'email', 'website', 'industry', 'cnpj']
     ordering_fields = ['name', 'created_at', 'updated_at']
     ordering = ['-created_at']
+    SEARCH_LIMIT = 50
+    AUTOCOMPLETE_LIMIT = 10
 
     def get_queryset(self):
-        """Otimizar queries com select_related"""
-        return Company.objects.select_related('created_by').prefetch_related('contacts')
+        """
+        Listagem e busca carregam só os campos exibidos e contam os contatos
+        no banco; as demais ações carregam a empresa completa com os contatos
+        """
+        if self.action == 'export':
+            # exports.company_rows carrega criador e contatos por lote
+            return Company.objects.all()
+        queryset = Company.objects.select_related('created_by', 'primary_contact')
+        if self.action in ['list', 'search', 'by_cnpj', 'cnpj_prefix']:
+            return annotate_contact_count(queryset.only(*LIST_FIELDS))
+        return queryset.prefetch_related('contacts')
 
     def get_serializer_class(self):
         """Retorna serializer apropriado para cada ação"""
@@ -61,52 +138,78 @@ class CompanyViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
     @action(detail=False, methods=['get'])
-    @method_decorator(cache_page(60 * 5))  # Cache por 5 minutos
     def statistics(self, request):
         """
         Endpoint para estatísticas das empresas
         GET /api/companies/statistics/
         """
-        cache_key = f'companies_stats_{request.user.id}'
-        stats = cache.get(cache_key)
-        
-        if not stats:
-            total_companies = Company.objects.count()
-            active_companies = Company.objects.filter(is_active=True).count()
-            clients = Company.objects.filter(is_client=True).count()
-            
-            # Estatísticas por tamanho
-            size_stats = (
-                Company.objects
-                .values('size')
-                .annotate(count=Count('size'))
-                .order_by('-count')
-            )
-            
-            # Estatísticas por indústria
-            industry_stats = (
-                Company.objects
-                .exclude(industry__isnull=True)
-                .exclude(industry='')
-                .values('industry')
-                .annotate(count=Count('industry'))
-                .order_by('-count')[:10]  # Top 10
-            )
-            
-            stats = {
-                'total_companies': total_companies,
-                'active_companies': active_companies,
-                'clients': clients,
-                'inactive_companies': total_companies - active_companies,
-                'size_distribution': list(size_stats),
-                'top_industries': list(industry_stats),
-                'conversion_rate': round((clients / total_companies * 100), 2) if total_companies > 0 else 0
-            }
-            
-            # Cache por 5 minutos
-            cache.set(cache_key, stats, 60 * 5)
-        
-        return Response(stats)
+        summary = get_statistics()
+        total = summary['total']
+        return Response({
+            'total_companies': total,
+            'active_companies': summary['active'],
+            'clients': summary['clients'],
+            'inactive_companies': total - summary['active'],
+            'size_distribution': [
+                {'size': size, 'count': count} for size, count in summary['by_size'].items()
+            ],
+            'top_industries': [
+                {'industry': industry, 'count': count}
+                for industry, count in list(summary['by_industry'].items())[:10]  # Top 10
+            ],
+            'conversion_rate': round((summary['clients'] / total * 100), 2) if total > 0 else 0
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exporta as empresas com os mesmos filtros, busca e ordenação da listagem
+        GET /api/companies/companies/export/?file_format=xlsx&is_client=true&search=tech&ordering=name
+        """
+        file_format = request.query_params.get('file_format', 'csv')
+        error = export_format_error(file_format)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(exports.company_rows(queryset), 'empresas', file_format)
+
+    @action(detail=False, methods=['get'])
+    def by_cnpj(self, request):
+        """
+        Empresa com o CNPJ informado (com ou sem pontuação)
+        GET /api/companies/companies/by_cnpj/?cnpj=12.345.678/0001-90
+        """
+        cnpj = normalize_cnpj(request.query_params.get('cnpj', ''))
+        if not cnpj or len(cnpj) != CNPJ_LENGTH:
+            return Response({'error': 'Informe um CNPJ com 14 dígitos'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Igualdade no índice unique de cnpj
+        company = self.get_queryset().filter(cnpj=cnpj).first()
+        if company is None:
+            return Response({'error': 'Empresa não encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(CompanyListSerializer(company).data)
+
+    @action(detail=False, methods=['get'])
+    def cnpj_prefix(self, request):
+        """
+        Empresas cujo CNPJ começa com os dígitos informados, em ordem de CNPJ
+        GET /api/companies/companies/cnpj_prefix/?prefix=12345678
+        """
+        prefix = normalize_cnpj(request.query_params.get('prefix', ''))
+        if not prefix or len(prefix) > CNPJ_LENGTH:
+            return Response({'error': 'Informe de 1 a 14 dígitos de CNPJ'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # CNPJs têm só dígitos: o prefixo vira um intervalo no índice unique
+        # (funciona em qualquer banco, ao contrário de LIKE 'prefixo%')
+        companies = self.get_queryset().filter(
+            cnpj__range=(prefix, prefix.ljust(CNPJ_LENGTH, '9'))
+        ).order_by('cnpj')[:self.SEARCH_LIMIT]
+        results = list(companies)
+        return Response({
+            'results': CompanyListSerializer(results, many=True).data,
+            'count': len(results),
+            'prefix': prefix
+        })
 
     @action(detail=True, methods=['get'])
     def contacts(self, request, pk=None):
@@ -129,51 +232,11 @@ class CompanyViewSet(viewsets.ModelViewSet):
         serializer = CompanyContactSerializer(data=request.data)
         
         if serializer.is_valid():
-            serializer.save(company=company)
+            save_contact(serializer, company=company)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=['get'])
-    def search(self, request):
-        """
-        Busca avançada de empresas
-        GET /api/companies/search/?q=termo&industry=tech&size=small
-        """
-        query = request.query_params.get('q', '')
-        industry = request.query_params.get('industry', '')
-        size = request.query_params.get('size', '')
-        is_client = request.query_params.get('is_client', '')
-        
-        queryset = self.get_queryset()
-        
-        if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) |
-                Q(email__icontains=query) |
-                Q(website__icontains=query) |
-                Q(industry__icontains=query) |
-                Q(cnpj__icontains=query)
-            )
-        
-        if industry:
-            queryset = queryset.filter(industry__icontains=industry)
-        
-        if size:
-            queryset = queryset.filter(size=size)
-        
-        if is_client:
-            queryset = queryset.filter(is_client=is_client.lower() == 'true')
-        
-        # Paginação
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = CompanyListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = CompanyListSerializer(queryset, many=True)
-        return Response(serializer.data)
-
     def destroy(self, request, *args, **kwargs):
         """
         Soft delete - marca como inativo ao invés de deletar
@@ -187,27 +250,6 @@ class CompanyViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK
         )
 
-    def create(self, request, *args, **kwargs):
-        """Override create para logging"""
-        print(f'[DEBUG][CompanyViewSet][create] Dados recebidos: {request.data}')
-        response = super().create(request, *args, **kwargs)
-        
-        # Limpar cache de estatísticas após criação
-        cache_key = f'companies_stats_{request.user.id}'
-        cache.delete(cache_key)
-        
-        return response
-
-    def get_queryset(self):
-        """Filtrar empresas por usuário se necessário"""
-        queryset = Company.objects.select_related('created_by').prefetch_related('contacts')
-        
-        # Opção: filtrar apenas empresas criadas pelo usuário atual
-        # Comentado para permitir ver todas as empresas
-        # queryset = queryset.filter(created_by=self.request.user)
-        
-        return queryset
-
     def update(self, request, *args, **kwargs):
         """Override update para retornar objeto completo"""
         partial = kwargs.pop('partial', False)
@@ -236,44 +278,56 @@ class CompanyViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def search(self, request):
         """
-        Busca avançada de empresas
-        
-        Parâmetros:
-        - q: termo de busca
-        - industry: filtro por setor
-        - size: filtro por tamanho
+        Busca de empresas por relevância (nome, CNPJ, e-mail, site, setor e observações)
+        GET /api/companies/companies/search/?q=termo&industry=tech&size=small&is_client=true&limit=50
+
+        Cada termo casa por prefixo e acentos são ignorados.
         """
         q = request.query_params.get('q', '')
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.SEARCH_LIMIT)), 1), self.SEARCH_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit deve ser um número inteiro'}, status=status.HTTP_400_BAD_REQUEST)
+        if not search.parse_terms(q):
+            return Response({'error': 'Informe um termo de busca'}, status=status.HTTP_400_BAD_REQUEST)
+
+        candidates = Company.objects.all()
         industry = request.query_params.get('industry', '')
         size = request.query_params.get('size', '')
-        
-        queryset = self.get_queryset()
-        
-        if q:
-            queryset = queryset.filter(
-                Q(name__icontains=q) |
-                Q(email__icontains=q) |
-                Q(website__icontains=q) |
-                Q(industry__icontains=q) |
-                Q(notes__icontains=q)
-            )
-        
+        is_client = request.query_params.get('is_client', '')
         if industry:
-            queryset = queryset.filter(industry__icontains=industry)
-        
+            candidates = candidates.filter(industry__icontains=industry)
         if size:
-            queryset = queryset.filter(size=size)
-        
-        # Limitar resultados
-        queryset = queryset[:50]
-        
-        serializer = CompanyListSerializer(queryset, many=True)
+            candidates = candidates.filter(size=size)
+        if is_client:
+            candidates = candidates.filter(is_client=is_client.lower() == 'true')
+        restrict = candidates if (industry or size or is_client) else None
+
+        ranked = search.search_company_ids(q, queryset=restrict, limit=limit)
+        companies = self.get_queryset().in_bulk([company_id for company_id, _ in ranked])
+        results = [companies[company_id] for company_id, _ in ranked if company_id in companies]
+
+        serializer = CompanyListSerializer(results, many=True)
         return Response({
             'results': serializer.data,
-            'count': queryset.count(),
+            'count': len(results),
             'search_term': q
         })
 
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Sugestões de empresas para typeahead
+        GET /api/companies/companies/autocomplete/?q=constr
+        """
+        ranked = search.search_company_ids(request.query_params.get('q', ''), limit=self.AUTOCOMPLETE_LIMIT)
+        names = dict(
+            Company.objects.filter(id__in=[company_id for company_id, _ in ranked]).values_list('id', 'name')
+        )
+        return Response([
+            {'id': company_id, 'name': names[company_id]} for company_id, _ in ranked if company_id in names
+        ])
+
     @action(detail=True, methods=['get'])
     def contacts(self, request, pk=None):
         """Lista todos os contatos de uma empresa"""
@@ -289,45 +343,42 @@ class CompanyViewSet(viewsets.ModelViewSet):
         serializer = CompanyContactSerializer(data=request.data)
         
         if serializer.is_valid():
-            serializer.save(company=company)
+            save_contact(serializer, company=company)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Estatísticas das empresas"""
-        queryset = self.get_queryset()
-        
-        stats = {
-            'total_companies': queryset.count(),
-            'by_size': {},
-            'by_industry': {},
-            'recent_companies': queryset[:5].count()
-        }
-        
-        # Estatísticas por tamanho
-        for size_key, size_label in Company.COMPANY_SIZES:
-            count = queryset.filter(size=size_key).count()
-            if count > 0:
-                stats['by_size'][size_key] = {'label': size_label, 'count': count}
-        
-        # Top 5 indústrias
-        industries = queryset.values_list('industry', flat=True).distinct()
-        for industry in industries[:5]:
-            if industry:
-                count = queryset.filter(industry=industry).count()
-                stats['by_industry'][industry] = count
-        
-        return Response(stats)
+        """Estatísticas das empresas (resumo usado na página de empresas)"""
+        summary = get_statistics()
+        sizes = dict(Company.COMPANY_SIZES)
+        return Response({
+            'total_companies': summary['total'],
+            'by_size': {
+                size: {'label': sizes.get(size, size), 'count': count}
+                for size, count in summary['by_size'].items()
+            },
+            # Top 5 indústrias
+            'by_industry': dict(list(summary['by_industry'].items())[:5]),
+            'recent_companies': min(summary['total'], 5)
+        })
 
 
 class CompanyContactViewSet(viewsets.ModelViewSet):
     """
     ViewSet para gerenciamento de contatos de empresas
+
+    A listagem aceita ?pagination=cursor e ?count=estimated (ver pagination.py)
+
+    Endpoints adicionais:
+    - GET /api/companies/contacts/?email=&phone= - Filtra pelo e-mail/telefone normalizado
+    - POST /api/companies/contacts/lookup/ - Identifica até 1.000 e-mails/telefones de uma vez
+    - POST /api/companies/contacts/{id}/set_primary/ - Define o contato principal da empresa
     """
     queryset = CompanyContact.objects.all()
     serializer_class = CompanyContactSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CompanyPagination
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'email', 'position']
 
@@ -338,19 +389,157 @@ class CompanyContactViewSet(viewsets.ModelViewSet):
         
         if company_id:
             queryset = queryset.filter(company_id=company_id)
+
+        # E-mail e telefone usam as chaves normalizadas (indexadas)
+        email = self.request.query_params.get('email')
+        if email:
+            queryset = queryset.filter(normalized_email=normalize_email(email))
+        phone = self.request.query_params.get('phone')
+        if phone:
+            queryset = queryset.filter(normalized_phone=normalize_phone(phone))
             
         return queryset
 
+    @action(detail=False, methods=['post'])
+    def lookup(self, request):
+        """
+        Identifica e-mails e telefones (roteamento de mensagens recebidas)
+        POST /api/companies/contacts/lookup/ {"emails": ["ana@alfa.com.br"], "phones": ["+55 11 3333-4444"]}
+
+        Cada identificador volta com os contatos e empresas correspondentes e
+        os dados da empresa; no máximo 1.000 identificadores por chamada.
+        """
+        emails = request.data.get('emails') or []
+        phones = request.data.get('phones') or []
+        if not isinstance(emails, list) or not isinstance(phones, list):
+            return Response({'error': 'emails e phones devem ser listas'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            results = directory.lookup(emails, phones)
+        except directory.DirectoryLookupError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': results,
+            'matched': sum(1 for result in results if result['matches']),
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exporta os contatos com os mesmos filtros da listagem
+        GET /api/companies/contacts/export/?file_format=csv&company=1&search=joão
+        """
+        file_format = request.query_params.get('file_format', 'csv')
+        error = export_format_error(file_format)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(self.get_queryset()).order_by('company_id', 'id')
+        return export_response(exports.contact_rows(queryset), 'contatos', file_format)
+
+    @action(detail=True, methods=['post'])
+    def set_primary(self, request, pk=None):
+        """
+        Torna o contato o principal da empresa
+        POST /api/companies/contacts/{id}/set_primary/
+        """
+        contact = set_primary_contact(self.get_object())
+        return Response(self.get_serializer(contact).data)
+
     def perform_create(self, serializer):
         """Garantir que apenas um contato seja marcado como primário por empresa"""
-        is_primary = serializer.validated_data.get('is_primary', False)
-        company = serializer.validated_data.get('company')
-        
-        if is_primary and company:
-            # Remove is_primary de outros contatos da mesma empresa
-            CompanyContact.objects.filter(
-                company=company, 
-                is_primary=True
-            ).update(is_primary=False)
-        
-        serializer.save()
+        save_contact(serializer)
+
+    def perform_update(self, serializer):
+        save_contact(serializer)
+
+
+class CompanyImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Importação de empresas em lote a partir de planilhas
+
+    Endpoints disponíveis:
+    - POST /api/companies/imports/ - Envia uma planilha CSV/XLSX (campo ``file``)
+    - GET /api/companies/imports/ - Lista as importações do usuário
+    - GET /api/companies/imports/{id}/ - Progresso da importação
+    - GET /api/companies/imports/{id}/errors/ - Relatório CSV das linhas rejeitadas
+    """
+    serializer_class = CompanyImportJobSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def get_queryset(self):
+        """Cada usuário vê as próprias importações"""
+        return CompanyImportJob.objects.filter(created_by=self.request.user)
+
+    def create(self, request):
+        """Cria o job e processa a planilha em segundo plano"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Envie a planilha no campo file'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            job = create_import_job(upload, request.user)
+        except CompanyImportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def errors(self, request, pk=None):
+        """Baixa o relatório das linhas rejeitadas (erros e duplicatas)"""
+        job = self.get_object()
+        if not job.error_report:
+            return Response({'error': 'Importação sem linhas rejeitadas'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(
+            job.error_report.open('rb'),
+            as_attachment=True,
+            filename=job.error_report.name.rsplit('/', 1)[-1],
+            content_type='text/csv',
+        )
+
+
+class DuplicateCandidateViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Fila de revisão de empresas possivelmente duplicadas (comando find_duplicate_companies)
+
+    Endpoints disponíveis:
+    - GET /api/companies/duplicates/?status=pending - Pares do maior para o menor score
+    - POST /api/companies/duplicates/{id}/merge/ - Mescla o par (``keep``: empresa mantida)
+    - POST /api/companies/duplicates/{id}/dismiss/ - Marca o par como não duplicado
+    """
+    serializer_class = DuplicateCandidateSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = DuplicateCandidate.objects.select_related('company_a', 'company_b', 'reviewed_by')
+        if self.action == 'list':
+            queryset = queryset.filter(status=self.request.query_params.get('status', 'pending'))
+        return queryset.order_by('-score', 'id')
+
+    @action(detail=True, methods=['post'])
+    def merge(self, request, pk=None):
+        """
+        Mescla as empresas do par; por padrão mantém a mais antiga (company_a)
+        POST /api/companies/duplicates/{id}/merge/ {"keep": 12}
+        """
+        candidate = self.get_object()
+        keep = request.data.get('keep', candidate.company_a_id)
+        pair = {candidate.company_a_id: candidate.company_a, candidate.company_b_id: candidate.company_b}
+        try:
+            target = pair[int(keep)]
+        except (KeyError, TypeError, ValueError):
+            return Response({'error': 'keep deve ser uma das empresas do par'}, status=status.HTTP_400_BAD_REQUEST)
+        duplicate = candidate.company_b if target is candidate.company_a else candidate.company_a
+
+        try:
+            target, moved = merge_companies(target, duplicate)
+        except DedupError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'company': CompanySerializer(target, context={'request': request}).data, 'moved': moved})
+
+    @action(detail=True, methods=['post'])
+    def dismiss(self, request, pk=None):
+        """Marca o par como empresas diferentes; varreduras futuras não o reabrem"""
+        candidate = self.get_object()
+        candidate.status = 'dismissed'
+        candidate.reviewed_by = request.user
+        candidate.reviewed_at = timezone.now()
+        candidate.save(update_fields=['status', 'reviewed_by', 'reviewed_at', 'updated_at'])
+        return Response(self.get_serializer(candidate).data)
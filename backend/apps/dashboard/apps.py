@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.dashboard'
+    verbose_name = 'Dashboard'
+
+    def ready(self):
+        """
+        Registra os signals que invalidam o feed "Meu Trabalho" em cache
+        """
+        import apps.dashboard.signals
@@ -0,0 +1,185 @@
+"""
+Feed "Meu Trabalho": tudo o que interessa a um usuário em uma única chamada.
+
+Três fontes, cada uma com uma query indexada e já ordenada por data
+(mais recente primeiro):
+
+- ``task``: tasks ativas atribuídas ao usuário em qualquer board
+- ``mention``: mensagens de chat que mencionam ``@username`` nas salas do usuário
+- ``company``: empresas criadas pelo usuário
+
+As fontes são consultadas em paralelo (uma thread e uma conexão por fonte;
+em SQLite, sequencialmente). O cache guarda por usuário a lista de cada
+fonte; a cada leitura as fontes pedidas (``?type=``) são combinadas com
+``heapq.merge`` pela data de cada item, então filtrar por tipo não perde
+itens cortados pelas outras fontes. O cache é invalidado pelos signals de
+``apps.dashboard.signals`` (e explicitamente pelas operações set-based do
+kanban) quando algo que aparece no feed muda.
+"""
+import heapq
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+FEED_SIZE = getattr(settings, 'DASHBOARD_FEED_SIZE', 50)
+FEED_CACHE_TTL = getattr(settings, 'DASHBOARD_FEED_CACHE_TTL', 300)
+MENTION_WINDOW = timedelta(days=getattr(settings, 'DASHBOARD_MENTION_WINDOW_DAYS', 30))
+FEED_CACHE_KEY = 'dashboard:my-work:{user_id}'
+
+MENTION_RE = re.compile(r'@([\w.@+-]+)')
+
+
+def feed_cache_key(user_id):
+    return FEED_CACHE_KEY.format(user_id=user_id)
+
+
+def parse_mentions(content):
+    """Usernames mencionados em um texto (``@username``)"""
+    return {name.rstrip('.') for name in MENTION_RE.findall(content or '')}
+
+
+def mentioned_user_ids(*contents):
+    """IDs dos usuários mencionados nos textos"""
+    names = set()
+    for content in contents:
+        names |= parse_mentions(content)
+    if not names:
+        return set()
+    return set(User.objects.filter(username__in=names).values_list('id', flat=True))
+
+
+def invalidate_feeds(user_ids):
+    """Descarta o feed em cache dos usuários depois do commit da transação atual"""
+    keys = [feed_cache_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _task_items(user, limit):
+    from apps.kanban.models import Task
+
+    tasks = Task.objects.filter(assigned_to=user, is_active=True).select_related(
+        'column__board'
+    ).order_by('-updated_at')[:limit]
+    now = timezone.now()
+    return [
+        {
+            'type': 'task',
+            'id': task.id,
+            'timestamp': task.updated_at,
+            'title': task.title,
+            'data': {
+                'board_id': task.column.board_id,
+                'board_name': task.column.board.name,
+                'column_name': task.column.name,
+                'priority': task.priority,
+                'due_date': task.due_date,
+                'is_overdue': bool(task.due_date and task.due_date < now),
+            },
+        }
+        for task in tasks
+    ]
+
+
+def _mention_items(user, limit):
+    from apps.chat.models import ChatMessage, ChatRoomMember
+
+    rooms = ChatRoomMember.objects.filter(user=user, is_active=True).values('room_id')
+    messages = ChatMessage.objects.filter(
+        room_id__in=rooms,
+        is_deleted=False,
+        created_at__gte=timezone.now() - MENTION_WINDOW,
+        content__icontains=f'@{user.username}',
+    ).exclude(sender=user).select_related('sender', 'room').order_by('-created_at')
+
+    items = []
+    # icontains também casa prefixos (@ana em @anabela); o regex confirma a menção
+    for message in messages.iterator(chunk_size=limit):
+        if user.username not in parse_mentions(message.content):
+            continue
+        items.append({
+            'type': 'mention',
+            'id': message.id,
+            'timestamp': message.created_at,
+            'title': message.room.name,
+            'data': {
+                'room_id': message.room_id,
+                'sender': message.sender.username,
+                'content': message.content[:200],
+            },
+        })
+        if len(items) >= limit:
+            break
+    return items
+
+
+def _company_items(user, limit):
+    from apps.companies.models import Company
+
+    companies = Company.objects.filter(created_by=user).only(
+        'id', 'name', 'industry', 'is_client', 'created_at'
+    ).order_by('-created_at')[:limit]
+    return [
+        {
+            'type': 'company',
+            'id': company.id,
+            'timestamp': company.created_at,
+            'title': company.name,
+            'data': {'industry': company.industry, 'is_client': company.is_client},
+        }
+        for company in companies
+    ]
+
+
+SOURCES = {'task': _task_items, 'mention': _mention_items, 'company': _company_items}
+
+
+def _run_source(source, user, limit):
+    try:
+        return source(user, limit)
+    finally:
+        # Cada thread abre a própria conexão; fecha ao terminar
+        connections.close_all()
+
+
+def collect_sources(user, limit=FEED_SIZE, parallel=None):
+    """Executa as consultas de cada fonte; retorna ``{tipo: itens ordenados}``"""
+    if parallel is None:
+        parallel = getattr(settings, 'DASHBOARD_FEED_PARALLEL', True) and connection.vendor != 'sqlite'
+    if not parallel:
+        return {item_type: source(user, limit) for item_type, source in SOURCES.items()}
+
+    with ThreadPoolExecutor(max_workers=len(SOURCES)) as executor:
+        futures = {
+            item_type: executor.submit(_run_source, source, user, limit) for item_type, source in SOURCES.items()
+        }
+        return {item_type: future.result() for item_type, future in futures.items()}
+
+
+def merge_sources(sources, types=None, limit=FEED_SIZE):
+    """Combina as fontes de ``types`` (todas, se vazio) do mais recente para o mais antigo"""
+    selected = [items for item_type, items in sources.items() if not types or item_type in types]
+    merged = heapq.merge(*selected, key=lambda item: item['timestamp'], reverse=True)
+    return list(islice(merged, limit))
+
+
+def build_feed(user, limit=FEED_SIZE, parallel=None, types=None):
+    """Feed do usuário sem cache"""
+    return merge_sources(collect_sources(user, limit, parallel), types, limit)
+
+
+def get_feed(user, types=None):
+    """Feed do usuário (só os tipos em ``types``, se informados), com as fontes lidas do cache"""
+    key = feed_cache_key(user.id)
+    sources = cache.get(key)
+    if sources is None:
+        sources = collect_sources(user, FEED_SIZE)
+        cache.set(key, sources, FEED_CACHE_TTL)
+    return merge_sources(sources, types, FEED_SIZE)
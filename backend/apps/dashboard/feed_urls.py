@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import my_work
+
+urlpatterns = [
+    path('my-work/', my_work, name='my_work'),
+]
@@ -0,0 +1,55 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from apps.chat.models import ChatMessage
+from apps.companies.models import Company
+from apps.dashboard.feed import invalidate_feeds, mentioned_user_ids
+from apps.kanban.models import Task
+
+
+@receiver(post_save, sender=Task)
+def invalidate_feed_on_task_save(sender, instance, created, **kwargs):
+    """
+    Invalida o feed do responsável atual e do anterior (reatribuição)
+    """
+    # Estado anterior capturado pelo pre_save de apps.kanban.signals
+    previous = getattr(instance, '_previous_state', None)
+    user_ids = {instance.assigned_to_id}
+    if isinstance(previous, dict):
+        user_ids.add(previous['assigned_to_id'])
+    invalidate_feeds(user_ids)
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_feed_on_task_delete(sender, instance, **kwargs):
+    invalidate_feeds([instance.assigned_to_id])
+
+
+@receiver(pre_save, sender=ChatMessage)
+def capture_message_previous_content(sender, instance, **kwargs):
+    """
+    Guarda o conteúdo anterior para invalidar quem deixou de ser mencionado
+    """
+    instance._previous_content = None
+    if not instance._state.adding:
+        instance._previous_content = ChatMessage.objects.filter(pk=instance.pk).values_list(
+            'content', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=ChatMessage)
+def invalidate_feed_on_mention(sender, instance, created, **kwargs):
+    """
+    Invalida o feed dos usuários mencionados na mensagem
+    """
+    invalidate_feeds(mentioned_user_ids(instance.content, getattr(instance, '_previous_content', None)))
+
+
+@receiver(post_delete, sender=ChatMessage)
+def invalidate_feed_on_message_delete(sender, instance, **kwargs):
+    invalidate_feeds(mentioned_user_ids(instance.content))
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_feed_on_company_change(sender, instance, **kwargs):
+    invalidate_feeds([instance.created_by_id])
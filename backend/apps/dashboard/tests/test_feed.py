@@ -0,0 +1,140 @@
+"""
+Testes para o feed "Meu Trabalho".
+
+Cobre:
+- Tasks atribuídas, menções no chat e empresas criadas em um único feed
+- Ordenação pela data de cada item (merge das fontes)
+- Cache por usuário e invalidação pelos signals e pelas operações em lote
+- Execução paralela das fontes
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.chat.models import ChatMessage, ChatRoom, ChatRoomMember
+from apps.companies.models import Company
+from apps.dashboard import feed
+from apps.kanban.models import Board, Column, Task
+
+
+class MyWorkFeedTest(TestCase):
+    """Testes para o endpoint e a invalidação do feed."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='ana', password='testpass123')
+        self.other = User.objects.create_user(username='bia', password='testpass123')
+        company = Company.objects.create(name='Feed Company', created_by=self.other)
+        self.board = Board.objects.create(name='Vendas', company=company, created_by=self.user)
+        self.column = Column.objects.create(board=self.board, name='A Fazer', position=0)
+        self.room = ChatRoom.objects.create(name='Time', room_type='group', created_by=self.other)
+        ChatRoomMember.objects.create(room=self.room, user=self.user)
+        ChatRoomMember.objects.create(room=self.room, user=self.other)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get_feed(self, **params):
+        response = self.client.get('/api/dashboard/my-work/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_merges_sources_by_timestamp(self):
+        """Os itens das três fontes vêm em um único feed, do mais recente para o mais antigo."""
+        task = Task.objects.create(title='Proposta', column=self.column, created_by=self.other, assigned_to=self.user)
+        Task.objects.create(title='De outra pessoa', column=self.column, created_by=self.user, assigned_to=self.other)
+        company = Company.objects.create(name='Cliente Novo', created_by=self.user)
+        mention = ChatMessage.objects.create(room=self.room, sender=self.other, content='@ana pode revisar?')
+        ChatMessage.objects.create(room=self.room, sender=self.other, content='@anabela não é a Ana')
+
+        now = timezone.now()
+        Task.objects.filter(pk=task.pk).update(updated_at=now - timedelta(hours=2))
+        Company.objects.filter(pk=company.pk).update(created_at=now - timedelta(hours=1))
+        ChatMessage.objects.filter(pk=mention.pk).update(created_at=now - timedelta(hours=3))
+
+        items = self.get_feed()
+
+        self.assertEqual(
+            [(item['type'], item['title']) for item in items],
+            [('company', 'Cliente Novo'), ('task', 'Proposta'), ('mention', 'Time')],
+        )
+        self.assertEqual(items[2]['data']['sender'], 'bia')
+        self.assertEqual([item['type'] for item in self.get_feed(type='task')], ['task'])
+
+    def test_type_filter_is_applied_before_feed_size(self):
+        """Filtrar por tipo traz itens que ficariam fora do feed completo."""
+        Task.objects.create(title='Proposta', column=self.column, created_by=self.other, assigned_to=self.user)
+        for index in range(3):
+            Company.objects.create(name=f'Cliente {index}', created_by=self.user)
+        Task.objects.update(updated_at=timezone.now() - timedelta(days=1))
+
+        with mock.patch.object(feed, 'FEED_SIZE', 2):
+            self.assertEqual([item['type'] for item in self.get_feed()], ['company', 'company'])
+            self.assertEqual([item['title'] for item in self.get_feed(type='task')], ['Proposta'])
+
+    def test_feed_is_only_routed_under_dashboard(self):
+        """O feed não é exposto junto com os health checks (e vice-versa)."""
+        self.assertEqual(self.client.get('/api/health/my-work/').status_code, 404)
+        self.assertEqual(self.client.get('/api/dashboard/health/').status_code, 404)
+
+    def test_feed_is_cached(self):
+        """A segunda leitura vem do cache, sem queries nas fontes."""
+        Task.objects.create(title='Proposta', column=self.column, created_by=self.other, assigned_to=self.user)
+        self.get_feed()
+        with self.assertNumQueries(0):
+            feed.get_feed(self.user)
+
+    def test_signals_invalidate_feed(self):
+        """Atribuições, menções e empresas novas invalidam o feed dos usuários afetados."""
+        self.assertEqual(self.get_feed(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(title='Proposta', column=self.column, created_by=self.other, assigned_to=self.user)
+        self.assertEqual(len(self.get_feed()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ChatMessage.objects.create(room=self.room, sender=self.other, content='Oi @ana')
+        self.assertEqual(len(self.get_feed()), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.create(name='Cliente Novo', created_by=self.user)
+        self.assertEqual(len(self.get_feed()), 3)
+
+        # Reatribuição invalida o responsável anterior
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assigned_to = self.other
+            task.save()
+        self.assertEqual([item['type'] for item in self.get_feed()], ['company', 'mention'])
+
+    def test_bulk_assign_invalidates_feed(self):
+        """Operações em lote invalidam o feed de quem recebe e de quem perde as tasks."""
+        task = Task.objects.create(title='Proposta', column=self.column, created_by=self.other, assigned_to=self.other)
+        self.assertEqual(self.get_feed(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/kanban/tasks/bulk/',
+                {'operation': 'assign', 'ids': [str(task.id)], 'assigned_to_id': self.user.id},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['title'] for item in self.get_feed()], ['Proposta'])
+
+    def test_parallel_sources(self):
+        """No modo paralelo cada fonte roda em uma thread e o merge é o mesmo."""
+        Task.objects.create(title='Proposta', column=self.column, created_by=self.other, assigned_to=self.user)
+        Company.objects.create(name='Cliente Novo', created_by=self.user)
+        serial = feed.build_feed(self.user, parallel=False)
+
+        # Em SQLite em memória as threads não veem os dados do teste; usa as fontes já calculadas
+        results = {source: source(self.user, feed.FEED_SIZE) for source in feed.SOURCES.values()}
+        with mock.patch.object(feed, '_run_source', side_effect=lambda source, user, limit: results[source]):
+            parallel = feed.build_feed(self.user, parallel=True)
+
+        self.assertEqual(parallel, serial)
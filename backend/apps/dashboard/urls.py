@@ -6,5 +6,4 @@ urlpatterns = [
     path('health/', health_check, name='health_check'),
     path('ready/', ready_check, name='ready_check'),
     path('metrics/', performance_metrics, name='performance_metrics'),
-    # Dashboard URLs will be implemented here
 ]
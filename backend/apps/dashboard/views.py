@@ -151,3 +151,29 @@ def performance_metrics(request):
             'error': str(e),
             'timestamp': timezone.now().isoformat()
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def my_work(request):
+    """
+    Feed "Meu Trabalho" do usuário: tasks atribuídas, menções no chat e
+    empresas criadas, do mais recente para o mais antigo
+
+    GET /api/dashboard/my-work/?type=task&limit=20
+    """
+    from .feed import FEED_SIZE, get_feed
+
+    items = get_feed(request.user, types=request.query_params.getlist('type'))
+
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', FEED_SIZE)), FEED_SIZE))
+    except ValueError:
+        return Response({'error': 'limit deve ser um número inteiro'}, status=status.HTTP_400_BAD_REQUEST)
+    items = items[:limit]
+
+    return Response({
+        'count': len(items),
+        'results': items,
+        'timestamp': timezone.now().isoformat(),
+    })
@@ -0,0 +1,170 @@
+"""
+Tabelas de busca textual compartilhadas pelos apps (tasks e empresas).
+
+Em SQLite o índice é uma tabela virtual FTS5; em PostgreSQL uma tabela com
+``tsvector`` (GIN) e a chave como PRIMARY KEY. Os demais bancos não têm
+índice e cada app faz a sua busca de fallback.
+
+No FTS5 só o ``rowid`` é indexado: filtrar pela coluna da chave (declarada
+``UNINDEXED``) percorre a tabela inteira. Por isso as linhas são gravadas e
+removidas sempre pelo ``rowid``: a própria chave, quando é inteira, ou o id
+de uma tabela de chaves (``chave -> rowid``) quando não é (UUIDs).
+"""
+from django.db import connection
+
+BATCH_SIZE = 500
+
+
+def vendor():
+    return connection.vendor
+
+
+def is_indexed():
+    """Se o banco atual tem índice de busca textual"""
+    return vendor() in ('sqlite', 'postgresql')
+
+
+def chunks(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _placeholders(count):
+    return ', '.join(['%s'] * count)
+
+
+def sqlite_match(terms):
+    """Expressão MATCH do FTS5: todos os termos, cada um por prefixo"""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def postgres_tsquery(terms):
+    """``tsquery`` com todos os termos, cada um por prefixo"""
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+class SearchTable:
+    """
+    Uma tabela de busca textual.
+
+    ``columns`` são as colunas gravadas depois da chave, na ordem das tuplas
+    passadas a ``write``; ``stored`` as que o PostgreSQL guarda além do
+    documento; ``weights`` o peso (A-D) de cada coluna no ``tsvector``.
+    ``keys_table`` é a tabela ``(id INTEGER PRIMARY KEY, <key> UNIQUE)`` que
+    dá o rowid das chaves não inteiras no SQLite.
+    """
+
+    def __init__(self, table, key, columns, weights, stored=(), keys_table=None, config='portuguese'):
+        self.table = table
+        self.key = key
+        self.columns = list(columns)
+        self.weights = dict(weights)
+        self.stored = list(stored)
+        self.keys_table = keys_table
+        self.config = config
+
+    def _rowids_sql(self, count):
+        """SQL que lista os rowids de ``count`` chaves"""
+        if self.keys_table is None:
+            return _placeholders(count)
+        return f"SELECT id FROM {self.keys_table} WHERE {self.key} IN ({_placeholders(count)})"
+
+    def remove(self, keys):
+        """Remove as linhas das chaves"""
+        keys = list(keys)
+        if not keys or not is_indexed():
+            return
+        with connection.cursor() as cursor:
+            for chunk in chunks(keys):
+                placeholders = _placeholders(len(chunk))
+                if vendor() == 'postgresql':
+                    cursor.execute(f"DELETE FROM {self.table} WHERE {self.key} IN ({placeholders})", chunk)
+                    continue
+                cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({self._rowids_sql(len(chunk))})", chunk)
+                if self.keys_table is not None:
+                    cursor.execute(f"DELETE FROM {self.keys_table} WHERE {self.key} IN ({placeholders})", chunk)
+
+    def _sqlite_rowids(self, cursor, keys):
+        if self.keys_table is None:
+            return {key: key for key in keys}
+        cursor.executemany(
+            f"INSERT INTO {self.keys_table} ({self.key}) VALUES (%s) ON CONFLICT ({self.key}) DO NOTHING",
+            [(key,) for key in keys],
+        )
+        cursor.execute(
+            f"SELECT {self.key}, id FROM {self.keys_table} WHERE {self.key} IN ({_placeholders(len(keys))})", keys
+        )
+        return dict(cursor.fetchall())
+
+    def write(self, rows):
+        """Grava ou atualiza linhas ``(chave, *columns)``; a última linha de cada chave prevalece"""
+        rows = list({row[0]: row for row in rows}.values())
+        if not rows or not is_indexed():
+            return
+
+        with connection.cursor() as cursor:
+            for chunk in chunks(rows):
+                if vendor() == 'sqlite':
+                    self._write_sqlite(cursor, chunk)
+                else:
+                    self._write_postgres(cursor, chunk)
+
+    def _write_sqlite(self, cursor, rows):
+        rowids = self._sqlite_rowids(cursor, [row[0] for row in rows])
+        # FTS5 não tem upsert: remove as versões anteriores (pelo rowid) e insere
+        cursor.execute(
+            f"DELETE FROM {self.table} WHERE rowid IN ({_placeholders(len(rowids))})", list(rowids.values())
+        )
+        cursor.executemany(
+            f"INSERT INTO {self.table} (rowid, {self.key}, {', '.join(self.columns)}) "
+            f"VALUES (%s, %s, {_placeholders(len(self.columns))})",
+            [(rowids[row[0]],) + tuple(row) for row in rows],
+        )
+
+    def _write_postgres(self, cursor, rows):
+        document = ' || '.join(
+            f"setweight(to_tsvector('{self.config}', %s), '{weight}')" for weight in self.weights.values()
+        )
+        updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in self.stored + ['document'])
+        stored = ''.join(f', {column}' for column in self.stored)
+        params = []
+        for row in rows:
+            values = dict(zip(self.columns, row[1:]))
+            params.append(
+                (row[0],) + tuple(values[column] for column in self.stored)
+                + tuple(values[column] for column in self.weights)
+            )
+        cursor.executemany(
+            f"INSERT INTO {self.table} ({self.key}{stored}, document) "
+            f"VALUES (%s{', %s' * len(self.stored)}, {document}) "
+            f"ON CONFLICT ({self.key}) DO UPDATE SET {updates}",
+            params,
+        )
+
+    def purge_missing(self, source_table, source_column='id'):
+        """
+        Remove as linhas cujas chaves não existem mais em ``source_table``
+        (exclusões em cascata que não passam pelos signals). No PostgreSQL a
+        chave estrangeira ``ON DELETE CASCADE`` já faz isso.
+        """
+        if vendor() != 'sqlite':
+            return
+        missing = f"NOT IN (SELECT {source_column} FROM {source_table})"
+        with connection.cursor() as cursor:
+            if self.keys_table is None:
+                cursor.execute(f"DELETE FROM {self.table} WHERE rowid {missing}")
+                return
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN "
+                f"(SELECT id FROM {self.keys_table} WHERE {self.key} {missing})"
+            )
+            cursor.execute(f"DELETE FROM {self.keys_table} WHERE {self.key} {missing}")
+
+    def clear(self):
+        """Esvazia o índice"""
+        if not is_indexed():
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            if vendor() == 'sqlite' and self.keys_table is not None:
+                cursor.execute(f"DELETE FROM {self.keys_table}")
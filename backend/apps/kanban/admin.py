@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Board, Column, Task, TaskComment, TaskAttachment
+from .models import Board, Column, Task, TaskComment, TaskAttachment, BoardStatistics, TaskReminder, SchedulerLease
 
 @admin.register(Board)
 class BoardAdmin(admin.ModelAdmin):
@@ -52,4 +52,20 @@ class TaskAttachmentAdmin(admin.ModelAdmin):
     list_display = ['filename', 'task', 'uploaded_by', 'file_size', 'uploaded_at']
     list_filter = ['content_type', 'uploaded_at']
     search_fields = ['filename', 'task__title', 'uploaded_by__email']
-    readonly_fields = ['id', 'uploaded_at']
\ No newline at end of file
+    readonly_fields = ['id', 'uploaded_at']
+@admin.register(BoardStatistics)
+class BoardStatisticsAdmin(admin.ModelAdmin):
+    list_display = ['board', 'total_tasks', 'overdue_tasks', 'overdue_checked_at', 'updated_at']
+    readonly_fields = ['board', 'total_tasks', 'tasks_by_priority', 'tasks_by_column',
+                       'overdue_tasks', 'overdue_checked_at', 'updated_at']
+
+@admin.register(TaskReminder)
+class TaskReminderAdmin(admin.ModelAdmin):
+    list_display = ['task', 'user', 'kind', 'due_date', 'sent_at']
+    list_filter = ['kind', 'sent_at']
+    search_fields = ['task__title', 'user__email']
+    readonly_fields = ['created_at', 'claimed_by', 'sent_at']
+
+@admin.register(SchedulerLease)
+class SchedulerLeaseAdmin(admin.ModelAdmin):
+    list_display = ['name', 'owner', 'acquired_at', 'expires_at']
@@ -0,0 +1,256 @@
+"""
+Analytics de fluxo dos boards: lead time, cycle time e tempo por coluna em
+percentis, e o diagrama de fluxo cumulativo (CFD).
+
+O CFD é servido a partir de ColumnDailySnapshot, uma linha por coluna e dia.
+Os snapshots são construídos de forma incremental pelo comando
+``build_flow_snapshots``: parte do último dia gravado e aplica os deltas
+diários do log de eventos (agregados no banco, uma query por execução). O dia
+corrente usa as contagens de BoardStatistics, o que corrige eventuais
+divergências (ex.: tasks excluídas, que não geram evento).
+
+Os percentis são calculados com NumPy.
+"""
+import logging
+import time
+from array import array
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Window
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Coalesce, Lead, TruncDate
+from django.utils import timezone
+import numpy as np
+
+from .events import completion_events, cycle_times
+from .models import Column, ColumnDailySnapshot, TaskEvent
+from .statistics import get_board_statistics
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 85, 95)
+CFD_CACHE_TIMEOUT = 60 * 60
+BATCH_SIZE = 1000
+
+
+def percentiles(values, qs=PERCENTILES):
+    """
+    Percentis (``numpy.percentile``, interpolação linear) e média de ``values``
+    """
+    summary = {'count': len(values), 'average': None}
+    summary.update({f'p{q}': None for q in qs})
+    if not len(values):
+        return summary
+
+    data = np.asarray(values, dtype=float)
+    results = np.percentile(data, qs)
+    summary['average'] = round(float(data.mean()), 2)
+    summary.update({f'p{q}': round(float(value), 2) for q, value in zip(qs, results)})
+    return summary
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def _daily_deltas(board_id, start, end):
+    """
+    Entradas e saídas por (dia, coluna) entre ``start`` e ``end`` (inclusive).
+
+    A agregação é feita no banco: uma linha por combinação de dia, tipo de
+    evento e colunas envolvidas, não uma por evento.
+    """
+    rows = TaskEvent.objects.filter(
+        board_id=board_id,
+        event_type__in=['created', 'moved', 'archived'],
+        created_at__gte=_day_start(start),
+        created_at__lt=_day_start(end + timedelta(days=1)),
+    ).annotate(
+        day=TruncDate('created_at'),
+        column=KeyTextTransform('column', 'data'),
+        from_column=KeyTextTransform('from_column', 'data'),
+        to_column=KeyTextTransform('to_column', 'data'),
+    ).values('day', 'event_type', 'column', 'from_column', 'to_column').annotate(
+        count=Count('id')
+    ).order_by()
+
+    deltas = defaultdict(lambda: [0, 0])
+    for row in rows:
+        if row['event_type'] == 'created':
+            deltas[(row['day'], row['column'])][0] += row['count']
+        elif row['event_type'] == 'archived':
+            deltas[(row['day'], row['column'])][1] += row['count']
+        else:
+            deltas[(row['day'], row['to_column'])][0] += row['count']
+            deltas[(row['day'], row['from_column'])][1] += row['count']
+    return deltas
+
+
+def _cfd_version_key(board_id):
+    return f'kanban:cfd-version:{board_id}'
+
+
+def build_board_snapshots(board_id, today=None):
+    """
+    Grava os snapshots diários do board do dia seguinte ao último gravado até hoje.
+
+    Sem snapshots anteriores, apenas o dia corrente é gravado. Retorna o
+    número de linhas gravadas.
+    """
+    today = today or timezone.localdate()
+    columns = [str(column_id) for column_id in Column.objects.filter(board_id=board_id).values_list('id', flat=True)]
+    last = ColumnDailySnapshot.objects.filter(board_id=board_id, date__lt=today).aggregate(
+        last=Max('date')
+    )['last']
+
+    counts = {}
+    start = today
+    if last is not None:
+        start = last + timedelta(days=1)
+        counts = {
+            str(column_id): task_count
+            for column_id, task_count in ColumnDailySnapshot.objects.filter(
+                board_id=board_id, date=last
+            ).values_list('column_id', 'task_count')
+        }
+
+    deltas = _daily_deltas(board_id, start, today)
+    live = {entry['id']: entry['task_count'] for entry in get_board_statistics(board_id).tasks_by_column}
+
+    snapshots = []
+    day = start
+    while day <= today:
+        for column_id in columns:
+            entered, exited = deltas.get((day, column_id), (0, 0))
+            if day == today:
+                counts[column_id] = live.get(column_id, 0)
+            else:
+                counts[column_id] = max(counts.get(column_id, 0) + entered - exited, 0)
+            snapshots.append(ColumnDailySnapshot(
+                board_id=board_id, column_id=column_id, date=day,
+                task_count=counts[column_id], entered=entered, exited=exited,
+            ))
+        day += timedelta(days=1)
+
+    with transaction.atomic():
+        ColumnDailySnapshot.objects.filter(board_id=board_id, date__gte=start).delete()
+        ColumnDailySnapshot.objects.bulk_create(snapshots, batch_size=BATCH_SIZE)
+
+    cache.set(_cfd_version_key(board_id), time.time_ns(), None)
+    logger.info(f"Snapshots de fluxo do board {board_id} gravados de {start} a {today} ({len(snapshots)} linhas)")
+    return len(snapshots)
+
+
+def cumulative_flow(board_id, days=365, today=None):
+    """
+    Série do CFD dos últimos ``days`` dias em formato colunar.
+
+    Lê os snapshots com uma query indexada por (board, date); dias sem
+    snapshot repetem a contagem anterior. O resultado fica em cache até o
+    próximo ``build_board_snapshots`` do board.
+    """
+    today = today or timezone.localdate()
+    version = cache.get(_cfd_version_key(board_id), 0)
+    cache_key = f'kanban:cfd:{board_id}:{days}:{today.isoformat()}:{version}'
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    start = today - timedelta(days=days - 1)
+    columns = list(
+        Column.objects.filter(board_id=board_id).order_by('position', 'created_at').values_list('id', 'name')
+    )
+    by_day = defaultdict(dict)
+    for column_id, day, task_count in ColumnDailySnapshot.objects.filter(
+        board_id=board_id, date__gte=start, date__lte=today
+    ).values_list('column_id', 'date', 'task_count'):
+        by_day[day][column_id] = task_count
+
+    first = min(by_day) if by_day else today
+    dates = [first + timedelta(days=offset) for offset in range((today - first).days + 1)]
+    series = {column_id: [] for column_id, _ in columns}
+    current = {}
+    for day in dates:
+        current.update(by_day.get(day, {}))
+        for column_id, _ in columns:
+            series[column_id].append(current.get(column_id, 0))
+
+    result = {
+        'start': dates[0].isoformat(),
+        'end': today.isoformat(),
+        'dates': [day.isoformat() for day in dates],
+        'columns': [
+            {'id': str(column_id), 'name': name, 'counts': series[column_id]}
+            for column_id, name in columns
+        ],
+    }
+    cache.set(cache_key, result, CFD_CACHE_TIMEOUT)
+    return result
+
+
+def lead_times(board_id, since, until=None):
+    """Lead time (em horas) das tasks concluídas no intervalo: da criação até a conclusão"""
+    completed = dict(
+        completion_events(board_id, since, until).exclude(task_id=None).values('task_id').annotate(
+            finished=Min('created_at')
+        ).values_list('task_id', 'finished')
+    )
+    if not completed:
+        return []
+    created = TaskEvent.objects.filter(
+        board_id=board_id, task_id__in=list(completed), event_type='created'
+    ).values_list('task_id', 'created_at')
+    return [
+        (completed[task_id] - created_at) / timedelta(hours=1)
+        for task_id, created_at in created
+        if created_at <= completed[task_id]
+    ]
+
+
+def time_in_columns(board_id, since, until=None):
+    """
+    Horas que as tasks passaram em cada coluna, por coluna.
+
+    Cada entrada (``created`` ou ``moved``) é pareada com o evento seguinte
+    da mesma task via ``LEAD()`` no banco; só permanências encerradas no
+    intervalo entram na conta.
+    """
+    until = until or timezone.now()
+    stays = TaskEvent.objects.filter(
+        board_id=board_id,
+        event_type__in=['created', 'moved', 'archived'],
+        created_at__lt=until,
+    ).exclude(task_id=None).annotate(
+        column=Coalesce(KeyTextTransform('to_column', 'data'), KeyTextTransform('column', 'data')),
+        left_at=Window(
+            Lead('created_at'),
+            partition_by=[F('task_id')],
+            order_by=[F('created_at').asc(), F('id').asc()],
+        ),
+    ).filter(
+        event_type__in=['created', 'moved'], left_at__gte=since, left_at__lt=until
+    ).values_list('column', 'created_at', 'left_at')
+
+    hours = defaultdict(lambda: array('d'))
+    for column_id, entered_at, left_at in stays:
+        hours[column_id].append((left_at - entered_at) / timedelta(hours=1))
+    return hours
+
+
+def flow_report(board_id, days=90):
+    """Percentis de lead time, cycle time e tempo por coluna dos últimos ``days`` dias"""
+    since = timezone.now() - timedelta(days=days)
+    per_column = time_in_columns(board_id, since)
+    columns = Column.objects.filter(board_id=board_id).order_by('position', 'created_at').values_list('id', 'name')
+    return {
+        'days': days,
+        'lead_time_hours': percentiles(lead_times(board_id, since)),
+        'cycle_time_hours': percentiles(cycle_times(board_id, since)),
+        'time_in_column_hours': [
+            {'id': str(column_id), 'name': name, **percentiles(per_column.get(str(column_id), []))}
+            for column_id, name in columns
+        ],
+    }
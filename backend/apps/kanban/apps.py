@@ -5,3 +5,9 @@ class KanbanConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.kanban'
     verbose_name = 'Kanban Board System'
+
+    def ready(self):
+        """
+        Registra os signals que mantêm as estatísticas dos boards
+        """
+        import apps.kanban.signals
@@ -0,0 +1,182 @@
+"""
+Operações em lote sobre tasks (atribuir, mover, arquivar, alterar labels).
+
+Cada operação roda em uma única transação com statements set-based
+(``update``/``bulk_update``/``bulk_create``) em vez de um ``save()`` por task.
+Como esses statements não disparam signals, as estatísticas, as labels
+normalizadas, o log de eventos dos boards afetados e o feed "Meu Trabalho"
+dos responsáveis são atualizados aqui explicitamente.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from apps.dashboard.feed import invalidate_feeds
+
+from . import events, search
+from .labels import build_task_labels, clean_labels
+from .models import Column, Task, TaskEvent, TaskLabel
+from .statistics import refresh_statistics
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ['assign', 'move', 'archive', 'relabel']
+
+
+class BulkResult:
+    """Acumula o resultado por task de uma operação em lote"""
+
+    def __init__(self, operation, requested_ids=None, actor_id=None):
+        self.operation = operation
+        self.actor_id = actor_id
+        self.events = []
+        self.results = {}
+        for task_id in requested_ids or []:
+            self.results[str(task_id)] = {'id': str(task_id), 'status': 'not_found'}
+
+    def set(self, task_id, status, error=None):
+        entry = {'id': str(task_id), 'status': status}
+        if error:
+            entry['error'] = error
+        self.results[str(task_id)] = entry
+
+    def event(self, task, event_type, now, **data):
+        self.events.append(TaskEvent(
+            board_id=task.column.board_id, task_id=task.id, actor_id=self.actor_id,
+            event_type=event_type, data=data, created_at=now,
+        ))
+
+    def as_dict(self):
+        results = list(self.results.values())
+        return {
+            'operation': self.operation,
+            'matched': sum(1 for entry in results if entry['status'] != 'not_found'),
+            'updated': sum(1 for entry in results if entry['status'] == 'updated'),
+            'results': results,
+        }
+
+
+def _assign(tasks, params, result, now):
+    assigned_to_id = params.get('assigned_to_id')
+    changed = [task.id for task in tasks if task.assigned_to_id != assigned_to_id]
+    Task.objects.filter(id__in=changed).update(assigned_to_id=assigned_to_id, updated_at=now)
+    for task in tasks:
+        if task.assigned_to_id != assigned_to_id:
+            result.set(task.id, 'updated')
+            result.event(task, 'assigned', now, **{'from': task.assigned_to_id, 'to': assigned_to_id})
+        else:
+            result.set(task.id, 'unchanged')
+    return set()
+
+
+def _archive(tasks, params, result, now):
+    Task.objects.filter(id__in=[task.id for task in tasks]).update(
+        is_active=False, status='archived', updated_at=now
+    )
+    search.remove_tasks([task.id for task in tasks])
+    for task in tasks:
+        result.set(task.id, 'updated')
+        result.event(task, 'archived', now, column=str(task.column_id))
+    return {task.column.board_id for task in tasks}
+
+
+def _move(tasks, params, result, now):
+    column = Column.objects.select_for_update().get(id=params['column_id'])
+    active_in_column = column.tasks.filter(is_active=True).aggregate(
+        count=Count('id'), max_pos=Max('position')
+    )
+    capacity = None
+    if column.max_tasks:
+        capacity = max(column.max_tasks - active_in_column['count'], 0)
+    next_position = (active_in_column['max_pos'] if active_in_column['max_pos'] is not None else -1) + 1
+
+    to_move = []
+    for task in tasks:
+        if task.column.board_id != column.board_id:
+            result.set(task.id, 'rejected', 'Colunas devem pertencer ao mesmo board')
+        elif task.column_id == column.id:
+            result.set(task.id, 'unchanged')
+        elif capacity is not None and len(to_move) >= capacity:
+            result.set(
+                task.id, 'rejected',
+                f'Coluna "{column.name}" atingiu o limite de {column.max_tasks} tasks'
+            )
+        else:
+            result.event(task, 'moved', now, from_column=str(task.column_id), to_column=str(column.id))
+            task.column = column
+            task.position = next_position + len(to_move)
+            task.updated_at = now
+            to_move.append(task)
+            result.set(task.id, 'updated')
+
+    Task.objects.bulk_update(to_move, ['column', 'position', 'updated_at'], batch_size=500)
+    return {column.board_id} if to_move else set()
+
+
+def _relabel(tasks, params, result, now):
+    add = clean_labels(params.get('add'))
+    remove = {label.lower() for label in clean_labels(params.get('remove'))}
+    replace = params.get('set')
+
+    changed = []
+    for task in tasks:
+        if replace is not None:
+            labels = clean_labels(replace)
+        else:
+            labels = clean_labels(
+                [label for label in task.labels if str(label).strip().lower() not in remove] + add
+            )
+        if labels != task.labels:
+            task.labels = labels
+            task.updated_at = now
+            changed.append(task)
+            result.set(task.id, 'updated')
+        else:
+            result.set(task.id, 'unchanged')
+
+    Task.objects.bulk_update(changed, ['labels', 'updated_at'], batch_size=500)
+    TaskLabel.objects.filter(task_id__in=[task.id for task in changed]).delete()
+    TaskLabel.objects.bulk_create(
+        [
+            label for task in changed
+            for label in build_task_labels(task.id, task.column.board_id, task.labels)
+        ],
+        batch_size=1000,
+    )
+    return set()
+
+
+HANDLERS = {
+    'assign': _assign,
+    'move': _move,
+    'archive': _archive,
+    'relabel': _relabel,
+}
+
+
+def run_bulk_operation(queryset, operation, params, requested_ids=None, actor=None):
+    """
+    Executa ``operation`` sobre as tasks ativas de ``queryset``.
+
+    Retorna um resumo com o status de cada task: ``updated``, ``unchanged``,
+    ``rejected`` (com ``error``) ou ``not_found`` para IDs pedidos que não
+    existem ou não estão ativos.
+    """
+    result = BulkResult(operation, requested_ids, actor_id=getattr(actor, 'id', None))
+    now = timezone.now()
+
+    with transaction.atomic():
+        tasks = list(
+            queryset.filter(is_active=True).select_related('column').select_for_update(of=('self',))
+            .order_by('position', 'created_at')
+        )
+        affected_boards = HANDLERS[operation](tasks, params, result, now)
+        if affected_boards:
+            refresh_statistics(affected_boards)
+        events.record_many(result.events)
+        invalidate_feeds({task.assigned_to_id for task in tasks} | {params.get('assigned_to_id')})
+
+    logger.info(f"Operação em lote '{operation}' aplicada a {len(tasks)} tasks")
+    return result.as_dict()
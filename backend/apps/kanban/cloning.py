@@ -0,0 +1,130 @@
+"""
+Criação de boards a partir de modelos e clonagem de pipelines.
+
+Tudo é inserido com ``bulk_create`` em ordem de dependência
+(board → colunas → tasks → labels → comentários). Como os IDs são UUIDs
+gerados em Python, o mapeamento entre original e cópia é conhecido antes do
+INSERT e cada tabela custa um statement por lote, não um por linha. Os
+eventos ``created`` das tasks copiadas vão para o log de eventos também em
+lote, e os comentários mantêm a data original.
+"""
+import logging
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.dashboard.feed import invalidate_feeds
+
+from . import events, search
+from .labels import build_task_labels
+from .models import Board, Column, Task, TaskComment, TaskEvent, TaskLabel
+from .statistics import refresh_board_statistics
+from .transfer import insert_rows
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+DEFAULT_COLUMNS = [
+    {'name': 'A Fazer', 'position': 0, 'color': '#e6f3ff'},
+    {'name': 'Em Progresso', 'position': 1, 'color': '#fff2e6'},
+    {'name': 'Concluído', 'position': 2, 'color': '#e6ffe6'},
+]
+
+
+def create_default_columns(board):
+    """Cria as colunas padrão de um board novo em um único INSERT"""
+    Column.objects.bulk_create([Column(board=board, **col_data) for col_data in DEFAULT_COLUMNS])
+    refresh_board_statistics(board.id)
+
+
+def clone_board(source, name, user, include_tasks=False, include_labels=True,
+                include_comments=False, as_template=False):
+    """
+    Copia ``source`` para um novo board chamado ``name``.
+
+    Colunas são sempre copiadas; tasks ativas, labels e comentários são
+    opcionais. Anexos não são copiados porque apontam para arquivos no storage.
+    """
+    with transaction.atomic():
+        board = Board.objects.create(
+            name=name,
+            description=source.description,
+            company=source.company,
+            created_by=user,
+            position=source.position,
+            is_template=as_template,
+        )
+
+        column_map = {}
+        columns = []
+        for column in source.columns.all():
+            new_id = uuid.uuid4()
+            column_map[column.id] = new_id
+            columns.append(Column(
+                id=new_id, board=board, name=column.name, position=column.position,
+                color=column.color, max_tasks=column.max_tasks,
+            ))
+        Column.objects.bulk_create(columns)
+
+        task_count = 0
+        if include_tasks:
+            task_count = _clone_tasks(board, column_map, user, include_labels, include_comments)
+
+        refresh_board_statistics(board.id)
+
+    logger.info(
+        f"Board {source.name} clonado como {board.name} ({len(columns)} colunas, {task_count} tasks)"
+    )
+    return board
+
+
+def _clone_tasks(board, column_map, user, include_labels, include_comments):
+    task_map = {}
+    tasks = []
+    labels = []
+    source_tasks = Task.objects.filter(column_id__in=column_map.keys(), is_active=True).order_by()
+
+    for task in source_tasks.iterator(chunk_size=BATCH_SIZE):
+        new_id = uuid.uuid4()
+        task_map[task.id] = new_id
+        tasks.append(Task(
+            id=new_id, title=task.title, description=task.description,
+            column_id=column_map[task.column_id], assigned_to_id=task.assigned_to_id,
+            created_by_id=task.created_by_id, priority=task.priority, status=task.status,
+            due_date=task.due_date, position=task.position,
+            labels=task.labels if include_labels else [],
+        ))
+        if include_labels:
+            labels.extend(build_task_labels(new_id, board.id, task.labels))
+
+    Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+    # bulk_create não dispara os signals que registram o evento de criação
+    now = timezone.now()
+    events.record_many([
+        TaskEvent(
+            board_id=board.id, task_id=task.id, actor_id=user.id, event_type='created',
+            data={'column': str(task.column_id), 'title': task.title}, created_at=now,
+        )
+        for task in tasks
+    ])
+    search.index_rows((task.id, board.id, task.title, task.description) for task in tasks)
+    invalidate_feeds({task.assigned_to_id for task in tasks})
+    if labels:
+        TaskLabel.objects.bulk_create(labels, batch_size=BATCH_SIZE)
+
+    if include_comments and task_map:
+        # Datas originais no próprio INSERT (created_at é auto_now_add); a cópia conta como alteração
+        comments = [
+            TaskComment(
+                task_id=task_map[comment.task_id], user_id=comment.user_id,
+                content=comment.content, created_at=comment.created_at, updated_at=now,
+            )
+            for comment in TaskComment.objects.filter(
+                task__column_id__in=column_map.keys(), task__is_active=True
+            ).order_by('created_at').iterator(chunk_size=BATCH_SIZE)
+        ]
+        insert_rows(TaskComment, comments)
+
+    return len(tasks)
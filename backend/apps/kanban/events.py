@@ -0,0 +1,146 @@
+"""
+Log append-only de eventos das tasks.
+
+Eventos são acumulados por transação e gravados com um único ``bulk_create``
+depois do commit, de modo que uma operação que altera muitas tasks não paga
+um INSERT por evento e um rollback descarta os eventos junto com a mudança.
+
+As métricas de fluxo (vazão e cycle time) são calculadas a partir dos
+eventos, sem varrer a tabela de tasks.
+"""
+import logging
+import threading
+import weakref
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Column, TaskEvent
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class _EventBatch:
+    """Eventos pendentes da transação atual"""
+
+    def __init__(self):
+        self.events = []
+
+    def flush(self):
+        _local.batch = None
+        events, self.events = self.events, []
+        if events:
+            TaskEvent.objects.bulk_create(events, batch_size=500)
+
+
+def _current_batch():
+    # ``_local.batch`` marca o lote pendente: o flush o limpa no commit. No
+    # rollback (da transação ou do savepoint que registrou o flush) o Django
+    # descarta o callback de on_commit, a única referência forte ao lote, e a
+    # referência fraca zera; o próximo evento inicia um novo lote.
+    ref = getattr(_local, 'batch', None)
+    batch = ref() if ref is not None else None
+    if batch is None:
+        batch = _EventBatch()
+        _local.batch = weakref.ref(batch)
+        transaction.on_commit(batch.flush)
+    return batch
+
+
+def record_many(events):
+    """Enfileira instâncias de TaskEvent (não salvas) para gravação após o commit"""
+    if not events:
+        return
+    if not transaction.get_connection().in_atomic_block:
+        TaskEvent.objects.bulk_create(events, batch_size=500)
+        return
+    _current_batch().events.extend(events)
+
+
+def record(board_id, event_type, task_id=None, actor_id=None, **data):
+    """Enfileira um evento para gravação após o commit"""
+    record_many([TaskEvent(
+        board_id=board_id, task_id=task_id, actor_id=actor_id,
+        event_type=event_type, data=data, created_at=timezone.now(),
+    )])
+
+
+def _completion_column_id(board_id):
+    """A última coluna do board é considerada a etapa de conclusão"""
+    return Column.objects.filter(board_id=board_id).order_by('-position', '-created_at').values_list(
+        'id', flat=True
+    ).first()
+
+
+def completion_events(board_id, since, until=None):
+    """Eventos que marcam uma task como concluída: arquivamento ou entrada na última coluna"""
+    until = until or timezone.now()
+    events = TaskEvent.objects.filter(board_id=board_id, created_at__gte=since, created_at__lt=until)
+    done_column = _completion_column_id(board_id)
+    archived = events.filter(event_type='archived')
+    if done_column is None:
+        return archived
+    return archived | events.filter(event_type='moved', data__to_column=str(done_column))
+
+
+def throughput(board_id, since, until=None):
+    """Tasks concluídas por dia no intervalo"""
+    daily = Counter()
+    rows = completion_events(board_id, since, until).annotate(
+        day=TruncDate('created_at')
+    ).values('day', 'task_id').distinct()
+    for row in rows:
+        daily[row['day']] += 1
+    return [{'date': day.isoformat(), 'count': daily[day]} for day in sorted(daily)]
+
+
+def cycle_times(board_id, since, until=None):
+    """
+    Cycle time (em horas) das tasks concluídas no intervalo.
+
+    Mede do primeiro ``moved`` da task (início do trabalho) até a conclusão;
+    tasks concluídas sem nunca terem sido movidas usam o evento ``created``.
+    """
+    completed = {}
+    for task_id, finished_at in completion_events(board_id, since, until).values_list('task_id', 'created_at'):
+        if task_id and (task_id not in completed or finished_at < completed[task_id]):
+            completed[task_id] = finished_at
+    if not completed:
+        return []
+
+    started = {}
+    for event_type in ('created', 'moved'):
+        rows = TaskEvent.objects.filter(
+            board_id=board_id, task_id__in=list(completed), event_type=event_type
+        ).values('task_id').annotate(first=Min('created_at')).values_list('task_id', 'first')
+        started.update(rows)
+
+    return [
+        (finished_at - started[task_id]) / timedelta(hours=1)
+        for task_id, finished_at in completed.items()
+        if task_id in started and started[task_id] <= finished_at
+    ]
+
+
+def flow_metrics(board_id, days=30):
+    """Resumo de vazão e cycle time dos últimos ``days`` dias"""
+    since = timezone.now() - timedelta(days=days)
+    hours = sorted(cycle_times(board_id, since))
+    cycle = {'count': len(hours), 'average_hours': None, 'median_hours': None}
+    if hours:
+        middle = len(hours) // 2
+        cycle['average_hours'] = round(sum(hours) / len(hours), 2)
+        cycle['median_hours'] = round(
+            hours[middle] if len(hours) % 2 else (hours[middle - 1] + hours[middle]) / 2, 2
+        )
+    return {
+        'days': days,
+        'throughput': throughput(board_id, since),
+        'cycle_time': cycle,
+    }
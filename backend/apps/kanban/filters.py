@@ -2,14 +2,21 @@ import django_filters
 from django_filters import rest_framework as filters
 from django.contrib.auth.models import User
 from .models import Task, Board, Column
+from .labels import filter_tasks_by_labels, parse_labels_param
 
 class TaskFilter(filters.FilterSet):
     assigned_to = filters.ModelChoiceFilter(queryset=User.objects.all())
+    assigned_to_me = filters.BooleanFilter(method='filter_assigned_to_me')
+    board = filters.UUIDFilter(field_name='column__board_id')
+    column = filters.UUIDFilter(field_name='column_id')
     priority = filters.ChoiceFilter(choices=Task.PRIORITY_CHOICES)
     status = filters.ChoiceFilter(choices=Task.STATUS_CHOICES)
     due_date_from = filters.DateTimeFilter(field_name='due_date', lookup_expr='gte')
     due_date_to = filters.DateTimeFilter(field_name='due_date', lookup_expr='lte')
     labels = filters.CharFilter(method='filter_labels')
+    labels_mode = filters.ChoiceFilter(
+        choices=[('all', 'Todas'), ('any', 'Qualquer')], method='filter_labels_mode'
+    )
     created_after = filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
     created_before = filters.DateTimeFilter(field_name='created_at', lookup_expr='lte')
 
@@ -17,14 +24,31 @@ class TaskFilter(filters.FilterSet):
         model = Task
         fields = ['assigned_to', 'priority', 'status', 'labels']
 
+    def filter_assigned_to_me(self, queryset, name, value):
+        """Filtra tasks atribuídas ao usuário autenticado"""
+        user = getattr(self.request, 'user', None)
+        if value and user and user.is_authenticated:
+            return queryset.filter(assigned_to=user)
+        return queryset
+
     def filter_labels(self, queryset, name, value):
-        """Filtra por labels usando JSONField"""
+        """
+        Filtra por labels separadas por vírgula usando TaskLabel.
+
+        Por padrão exige todas as labels; ``labels_mode=any`` aceita qualquer uma.
+        """
         if value:
-            return queryset.filter(labels__contains=[value])
+            mode = self.form.cleaned_data.get('labels_mode') or 'all'
+            return filter_tasks_by_labels(queryset, parse_labels_param(value), mode)
+        return queryset
+
+    def filter_labels_mode(self, queryset, name, value):
+        """Apenas modifica filter_labels"""
         return queryset
 
 class BoardFilter(filters.FilterSet):
     created_by = filters.ModelChoiceFilter(queryset=User.objects.all())
+    is_template = filters.BooleanFilter()
     created_after = filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
     created_before = filters.DateTimeFilter(field_name='created_at', lookup_expr='lte')
 
@@ -1,63 +1,78 @@
 import logging
+from datetime import timedelta
+
 from firebase_admin import storage
-from django.conf import settings
-import uuid
-import mimetypes
-import os
+from django.utils import timezone
+
+from .storage import (
+    ATTACHMENTS_PREFIX, CHUNK_SIZE, URL_EXPIRATION, BaseStorageService, StoredFile, invalidate_download_url
+)
 
 logger = logging.getLogger(__name__)
 
-class FirebaseStorageService:
+class FirebaseStorageService(BaseStorageService):
     def __init__(self):
         self.bucket = storage.bucket()
-    
-    def upload_task_attachment(self, file_data, filename, task_id, user_id):
+
+    def save_file(self, firebase_path, fileobj, content_type):
         """
-        Upload arquivo para Firebase Storage
+        Upload para Firebase Storage em blocos (upload resumable), sem
+        carregar o arquivo inteiro na memória
         """
         try:
-            # Gerar path único
-            file_extension = os.path.splitext(filename)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            firebase_path = f"kanban/tasks/{task_id}/attachments/{unique_filename}"
-            
-            # Upload para Firebase
-            blob = self.bucket.blob(firebase_path)
-            content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
-            
-            blob.upload_from_string(
-                file_data,
-                content_type=content_type
-            )
-            
+            blob = self.bucket.blob(firebase_path, chunk_size=CHUNK_SIZE)
+            blob.upload_from_file(fileobj, content_type=content_type, rewind=True)
+
             # Tornar arquivo público (opcional, dependendo da segurança desejada)
             # blob.make_public()
-            
-            logger.info(f"Arquivo {filename} enviado para Firebase Storage: {firebase_path}")
-            
-            return {
-                'firebase_path': firebase_path,
-                'filename': filename,
-                'file_size': len(file_data),
-                'content_type': content_type
-            }
-            
+
         except Exception as e:
             logger.error(f"Erro ao fazer upload para Firebase Storage: {e}")
             raise
-    
-    def get_download_url(self, firebase_path):
+
+    def exists(self, firebase_path):
+        return self.bucket.blob(firebase_path).exists()
+
+    def touch(self, firebase_path):
+        """
+        Atualiza os metadados do blob para renovar ``updated``
+        """
+        blob = self.bucket.blob(firebase_path)
+        blob.metadata = {'reused_at': timezone.now().isoformat()}
+        blob.patch()
+
+    def updated_at(self, firebase_path):
+        blob = self.bucket.get_blob(firebase_path)
+        return blob.updated if blob is not None else None
+
+    def list_files(self, prefix=ATTACHMENTS_PREFIX):
+        """
+        Lista os arquivos do bucket sob ``prefix`` (paginado pela API)
+        """
+        for blob in self.bucket.list_blobs(prefix=prefix):
+            yield StoredFile(blob.name, blob.size, blob.updated)
+
+    def get_download_url(self, firebase_path, expiration=URL_EXPIRATION):
         """
         Gera URL de download temporária
         """
         try:
             blob = self.bucket.blob(firebase_path)
-            # URL válida por 1 hora
-            return blob.generate_signed_url(expiration=3600)
+            # Um inteiro seria lido como instante absoluto (epoch), não como validade
+            return blob.generate_signed_url(expiration=timedelta(seconds=expiration))
         except Exception as e:
             logger.error(f"Erro ao gerar URL de download: {e}")
             return None
-    
+
+    def get_download_urls(self, firebase_paths, expiration=URL_EXPIRATION):
+        """
+        Gera URLs de download para vários arquivos.
+
+        A assinatura é local (chave da service account), então o lote reaproveita
+        o bucket e as credenciais sem nenhuma ida à rede por arquivo.
+        """
+        return {path: self.get_download_url(path, expiration) for path in firebase_paths}
+
     def delete_file(self, firebase_path):
         """
         Remove arquivo do Firebase Storage
@@ -65,8 +80,9 @@ class FirebaseStorageService:
         try:
             blob = self.bucket.blob(firebase_path)
             blob.delete()
+            invalidate_download_url(firebase_path)
             logger.info(f"Arquivo removido do Firebase Storage: {firebase_path}")
             return True
         except Exception as e:
             logger.error(f"Erro ao remover arquivo: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,106 @@
+"""
+Labels de tasks normalizadas em TaskLabel.
+
+``Task.labels`` continua sendo o formato exposto pela API; cada alteração é
+espelhada em linhas de TaskLabel (uma por label) indexadas por ``slug`` e por
+``(board, slug)``, o que permite filtrar, sugerir e contar labels sem varrer
+o JSON de todas as tasks.
+"""
+from django.db.models import Count, Exists, Min, OuterRef
+
+from .models import TaskLabel
+
+MAX_LABEL_LENGTH = 100
+
+
+def normalize_label(label):
+    """Chave de busca de uma label: sem espaços nas pontas e em minúsculas"""
+    return str(label).strip().lower()
+
+
+def clean_labels(labels):
+    """Remove labels vazias e duplicadas (ignorando maiúsculas), preservando a ordem"""
+    cleaned = []
+    seen = set()
+    for label in labels or []:
+        name = str(label).strip()[:MAX_LABEL_LENGTH]
+        slug = name.lower()
+        if name and slug not in seen:
+            seen.add(slug)
+            cleaned.append(name)
+    return cleaned
+
+
+def build_task_labels(task_id, board_id, labels):
+    """Instâncias de TaskLabel (não salvas) para as labels de uma task"""
+    return [
+        TaskLabel(task_id=task_id, board_id=board_id, name=name, slug=name.lower())
+        for name in clean_labels(labels)
+    ]
+
+
+def sync_task_labels(task, board_id):
+    """Alinha as linhas de TaskLabel de uma task com ``task.labels``"""
+    wanted = {label.slug: label for label in build_task_labels(task.pk, board_id, task.labels)}
+    existing = {
+        label.slug: label for label in TaskLabel.objects.filter(task_id=task.pk)
+    }
+
+    stale = [label.pk for slug, label in existing.items() if slug not in wanted]
+    if stale:
+        TaskLabel.objects.filter(pk__in=stale).delete()
+
+    moved = [label.pk for slug, label in existing.items() if slug in wanted and label.board_id != board_id]
+    if moved:
+        TaskLabel.objects.filter(pk__in=moved).update(board_id=board_id)
+
+    missing = [label for slug, label in wanted.items() if slug not in existing]
+    if missing:
+        TaskLabel.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+def parse_labels_param(value):
+    """Converte "a,b,c" em uma lista de slugs"""
+    return [slug for slug in (normalize_label(part) for part in value.split(',')) if slug]
+
+
+def filter_tasks_by_labels(queryset, slugs, mode='all'):
+    """
+    Filtra tasks por labels usando o índice (slug, task).
+
+    ``mode='all'`` exige todas as labels (um EXISTS por label);
+    ``mode='any'`` aceita qualquer uma (um único EXISTS com IN).
+    """
+    if not slugs:
+        return queryset
+    if mode == 'any':
+        return queryset.filter(
+            Exists(TaskLabel.objects.filter(task=OuterRef('pk'), slug__in=slugs))
+        )
+    for slug in slugs:
+        queryset = queryset.filter(
+            Exists(TaskLabel.objects.filter(task=OuterRef('pk'), slug=slug))
+        )
+    return queryset
+
+
+def label_usage(board_id=None, prefix='', limit=None):
+    """
+    Labels em uso em tasks ativas com a contagem de tasks de cada uma.
+
+    O prefixo é aplicado como intervalo em ``slug`` para aproveitar o índice
+    em qualquer banco (LIKE com ESCAPE não usa índice no SQLite).
+    """
+    queryset = TaskLabel.objects.filter(task__is_active=True)
+    if board_id:
+        queryset = queryset.filter(board_id=board_id)
+    prefix = normalize_label(prefix)
+    if prefix:
+        queryset = queryset.filter(slug__gte=prefix, slug__lt=prefix + '\uffff')
+
+    usage = queryset.values('slug').annotate(
+        name=Min('name'), count=Count('task_id')
+    ).order_by('-count', 'slug')
+    if limit:
+        usage = usage[:limit]
+    return [{'name': row['name'], 'slug': row['slug'], 'count': row['count']} for row in usage]
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.kanban.analytics import build_board_snapshots
+from apps.kanban.models import Board
+
+
+class Command(BaseCommand):
+    help = 'Grava os snapshots diários por coluna usados no CFD (executar diariamente)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', action='append', help='ID do board (pode ser repetido); padrão: todos')
+
+    def handle(self, *args, **options):
+        boards = Board.objects.filter(is_template=False)
+        if options['board']:
+            boards = boards.filter(id__in=options['board'])
+
+        total = 0
+        board_ids = list(boards.values_list('id', flat=True))
+        for board_id in board_ids:
+            total += build_board_snapshots(board_id)
+        self.stdout.write(self.style.SUCCESS(f'{total} snapshots gravados para {len(board_ids)} boards'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from apps.kanban.storage_gc import SOURCES, collect_orphans
+
+
+class Command(BaseCommand):
+    help = 'Remove do storage os arquivos de anexos sem referência no banco (executar periodicamente)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', choices=sorted(SOURCES), action='append',
+            help='Conjunto de anexos a varrer (pode ser repetido); padrão: todos',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Apenas lista os órfãos, sem remover')
+        parser.add_argument('--batch-size', type=int, default=500, help='Arquivos conferidos por query')
+        parser.add_argument('--workers', type=int, default=8, help='Remoções em paralelo')
+        parser.add_argument('--rate', type=float, default=50, help='Máximo de remoções por segundo (0 = sem limite)')
+        parser.add_argument('--min-age', type=int, default=None, help='Idade mínima (segundos) dos arquivos removidos')
+
+    def handle(self, *args, **options):
+        for name in options['source'] or sorted(SOURCES):
+            report = collect_orphans(
+                SOURCES[name],
+                dry_run=options['dry_run'],
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+                rate=options['rate'],
+                min_age=options['min_age'],
+            )
+            action = 'seriam removidos' if report['dry_run'] else 'removidos'
+            self.stdout.write(self.style.SUCCESS(
+                f"[{name}] {report['scanned']} arquivos varridos, {report['orphans']} órfãos "
+                f"({report['orphan_bytes']} bytes) {action}; {report['deleted']} removidos, "
+                f"{report['kept']} mantidos (renovados durante a varredura), {report['failed']} falhas"
+            ))
+            for path in report['sample']:
+                self.stdout.write(f"  {path}")
@@ -0,0 +1,49 @@
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.kanban.models import Board
+from apps.kanban.transfer import export_board
+
+
+class Command(BaseCommand):
+    help = 'Exporta um board (colunas, tasks, comentários e anexos) em NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('board', help='ID do board')
+        parser.add_argument('--output', '-o', help='Arquivo de saída (.ndjson ou .ndjson.gz); padrão: stdout')
+        parser.add_argument('--active-only', action='store_true', help='Não exporta tasks arquivadas')
+
+    def handle(self, *args, **options):
+        try:
+            board = Board.objects.get(pk=options['board'])
+        except (Board.DoesNotExist, ValueError):
+            raise CommandError(f"Board {options['board']} não encontrado")
+
+        output = options['output']
+        if not output:
+            out, close = sys.stdout, False
+        elif output.endswith('.gz'):
+            out, close = gzip.open(output, 'wt', encoding='utf-8'), True
+        else:
+            out, close = open(output, 'w', encoding='utf-8'), True
+
+        counts = {}
+        started = time.monotonic()
+        size = 0
+        try:
+            for line in export_board(board, include_archived=not options['active_only'], counts=counts):
+                out.write(line)
+                size += len(line)
+        finally:
+            if close:
+                out.close()
+
+        records = sum(counts.values())
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stderr.write(self.style.SUCCESS(
+            f"{records} registros exportados em {elapsed:.2f}s "
+            f"({records / elapsed:,.0f} registros/s, {size / 1024 / 1024:.1f} MB)"
+        ))
@@ -0,0 +1,42 @@
+import gzip
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.companies.models import Company
+from apps.kanban.transfer import BoardImportError, import_board
+
+
+class Command(BaseCommand):
+    help = 'Importa um board exportado com export_board (NDJSON, opcionalmente .gz)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Arquivo .ndjson ou .ndjson.gz')
+        parser.add_argument('--company', required=True, help='ID da empresa de destino')
+        parser.add_argument('--user', required=True, help='Username de quem importa (criador do board)')
+        parser.add_argument('--name', help='Nome do novo board (padrão: o nome exportado)')
+
+    def handle(self, *args, **options):
+        try:
+            company = Company.objects.get(pk=options['company'])
+            user = User.objects.get(username=options['user'])
+        except (Company.DoesNotExist, User.DoesNotExist, ValueError) as e:
+            raise CommandError(str(e))
+
+        path = options['file']
+        opener = gzip.open if path.endswith('.gz') else open
+        started = time.monotonic()
+        try:
+            with opener(path, 'rt', encoding='utf-8') as lines:
+                board, counts = import_board(lines, user, company, name=options['name'])
+        except (OSError, BoardImportError) as e:
+            raise CommandError(str(e))
+
+        records = sum(counts.values())
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Board {board.name} ({board.id}) importado: "
+            + ", ".join(f"{count} {name}" for name, count in counts.items())
+            + f" em {elapsed:.2f}s ({records / elapsed:,.0f} registros/s)"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.kanban.search import is_indexed, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Recria o índice de busca textual das tasks a partir da tabela de tasks'
+
+    def handle(self, *args, **options):
+        if not is_indexed():
+            self.stdout.write(self.style.WARNING('Banco sem índice de busca textual; a busca usa icontains'))
+            return
+        total = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'{total} tasks indexadas'))
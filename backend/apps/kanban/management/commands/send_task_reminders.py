@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.kanban.reminders import OVERDUE_LOOKBACK, REMINDER_HORIZON, send_due_reminders
+
+
+class Command(BaseCommand):
+    help = 'Envia lembretes de tasks que vencem em breve ou estão atrasadas (executar periodicamente)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-hours', type=int, default=int(REMINDER_HORIZON.total_seconds() // 3600),
+            help='Avisar sobre tasks que vencem nas próximas N horas',
+        )
+        parser.add_argument(
+            '--lookback-days', type=int, default=OVERDUE_LOOKBACK.days,
+            help='Avisar sobre tasks atrasadas há no máximo N dias',
+        )
+        parser.add_argument('--owner', help='Identificador do worker no lease (padrão: hostname)')
+
+    def handle(self, *args, **options):
+        from datetime import timedelta
+
+        result = send_due_reminders(
+            owner=options['owner'],
+            horizon=timedelta(hours=options['horizon_hours']),
+            lookback=timedelta(days=options['lookback_days']),
+        )
+        if not result['acquired']:
+            self.stdout.write(self.style.WARNING('Outro worker está enviando os lembretes; nada a fazer'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['reminders']} lembretes enviados para {result['users']} usuários "
+            f"({result['scanned']} tasks examinadas)"
+        ))
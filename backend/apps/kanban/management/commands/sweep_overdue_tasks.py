@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.kanban.statistics import refresh_statistics, sweep_overdue
+
+
+class Command(BaseCommand):
+    help = 'Atualiza a contagem de tasks atrasadas nas estatísticas dos boards (executar periodicamente)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recalcula todas as estatísticas a partir da tabela de tasks',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            from apps.kanban.models import Board
+            board_ids = list(Board.objects.values_list('id', flat=True))
+            refresh_statistics(board_ids)
+            self.stdout.write(self.style.SUCCESS(f'Estatísticas recalculadas para {len(board_ids)} boards'))
+            return
+
+        count = sweep_overdue()
+        self.stdout.write(self.style.SUCCESS(f'Tasks atrasadas atualizadas em {count} boards'))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.5 on 2026-10-19 12:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0003_alter_column_color'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardStatistics',
+            fields=[
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='kanban.board')),
+                ('total_tasks', models.IntegerField(default=0)),
+                ('tasks_by_priority', models.JSONField(blank=True, default=dict)),
+                ('tasks_by_column', models.JSONField(blank=True, default=list)),
+                ('overdue_tasks', models.IntegerField(default=0)),
+                ('overdue_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Board statistics',
+            },
+        ),
+    ]
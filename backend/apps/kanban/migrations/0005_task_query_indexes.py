@@ -0,0 +1,25 @@
+# Generated by Django 4.2.5 on 2026-10-19 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0004_board_statistics'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'is_active', 'due_date'], name='kanban_task_assigne_06d049_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['column', 'is_active', 'position'], name='kanban_task_column__420e81_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['is_active', 'created_at'], name='kanban_task_is_acti_f6df40_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.5 on 2026-10-19 12:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_task_labels(apps, schema_editor):
+    """Copia as labels existentes em Task.labels para TaskLabel"""
+    Task = apps.get_model('kanban', 'Task')
+    TaskLabel = apps.get_model('kanban', 'TaskLabel')
+
+    batch = []
+    tasks = Task.objects.exclude(labels=[]).values_list('id', 'column__board_id', 'labels')
+    for task_id, board_id, labels in tasks.iterator(chunk_size=2000):
+        seen = set()
+        for label in labels or []:
+            name = str(label).strip()[:100]
+            slug = name.lower()
+            if name and slug not in seen:
+                seen.add(slug)
+                batch.append(TaskLabel(task_id=task_id, board_id=board_id, name=name, slug=slug))
+        if len(batch) >= 2000:
+            TaskLabel.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TaskLabel.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0005_task_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskLabel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.CharField(help_text='Label normalizada (minúsculas) usada nas buscas', max_length=100)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_labels', to='kanban.board')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_labels', to='kanban.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['slug', 'task'], name='kanban_task_slug_bcd7b6_idx'), models.Index(fields=['board', 'slug'], name='kanban_task_board_i_f10f6c_idx')],
+                'unique_together': {('task', 'slug')},
+            },
+        ),
+        migrations.RunPython(backfill_task_labels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-19 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0006_task_label'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='is_template',
+            field=models.BooleanField(default=False, help_text='Modelo de pipeline usado para criar novos boards'),
+        ),
+    ]
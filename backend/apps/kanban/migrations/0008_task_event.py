@@ -0,0 +1,33 @@
+# Generated by Django 4.2.5 on 2026-10-19 12:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('kanban', '0007_board_is_template'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('created', 'Criada'), ('moved', 'Movida'), ('assigned', 'Atribuída'), ('priority_changed', 'Prioridade alterada'), ('archived', 'Arquivada'), ('commented', 'Comentada')], max_length=20)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='kanban.board')),
+                ('task', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='kanban.task')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['board', 'created_at'], name='kanban_task_board_i_fbea5e_idx'), models.Index(fields=['task', 'created_at'], name='kanban_task_task_id_87a6a3_idx'), models.Index(fields=['board', 'event_type', 'created_at'], name='kanban_task_board_i_967a9e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.5 on 2026-10-19 12:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0008_task_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColumnDailySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('task_count', models.IntegerField(default=0)),
+                ('entered', models.IntegerField(default=0)),
+                ('exited', models.IntegerField(default=0)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flow_snapshots', to='kanban.board')),
+                ('column', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flow_snapshots', to='kanban.column')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board', 'date'], name='kanban_colu_board_i_82d86f_idx')],
+                'unique_together': {('column', 'date')},
+            },
+        ),
+    ]
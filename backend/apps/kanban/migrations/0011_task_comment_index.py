@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0010_task_attachment_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=models.Index(fields=['task', 'created_at'], name='kanban_task_task_id_e3a9e2_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# Índice de busca textual das tasks ativas. Em SQLite é uma tabela virtual
+# FTS5; em PostgreSQL uma tabela com tsvector e índice GIN. Outros bancos não
+# têm tabela e a busca usa icontains (ver apps/kanban/search.py).
+
+SQLITE_CREATE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS kanban_task_search USING fts5(
+    task_id UNINDEXED, board_id UNINDEXED, title, description,
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+)
+"""
+
+POSTGRES_CREATE = [
+    """
+    CREATE TABLE IF NOT EXISTS kanban_task_search (
+        task_id uuid PRIMARY KEY REFERENCES kanban_task (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        board_id uuid NOT NULL,
+        title text NOT NULL,
+        description text NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS kanban_task_search_document_idx ON kanban_task_search USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS kanban_task_search_board_idx ON kanban_task_search (board_id)",
+]
+
+SQLITE_BACKFILL = """
+INSERT INTO kanban_task_search (task_id, board_id, title, description)
+SELECT t.id, c.board_id, t.title, t.description
+FROM kanban_task t JOIN kanban_column c ON c.id = t.column_id
+WHERE t.is_active
+"""
+
+POSTGRES_BACKFILL = """
+INSERT INTO kanban_task_search (task_id, board_id, title, description, document)
+SELECT t.id, c.board_id, t.title, t.description,
+       setweight(to_tsvector('portuguese', t.title), 'A') || setweight(to_tsvector('portuguese', t.description), 'B')
+FROM kanban_task t JOIN kanban_column c ON c.id = t.column_id
+WHERE t.is_active
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(SQLITE_BACKFILL)
+    elif vendor == 'postgresql':
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+        schema_editor.execute(POSTGRES_BACKFILL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS kanban_task_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0011_task_comment_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
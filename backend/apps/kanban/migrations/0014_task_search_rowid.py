@@ -0,0 +1,54 @@
+from django.db import migrations
+
+# No FTS5 só o rowid é indexado: apagar por task_id (UNINDEXED) percorria o
+# índice inteiro a cada alteração de task. Os IDs das tasks são UUIDs, então
+# kanban_task_search_keys dá a cada task um rowid inteiro e o índice é
+# recriado com esses rowids. Só o SQLite muda; no PostgreSQL task_id já é a
+# PRIMARY KEY da tabela de busca.
+
+SQLITE_FORWARD = [
+    """
+    CREATE TABLE IF NOT EXISTS kanban_task_search_keys (
+        id integer PRIMARY KEY,
+        task_id char(32) NOT NULL UNIQUE
+    )
+    """,
+    "INSERT OR IGNORE INTO kanban_task_search_keys (task_id) SELECT task_id FROM kanban_task_search",
+    """
+    CREATE VIRTUAL TABLE kanban_task_search_new USING fts5(
+        task_id UNINDEXED, board_id UNINDEXED, title, description,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO kanban_task_search_new (rowid, task_id, board_id, title, description)
+    SELECT k.id, s.task_id, s.board_id, s.title, s.description
+    FROM kanban_task_search s JOIN kanban_task_search_keys k ON k.task_id = s.task_id
+    WHERE s.rowid IN (SELECT max(rowid) FROM kanban_task_search GROUP BY task_id)
+    """,
+    "DROP TABLE kanban_task_search",
+    "ALTER TABLE kanban_task_search_new RENAME TO kanban_task_search",
+]
+
+
+def use_rowid_keys(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_FORWARD:
+            schema_editor.execute(statement)
+
+
+def drop_rowid_keys(apps, schema_editor):
+    # O índice com rowids arbitrários continua válido para a versão anterior
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS kanban_task_search_keys")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0013_task_reminders'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_rowid_keys, drop_rowid_keys),
+    ]
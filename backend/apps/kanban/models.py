@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from apps.companies.models import Company
 import uuid
 
@@ -14,6 +15,7 @@ class Board(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    is_template = models.BooleanField(default=False, help_text="Modelo de pipeline usado para criar novos boards")
     position = models.IntegerField(default=0)
 
     class Meta:
@@ -87,6 +89,12 @@ class Task(models.Model):
 
     class Meta:
         ordering = ['position', 'created_at']
+        indexes = [
+            models.Index(fields=['assigned_to', 'is_active', 'due_date']),
+            models.Index(fields=['column', 'is_active', 'position']),
+            models.Index(fields=['is_active', 'created_at']),
+            models.Index(fields=['is_active', 'due_date']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.column.name}"
@@ -103,6 +111,9 @@ class TaskComment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['task', 'created_at']),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user.email} on {self.task.title}"
@@ -116,8 +127,151 @@ class TaskAttachment(models.Model):
     filename = models.CharField(max_length=255)
     file_size = models.BigIntegerField()
     content_type = models.CharField(max_length=100)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 do conteúdo
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.filename} - {self.task.title}"
+
+
+class BoardStatistics(models.Model):
+    """Precomputed task statistics for a board, kept current by task signals"""
+    board = models.OneToOneField(Board, on_delete=models.CASCADE, primary_key=True, related_name='statistics')
+    total_tasks = models.IntegerField(default=0)
+    tasks_by_priority = models.JSONField(default=dict, blank=True)
+    tasks_by_column = models.JSONField(default=list, blank=True)
+    overdue_tasks = models.IntegerField(default=0)
+    overdue_checked_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Board statistics'
+
+    def __str__(self):
+        return f"Statistics - {self.board_id}"
+
+    def as_dict(self):
+        return {
+            'total_tasks': self.total_tasks,
+            'tasks_by_priority': self.tasks_by_priority,
+            'tasks_by_column': self.tasks_by_column,
+            'overdue_tasks': self.overdue_tasks,
+        }
+
+
+class TaskLabel(models.Model):
+    """Normalized task labels, mirrored from Task.labels for indexed filtering"""
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='task_labels')
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='task_labels')
+    name = models.CharField(max_length=100)
+    slug = models.CharField(max_length=100, help_text="Label normalizada (minúsculas) usada nas buscas")
+
+    class Meta:
+        unique_together = ['task', 'slug']
+        indexes = [
+            models.Index(fields=['slug', 'task']),
+            models.Index(fields=['board', 'slug']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.task_id}"
+
+
+class TaskEvent(models.Model):
+    """Append-only history of task changes (see events.py)"""
+    EVENT_TYPES = [
+        ('created', 'Criada'),
+        ('moved', 'Movida'),
+        ('assigned', 'Atribuída'),
+        ('priority_changed', 'Prioridade alterada'),
+        ('archived', 'Arquivada'),
+        ('commented', 'Comentada'),
+    ]
+
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='events')
+    # Sem constraint: o histórico sobrevive à remoção da task
+    task = models.ForeignKey(
+        Task, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='events'
+    )
+    actor = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['board', 'created_at']),
+            models.Index(fields=['task', 'created_at']),
+            models.Index(fields=['board', 'event_type', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} - {self.task_id}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("TaskEvent é append-only e não pode ser alterado")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("TaskEvent é append-only e não pode ser removido")
+
+
+class ColumnDailySnapshot(models.Model):
+    """Daily per-column task counts used for cumulative flow diagrams (see analytics.py)"""
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='flow_snapshots')
+    column = models.ForeignKey(Column, on_delete=models.CASCADE, related_name='flow_snapshots')
+    date = models.DateField()
+    task_count = models.IntegerField(default=0)
+    entered = models.IntegerField(default=0)
+    exited = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['column', 'date']
+        indexes = [
+            models.Index(fields=['board', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.column_id} {self.date}: {self.task_count}"
+
+
+class TaskReminder(models.Model):
+    """Due-date reminder sent (or being sent) to a task assignee (see reminders.py)"""
+    KIND_CHOICES = [
+        ('upcoming', 'Vence em breve'),
+        ('overdue', 'Atrasada'),
+    ]
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='reminders')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_reminders')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Prazo ao qual o lembrete se refere: um novo prazo gera um novo lembrete
+    due_date = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_by = models.UUIDField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ['task', 'kind', 'due_date']
+        indexes = [
+            models.Index(fields=['sent_at', 'user']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} - {self.task_id}"
+
+
+class SchedulerLease(models.Model):
+    """Named lease held by one worker at a time for periodic jobs"""
+    name = models.CharField(max_length=100, primary_key=True)
+    owner = models.CharField(max_length=255)
+    expires_at = models.DateTimeField()
+    acquired_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} ({self.owner})"
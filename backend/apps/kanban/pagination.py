@@ -0,0 +1,33 @@
+"""
+Paginação por cursor (keyset) para listagens do Kanban
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Paginação keyset para a consulta global de tasks.
+
+    O cursor codifica a posição em ``created_at``, então páginas profundas custam
+    o mesmo que a primeira e inserções concorrentes não deslocam os resultados.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class TaskEventCursorPagination(CursorPagination):
+    """Paginação keyset para feeds de atividade e timelines de tasks"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class TaskCommentCursorPagination(CursorPagination):
+    """Paginação keyset para os comentários de uma task, do mais recente para o mais antigo"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,242 @@
+"""
+Lembretes de prazo das tasks.
+
+O comando ``send_task_reminders`` (executar periodicamente, em qualquer
+número de nós) chama ``send_due_reminders``:
+
+1. Adquire o lease ``task-reminders`` em ``SchedulerLease``; só um worker
+   por vez faz a varredura e os demais retornam sem fazer nada.
+2. Faz uma busca por faixa em ``(is_active, due_date)``: tasks atribuídas
+   que vencem até ``REMINDER_HORIZON`` à frente (``upcoming``) ou que
+   venceram há no máximo ``OVERDUE_LOOKBACK`` (``overdue``).
+3. Registra um ``TaskReminder`` por (task, tipo, prazo) com
+   ``ignore_conflicts``: a constraint única garante que cada lembrete exista
+   uma vez só, mesmo que o lease expire no meio de uma execução.
+4. Para cada responsável, reserva os lembretes pendentes com um UPDATE
+   condicional que grava ``claimed_by`` e ``sent_at`` juntos, antes da
+   entrega (outbox), e envia uma única notificação com todas as tasks dele,
+   por e-mail e/ou WebSocket. Um lembrete reservado já não está pendente:
+   mesmo que o lease expire durante a entrega e outro worker assuma, ele não
+   é reservado de novo. Se a entrega falha a reserva é desfeita e o lembrete
+   fica para a próxima execução; se o worker cai no meio da entrega o
+   lembrete conta como enviado (no máximo uma notificação, nunca duas).
+"""
+import logging
+import socket
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import SchedulerLease, Task, TaskReminder
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = 'task-reminders'
+LEASE_TTL = getattr(settings, 'KANBAN_REMINDER_LEASE_TTL', 300)
+REMINDER_HORIZON = timedelta(hours=getattr(settings, 'KANBAN_REMINDER_HORIZON_HOURS', 24))
+OVERDUE_LOOKBACK = timedelta(days=getattr(settings, 'KANBAN_REMINDER_OVERDUE_LOOKBACK_DAYS', 7))
+REMINDER_CHANNELS = getattr(settings, 'KANBAN_REMINDER_CHANNELS', ('email', 'websocket'))
+BATCH_SIZE = 500
+
+
+def default_owner():
+    """Identificador do worker usado no lease"""
+    return f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(name, owner, ttl=LEASE_TTL, now=None):
+    """
+    Adquire (ou renova) o lease ``name`` para ``owner``.
+
+    Retorna True se o lease é de ``owner`` até ``now + ttl``. A troca de dono
+    só acontece com um UPDATE condicional sobre um lease expirado, então dois
+    workers nunca saem daqui com o mesmo lease válido.
+    """
+    now = now or timezone.now()
+    expires_at = now + timedelta(seconds=ttl)
+
+    taken = SchedulerLease.objects.filter(
+        Q(owner=owner) | Q(expires_at__lte=now), name=name
+    ).update(owner=owner, expires_at=expires_at, acquired_at=now)
+    if taken:
+        return True
+
+    try:
+        with transaction.atomic():
+            SchedulerLease.objects.create(name=name, owner=owner, expires_at=expires_at, acquired_at=now)
+    except IntegrityError:
+        # Outro worker tem o lease válido
+        return False
+    return True
+
+
+def release_lease(name, owner):
+    """Libera o lease se ainda pertencer a ``owner``"""
+    SchedulerLease.objects.filter(name=name, owner=owner).delete()
+
+
+def _due_tasks(now, horizon, lookback):
+    return Task.objects.filter(
+        is_active=True,
+        due_date__gte=now - lookback,
+        due_date__lt=now + horizon,
+        assigned_to__isnull=False,
+    ).values_list('id', 'assigned_to_id', 'due_date').order_by().iterator(chunk_size=BATCH_SIZE)
+
+
+def register_reminders(now=None, horizon=REMINDER_HORIZON, lookback=OVERDUE_LOOKBACK):
+    """
+    Cria os TaskReminder que faltam para as tasks na janela de varredura.
+
+    Lembretes já registrados (mesma task, tipo e prazo) são ignorados pela
+    constraint única; retorna o número de tasks examinadas.
+    """
+    now = now or timezone.now()
+    scanned = 0
+    batch = []
+    for task_id, user_id, due_date in _due_tasks(now, horizon, lookback):
+        scanned += 1
+        kind = 'overdue' if due_date < now else 'upcoming'
+        batch.append(TaskReminder(task_id=task_id, user_id=user_id, kind=kind, due_date=due_date))
+        if len(batch) >= BATCH_SIZE:
+            TaskReminder.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    TaskReminder.objects.bulk_create(batch, ignore_conflicts=True)
+    return scanned
+
+
+def _claim(user_id):
+    """
+    Reserva os lembretes pendentes do usuário, já marcados como enviados;
+    retorna o token da reserva
+    """
+    token = uuid.uuid4()
+    claimed = TaskReminder.objects.filter(
+        user_id=user_id, sent_at__isnull=True, claimed_by__isnull=True
+    ).update(claimed_by=token, sent_at=timezone.now())
+    return token if claimed else None
+
+
+def _reminder_payload(reminders):
+    upcoming, overdue = [], []
+    for reminder in reminders:
+        task = reminder.task
+        item = {
+            'task_id': task.id,
+            'title': task.title,
+            'board_id': task.column.board_id,
+            'board_name': task.column.board.name,
+            'due_date': timezone.localtime(reminder.due_date),
+        }
+        (overdue if reminder.kind == 'overdue' else upcoming).append(item)
+    return upcoming, overdue
+
+
+def push_reminders(user_id, upcoming, overdue):
+    """Envia os lembretes para as conexões WebSocket do usuário"""
+    from channels.layers import get_channel_layer
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    def serialize(items):
+        return [
+            {**item, 'task_id': str(item['task_id']), 'board_id': str(item['board_id']),
+             'due_date': item['due_date'].isoformat()}
+            for item in items
+        ]
+
+    async_to_sync(channel_layer.group_send)(
+        f'user_{user_id}',
+        {
+            'type': 'task_reminders',
+            'upcoming': serialize(upcoming),
+            'overdue': serialize(overdue),
+            'timestamp': timezone.now().isoformat(),
+        },
+    )
+
+
+def deliver(user, upcoming, overdue, channels=REMINDER_CHANNELS):
+    """Entrega uma notificação agrupada pelos canais configurados"""
+    from apps.authentication.email_utils import send_task_reminder_email
+
+    if 'email' in channels and user.email:
+        send_task_reminder_email(user, upcoming, overdue)
+    if 'websocket' in channels:
+        push_reminders(user.id, upcoming, overdue)
+
+
+def _pending_users():
+    return list(
+        TaskReminder.objects.filter(sent_at__isnull=True, claimed_by__isnull=True)
+        .values_list('user_id', flat=True).distinct().order_by('user_id')
+    )
+
+
+def send_due_reminders(owner=None, now=None, horizon=REMINDER_HORIZON, lookback=OVERDUE_LOOKBACK,
+                       channels=REMINDER_CHANNELS):
+    """
+    Executa uma rodada de lembretes se este worker conseguir o lease.
+
+    Retorna um dict com ``acquired``, ``scanned``, ``users`` (notificações
+    enviadas) e ``reminders`` (lembretes entregues).
+    """
+    owner = owner or default_owner()
+    result = {'acquired': False, 'scanned': 0, 'users': 0, 'reminders': 0}
+    if not acquire_lease(LEASE_NAME, owner, now=now):
+        logger.info(f"Lembretes: lease {LEASE_NAME} em uso por outro worker")
+        return result
+    result['acquired'] = True
+
+    try:
+        now = now or timezone.now()
+        result['scanned'] = register_reminders(now, horizon, lookback)
+
+        for user_id in _pending_users():
+            # Renova o lease a cada usuário; se outro worker assumiu, para aqui
+            if not acquire_lease(LEASE_NAME, owner):
+                logger.warning(f"Lembretes: lease {LEASE_NAME} perdido durante a execução")
+                break
+
+            token = _claim(user_id)
+            if token is None:
+                continue
+            reminders = list(
+                TaskReminder.objects.filter(claimed_by=token)
+                .select_related('user', 'task__column__board')
+                .order_by('due_date')
+            )
+            # Lembretes de tasks que mudaram de prazo, responsável ou foram arquivadas são descartados
+            valid = [
+                reminder for reminder in reminders
+                if reminder.task.is_active
+                and reminder.task.assigned_to_id == reminder.user_id
+                and reminder.task.due_date == reminder.due_date
+            ]
+            try:
+                if valid:
+                    upcoming, overdue = _reminder_payload(valid)
+                    deliver(reminders[0].user, upcoming, overdue, channels)
+            except Exception as e:
+                logger.error(f"Erro ao enviar lembretes para o usuário {user_id}: {e}")
+                TaskReminder.objects.filter(claimed_by=token).update(claimed_by=None, sent_at=None)
+                continue
+
+            if valid:
+                result['users'] += 1
+                result['reminders'] += len(valid)
+    finally:
+        release_lease(LEASE_NAME, owner)
+
+    logger.info(
+        f"Lembretes: {result['reminders']} lembretes enviados para {result['users']} usuários "
+        f"({result['scanned']} tasks examinadas)"
+    )
+    return result
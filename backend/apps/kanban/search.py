@@ -0,0 +1,205 @@
+"""
+Busca textual nas tasks ativas (título e descrição).
+
+O índice fica na tabela ``kanban_task_search`` criada pela migração 0012:
+FTS5 no SQLite e ``tsvector`` com índice GIN no PostgreSQL (ver
+``apps.fulltext``). Como os IDs são UUIDs, no SQLite o rowid de cada task
+vem da tabela ``kanban_task_search_keys`` (migração 0014). Os signals de
+Task mantêm o índice atualizado; operações set-based (bulk, clonagem)
+chamam ``index_rows``/``remove_tasks`` explicitamente. Em outros bancos a
+busca cai para ``icontains``.
+
+Cada termo da consulta casa por prefixo (útil para typeahead) e todos os
+termos precisam aparecer. Os resultados vêm ordenados por relevância, com o
+título destacado e um trecho da descrição; os trechos são escapados e os
+termos envolvidos em ``<mark>``.
+"""
+import html
+import logging
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from apps.fulltext import SearchTable, postgres_tsquery, sqlite_match
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'kanban_task_search'
+SEARCH_CONFIG = 'portuguese'
+MAX_TERMS = 8
+
+INDEX = SearchTable(
+    SEARCH_TABLE, 'task_id', columns=['board_id', 'title', 'description'],
+    weights={'title': 'A', 'description': 'B'}, stored=['board_id', 'title', 'description'],
+    keys_table='kanban_task_search_keys', config=SEARCH_CONFIG,
+)
+
+# Marcadores de destaque usados no SQL; trocados por <mark> depois do escape
+_START, _STOP = '\x02', '\x03'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _vendor():
+    return connection.vendor
+
+
+def is_indexed():
+    """Se o banco atual tem índice de busca textual"""
+    return _vendor() in ('sqlite', 'postgresql')
+
+
+def parse_terms(query):
+    """Termos da consulta (apenas caracteres de palavra, no máximo MAX_TERMS)"""
+    return _TOKEN_RE.findall(query or '')[:MAX_TERMS]
+
+
+def _uuid(value):
+    return Task._meta.pk.get_db_prep_value(value, connection)
+
+
+def _highlight(text):
+    return html.escape(text or '').replace(_START, '<mark>').replace(_STOP, '</mark>')
+
+
+def remove_tasks(task_ids):
+    """Remove tasks do índice"""
+    INDEX.remove([_uuid(task_id) for task_id in task_ids])
+
+
+def purge_deleted():
+    """
+    Remove do índice as tasks que não existem mais (exclusões em cascata de
+    colunas e boards); percorre a tabela de chaves, não o índice FTS
+    """
+    INDEX.purge_missing(Task._meta.db_table)
+
+
+def index_rows(rows):
+    """
+    Grava ou atualiza tasks no índice.
+
+    ``rows`` são tuplas ``(task_id, board_id, title, description)`` de tasks ativas.
+    """
+    INDEX.write(
+        (_uuid(task_id), _uuid(board_id), title, description or '')
+        for task_id, board_id, title, description in rows
+    )
+
+
+def index_task(task, board_id):
+    """Atualiza o índice após a mudança de uma task"""
+    if task.is_active:
+        index_rows([(task.pk, board_id, task.title, task.description)])
+    else:
+        remove_tasks([task.pk])
+
+
+def rebuild_index(batch_size=2000):
+    """Recria o índice a partir da tabela de tasks; retorna o número de tasks indexadas"""
+    if not is_indexed():
+        return 0
+    INDEX.clear()
+
+    batch = []
+    total = 0
+    rows = Task.objects.filter(is_active=True).values_list(
+        'id', 'column__board_id', 'title', 'description'
+    ).order_by().iterator(chunk_size=batch_size)
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            index_rows(batch)
+            total += len(batch)
+            batch = []
+    index_rows(batch)
+    return total + len(batch)
+
+
+def _search_sqlite(terms, board_id, limit):
+    match = sqlite_match(terms)
+    sql = (
+        f"SELECT task_id, -bm25({SEARCH_TABLE}, 0, 0, 10.0, 1.0) AS rank, "
+        f"highlight({SEARCH_TABLE}, 2, '{_START}', '{_STOP}'), "
+        f"snippet({SEARCH_TABLE}, 3, '{_START}', '{_STOP}', '…', 16) "
+        f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+    )
+    params = [match]
+    if board_id:
+        sql += " AND board_id = %s"
+        params.append(_uuid(board_id))
+    sql += " ORDER BY rank DESC LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _search_postgres(terms, board_id, limit):
+    tsquery = postgres_tsquery(terms)
+    options = f"StartSel={_START}, StopSel={_STOP}"
+    sql = (
+        f"SELECT task_id, ts_rank(document, query) AS rank, "
+        f"ts_headline('{SEARCH_CONFIG}', title, query, %s), "
+        f"ts_headline('{SEARCH_CONFIG}', description, query, %s) "
+        f"FROM {SEARCH_TABLE}, to_tsquery('{SEARCH_CONFIG}', %s) query WHERE document @@ query"
+    )
+    params = [f"{options}, HighlightAll=true", f"{options}, MaxWords=24, MinWords=8", tsquery]
+    if board_id:
+        sql += " AND board_id = %s"
+        params.append(_uuid(board_id))
+    sql += " ORDER BY rank DESC LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _search_fallback(terms, board_id, limit):
+    queryset = Task.objects.filter(is_active=True)
+    if board_id:
+        queryset = queryset.filter(column__board_id=board_id)
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+
+    def mark(text):
+        return pattern.sub(lambda match: f'{_START}{match.group(0)}{_STOP}', text)
+
+    return [
+        (task_id, 0.0, mark(title), mark(description[:200]))
+        for task_id, title, description in queryset.order_by('-created_at').values_list(
+            'id', 'title', 'description'
+        )[:limit]
+    ]
+
+
+def search_tasks(query, board_id=None, limit=20):
+    """
+    Busca tasks ativas por título e descrição.
+
+    Retorna uma lista ordenada por relevância de dicts com ``task_id``,
+    ``rank``, ``title_highlight`` e ``snippet``.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return []
+
+    if _vendor() == 'sqlite':
+        rows = _search_sqlite(terms, board_id, limit)
+    elif _vendor() == 'postgresql':
+        rows = _search_postgres(terms, board_id, limit)
+    else:
+        rows = _search_fallback(terms, board_id, limit)
+
+    return [
+        {
+            'task_id': Task._meta.pk.to_python(task_id),
+            'rank': round(float(rank), 4),
+            'title_highlight': _highlight(title),
+            'snippet': _highlight(snippet),
+        }
+        for task_id, rank, title, snippet in rows
+    ]
@@ -1,20 +1,41 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Board, Column, Task, TaskComment, TaskAttachment
+from .models import Board, Column, Task, TaskComment, TaskAttachment, TaskEvent
+from .bulk import OPERATIONS
+from .labels import clean_labels
+from .storage import get_download_url, get_download_urls
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'first_name', 'last_name']
 
+class TaskAttachmentListSerializer(serializers.ListSerializer):
+    """Gera as URLs de download de todos os anexos da lista em um único lote"""
+
+    def to_representation(self, data):
+        attachments = data.all() if hasattr(data, 'all') else data
+        self.child.download_urls = get_download_urls(
+            attachment.firebase_path for attachment in attachments
+        )
+        return super().to_representation(attachments)
+
 class TaskAttachmentSerializer(serializers.ModelSerializer):
     uploaded_by = UserSerializer(read_only=True)
-    download_url = serializers.CharField(read_only=True)
+    download_url = serializers.SerializerMethodField()
     
     class Meta:
         model = TaskAttachment
         fields = ['id', 'firebase_path', 'filename', 'file_size', 'content_type', 
-                 'uploaded_by', 'uploaded_at', 'download_url']
+                 'content_hash', 'uploaded_by', 'uploaded_at', 'download_url']
+        read_only_fields = ['content_hash']
+        list_serializer_class = TaskAttachmentListSerializer
+
+    def get_download_url(self, obj):
+        download_urls = getattr(self, 'download_urls', None)
+        if download_urls is not None:
+            return download_urls.get(obj.firebase_path)
+        return get_download_url(obj.firebase_path)
 
 class TaskCommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -23,6 +44,13 @@ class TaskCommentSerializer(serializers.ModelSerializer):
         model = TaskComment
         fields = ['id', 'content', 'user', 'created_at', 'updated_at']
 
+class TaskEventSerializer(serializers.ModelSerializer):
+    actor = UserSerializer(read_only=True)
+
+    class Meta:
+        model = TaskEvent
+        fields = ['id', 'board', 'task', 'actor', 'event_type', 'data', 'created_at']
+
 class TaskListSerializer(serializers.ModelSerializer):
     assigned_to = UserSerializer(read_only=True)
     comments_count = serializers.SerializerMethodField()
@@ -37,15 +65,37 @@ class TaskListSerializer(serializers.ModelSerializer):
         ]
 
     def get_comments_count(self, obj):
+        # Usa a contagem anotada na queryset quando disponível
+        if hasattr(obj, 'comments_total'):
+            return obj.comments_total
         return obj.comments.count()
 
     def get_attachments_count(self, obj):
+        if hasattr(obj, 'attachments_total'):
+            return obj.attachments_total
         return obj.attachments.count()
 
+class TaskSearchSerializer(TaskListSerializer):
+    """Task com contexto de coluna e board para consultas entre boards"""
+    column_id = serializers.UUIDField(source='column.id', read_only=True)
+    column_name = serializers.CharField(source='column.name', read_only=True)
+    board_id = serializers.UUIDField(source='column.board.id', read_only=True)
+    board_name = serializers.CharField(source='column.board.name', read_only=True)
+
+    class Meta(TaskListSerializer.Meta):
+        fields = TaskListSerializer.Meta.fields + ['column_id', 'column_name', 'board_id', 'board_name']
+
 class TaskDetailSerializer(serializers.ModelSerializer):
+    """
+    Detalhe da task com apenas os ``LATEST_COMMENTS`` comentários mais recentes
+    e o total; o restante é lido paginado em .../tasks/{id}/comments/
+    """
+    LATEST_COMMENTS = 10
+
     assigned_to = UserSerializer(read_only=True)
     created_by = UserSerializer(read_only=True)
-    comments = TaskCommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
+    comments_total = serializers.SerializerMethodField()
     attachments = TaskAttachmentSerializer(many=True, read_only=True)
     
     class Meta:
@@ -53,9 +103,21 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'priority', 'status', 'due_date',
             'assigned_to', 'created_by', 'position', 'labels', 'created_at', 
-            'updated_at', 'comments', 'attachments'
+            'updated_at', 'comments', 'comments_total', 'attachments'
         ]
 
+    def get_comments(self, obj):
+        # Usa o prefetch limitado da view quando disponível
+        comments = getattr(obj, 'latest_comments', None)
+        if comments is None:
+            comments = obj.comments.select_related('user').order_by('-created_at', '-id')[:self.LATEST_COMMENTS]
+        return TaskCommentSerializer(comments, many=True).data
+
+    def get_comments_total(self, obj):
+        if hasattr(obj, 'comments_total'):
+            return obj.comments_total
+        return obj.comments.count()
+
 class TaskCreateUpdateSerializer(serializers.ModelSerializer):
     assigned_to_id = serializers.IntegerField(required=False, allow_null=True)
     
@@ -66,6 +128,11 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
             'assigned_to_id', 'labels'
         ]
 
+    def validate_labels(self, value):
+        if not isinstance(value, list) or not all(isinstance(label, str) for label in value):
+            raise serializers.ValidationError("Labels devem ser uma lista de textos")
+        return clean_labels(value)
+
     def validate_assigned_to_id(self, value):
         if value and not User.objects.filter(id=value).exists():
             raise serializers.ValidationError("Usuário não encontrado")
@@ -77,6 +144,45 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
             instance.assigned_to_id = assigned_to_id
         return super().update(instance, validated_data)
 
+class BulkTaskOperationSerializer(serializers.Serializer):
+    """Payload de POST /api/kanban/tasks/bulk/"""
+    MAX_TASKS = 2000
+
+    operation = serializers.ChoiceField(choices=OPERATIONS)
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, max_length=MAX_TASKS)
+    filter = serializers.DictField(required=False)
+    assigned_to_id = serializers.IntegerField(required=False, allow_null=True)
+    column_id = serializers.UUIDField(required=False)
+    labels = serializers.DictField(child=serializers.ListField(child=serializers.CharField()), required=False)
+
+    def validate_assigned_to_id(self, value):
+        if value and not User.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Usuário não encontrado")
+        return value
+
+    def validate_column_id(self, value):
+        if not Column.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Coluna não encontrada")
+        return value
+
+    def validate_labels(self, value):
+        unknown = set(value) - {'add', 'remove', 'set'}
+        if unknown:
+            raise serializers.ValidationError(f"Chaves inválidas: {', '.join(sorted(unknown))}")
+        return value
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError("Informe 'ids' ou 'filter'")
+        operation = attrs['operation']
+        if operation == 'assign' and 'assigned_to_id' not in attrs:
+            raise serializers.ValidationError({'assigned_to_id': "Obrigatório para 'assign'"})
+        if operation == 'move' and 'column_id' not in attrs:
+            raise serializers.ValidationError({'column_id': "Obrigatório para 'move'"})
+        if operation == 'relabel' and not attrs.get('labels'):
+            raise serializers.ValidationError({'labels': "Obrigatório para 'relabel'"})
+        return attrs
+
 class ColumnSerializer(serializers.ModelSerializer):
     tasks = TaskListSerializer(many=True, read_only=True)
     task_count = serializers.ReadOnlyField()
@@ -99,7 +205,7 @@ class BoardListSerializer(serializers.ModelSerializer):
         model = Board
         fields = [
             'id', 'name', 'description', 'created_by', 'created_at', 
-            'updated_at', 'position', 'columns_count', 'tasks_count'
+            'updated_at', 'position', 'is_template', 'columns_count', 'tasks_count'
         ]
 
     def get_columns_count(self, obj):
@@ -116,10 +222,27 @@ class BoardDetailSerializer(serializers.ModelSerializer):
         model = Board
         fields = [
             'id', 'name', 'description', 'created_by', 'created_at',
-            'updated_at', 'position', 'columns'
+            'updated_at', 'position', 'is_template', 'columns'
         ]
 
 class BoardCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Board
-        fields = ['name', 'description']
\ No newline at end of file
+        fields = ['name', 'description', 'is_template']
+
+class BoardCloneSerializer(serializers.Serializer):
+    """Payload de POST /api/kanban/boards/{id}/clone/"""
+    name = serializers.CharField(max_length=255, required=False)
+    include_tasks = serializers.BooleanField(default=False)
+    include_labels = serializers.BooleanField(default=True)
+    include_comments = serializers.BooleanField(default=False)
+    as_template = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        source = self.context['source']
+        attrs['name'] = (attrs.get('name') or f"{source.name} (cópia)").strip()
+        if Board.objects.filter(company=source.company, name=attrs['name']).exists():
+            raise serializers.ValidationError({'name': "Já existe um board com este nome"})
+        if attrs['include_comments'] and not attrs['include_tasks']:
+            raise serializers.ValidationError({'include_comments': "Requer include_tasks"})
+        return attrs
\ No newline at end of file
@@ -0,0 +1,192 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from apps.kanban.models import Board, Column, Task, TaskAttachment, TaskComment, TaskEvent
+from apps.kanban import events, labels, search, statistics, storage_gc
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Campos de Task que afetam as estatísticas do board e as labels normalizadas
+STATISTICS_FIELDS = {'is_active', 'column', 'column_id', 'priority', 'due_date'}
+TRACKED_FIELDS = STATISTICS_FIELDS | {'labels', 'assigned_to', 'assigned_to_id'}
+# Campos de Task que afetam o índice de busca textual
+SEARCH_FIELDS = {'title', 'description', 'is_active', 'column', 'column_id'}
+
+
+def _column_board_id(column_id):
+    return Column.objects.filter(pk=column_id).values_list('board_id', flat=True).first()
+
+
+@receiver(pre_save, sender=Task)
+def capture_task_previous_state(sender, instance, update_fields=None, **kwargs):
+    """
+    Guarda o estado anterior da task para calcular o delta das estatísticas
+    """
+    instance._previous_state = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not TRACKED_FIELDS.intersection(update_fields):
+        instance._previous_state = 'unchanged'
+        return
+
+    instance._previous_state = Task.objects.filter(pk=instance.pk).values(
+        'is_active', 'column_id', 'column__board_id', 'priority', 'due_date', 'labels', 'assigned_to_id'
+    ).first()
+
+
+@receiver(post_save, sender=Task)
+def update_board_statistics_on_save(sender, instance, created, **kwargs):
+    """
+    Atualiza incrementalmente as estatísticas do board e as labels normalizadas
+    quando uma task muda
+    """
+    previous = getattr(instance, '_previous_state', None)
+    if previous == 'unchanged':
+        return
+
+    added = statistics.task_contribution(
+        instance.is_active, instance.column_id, instance.priority, instance.due_date
+    )
+    if Task.column.is_cached(instance):
+        board_id = instance.column.board_id
+    elif previous and previous['column_id'] == instance.column_id:
+        board_id = previous['column__board_id']
+    else:
+        board_id = _column_board_id(instance.column_id)
+
+    try:
+        if not previous:
+            statistics.apply_task_delta(board_id, added=added)
+        else:
+            removed = statistics.task_contribution(
+                previous['is_active'], previous['column_id'], previous['priority'], previous['due_date']
+            )
+            if previous['column__board_id'] == board_id:
+                statistics.apply_task_delta(board_id, removed=removed, added=added)
+            else:
+                statistics.apply_task_delta(previous['column__board_id'], removed=removed)
+                statistics.apply_task_delta(board_id, added=added)
+    except Exception as e:
+        logger.error(f"Erro ao atualizar estatísticas do board {board_id}: {e}")
+        raise
+
+    if (
+        (previous is None and instance.labels)
+        or (previous and (previous['labels'] != instance.labels or previous['column__board_id'] != board_id))
+    ):
+        labels.sync_task_labels(instance, board_id)
+
+    events.record_many(_task_events(instance, previous, board_id))
+
+
+@receiver(post_save, sender=Task)
+def update_task_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Mantém o índice de busca textual da task atualizado
+    """
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    if Task.column.is_cached(instance):
+        board_id = instance.column.board_id
+    else:
+        board_id = _column_board_id(instance.column_id)
+    search.index_task(instance, board_id)
+
+
+def _task_events(task, previous, board_id):
+    """Eventos gerados pela mudança de uma task"""
+    now = timezone.now()
+    actor_id = getattr(task, '_event_actor_id', None)
+
+    def event(event_type, **data):
+        return TaskEvent(
+            board_id=board_id, task_id=task.pk, actor_id=actor_id,
+            event_type=event_type, data=data, created_at=now,
+        )
+
+    if previous is None:
+        actor_id = actor_id or task.created_by_id
+        return [event('created', column=str(task.column_id), title=task.title)]
+
+    changes = []
+    if previous['column_id'] != task.column_id:
+        changes.append(event('moved', from_column=str(previous['column_id']), to_column=str(task.column_id)))
+    if previous['assigned_to_id'] != task.assigned_to_id:
+        changes.append(event('assigned', **{'from': previous['assigned_to_id'], 'to': task.assigned_to_id}))
+    if previous['priority'] != task.priority:
+        changes.append(event('priority_changed', **{'from': previous['priority'], 'to': task.priority}))
+    if previous['is_active'] and not task.is_active:
+        changes.append(event('archived', column=str(task.column_id)))
+    return changes
+
+
+@receiver(post_delete, sender=Task)
+def update_board_statistics_on_delete(sender, instance, origin=None, **kwargs):
+    """
+    Remove a parcela da task das estatísticas do board.
+
+    Exclusões em cascata de colunas e boards são tratadas pelos handlers
+    desses modelos, que recalculam o board uma única vez.
+    """
+    if isinstance(origin, (Column, Board)):
+        return
+
+    search.remove_tasks([instance.pk])
+    board_id = _column_board_id(instance.column_id)
+    if board_id:
+        removed = statistics.task_contribution(
+            instance.is_active, instance.column_id, instance.priority, instance.due_date
+        )
+        statistics.apply_task_delta(board_id, removed=removed)
+
+
+@receiver(post_save, sender=TaskComment)
+def record_comment_event(sender, instance, created, **kwargs):
+    """
+    Registra o evento de comentário no log da task
+    """
+    if created:
+        board_id = Task.objects.filter(pk=instance.task_id).values_list('column__board_id', flat=True).first()
+        events.record(board_id, 'commented', instance.task_id, instance.user_id, comment=str(instance.pk))
+
+
+@receiver(post_delete, sender=TaskAttachment)
+def delete_attachment_file(sender, instance, **kwargs):
+    """
+    Remove o arquivo do storage após o commit, se nenhum outro anexo o usa
+    """
+    storage_gc.schedule_delete(storage_gc.KANBAN_ATTACHMENTS, [instance.firebase_path])
+
+
+@receiver(post_save, sender=Column)
+def update_board_statistics_on_column_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Atualiza nome e ordem das colunas nas estatísticas do board quando
+    colunas são criadas, renomeadas ou reposicionadas (sem recontar as tasks)
+    """
+    if update_fields is not None and not {'name', 'position'} & set(update_fields):
+        return
+    statistics.apply_column_changes(instance.board_id, instance.pk if created else None)
+
+
+@receiver(post_delete, sender=Column)
+def refresh_board_statistics_on_column_delete(sender, instance, origin=None, **kwargs):
+    """
+    Recalcula o board após a remoção de uma coluna (e de suas tasks).
+
+    Só age quando a própria coluna foi removida; em cascatas vindas do board
+    a linha de estatísticas é removida junto.
+    """
+    if not isinstance(origin, Column):
+        return
+    statistics.refresh_board_statistics(instance.board_id)
+    search.purge_deleted()
+
+
+@receiver(post_delete, sender=Board)
+def purge_board_search_index(sender, instance, **kwargs):
+    """
+    Remove do índice de busca as tasks excluídas junto com o board
+    """
+    search.purge_deleted()
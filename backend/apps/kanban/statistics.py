@@ -0,0 +1,271 @@
+"""
+Estatísticas pré-calculadas dos boards.
+
+As contagens ficam em uma linha de BoardStatistics por board e são mantidas
+de forma incremental pelos signals de Task (ver signals.py), de modo que o
+endpoint de estatísticas lê uma única linha em vez de agregar a tabela de tasks.
+
+Tasks atrasadas mudam com o passar do tempo sem nenhuma escrita no banco, então
+``overdue_tasks`` é sempre relativo a ``overdue_checked_at``: o valor armazenado
+é o número de tasks ativas com ``due_date < overdue_checked_at``. A varredura
+periódica (comando ``sweep_overdue_tasks``) e a leitura de linhas antigas
+avançam essa referência.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import BoardStatistics, Column, Task
+
+logger = logging.getLogger(__name__)
+
+# Idade máxima (segundos) da contagem de atrasadas antes de ser recalculada na leitura
+OVERDUE_TTL = getattr(settings, 'KANBAN_STATISTICS_OVERDUE_TTL', 300)
+
+
+def task_contribution(is_active, column_id, priority, due_date):
+    """Parcela de uma task nas estatísticas do board (None se não conta)"""
+    if not is_active:
+        return None
+    return (str(column_id), priority, due_date)
+
+
+def _empty_statistics(board_id, columns, now):
+    return BoardStatistics(
+        board_id=board_id,
+        total_tasks=0,
+        tasks_by_priority={},
+        tasks_by_column=[
+            {'id': str(column_id), 'name': name, 'task_count': 0}
+            for column_id, name in columns
+        ],
+        overdue_tasks=0,
+        overdue_checked_at=now,
+    )
+
+
+def compute_statistics(board_ids, now=None):
+    """
+    Recalcula as estatísticas dos boards a partir da tabela de tasks.
+
+    Usa duas queries independentemente do número de boards: uma para as colunas
+    e uma agregação agrupada por (board, coluna, prioridade).
+    """
+    now = now or timezone.now()
+    board_ids = list(board_ids)
+
+    columns = defaultdict(list)
+    for column_id, board_id, name in Column.objects.filter(
+        board_id__in=board_ids
+    ).order_by('position', 'created_at').values_list('id', 'board_id', 'name'):
+        columns[board_id].append((column_id, name))
+
+    results = {board_id: _empty_statistics(board_id, columns[board_id], now) for board_id in board_ids}
+    column_entries = {
+        board_id: {entry['id']: entry for entry in stats.tasks_by_column}
+        for board_id, stats in results.items()
+    }
+
+    rows = Task.objects.filter(
+        column__board_id__in=board_ids, is_active=True
+    ).values('column__board_id', 'column_id', 'priority').annotate(
+        count=Count('id'),
+        overdue=Count('id', filter=Q(due_date__lt=now)),
+    ).order_by()
+
+    for row in rows:
+        board_id = row['column__board_id']
+        stats = results[board_id]
+        stats.total_tasks += row['count']
+        stats.overdue_tasks += row['overdue']
+        stats.tasks_by_priority[row['priority']] = (
+            stats.tasks_by_priority.get(row['priority'], 0) + row['count']
+        )
+        column_entries[board_id][str(row['column_id'])]['task_count'] += row['count']
+
+    return results
+
+
+def compute_board_statistics(board_id, now=None):
+    """Recalcula as estatísticas de um único board (sem persistir)"""
+    return compute_statistics([board_id], now=now)[board_id]
+
+
+def refresh_board_statistics(board_id):
+    """Recalcula e grava as estatísticas de um board"""
+    return refresh_statistics([board_id]).get(board_id)
+
+
+def refresh_statistics(board_ids):
+    """Recalcula e grava as estatísticas de vários boards em lote"""
+    board_ids = set(board_ids)
+    if not board_ids:
+        return {}
+
+    from .models import Board
+    existing_boards = set(Board.objects.filter(id__in=board_ids).values_list('id', flat=True))
+    computed = compute_statistics(existing_boards)
+
+    with transaction.atomic():
+        stored = set(
+            BoardStatistics.objects.filter(board_id__in=existing_boards).values_list('board_id', flat=True)
+        )
+        to_create = [stats for board_id, stats in computed.items() if board_id not in stored]
+        to_update = [stats for board_id, stats in computed.items() if board_id in stored]
+        if to_create:
+            BoardStatistics.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_update:
+            BoardStatistics.objects.bulk_update(to_update, [
+                'total_tasks', 'tasks_by_priority', 'tasks_by_column',
+                'overdue_tasks', 'overdue_checked_at',
+            ])
+    return computed
+
+
+def apply_task_delta(board_id, removed=None, added=None):
+    """
+    Aplica a mudança de uma task nas estatísticas do board.
+
+    ``removed`` e ``added`` são parcelas retornadas por ``task_contribution``.
+    Se o board ainda não tem linha de estatísticas nada é feito: a linha será
+    calculada do zero na próxima leitura.
+    """
+    if removed == added:
+        return
+
+    with transaction.atomic():
+        stats = BoardStatistics.objects.select_for_update().filter(board_id=board_id).first()
+        if stats is None:
+            return
+
+        column_entries = {entry['id']: entry for entry in stats.tasks_by_column}
+        for contribution, sign in ((removed, -1), (added, 1)):
+            if contribution is None:
+                continue
+            column_id, priority, due_date = contribution
+            entry = column_entries.get(column_id)
+            if entry is None:
+                # Coluna desconhecida: a linha está defasada, recalcular tudo
+                transaction.on_commit(lambda: refresh_board_statistics(board_id))
+                return
+
+            stats.total_tasks += sign
+            entry['task_count'] += sign
+            priority_count = stats.tasks_by_priority.get(priority, 0) + sign
+            if priority_count:
+                stats.tasks_by_priority[priority] = priority_count
+            else:
+                stats.tasks_by_priority.pop(priority, None)
+            if due_date and stats.overdue_checked_at and due_date < stats.overdue_checked_at:
+                stats.overdue_tasks += sign
+
+        stats.save(update_fields=[
+            'total_tasks', 'tasks_by_priority', 'tasks_by_column', 'overdue_tasks', 'updated_at'
+        ])
+
+
+def apply_column_changes(board_id, created_column_id=None):
+    """
+    Atualiza nomes e ordem das colunas em ``tasks_by_column`` sem reagregar
+    as tasks (colunas criadas, renomeadas ou reposicionadas).
+
+    ``created_column_id`` é uma coluna recém-criada, que entra com zero
+    tasks. Qualquer outra coluna ausente da linha indica estatísticas
+    defasadas, e o board é recalculado por completo.
+    """
+    with transaction.atomic():
+        stats = BoardStatistics.objects.select_for_update().filter(board_id=board_id).first()
+        if stats is None:
+            return
+
+        entries = {entry['id']: entry for entry in stats.tasks_by_column}
+        tasks_by_column = []
+        for column_id, name in Column.objects.filter(board_id=board_id).order_by(
+            'position', 'created_at'
+        ).values_list('id', 'name'):
+            entry = entries.get(str(column_id))
+            if entry is None:
+                if column_id != created_column_id:
+                    transaction.on_commit(lambda: refresh_board_statistics(board_id))
+                    return
+                entry = {'id': str(column_id), 'task_count': 0}
+            tasks_by_column.append({'id': entry['id'], 'name': name, 'task_count': entry['task_count']})
+
+        if tasks_by_column != stats.tasks_by_column:
+            stats.tasks_by_column = tasks_by_column
+            stats.save(update_fields=['tasks_by_column', 'updated_at'])
+
+
+def sweep_overdue(board_ids=None, now=None):
+    """
+    Recalcula a contagem de tasks atrasadas e avança ``overdue_checked_at``.
+
+    Uma única agregação agrupada por board cobre todos os boards pedidos
+    (ou todos os que já têm estatísticas, se ``board_ids`` for None).
+    """
+    now = now or timezone.now()
+    queryset = BoardStatistics.objects.all()
+    if board_ids is not None:
+        queryset = queryset.filter(board_id__in=list(board_ids))
+
+    with transaction.atomic():
+        stats_rows = list(queryset.select_for_update())
+        if not stats_rows:
+            return 0
+
+        overdue = dict(
+            Task.objects.filter(
+                column__board_id__in=[stats.board_id for stats in stats_rows],
+                is_active=True,
+                due_date__lt=now,
+            ).values('column__board_id').annotate(count=Count('id')).order_by().values_list(
+                'column__board_id', 'count'
+            )
+        )
+        for stats in stats_rows:
+            stats.overdue_tasks = overdue.get(stats.board_id, 0)
+            stats.overdue_checked_at = now
+        BoardStatistics.objects.bulk_update(
+            stats_rows, ['overdue_tasks', 'overdue_checked_at'], batch_size=500
+        )
+
+    logger.info(f"Varredura de tasks atrasadas concluída para {len(stats_rows)} boards")
+    return len(stats_rows)
+
+
+def get_statistics(board_ids):
+    """
+    Retorna as estatísticas dos boards lendo BoardStatistics.
+
+    Linhas inexistentes são calculadas e gravadas em lote e contagens de
+    atrasadas mais antigas que ``OVERDUE_TTL`` são atualizadas em uma query.
+    """
+    board_ids = list(board_ids)
+    stats = {row.board_id: row for row in BoardStatistics.objects.filter(board_id__in=board_ids)}
+
+    missing = [board_id for board_id in board_ids if board_id not in stats]
+    if missing:
+        stats.update(refresh_statistics(missing))
+
+    stale_before = timezone.now() - timedelta(seconds=OVERDUE_TTL)
+    stale = [
+        board_id for board_id, row in stats.items()
+        if row.overdue_checked_at is None or row.overdue_checked_at < stale_before
+    ]
+    if stale:
+        sweep_overdue(stale)
+        stats.update({
+            row.board_id: row for row in BoardStatistics.objects.filter(board_id__in=stale)
+        })
+
+    return stats
+
+
+def get_board_statistics(board_id):
+    """Estatísticas de um único board"""
+    return get_statistics([board_id]).get(board_id)
@@ -0,0 +1,355 @@
+"""
+Acesso ao storage dos anexos e cache de URLs de download assinadas.
+
+Gerar uma URL assinada custa uma operação de assinatura por arquivo; como a
+URL continua válida até expirar, ela é guardada no cache (chave derivada do
+``firebase_path``) por um pouco menos que a validade da assinatura. Listas de
+anexos buscam todas as URLs com um ``get_many`` e assinam em lote só as que
+faltam.
+
+O backend é escolhido pela setting ``KANBAN_STORAGE_BACKEND``: ``firebase``
+(padrão), ``local`` (disco) ou ``memory``; os dois últimos permitem rodar sem
+rede. Uploads são lidos em blocos, deduplicados pelo SHA-256 do conteúdo e
+podem ser enviados em paralelo.
+"""
+import hashlib
+import io
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Validade (segundos) das URLs assinadas e folga para expirar o cache antes delas
+URL_EXPIRATION = getattr(settings, 'KANBAN_SIGNED_URL_EXPIRATION', 3600)
+URL_CACHE_MARGIN = getattr(settings, 'KANBAN_SIGNED_URL_CACHE_MARGIN', 300)
+# Tamanho dos blocos lidos/enviados nos uploads (múltiplo de 256 KB, exigido pelo upload resumable do GCS)
+CHUNK_SIZE = 1024 * 1024
+# Prefixo de todos os anexos do Kanban (inclui os caminhos antigos kanban/tasks/...)
+ATTACHMENTS_PREFIX = 'kanban/'
+
+
+def attachment_path(content_hash, filename):
+    """
+    Caminho no storage de um anexo, endereçado pelo conteúdo.
+
+    Arquivos iguais caem no mesmo caminho e são gravados uma única vez.
+    """
+    file_extension = os.path.splitext(filename)[1].lower()
+    return f"{ATTACHMENTS_PREFIX}attachments/{content_hash[:2]}/{content_hash}{file_extension}"
+
+
+def hash_file(fileobj, chunk_size=CHUNK_SIZE):
+    """
+    SHA-256 e tamanho do conteúdo, lendo em blocos.
+
+    Retorna ``(hash, tamanho, arquivo)``; o arquivo volta rebobinado. Streams
+    que não permitem ``seek`` são copiados para um arquivo temporário (em
+    memória só até ``chunk_size``) durante a leitura.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    seekable = getattr(fileobj, 'seekable', lambda: False)()
+    copy = None if seekable else tempfile.SpooledTemporaryFile(max_size=chunk_size)
+    for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+        digest.update(chunk)
+        size += len(chunk)
+        if copy is not None:
+            copy.write(chunk)
+    fileobj = fileobj if copy is None else copy
+    fileobj.seek(0)
+    return digest.hexdigest(), size, fileobj
+
+
+class StoredFile(namedtuple('StoredFile', ['path', 'size', 'updated_at'])):
+    """Arquivo listado pelo storage"""
+
+
+class BaseStorageService:
+    """
+    Interface dos backends de storage dos anexos.
+
+    Subclasses implementam ``save_file``, ``exists``, ``delete_file`` e
+    ``get_download_url``. Upload com deduplicação por hash de conteúdo,
+    envio paralelo e URLs em lote ficam aqui.
+    """
+    MAX_UPLOAD_WORKERS = getattr(settings, 'KANBAN_STORAGE_UPLOAD_WORKERS', 4)
+
+    def save_file(self, firebase_path, fileobj, content_type):
+        """Grava o conteúdo de ``fileobj`` (lido em blocos de CHUNK_SIZE) em ``firebase_path``"""
+        raise NotImplementedError
+
+    def exists(self, firebase_path):
+        raise NotImplementedError
+
+    def delete_file(self, firebase_path):
+        raise NotImplementedError
+
+    def list_files(self, prefix=ATTACHMENTS_PREFIX):
+        """Itera os arquivos (StoredFile) sob ``prefix``"""
+        raise NotImplementedError
+
+    def touch(self, firebase_path):
+        """Renova a data de alteração de um arquivo reaproveitado (ver storage_gc)"""
+
+    def updated_at(self, firebase_path):
+        """Data da última alteração (ou ``touch``) do arquivo; None se desconhecida ou inexistente"""
+        return None
+
+    def get_download_url(self, firebase_path, expiration=URL_EXPIRATION):
+        raise NotImplementedError
+
+    def get_download_urls(self, firebase_paths, expiration=URL_EXPIRATION):
+        """
+        Gera URLs de download para vários arquivos
+        """
+        return {path: self.get_download_url(path, expiration) for path in firebase_paths}
+
+    def upload_task_attachment(self, file_data, filename, task_id=None, user_id=None):
+        """
+        Envia um anexo (bytes ou arquivo) sem carregá-lo inteiro na memória.
+
+        Se o storage já tem um arquivo com o mesmo conteúdo, nada é enviado e
+        o caminho existente é reaproveitado (``deduplicated``).
+        """
+        fileobj = io.BytesIO(file_data) if isinstance(file_data, (bytes, bytearray)) else file_data
+        content_hash, file_size, fileobj = hash_file(fileobj)
+        firebase_path = attachment_path(content_hash, filename)
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        deduplicated = self.exists(firebase_path)
+        if deduplicated:
+            self.touch(firebase_path)
+        else:
+            self.save_file(firebase_path, fileobj, content_type)
+            logger.info(f"Arquivo {filename} enviado para o storage: {firebase_path}")
+
+        return {
+            'firebase_path': firebase_path,
+            'filename': filename,
+            'file_size': file_size,
+            'content_type': content_type,
+            'content_hash': content_hash,
+            'deduplicated': deduplicated,
+        }
+
+    def upload_task_attachments(self, files, task_id=None, user_id=None):
+        """
+        Envia vários anexos em paralelo.
+
+        ``files`` é uma lista de ``(arquivo, nome)``; o resultado segue a mesma ordem.
+        """
+        files = list(files)
+        if len(files) <= 1:
+            return [self.upload_task_attachment(fileobj, name, task_id, user_id) for fileobj, name in files]
+        with ThreadPoolExecutor(max_workers=min(self.MAX_UPLOAD_WORKERS, len(files))) as executor:
+            return list(executor.map(
+                lambda item: self.upload_task_attachment(item[0], item[1], task_id, user_id), files
+            ))
+
+
+class LocalStorageService(BaseStorageService):
+    """
+    Storage em disco local (desenvolvimento e testes).
+
+    Os arquivos ficam em ``KANBAN_LOCAL_STORAGE_ROOT`` e as URLs são
+    assinadas com HMAC da SECRET_KEY.
+    """
+
+    def __init__(self, root=None, base_url=None):
+        self.root = Path(root or getattr(settings, 'KANBAN_LOCAL_STORAGE_ROOT', settings.MEDIA_ROOT))
+        self.base_url = base_url or settings.MEDIA_URL
+
+    def _signature(self, firebase_path, expires):
+        return salted_hmac('kanban.storage', f'{firebase_path}:{expires}', algorithm='sha256').hexdigest()
+
+    def save_file(self, firebase_path, fileobj, content_type):
+        destination = self.root / firebase_path
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        # Grava em arquivo temporário e renomeia: leitores nunca veem um arquivo pela metade
+        with tempfile.NamedTemporaryFile(dir=destination.parent, delete=False) as temporary:
+            shutil.copyfileobj(fileobj, temporary, CHUNK_SIZE)
+        os.replace(temporary.name, destination)
+
+    def exists(self, firebase_path):
+        return (self.root / firebase_path).exists()
+
+    def touch(self, firebase_path):
+        os.utime(self.root / firebase_path)
+
+    def updated_at(self, firebase_path):
+        try:
+            return datetime.fromtimestamp((self.root / firebase_path).stat().st_mtime, tz=dt_timezone.utc)
+        except OSError:
+            return None
+
+    def list_files(self, prefix=ATTACHMENTS_PREFIX):
+        base = self.root / prefix
+        if not base.exists():
+            return
+        for path in base.rglob('*'):
+            if path.is_file():
+                stat = path.stat()
+                yield StoredFile(
+                    path.relative_to(self.root).as_posix(), stat.st_size,
+                    datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc),
+                )
+
+    def get_download_url(self, firebase_path, expiration=URL_EXPIRATION):
+        """
+        Gera URL de download assinada
+        """
+        expires = int(time.time()) + expiration
+        signature = self._signature(firebase_path, expires)
+        return f"{self.base_url}{quote(firebase_path)}?expires={expires}&signature={signature}"
+
+    def verify_signature(self, firebase_path, expires, signature):
+        """Confere uma URL gerada por ``get_download_url``"""
+        if int(expires) < time.time():
+            return False
+        return constant_time_compare(self._signature(firebase_path, int(expires)), signature)
+
+    def delete_file(self, firebase_path):
+        """
+        Remove arquivo do disco local
+        """
+        try:
+            (self.root / firebase_path).unlink()
+            invalidate_download_url(firebase_path)
+            logger.info(f"Arquivo removido do storage local: {firebase_path}")
+            return True
+        except OSError as e:
+            logger.error(f"Erro ao remover arquivo: {e}")
+            return False
+
+
+class InMemoryStorageService(BaseStorageService):
+    """Storage em memória do processo, para testes"""
+
+    def __init__(self):
+        self.files = {}
+        self._lock = threading.Lock()
+
+    def save_file(self, firebase_path, fileobj, content_type):
+        content = b''.join(iter(lambda: fileobj.read(CHUNK_SIZE), b''))
+        with self._lock:
+            self.files[firebase_path] = (content, content_type, timezone.now())
+
+    def exists(self, firebase_path):
+        return firebase_path in self.files
+
+    def touch(self, firebase_path):
+        with self._lock:
+            content, content_type, updated_at = self.files[firebase_path]
+            self.files[firebase_path] = (content, content_type, timezone.now())
+
+    def updated_at(self, firebase_path):
+        entry = self.files.get(firebase_path)
+        return entry[2] if entry else None
+
+    def list_files(self, prefix=ATTACHMENTS_PREFIX):
+        with self._lock:
+            items = list(self.files.items())
+        for path, (content, content_type, updated_at) in items:
+            if path.startswith(prefix):
+                yield StoredFile(path, len(content), updated_at)
+
+    def get_download_url(self, firebase_path, expiration=URL_EXPIRATION):
+        return f"memory://{quote(firebase_path)}?expires={int(time.time()) + expiration}"
+
+    def delete_file(self, firebase_path):
+        with self._lock:
+            removed = self.files.pop(firebase_path, None) is not None
+        invalidate_download_url(firebase_path)
+        return removed
+
+
+BACKENDS = {
+    'firebase': 'apps.kanban.firebase_storage.FirebaseStorageService',
+    'local': 'apps.kanban.storage.LocalStorageService',
+    'memory': 'apps.kanban.storage.InMemoryStorageService',
+}
+
+_services = {}
+
+
+def get_storage_service():
+    """
+    Instância do backend configurado em ``KANBAN_STORAGE_BACKEND``.
+
+    Aceita os nomes de ``BACKENDS`` ou o caminho pontuado de uma subclasse
+    de BaseStorageService.
+    """
+    backend = getattr(settings, 'KANBAN_STORAGE_BACKEND', 'firebase')
+    if backend not in _services:
+        try:
+            service_class = import_string(BACKENDS.get(backend, backend))
+        except ImportError as e:
+            raise ImproperlyConfigured(f"KANBAN_STORAGE_BACKEND inválido: {backend}") from e
+        _services[backend] = service_class()
+    return _services[backend]
+
+
+def _url_cache_key(firebase_path):
+    return 'kanban:signed-url:' + hashlib.sha1(firebase_path.encode()).hexdigest()
+
+
+def get_download_urls(firebase_paths, service=None):
+    """
+    URLs de download de vários arquivos, usando o cache sempre que possível.
+
+    Retorna ``{firebase_path: url}``; arquivos cuja URL não pôde ser gerada
+    ficam de fora.
+    """
+    paths = list(dict.fromkeys(path for path in firebase_paths if path))
+    if not paths:
+        return {}
+
+    keys = {_url_cache_key(path): path for path in paths}
+    urls = {keys[key]: url for key, url in cache.get_many(list(keys)).items()}
+    missing = [path for path in paths if path not in urls]
+    if not missing:
+        return urls
+
+    try:
+        service = service or get_storage_service()
+        generated = {
+            path: url for path, url in service.get_download_urls(missing, expiration=URL_EXPIRATION).items()
+            if url
+        }
+    except Exception as e:
+        logger.error(f"Erro ao gerar URLs de download: {e}")
+        return urls
+
+    cache.set_many(
+        {_url_cache_key(path): url for path, url in generated.items()},
+        timeout=max(URL_EXPIRATION - URL_CACHE_MARGIN, 0),
+    )
+    urls.update(generated)
+    return urls
+
+
+def get_download_url(firebase_path, service=None):
+    """URL de download de um arquivo, usando o cache"""
+    return get_download_urls([firebase_path], service=service).get(firebase_path)
+
+
+def invalidate_download_url(firebase_path):
+    """Remove a URL do cache (ex.: quando o arquivo é excluído)"""
+    cache.delete(_url_cache_key(firebase_path))
@@ -0,0 +1,251 @@
+"""
+Limpeza dos arquivos de anexos que não são mais referenciados no banco.
+
+- Imediata: quando um TaskAttachment ou ChatAttachment é removido, o arquivo
+  é agendado e, depois do commit, apagado em uma thread de fundo. Os caminhos
+  removidos na mesma transação são conferidos contra o banco com uma única
+  query, feita na thread de fundo logo antes de apagar; como os anexos do
+  Kanban são deduplicados por conteúdo, o arquivo só é apagado se nenhuma
+  outra linha ainda aponta para ele. Um upload do mesmo conteúdo entre o
+  agendamento e a remoção renova a data do arquivo (``touch``) antes de
+  gravar a linha, então arquivos alterados depois do agendamento são mantidos
+  (se ficarem órfãos, a varredura periódica os remove).
+- Periódica (comando ``collect_orphan_attachments``): percorre a listagem do
+  storage em lotes, confere cada lote com uma query e apaga os órfãos em
+  paralelo, limitado a ``rate`` remoções por segundo. Arquivos alterados há
+  menos de ``ORPHAN_MIN_AGE`` segundos são ignorados, o que protege uploads
+  cuja linha ainda não foi gravada (uploads deduplicados renovam a data do
+  arquivo existente). A idade é conferida de novo logo antes de cada remoção,
+  para cobrir um ``touch`` feito depois da listagem.
+"""
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TaskAttachment
+from .storage import ATTACHMENTS_PREFIX, StoredFile, get_storage_service
+
+logger = logging.getLogger(__name__)
+
+# Idade mínima (segundos) de um arquivo sem referência para ser removido pela varredura
+ORPHAN_MIN_AGE = getattr(settings, 'KANBAN_STORAGE_ORPHAN_MIN_AGE', 3600)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='storage-cleanup')
+_local = threading.local()
+
+
+class DjangoStorageAdapter:
+    """Expõe um storage do Django (FileField) com a interface usada pela limpeza"""
+
+    def __init__(self, storage=None):
+        self.storage = storage or default_storage
+
+    def list_files(self, prefix):
+        directories, files = self.storage.listdir(prefix) if self.storage.exists(prefix) else ([], [])
+        for name in files:
+            path = f"{prefix}{name}"
+            try:
+                updated_at = self.storage.get_modified_time(path)
+            except NotImplementedError:
+                updated_at = None
+            if updated_at is not None and timezone.is_naive(updated_at):
+                updated_at = timezone.make_aware(updated_at)
+            yield StoredFile(path, self.storage.size(path), updated_at)
+        for directory in directories:
+            yield from self.list_files(f"{prefix}{directory}/")
+
+    def updated_at(self, path):
+        try:
+            updated_at = self.storage.get_modified_time(path)
+        except (NotImplementedError, OSError):
+            return None
+        return timezone.make_aware(updated_at) if timezone.is_naive(updated_at) else updated_at
+
+    def delete_file(self, path):
+        try:
+            self.storage.delete(path)
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao remover arquivo {path}: {e}")
+            return False
+
+
+class AttachmentSource:
+    """Um conjunto de anexos: onde os arquivos ficam e quais caminhos o banco referencia"""
+
+    def __init__(self, name, prefix, get_storage, referenced):
+        self.name = name
+        self.prefix = prefix
+        self.get_storage = get_storage
+        self.referenced = referenced
+
+
+def _kanban_referenced(paths):
+    return set(TaskAttachment.objects.filter(firebase_path__in=paths).values_list('firebase_path', flat=True))
+
+
+def _chat_referenced(paths):
+    from apps.chat.models import ChatAttachment
+    return set(ChatAttachment.objects.filter(file__in=paths).values_list('file', flat=True))
+
+
+KANBAN_ATTACHMENTS = AttachmentSource('kanban', ATTACHMENTS_PREFIX, get_storage_service, _kanban_referenced)
+CHAT_ATTACHMENTS = AttachmentSource('chat', 'chat_attachments/', DjangoStorageAdapter, _chat_referenced)
+SOURCES = {source.name: source for source in (KANBAN_ATTACHMENTS, CHAT_ATTACHMENTS)}
+
+
+def _delete_files(source, paths, scheduled_at):
+    """Apaga os arquivos sem referência no banco e não reaproveitados desde ``scheduled_at``"""
+    storage = source.get_storage()
+    referenced = source.referenced(paths)
+    deleted = 0
+    for path in paths:
+        if path in referenced:
+            continue
+        updated_at = storage.updated_at(path)
+        if updated_at is not None and updated_at > scheduled_at:
+            continue
+        if storage.delete_file(path):
+            deleted += 1
+    logger.info(f"{deleted} arquivos de anexos ({source.name}) removidos do storage")
+
+
+def delete_unreferenced(source, paths):
+    """Apaga os arquivos de ``paths`` que nenhuma linha do banco referencia mais"""
+    paths = sorted(set(paths))
+    if not paths:
+        return
+    if getattr(settings, 'KANBAN_STORAGE_CLEANUP_ASYNC', True):
+        _executor.submit(_delete_files, source, paths, timezone.now())
+    else:
+        _delete_files(source, paths, timezone.now())
+
+
+class _CleanupBatch:
+    """Caminhos removidos na transação atual"""
+
+    def __init__(self, source):
+        self.source = source
+        self.paths = set()
+        self.flushed = False
+
+    def flush(self):
+        self.flushed = True
+        paths, self.paths = self.paths, set()
+        if paths:
+            try:
+                delete_unreferenced(self.source, paths)
+            except Exception as e:
+                logger.error(f"Erro ao limpar anexos ({self.source.name}): {e}")
+
+
+def schedule_delete(source, paths):
+    """Agenda a remoção dos arquivos para depois do commit da transação atual"""
+    paths = [path for path in paths if path]
+    if not paths:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        delete_unreferenced(source, paths)
+        return
+
+    batches = getattr(_local, 'batches', None)
+    if batches is None:
+        batches = _local.batches = {}
+    # Mesmo critério do log de eventos: só o callback de on_commit guarda o lote;
+    # depois do flush, ou se o rollback descartou o callback, um novo lote é iniciado
+    ref = batches.get(source.name)
+    batch = ref() if ref is not None else None
+    if batch is None or batch.flushed:
+        batch = _CleanupBatch(source)
+        batches[source.name] = weakref.ref(batch)
+        transaction.on_commit(batch.flush)
+    batch.paths.update(paths)
+
+
+class _RateLimiter:
+    """Limita as chamadas a ``rate`` por segundo, somando todas as threads"""
+
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(self.next_at, now) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def collect_orphans(source, dry_run=False, batch_size=500, workers=8, rate=None, min_age=None, sample_size=20):
+    """
+    Reconcilia a listagem do storage com o banco e remove os arquivos órfãos.
+
+    Só arquivos mais antigos que ``min_age`` são removidos, conferindo a idade
+    de novo logo antes da remoção. Retorna um relatório com arquivos varridos,
+    órfãos encontrados (e seus bytes), removidos, mantidos (renovados durante
+    a varredura), falhas e uma amostra dos caminhos órfãos. Com ``dry_run``
+    nada é removido.
+    """
+    min_age = ORPHAN_MIN_AGE if min_age is None else min_age
+    cutoff = timezone.now() - timedelta(seconds=min_age)
+    report = {
+        'source': source.name, 'dry_run': dry_run, 'scanned': 0, 'orphans': 0,
+        'orphan_bytes': 0, 'deleted': 0, 'kept': 0, 'failed': 0, 'sample': [],
+    }
+    storage = source.get_storage()
+    limiter = _RateLimiter(rate)
+
+    def delete(path):
+        # Um upload deduplicado renova o arquivo (touch) antes de gravar a linha
+        # que o referencia: se isso aconteceu depois da listagem, ele é mantido
+        updated_at = storage.updated_at(path)
+        if updated_at is not None and updated_at >= cutoff:
+            return None
+        limiter.wait()
+        return storage.delete_file(path)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch in _batched(storage.list_files(source.prefix), batch_size):
+            report['scanned'] += len(batch)
+            candidates = [
+                stored for stored in batch
+                if stored.updated_at is None or stored.updated_at < cutoff
+            ]
+            if not candidates:
+                continue
+            referenced = source.referenced([stored.path for stored in candidates])
+            orphans = [stored for stored in candidates if stored.path not in referenced]
+            report['orphans'] += len(orphans)
+            report['orphan_bytes'] += sum(stored.size or 0 for stored in orphans)
+            report['sample'].extend(stored.path for stored in orphans[:sample_size - len(report['sample'])])
+            if dry_run or not orphans:
+                continue
+            for deleted in executor.map(delete, [stored.path for stored in orphans]):
+                report['kept' if deleted is None else 'deleted' if deleted else 'failed'] += 1
+
+    logger.info(
+        f"Varredura de anexos ({source.name}): {report['scanned']} arquivos, "
+        f"{report['orphans']} órfãos, {report['deleted']} removidos"
+    )
+    return report
@@ -0,0 +1,3 @@
+"""
+Testes para o módulo Kanban do CRM System.
+"""
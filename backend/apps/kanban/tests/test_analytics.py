@@ -0,0 +1,185 @@
+"""
+Testes para as analytics de fluxo.
+
+Cobre:
+- Percentis (interpolação linear) e média
+- Construção incremental dos snapshots diários a partir dos eventos
+- CFD de 12 meses com número fixo de queries e cache
+- Lead time, cycle time e tempo por coluna
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban import analytics
+from apps.kanban.models import Board, Column, ColumnDailySnapshot, Task, TaskEvent
+
+
+class FlowAnalyticsTestMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='analytics', password='testpass123')
+        self.company = Company.objects.create(name='Analytics Company')
+        self.board = Board.objects.create(name='Vendas', company=self.company, created_by=self.user)
+        self.todo = Column.objects.create(board=self.board, name='A Fazer', position=0)
+        self.doing = Column.objects.create(board=self.board, name='Em Progresso', position=1)
+        self.done = Column.objects.create(board=self.board, name='Concluído', position=2)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.localdate()
+
+    def at(self, days_ago, hour=12):
+        day = self.today - timedelta(days=days_ago)
+        return timezone.make_aware(timezone.datetime(day.year, day.month, day.day, hour))
+
+    def event(self, task, event_type, when, **data):
+        return TaskEvent(board=self.board, task_id=task.id, event_type=event_type, data=data, created_at=when)
+
+
+class PercentilesTest(TestCase):
+    """Testes para o cálculo de percentis."""
+
+    def test_empty_values(self):
+        """Sem valores, os percentis são nulos."""
+        self.assertEqual(
+            analytics.percentiles([]), {'count': 0, 'average': None, 'p50': None, 'p85': None, 'p95': None}
+        )
+
+    def test_linear_interpolation(self):
+        """Os percentis interpolam linearmente entre os valores ordenados."""
+        result = analytics.percentiles([10, 1, 4, 7])
+        self.assertEqual(result['count'], 4)
+        self.assertEqual(result['average'], 5.5)
+        self.assertEqual(result['p50'], 5.5)
+        self.assertEqual(result['p85'], 8.65)
+        self.assertEqual(result['p95'], 9.55)
+
+
+class ColumnSnapshotTest(FlowAnalyticsTestMixin, TestCase):
+    """Testes para a construção dos snapshots diários."""
+
+    def test_first_build_uses_current_counts(self):
+        """Sem histórico, só o dia corrente é gravado com as contagens atuais."""
+        Task.objects.create(title='A', column=self.todo, created_by=self.user)
+        Task.objects.create(title='B', column=self.doing, created_by=self.user)
+
+        self.assertEqual(analytics.build_board_snapshots(self.board.id, today=self.today), 3)
+
+        counts = dict(ColumnDailySnapshot.objects.filter(date=self.today).values_list('column_id', 'task_count'))
+        self.assertEqual(counts, {self.todo.id: 1, self.doing.id: 1, self.done.id: 0})
+
+    def test_incremental_build_applies_daily_deltas(self):
+        """Os dias entre o último snapshot e hoje são derivados dos eventos."""
+        ColumnDailySnapshot.objects.bulk_create([
+            ColumnDailySnapshot(board=self.board, column=column, date=self.today - timedelta(days=3), task_count=2)
+            for column in (self.todo, self.doing, self.done)
+        ])
+        task = Task.objects.create(title='A', column=self.todo, created_by=self.user)
+        TaskEvent.objects.bulk_create([
+            self.event(task, 'created', self.at(2), column=str(self.todo.id)),
+            self.event(task, 'moved', self.at(1), from_column=str(self.todo.id), to_column=str(self.doing.id)),
+            self.event(task, 'archived', self.at(1, hour=18), column=str(self.doing.id)),
+        ])
+
+        analytics.build_board_snapshots(self.board.id, today=self.today)
+
+        rows = {
+            (row.column_id, (self.today - row.date).days): row
+            for row in ColumnDailySnapshot.objects.filter(board=self.board)
+        }
+        self.assertEqual(rows[(self.todo.id, 2)].task_count, 3)
+        self.assertEqual(rows[(self.todo.id, 2)].entered, 1)
+        self.assertEqual(rows[(self.todo.id, 1)].task_count, 2)
+        self.assertEqual(rows[(self.todo.id, 1)].exited, 1)
+        self.assertEqual(rows[(self.doing.id, 1)].task_count, 2)
+        self.assertEqual(rows[(self.doing.id, 1)].entered, 1)
+        self.assertEqual(rows[(self.doing.id, 1)].exited, 1)
+        # O dia corrente usa as contagens reais do board
+        self.assertEqual(rows[(self.todo.id, 0)].task_count, 1)
+        self.assertEqual(rows[(self.doing.id, 0)].task_count, 0)
+
+    def test_rebuild_is_idempotent(self):
+        """Rodar o comando de novo no mesmo dia regrava apenas o dia corrente."""
+        analytics.build_board_snapshots(self.board.id, today=self.today)
+        analytics.build_board_snapshots(self.board.id, today=self.today)
+        self.assertEqual(ColumnDailySnapshot.objects.filter(board=self.board).count(), 3)
+
+
+class CumulativeFlowTest(FlowAnalyticsTestMixin, TestCase):
+    """Testes para o endpoint de CFD."""
+
+    def setUp(self):
+        super().setUp()
+        ColumnDailySnapshot.objects.bulk_create([
+            ColumnDailySnapshot(
+                board=self.board, column=column, date=self.today - timedelta(days=days_ago),
+                task_count=index + days_ago % 7,
+            )
+            for days_ago in range(0, 365, 2)
+            for index, column in enumerate((self.todo, self.doing, self.done))
+        ])
+
+    def test_twelve_month_cfd(self):
+        """O CFD tem uma série por coluna e preenche os dias sem snapshot."""
+        url = f'/api/kanban/boards/{self.board.id}/cfd/'
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['dates']), 365)
+        self.assertEqual([column['name'] for column in response.data['columns']], ['A Fazer', 'Em Progresso', 'Concluído'])
+        todo = response.data['columns'][0]['counts']
+        self.assertEqual(len(todo), 365)
+        self.assertEqual(todo[-1], 0)
+        self.assertEqual(todo[-2], todo[-3])
+
+    def test_cfd_is_cached_until_next_build(self):
+        """Leituras repetidas vêm do cache; um novo build invalida o cache."""
+        url = f'/api/kanban/boards/{self.board.id}/cfd/'
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        Task.objects.create(title='Novo', column=self.done, created_by=self.user)
+        analytics.build_board_snapshots(self.board.id)
+        response = self.client.get(url)
+        self.assertEqual(response.data['columns'][2]['counts'][-1], 1)
+
+
+class FlowReportTest(FlowAnalyticsTestMixin, TestCase):
+    """Testes para os percentis de lead time, cycle time e tempo por coluna."""
+
+    def test_flow_report(self):
+        """Cada permanência encerrada entra no percentil da coluna."""
+        for hours_in_todo in (2, 4, 6):
+            task = Task.objects.create(title='Deal', column=self.done, created_by=self.user)
+            created = self.at(5)
+            TaskEvent.objects.bulk_create([
+                self.event(task, 'created', created, column=str(self.todo.id)),
+                self.event(
+                    task, 'moved', created + timedelta(hours=hours_in_todo),
+                    from_column=str(self.todo.id), to_column=str(self.doing.id),
+                ),
+                self.event(
+                    task, 'moved', created + timedelta(hours=hours_in_todo + 10),
+                    from_column=str(self.doing.id), to_column=str(self.done.id),
+                ),
+            ])
+
+        response = self.client.get(f'/api/kanban/boards/{self.board.id}/flow/?days=30')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['lead_time_hours']['count'], 3)
+        self.assertEqual(response.data['lead_time_hours']['p50'], 14.0)
+        self.assertEqual(response.data['cycle_time_hours']['p50'], 10.0)
+        per_column = {entry['name']: entry for entry in response.data['time_in_column_hours']}
+        self.assertEqual(per_column['A Fazer']['p50'], 4.0)
+        self.assertEqual(per_column['Em Progresso']['average'], 10.0)
+        self.assertEqual(per_column['Concluído']['count'], 0)
@@ -0,0 +1,131 @@
+"""
+Testes para as operações em lote sobre tasks.
+
+Cobre:
+- Seleção por lista de IDs e por filtro
+- Atribuir, mover (com limite WIP), arquivar e alterar labels
+- Estatísticas e labels normalizadas após statements set-based
+"""
+
+import uuid
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban import statistics
+from apps.kanban.models import Board, BoardStatistics, Column, Task, TaskLabel
+
+
+class BulkTaskOperationTest(TestCase):
+    """Testes para POST /api/kanban/tasks/bulk/."""
+
+    url = '/api/kanban/tasks/bulk/'
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='testpass123')
+        self.leaving = User.objects.create_user(username='leaving', password='testpass123')
+        self.company = Company.objects.create(name='Bulk Company')
+        self.board = Board.objects.create(name='Vendas', company=self.company, created_by=self.manager)
+        self.todo = Column.objects.create(board=self.board, name='A Fazer', position=0)
+        self.doing = Column.objects.create(board=self.board, name='Em Progresso', position=1, max_tasks=3)
+        statistics.refresh_board_statistics(self.board.id)
+        self.tasks = [
+            Task.objects.create(
+                column=self.todo, created_by=self.manager, title=f'T{i}', position=i,
+                assigned_to=self.leaving, labels=['vip'] if i % 2 else [],
+            )
+            for i in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def post(self, payload):
+        return self.client.post(self.url, payload, format='json')
+
+    def assertStatisticsMatch(self):
+        stored = BoardStatistics.objects.get(board=self.board)
+        expected = statistics.compute_board_statistics(self.board.id, now=stored.overdue_checked_at)
+        self.assertEqual(stored.as_dict(), expected.as_dict())
+
+    def test_reassign_by_filter(self):
+        """Reatribui todas as tasks de um usuário via filtro."""
+        response = self.post({
+            'operation': 'assign',
+            'filter': {'assigned_to': self.leaving.id},
+            'assigned_to_id': self.manager.id,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 5)
+        self.assertEqual(Task.objects.filter(assigned_to=self.manager).count(), 5)
+
+    def test_move_respects_wip_limit(self):
+        """Mover além do limite da coluna rejeita o excedente."""
+        response = self.post({
+            'operation': 'move',
+            'ids': [str(task.id) for task in self.tasks],
+            'column_id': str(self.doing.id),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        statuses = [entry['status'] for entry in response.data['results']]
+        self.assertEqual(statuses, ['updated'] * 3 + ['rejected'] * 2)
+        self.assertIn('limite', response.data['results'][-1]['error'])
+        self.assertEqual(
+            list(self.doing.tasks.order_by('position').values_list('position', flat=True)), [0, 1, 2]
+        )
+        self.assertStatisticsMatch()
+
+    def test_move_to_other_board_is_rejected(self):
+        """Tasks de outro board não são movidas."""
+        other = Board.objects.create(name='Outro', company=self.company, created_by=self.manager)
+        column = Column.objects.create(board=other, name='A Fazer')
+
+        response = self.post({
+            'operation': 'move', 'ids': [str(self.tasks[0].id)], 'column_id': str(column.id),
+        })
+        self.assertEqual(response.data['results'][0]['status'], 'rejected')
+        self.assertEqual(Task.objects.get(id=self.tasks[0].id).column, self.todo)
+
+    def test_archive_reports_missing_ids(self):
+        """Arquivar informa IDs inexistentes como not_found."""
+        missing = str(uuid.uuid4())
+        response = self.post({
+            'operation': 'archive', 'ids': [str(self.tasks[0].id), missing],
+        })
+
+        results = {entry['id']: entry['status'] for entry in response.data['results']}
+        self.assertEqual(results, {str(self.tasks[0].id): 'updated', missing: 'not_found'})
+        self.assertEqual(response.data['matched'], 1)
+        self.assertFalse(Task.objects.get(id=self.tasks[0].id).is_active)
+        self.assertStatisticsMatch()
+
+    def test_relabel_updates_task_labels(self):
+        """Adicionar e remover labels atualiza o JSON e TaskLabel."""
+        response = self.post({
+            'operation': 'relabel',
+            'ids': [str(task.id) for task in self.tasks[:2]],
+            'labels': {'add': ['Renovação'], 'remove': ['VIP']},
+        })
+
+        self.assertEqual(response.data['updated'], 2)
+        for task in self.tasks[:2]:
+            task.refresh_from_db()
+            self.assertEqual(task.labels, ['Renovação'])
+            self.assertEqual(
+                list(TaskLabel.objects.filter(task=task).values_list('slug', flat=True)), ['renovação']
+            )
+
+    def test_query_count_is_independent_of_task_count(self):
+        """O número de queries não cresce com o número de tasks."""
+        ids = [str(task.id) for task in self.tasks]
+        # contagem, savepoint, seleção, update, release
+        with self.assertNumQueries(5):
+            self.post({'operation': 'assign', 'ids': ids, 'assigned_to_id': None})
+
+    def test_requires_ids_or_filter(self):
+        """Payload sem ids e sem filter é inválido."""
+        response = self.post({'operation': 'archive'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,148 @@
+"""
+Testes para modelos de pipeline e clonagem de boards.
+
+Cobre:
+- Colunas padrão criadas em lote
+- Clonagem de colunas, tasks, labels e comentários
+- Eventos de criação das tasks copiadas e datas originais dos comentários
+- Número de queries constante em relação ao tamanho do board
+- Listagem e instanciação de modelos
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban import statistics
+from apps.kanban.cloning import clone_board
+from apps.kanban.models import Board, BoardStatistics, Column, Task, TaskComment, TaskEvent, TaskLabel
+
+
+class BoardCloningTest(TestCase):
+    """Testes para clone_board e os endpoints de modelos."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='cloner', password='testpass123')
+        self.company = Company.objects.create(name='Clone Company')
+        self.source = Board.objects.create(name='Vendas', company=self.company, created_by=self.user)
+        self.columns = [
+            Column.objects.create(board=self.source, name=name, position=position, max_tasks=10)
+            for position, name in enumerate(['Lead', 'Proposta', 'Fechado'])
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def add_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                column=self.columns[i % 3], created_by=self.user, title=f'Deal {i}',
+                position=i, labels=['vip'],
+            )
+            TaskComment.objects.create(task=task, user=self.user, content='Primeiro contato')
+
+    def test_create_board_uses_default_columns(self):
+        """Criar um board via API cria as três colunas padrão."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/kanban/boards/', {'name': 'Novo'}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        board = Board.objects.get(name='Novo')
+        self.assertEqual(
+            list(board.columns.values_list('name', flat=True)), ['A Fazer', 'Em Progresso', 'Concluído']
+        )
+        column_inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "kanban_column"')]
+        self.assertEqual(len(column_inserts), 1)
+
+    def test_clone_copies_everything(self):
+        """Clonar com tasks copia colunas, tasks, labels e comentários."""
+        self.add_tasks(6)
+        Task.objects.create(column=self.columns[0], created_by=self.user, title='Arquivada', is_active=False)
+
+        board = clone_board(
+            self.source, 'Vendas 2026', self.user, include_tasks=True, include_comments=True
+        )
+
+        self.assertEqual(
+            list(board.columns.values_list('name', 'max_tasks')),
+            [('Lead', 10), ('Proposta', 10), ('Fechado', 10)],
+        )
+        cloned = Task.objects.filter(column__board=board)
+        self.assertEqual(cloned.count(), 6)
+        self.assertEqual(TaskLabel.objects.filter(board=board).count(), 6)
+        self.assertEqual(TaskComment.objects.filter(task__column__board=board).count(), 6)
+        self.assertEqual(Task.objects.filter(column__board=self.source).count(), 7)
+
+        stored = BoardStatistics.objects.get(board=board)
+        self.assertEqual(stored.total_tasks, 6)
+        expected = statistics.compute_board_statistics(board.id, now=stored.overdue_checked_at)
+        self.assertEqual(stored.as_dict(), expected.as_dict())
+
+    def test_clone_records_created_events_and_keeps_comment_dates(self):
+        """As tasks copiadas ganham o evento 'created' e os comentários mantêm a data original."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_tasks(3)
+        commented_at = timezone.now() - timedelta(days=10)
+        TaskComment.objects.update(created_at=commented_at)
+        other = User.objects.create_user(username='copia', password='testpass123')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            board = clone_board(self.source, 'Vendas 2026', other, include_tasks=True, include_comments=True)
+
+        created = TaskEvent.objects.filter(board=board, event_type='created')
+        self.assertEqual(
+            sorted((event.task_id, event.actor_id, event.data['title']) for event in created),
+            sorted((task.id, other.id, task.title) for task in Task.objects.filter(column__board=board)),
+        )
+        self.assertEqual(
+            set(TaskComment.objects.filter(task__column__board=board).values_list('created_at', flat=True)),
+            {commented_at},
+        )
+
+    def test_clone_query_count_is_constant(self):
+        """O número de queries não depende do número de tasks."""
+        self.add_tasks(10)
+        with CaptureQueriesContext(connection) as small:
+            clone_board(self.source, 'Copia 1', self.user, include_tasks=True, include_comments=True)
+
+        self.add_tasks(40)
+        with CaptureQueriesContext(connection) as large:
+            clone_board(self.source, 'Copia 2', self.user, include_tasks=True, include_comments=True)
+
+        self.assertEqual(len(small), len(large))
+
+    def test_templates_flow(self):
+        """Modelos não aparecem na listagem normal e podem ser instanciados."""
+        self.add_tasks(3)
+        response = self.client.post(
+            f'/api/kanban/boards/{self.source.id}/clone/',
+            {'name': 'Modelo Vendas', 'as_template': True},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        template_id = response.data['id']
+
+        names = [item['name'] for item in self.client.get('/api/kanban/boards/').data['results']]
+        self.assertNotIn('Modelo Vendas', names)
+        templates = self.client.get('/api/kanban/boards/templates/').data
+        self.assertEqual([item['name'] for item in templates], ['Modelo Vendas'])
+
+        response = self.client.post(
+            f'/api/kanban/boards/{template_id}/clone/', {'name': 'Vendas Sul'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data['is_template'])
+        self.assertEqual(len(response.data['columns']), 3)
+        self.assertEqual(Task.objects.filter(column__board_id=response.data['id']).count(), 0)
+
+    def test_clone_with_duplicate_name(self):
+        """Nome já usado na empresa retorna 400."""
+        response = self.client.post(
+            f'/api/kanban/boards/{self.source.id}/clone/', {'name': 'Vendas'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,81 @@
+"""
+Testes para os comentários das tasks.
+
+Cobre:
+- Listagem de comentários paginada por cursor
+- Detalhe da task com os comentários mais recentes e o total
+- Listagem de tasks sem carregar comentários
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban.models import Board, Column, Task, TaskComment
+from apps.kanban.serializers import TaskDetailSerializer
+
+
+class TaskCommentThreadTest(TestCase):
+    """Testes para a leitura de comentários."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='comments', password='testpass123')
+        company = Company.objects.create(name='Comments Company')
+        self.board = Board.objects.create(name='Vendas', company=company, created_by=self.user)
+        self.column = Column.objects.create(board=self.board, name='A Fazer', position=0)
+        self.task = Task.objects.create(title='Deal quente', column=self.column, created_by=self.user)
+        comments = TaskComment.objects.bulk_create([
+            TaskComment(task=self.task, user=self.user, content=f'Comentário {index}')
+            for index in range(25)
+        ])
+        # Datas distintas para uma ordem determinística
+        now = timezone.now()
+        for index, comment in enumerate(comments):
+            comment.created_at = now - timedelta(minutes=25 - index)
+        TaskComment.objects.bulk_update(comments, ['created_at'])
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.task_url = f'/api/kanban/boards/{self.board.id}/columns/{self.column.id}/tasks/'
+
+    def test_comments_are_cursor_paginated(self):
+        """Os comentários vêm do mais recente para o mais antigo, página a página."""
+        url = f'{self.task_url}{self.task.id}/comments/?page_size=10'
+        contents = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            contents.extend(item['content'] for item in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(contents, [f'Comentário {index}' for index in range(24, -1, -1)])
+
+    def test_detail_includes_latest_comments_and_total(self):
+        """O detalhe traz só os comentários mais recentes e o total."""
+        response = self.client.get(f'{self.task_url}{self.task.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['comments_total'], 25)
+        self.assertEqual(len(response.data['comments']), TaskDetailSerializer.LATEST_COMMENTS)
+        self.assertEqual(response.data['comments'][0]['content'], 'Comentário 24')
+
+    def test_task_list_does_not_load_comments(self):
+        """A lista de tasks usa contagens anotadas e não lê a tabela de comentários diretamente."""
+        Task.objects.create(title='Outro deal', column=self.column, created_by=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.task_url)
+
+        self.assertEqual(response.status_code, 200)
+        counts = {item['title']: item['comments_count'] for item in response.data['results']}
+        self.assertEqual(counts, {'Deal quente': 25, 'Outro deal': 0})
+        comment_loads = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].lstrip().upper().startswith('SELECT') and '"kanban_taskcomment"."content"' in query['sql']
+        ]
+        self.assertEqual(comment_loads, [])
@@ -0,0 +1,191 @@
+"""
+Testes para o log de eventos das tasks.
+
+Cobre:
+- Eventos gerados por criação, movimentação, atribuição, prioridade,
+  arquivamento e comentários
+- Gravação em lote após o commit e descarte em rollback
+- Imutabilidade (append-only)
+- Feed do board, timeline da task e métricas de fluxo
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban import events
+from apps.kanban.models import Board, Column, Task, TaskComment, TaskEvent
+
+
+class TaskEventTestMixin:
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='events', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.company = Company.objects.create(name='Events Company')
+        self.board = Board.objects.create(name='Vendas', company=self.company, created_by=self.user)
+        self.todo = Column.objects.create(board=self.board, name='A Fazer', position=0)
+        self.doing = Column.objects.create(board=self.board, name='Em Progresso', position=1)
+        self.done = Column.objects.create(board=self.board, name='Concluído', position=2)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_task(self, **kwargs):
+        kwargs.setdefault('title', 'Deal')
+        kwargs.setdefault('column', self.todo)
+        return Task.objects.create(created_by=self.user, **kwargs)
+
+
+class TaskEventRecordingTest(TaskEventTestMixin, TestCase):
+    """Testes para a gravação dos eventos."""
+
+    def test_task_lifecycle_events(self):
+        """Cada tipo de mudança gera o evento correspondente."""
+        with self.captureOnCommitCallbacks(execute=True):
+            task = self.create_task()
+            task.column = self.doing
+            task.assigned_to = self.other
+            task.priority = 'urgent'
+            task.save()
+            TaskComment.objects.create(task=task, user=self.other, content='Ligar amanhã')
+            task.is_active = False
+            task.save()
+
+        event_types = list(TaskEvent.objects.filter(task=task).order_by('id').values_list('event_type', flat=True))
+        self.assertEqual(
+            event_types, ['created', 'moved', 'assigned', 'priority_changed', 'commented', 'archived']
+        )
+        moved = TaskEvent.objects.get(task=task, event_type='moved')
+        self.assertEqual(moved.data, {'from_column': str(self.todo.id), 'to_column': str(self.doing.id)})
+
+    def test_events_are_written_in_one_batch(self):
+        """Vários eventos da mesma transação viram um único INSERT."""
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(5):
+                    self.create_task(title=f'Deal {i}')
+
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "kanban_taskevent"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(TaskEvent.objects.count(), 5)
+
+    def test_rollback_discards_events(self):
+        """Eventos de um savepoint desfeito não são gravados."""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.create_task(title='Desfeita')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.create_task(title='Mantida')
+
+        self.assertEqual(
+            list(TaskEvent.objects.values_list('data__title', flat=True)), ['Mantida']
+        )
+
+    def test_flush_starts_a_new_batch(self):
+        """Depois do flush, os eventos seguintes vão para um novo lote."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_task(title='Primeira')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_task(title='Segunda')
+
+        self.assertEqual(
+            sorted(TaskEvent.objects.values_list('data__title', flat=True)), ['Primeira', 'Segunda']
+        )
+
+    def test_events_are_append_only(self):
+        """Eventos gravados não podem ser alterados nem removidos."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_task()
+        event = TaskEvent.objects.get()
+
+        with self.assertRaises(ValueError):
+            event.save()
+        with self.assertRaises(ValueError):
+            event.delete()
+
+    def test_bulk_operations_record_events(self):
+        """Operações em lote registram eventos com o autor da requisição."""
+        with self.captureOnCommitCallbacks(execute=True):
+            tasks = [self.create_task(title=f'Deal {i}') for i in range(3)]
+            self.client.post('/api/kanban/tasks/bulk/', {
+                'operation': 'move', 'ids': [str(task.id) for task in tasks],
+                'column_id': str(self.doing.id),
+            }, format='json')
+
+        moved = TaskEvent.objects.filter(event_type='moved')
+        self.assertEqual(moved.count(), 3)
+        self.assertEqual(set(moved.values_list('actor_id', flat=True)), {self.user.id})
+
+
+class TaskEventFeedTest(TaskEventTestMixin, TestCase):
+    """Testes para os feeds e as métricas."""
+
+    def test_activity_feed_pages_with_cursor(self):
+        """O feed do board pagina por cursor sem repetir eventos."""
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(7):
+                self.create_task(title=f'Deal {i}')
+
+        url = f'/api/kanban/boards/{self.board.id}/activity/'
+        seen = []
+        response = self.client.get(url, {'page_size': 3})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_task_timeline(self):
+        """A timeline traz apenas os eventos da task."""
+        with self.captureOnCommitCallbacks(execute=True):
+            task = self.create_task()
+            self.create_task(title='Outra')
+            response = self.client.patch(
+                f'/api/kanban/boards/{self.board.id}/columns/{self.todo.id}/tasks/{task.id}/move/',
+                {'column_id': str(self.doing.id)}, format='json',
+            )
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(
+            f'/api/kanban/boards/{self.board.id}/columns/{self.doing.id}/tasks/{task.id}/timeline/'
+        )
+        self.assertEqual(
+            [item['event_type'] for item in response.data['results']], ['moved', 'created']
+        )
+        self.assertEqual(response.data['results'][0]['actor']['id'], self.user.id)
+
+    def test_flow_metrics_from_events(self):
+        """Vazão e cycle time são calculados a partir dos eventos."""
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            task_ids = [self.create_task(title=f'Deal {i}').id for i in range(2)]
+            events.record_many([
+                TaskEvent(board=self.board, task_id=task_ids[0], event_type='moved',
+                          data={'from_column': str(self.todo.id), 'to_column': str(self.doing.id)},
+                          created_at=now - timedelta(hours=10)),
+                TaskEvent(board=self.board, task_id=task_ids[0], event_type='moved',
+                          data={'from_column': str(self.doing.id), 'to_column': str(self.done.id)},
+                          created_at=now - timedelta(hours=4)),
+                TaskEvent(board=self.board, task_id=task_ids[1], event_type='created',
+                          data={}, created_at=now - timedelta(hours=3)),
+                TaskEvent(board=self.board, task_id=task_ids[1], event_type='archived',
+                          data={}, created_at=now - timedelta(hours=1)),
+            ])
+
+        response = self.client.get(f'/api/kanban/boards/{self.board.id}/metrics/', {'days': 7})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(day['count'] for day in response.data['throughput']), 2)
+        self.assertEqual(response.data['cycle_time']['count'], 2)
+        self.assertEqual(response.data['cycle_time']['median_hours'], 4.0)
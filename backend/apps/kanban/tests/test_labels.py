@@ -0,0 +1,101 @@
+"""
+Testes para as labels normalizadas de tasks.
+
+Cobre:
+- Sincronização de Task.labels com TaskLabel
+- Filtro por múltiplas labels (todas / qualquer)
+- Autocomplete e contagem de uso por board
+"""
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban.models import Board, Column, Task, TaskLabel
+
+
+class TaskLabelTest(TestCase):
+    """Testes para TaskLabel e endpoints de labels."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='labels', password='testpass123')
+        self.company = Company.objects.create(name='Label Company')
+        self.board = Board.objects.create(name='Vendas', company=self.company, created_by=self.user)
+        self.column = Column.objects.create(board=self.board, name='Aberto')
+        other_board = Board.objects.create(name='Suporte', company=self.company, created_by=self.user)
+        self.other_column = Column.objects.create(board=other_board, name='Aberto')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_task(self, labels, column=None, **kwargs):
+        return Task.objects.create(
+            column=column or self.column, created_by=self.user, title='Task', labels=labels, **kwargs
+        )
+
+    def slugs(self, task):
+        return set(TaskLabel.objects.filter(task=task).values_list('slug', flat=True))
+
+    def test_labels_are_mirrored(self):
+        """Criar e alterar labels mantém TaskLabel sincronizado."""
+        task = self.create_task(['VIP', 'Renovação', 'vip'])
+        self.assertEqual(self.slugs(task), {'vip', 'renovação'})
+
+        task.labels = ['Renovação', 'Urgente']
+        task.save()
+        self.assertEqual(self.slugs(task), {'renovação', 'urgente'})
+        self.assertEqual(
+            set(TaskLabel.objects.filter(task=task).values_list('board_id', flat=True)), {self.board.id}
+        )
+
+    def test_update_with_unrelated_fields_skips_sync(self):
+        """Salvar só a posição não consulta TaskLabel."""
+        task = self.create_task(['vip'])
+        task.position = 3
+        with self.assertNumQueries(1):
+            task.save(update_fields=['position'])
+
+    def test_filter_all_and_any(self):
+        """labels exige todas por padrão e aceita qualquer com labels_mode=any."""
+        both = self.create_task(['vip', 'renovação'])
+        only_vip = self.create_task(['VIP'])
+        self.create_task(['outro'])
+
+        response = self.client.get('/api/kanban/tasks/', {'labels': 'vip,Renovação'})
+        self.assertEqual([item['id'] for item in response.data['results']], [str(both.id)])
+
+        response = self.client.get(
+            '/api/kanban/tasks/', {'labels': 'vip,renovação', 'labels_mode': 'any'}
+        )
+        self.assertEqual(
+            {item['id'] for item in response.data['results']}, {str(both.id), str(only_vip.id)}
+        )
+
+    def test_board_label_usage(self):
+        """O board lista as labels em uso com contagens de tasks ativas."""
+        self.create_task(['vip', 'renovação'])
+        self.create_task(['vip'])
+        self.create_task(['vip'], is_active=False)
+        self.create_task(['vip'], column=self.other_column)
+
+        response = self.client.get(f'/api/kanban/boards/{self.board.id}/labels/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(item['slug'], item['count']) for item in response.data],
+            [('vip', 2), ('renovação', 1)],
+        )
+
+    def test_autocomplete(self):
+        """O autocomplete sugere labels pelo prefixo."""
+        self.create_task(['Renovação', 'Reunião'])
+        self.create_task(['Renovação'], column=self.other_column)
+        self.create_task(['vip'])
+
+        response = self.client.get('/api/kanban/labels/', {'q': 're'})
+        self.assertEqual(
+            [(item['name'], item['count']) for item in response.data],
+            [('Renovação', 2), ('Reunião', 1)],
+        )
+
+        response = self.client.get('/api/kanban/labels/', {'q': 'REN', 'board': str(self.board.id)})
+        self.assertEqual([(item['slug'], item['count']) for item in response.data], [('renovação', 1)])
@@ -0,0 +1,169 @@
+"""
+Testes para os lembretes de prazo das tasks.
+
+Cobre:
+- Detecção de tasks que vencem em breve e atrasadas
+- Uma notificação agrupada por responsável (e-mail e WebSocket)
+- Idempotência entre execuções e lease exclusivo entre workers
+- Novo prazo gera novo lembrete; falha na entrega mantém o lembrete pendente
+- Lembretes em entrega não são reservados de novo por quem assume o lease
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.companies.models import Company
+from apps.kanban import reminders
+from apps.kanban.models import Board, Column, SchedulerLease, Task, TaskReminder
+
+
+class TaskReminderTest(TestCase):
+    """Testes para a varredura e a entrega dos lembretes."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ana', email='ana@example.com', password='testpass123')
+        self.other = User.objects.create_user(username='bia', email='bia@example.com', password='testpass123')
+        company = Company.objects.create(name='Reminder Company')
+        self.board = Board.objects.create(name='Vendas', company=company, created_by=self.user)
+        self.column = Column.objects.create(board=self.board, name='A Fazer', position=0)
+        self.now = timezone.now()
+
+    def create_task(self, title, due_in, assigned_to=None, **kwargs):
+        return Task.objects.create(
+            title=title, column=self.column, created_by=self.user,
+            assigned_to=assigned_to or self.user, due_date=self.now + due_in, **kwargs
+        )
+
+    def run_reminders(self, **kwargs):
+        kwargs.setdefault('channels', ('email',))
+        return reminders.send_due_reminders(owner='worker-1', now=self.now, **kwargs)
+
+    def test_batches_upcoming_and_overdue_per_assignee(self):
+        """Cada responsável recebe um e-mail com todas as suas tasks da janela."""
+        self.create_task('Proposta', timedelta(hours=3))
+        self.create_task('Contrato', -timedelta(days=1))
+        self.create_task('Bia', timedelta(hours=1), assigned_to=self.other)
+        self.create_task('Distante', timedelta(days=5))
+        self.create_task('Muito atrasada', -timedelta(days=30))
+        self.create_task('Arquivada', timedelta(hours=1), is_active=False)
+
+        result = self.run_reminders()
+
+        self.assertEqual(result, {'acquired': True, 'scanned': 3, 'users': 2, 'reminders': 3})
+        self.assertEqual(len(mail.outbox), 2)
+        ana = next(message for message in mail.outbox if message.to == ['ana@example.com'])
+        self.assertIn('Tasks atrasadas:\n- Contrato', ana.body)
+        self.assertIn('Tasks que vencem em breve:\n- Proposta', ana.body)
+        self.assertNotIn('Distante', ana.body)
+        self.assertEqual(
+            set(TaskReminder.objects.values_list('task__title', 'kind')),
+            {('Proposta', 'upcoming'), ('Contrato', 'overdue'), ('Bia', 'upcoming')},
+        )
+
+    def test_second_run_sends_nothing(self):
+        """Execuções repetidas não duplicam lembretes."""
+        self.create_task('Proposta', timedelta(hours=3))
+        self.run_reminders()
+        result = self.run_reminders()
+
+        self.assertEqual(result['reminders'], 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(TaskReminder.objects.count(), 1)
+
+    def test_overdue_after_upcoming_and_new_due_date(self):
+        """A task vencida gera o aviso de atraso; um novo prazo gera um novo lembrete."""
+        task = self.create_task('Proposta', timedelta(hours=3))
+        self.run_reminders()
+
+        self.now += timedelta(hours=4)
+        self.assertEqual(self.run_reminders()['reminders'], 1)
+
+        task.due_date = self.now + timedelta(hours=2)
+        task.save()
+        self.assertEqual(self.run_reminders()['reminders'], 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_lease_is_exclusive(self):
+        """Enquanto o lease está válido, outro worker não executa a rodada."""
+        self.create_task('Proposta', timedelta(hours=3))
+        self.assertTrue(reminders.acquire_lease(reminders.LEASE_NAME, 'worker-2'))
+
+        self.assertFalse(self.run_reminders()['acquired'])
+        self.assertEqual(TaskReminder.objects.count(), 0)
+
+        # Lease expirado pode ser assumido
+        SchedulerLease.objects.update(expires_at=self.now - timedelta(seconds=1))
+        self.assertTrue(self.run_reminders()['acquired'])
+        self.assertFalse(SchedulerLease.objects.exists())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_delivery_is_retried(self):
+        """Se a entrega falha, o lembrete continua pendente para a próxima execução."""
+        self.create_task('Proposta', timedelta(hours=3))
+        with mock.patch.object(reminders, 'deliver', side_effect=ConnectionError('smtp')):
+            self.assertEqual(self.run_reminders()['reminders'], 0)
+        self.assertTrue(TaskReminder.objects.filter(sent_at__isnull=True, claimed_by__isnull=True).exists())
+
+        self.assertEqual(self.run_reminders()['reminders'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_lease_takeover_does_not_resend_in_flight_reminders(self):
+        """Se o lease expira durante a entrega, o novo dono não reenvia os lembretes reservados."""
+        self.create_task('Proposta', timedelta(hours=3))
+        deliver = reminders.deliver
+        takeover = []
+
+        def slow_deliver(*args, **kwargs):
+            if not takeover:
+                SchedulerLease.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+                takeover.append(reminders.send_due_reminders(owner='worker-2', now=self.now, channels=('email',)))
+            deliver(*args, **kwargs)
+
+        with mock.patch.object(reminders, 'deliver', side_effect=slow_deliver):
+            self.assertEqual(self.run_reminders()['reminders'], 1)
+
+        self.assertTrue(takeover[0]['acquired'])
+        self.assertEqual(takeover[0]['reminders'], 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_reassigned_task_is_not_reminded(self):
+        """Lembretes de tasks que mudaram de responsável são descartados."""
+        task = self.create_task('Proposta', timedelta(hours=3))
+        reminders.register_reminders(now=self.now)
+        task.assigned_to = None
+        task.save()
+
+        self.assertEqual(self.run_reminders()['reminders'], 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_websocket_push(self):
+        """Os lembretes são enviados ao grupo pessoal do responsável."""
+        self.create_task('Proposta', timedelta(hours=3))
+        channel_layer = get_channel_layer()
+        channel_name = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(f'user_{self.user.id}', channel_name)
+
+        self.run_reminders(channels=('websocket',))
+
+        event = async_to_sync(channel_layer.receive)(channel_name)
+        self.assertEqual(event['type'], 'task_reminders')
+        self.assertEqual([item['title'] for item in event['upcoming']], ['Proposta'])
+        self.assertEqual(mail.outbox, [])
+
+    def test_command(self):
+        """O comando executa uma rodada e informa o resultado."""
+        Task.objects.create(
+            title='Proposta', column=self.column, created_by=self.user, assigned_to=self.user,
+            due_date=timezone.now() + timedelta(hours=1),
+        )
+        stdout = mock.MagicMock()
+        call_command('send_task_reminders', stdout=stdout)
+        self.assertIn('1 lembretes enviados para 1 usuários', stdout.write.call_args[0][0])
@@ -0,0 +1,162 @@
+"""
+Testes para a busca textual de tasks.
+
+Cobre:
+- Índice mantido pelos signals (criação, edição, arquivamento, exclusão)
+- Busca por prefixo, ranking e trechos destacados
+- Filtro por board e arquivamento em lote
+- Fallback com icontains em bancos sem índice
+"""
+
+import re
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban import search
+from apps.kanban.models import Board, Column, Task
+
+
+class TaskSearchTest(TestCase):
+    """Testes para o índice e o endpoint de busca."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='search', password='testpass123')
+        company = Company.objects.create(name='Search Company')
+        self.board = Board.objects.create(name='Vendas', company=company, created_by=self.user)
+        self.other_board = Board.objects.create(name='Suporte', company=company, created_by=self.user)
+        self.column = Column.objects.create(board=self.board, name='A Fazer', position=0)
+        self.other_column = Column.objects.create(board=self.other_board, name='A Fazer', position=0)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_task(self, title, description='', column=None):
+        return Task.objects.create(
+            title=title, description=description, column=column or self.column, created_by=self.user
+        )
+
+    def search(self, query, **params):
+        response = self.client.get('/api/kanban/tasks/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_prefix_match_and_ranking(self):
+        """Termos casam por prefixo e acertos no título têm mais peso."""
+        in_title = self.create_task('Proposta comercial', 'Enviar até sexta')
+        in_description = self.create_task('Reunião', 'Revisar a proposta com o cliente')
+        for index in range(6):
+            self.create_task(f'Ligação {index}', 'Follow-up')
+
+        results = self.search('propo')
+
+        self.assertEqual([item['id'] for item in results], [str(in_title.id), str(in_description.id)])
+        self.assertGreater(results[0]['rank'], results[1]['rank'])
+        self.assertEqual(results[0]['title_highlight'], '<mark>Proposta</mark> comercial')
+        self.assertIn('<mark>proposta</mark>', results[1]['snippet'])
+
+    def test_all_terms_required_and_accents_ignored(self):
+        """Todos os termos precisam aparecer; acentos são ignorados."""
+        task = self.create_task('Negociação de contrato', 'Cliente pediu desconto')
+        self.create_task('Contrato novo', '')
+
+        self.assertEqual([item['id'] for item in self.search('negociacao contr')], [str(task.id)])
+
+    def test_snippet_is_escaped(self):
+        """O conteúdo da task é escapado antes do destaque."""
+        self.create_task('<b>Orçamento</b>', '')
+        self.assertEqual(self.search('orcamento')[0]['title_highlight'], '&lt;b&gt;<mark>Orçamento</mark>&lt;/b&gt;')
+
+    def test_index_follows_task_changes(self):
+        """Edição, arquivamento e exclusão atualizam o índice."""
+        task = self.create_task('Demonstração', '')
+        task.title = 'Apresentação'
+        task.save()
+        self.assertEqual(self.search('demonst'), [])
+        self.assertEqual(len(self.search('apresent')), 1)
+
+        task.is_active = False
+        task.save()
+        self.assertEqual(self.search('apresent'), [])
+
+        task.is_active = True
+        task.save()
+        task.delete()
+        self.assertEqual(search.search_tasks('apresent'), [])
+
+    def test_board_filter(self):
+        """O parâmetro board restringe a busca a um board."""
+        self.create_task('Renovação anual')
+        other = self.create_task('Renovação suporte', column=self.other_column)
+
+        results = self.search('renov', board=str(self.other_board.id))
+        self.assertEqual([item['id'] for item in results], [str(other.id)])
+        self.assertEqual(results[0]['board_name'], 'Suporte')
+
+    def test_board_delete_purges_index(self):
+        """Tasks excluídas em cascata com o board saem do índice."""
+        self.create_task('Renovação suporte', column=self.other_column)
+        self.other_board.delete()
+        self.assertEqual(search.search_tasks('renov'), [])
+
+    def test_bulk_archive_removes_from_index(self):
+        """O arquivamento em lote remove as tasks do índice."""
+        task = self.create_task('Contrato anual')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/kanban/tasks/bulk/', {'operation': 'archive', 'ids': [str(task.id)]}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(search.search_tasks('contrato'), [])
+
+    def test_query_is_required(self):
+        """Consultas sem termos são rejeitadas."""
+        response = self.client.get('/api/kanban/tasks/search/', {'q': '  "*" '})
+        self.assertEqual(response.status_code, 400)
+
+    def test_fallback_without_index(self):
+        """Sem índice, a busca usa icontains e mantém o destaque."""
+        task = self.create_task('Proposta comercial', 'Detalhes da proposta')
+        with mock.patch.object(search, '_vendor', return_value='mysql'):
+            results = search.search_tasks('propo')
+        self.assertEqual([item['task_id'] for item in results], [task.id])
+        self.assertEqual(results[0]['title_highlight'], '<mark>Propo</mark>sta comercial')
+
+    @skipUnless(connection.vendor == 'sqlite', 'Plano de consulta do FTS5')
+    def test_index_writes_do_not_scan_the_fts_table(self):
+        """Atualizar e remover tasks do índice acessa o FTS5 pelo rowid, sem varrer a tabela."""
+        for index in range(20):
+            self.create_task(f'Proposta {index}')
+        task = self.create_task('Proposta comercial')
+
+        with CaptureQueriesContext(connection) as queries:
+            task.title = 'Proposta revisada'
+            task.save()
+            task.delete()
+
+        statements = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM kanban_task_search')
+        ]
+        self.assertTrue(statements)
+        for sql in statements:
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = [row[3] for row in cursor.fetchall()]
+            scans = [
+                step for step in plan
+                if step.startswith('SCAN') and not re.search(r'VIRTUAL TABLE INDEX \d+:=', step)
+            ]
+            self.assertEqual(scans, [], sql)
+        self.assertEqual(search.search_tasks('proposta revisada'), [])
+
+    def test_rebuild_index(self):
+        """A reconstrução indexa todas as tasks ativas."""
+        self.create_task('Proposta comercial')
+        self.create_task('Proposta técnica')
+        self.assertEqual(search.rebuild_index(), 2)
+        self.assertEqual(len(search.search_tasks('proposta')), 2)
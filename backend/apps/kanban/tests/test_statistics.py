@@ -0,0 +1,250 @@
+"""
+Testes para as estatísticas pré-calculadas dos boards.
+
+Cobre:
+- Manutenção incremental via signals de Task e Column
+- Equivalência com o recálculo completo
+- Varredura de tasks atrasadas
+- Endpoints de estatísticas individual e em lote
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban import statistics
+from apps.kanban.models import Board, BoardStatistics, Column, Task
+
+
+class BoardStatisticsTestMixin:
+    """Helpers compartilhados pelos testes de estatísticas."""
+
+    def create_board(self, name='Pipeline'):
+        board = Board.objects.create(name=name, company=self.company, created_by=self.user)
+        columns = [
+            Column.objects.create(board=board, name=column_name, position=position)
+            for position, column_name in enumerate(['A Fazer', 'Em Progresso', 'Concluído'])
+        ]
+        return board, columns
+
+    def create_task(self, column, **kwargs):
+        kwargs.setdefault('title', 'Task')
+        return Task.objects.create(column=column, created_by=self.user, **kwargs)
+
+    def assertMatchesRecompute(self, board):
+        """Os valores armazenados devem ser idênticos ao recálculo completo."""
+        stored = BoardStatistics.objects.get(board=board)
+        expected = statistics.compute_board_statistics(board.id, now=stored.overdue_checked_at)
+        self.assertEqual(stored.as_dict(), expected.as_dict())
+
+
+class BoardStatisticsMaintenanceTest(BoardStatisticsTestMixin, TestCase):
+    """Testes para a manutenção incremental das estatísticas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='stats', password='testpass123')
+        self.company = Company.objects.create(name='Stats Company')
+        self.board, self.columns = self.create_board()
+        statistics.refresh_board_statistics(self.board.id)
+
+    def test_create_updates_counts(self):
+        """Criar tasks incrementa total, prioridade e coluna."""
+        self.create_task(self.columns[0], priority='high')
+        self.create_task(self.columns[0], priority='low')
+        self.create_task(self.columns[1], priority='high')
+
+        stats = BoardStatistics.objects.get(board=self.board)
+        self.assertEqual(stats.total_tasks, 3)
+        self.assertEqual(stats.tasks_by_priority, {'high': 2, 'low': 1})
+        self.assertEqual(
+            [entry['task_count'] for entry in stats.tasks_by_column], [2, 1, 0]
+        )
+        self.assertMatchesRecompute(self.board)
+
+    def test_sequence_of_changes_matches_recompute(self):
+        """Sequência mista de operações mantém os valores iguais ao recálculo."""
+        past = timezone.now() - timedelta(days=2)
+        future = timezone.now() + timedelta(days=2)
+        tasks = [
+            self.create_task(self.columns[i % 3], priority=priority, due_date=due)
+            for i, (priority, due) in enumerate([
+                ('low', None), ('medium', past), ('high', future),
+                ('urgent', past), ('medium', None), ('high', past),
+            ])
+        ]
+        self.assertMatchesRecompute(self.board)
+
+        tasks[0].column = self.columns[2]
+        tasks[0].save()
+        tasks[1].priority = 'urgent'
+        tasks[1].save()
+        tasks[2].is_active = False
+        tasks[2].status = 'archived'
+        tasks[2].save()
+        tasks[3].due_date = future
+        tasks[3].save()
+        tasks[4].due_date = past
+        tasks[4].save()
+        tasks[5].delete()
+        tasks[0].position = 10
+        tasks[0].save(update_fields=['position'])
+        self.assertMatchesRecompute(self.board)
+
+        stats = BoardStatistics.objects.get(board=self.board)
+        self.assertEqual(stats.total_tasks, 4)
+        self.assertEqual(stats.overdue_tasks, 2)
+
+    def test_column_changes_refresh_statistics(self):
+        """Criar, renomear e remover colunas mantém a lista de colunas em dia."""
+        self.create_task(self.columns[1])
+        extra = Column.objects.create(board=self.board, name='Perdido', position=3)
+        self.create_task(extra)
+
+        self.columns[0].name = 'Backlog'
+        self.columns[0].save()
+        self.assertMatchesRecompute(self.board)
+
+        self.columns[1].delete()
+        self.assertMatchesRecompute(self.board)
+        stats = BoardStatistics.objects.get(board=self.board)
+        self.assertEqual(stats.total_tasks, 1)
+        self.assertEqual(
+            [entry['name'] for entry in stats.tasks_by_column], ['Backlog', 'Concluído', 'Perdido']
+        )
+
+    def test_column_changes_do_not_recount_tasks(self):
+        """Renomear e reposicionar colunas só reescreve a lista; outras mudanças não tocam as estatísticas."""
+        self.create_task(self.columns[0])
+        self.create_task(self.columns[2])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.columns[2].name = 'Entregue'
+            self.columns[2].position = -1
+            self.columns[2].save()
+        self.assertFalse([query for query in queries.captured_queries if '"kanban_task"' in query['sql']])
+        self.assertMatchesRecompute(self.board)
+        stats = BoardStatistics.objects.get(board=self.board)
+        self.assertEqual(
+            [(entry['name'], entry['task_count']) for entry in stats.tasks_by_column],
+            [('Entregue', 1), ('A Fazer', 1), ('Em Progresso', 0)],
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.columns[0].color = '#ff0000'
+            self.columns[0].save(update_fields=['color'])
+        self.assertFalse([query for query in queries.captured_queries if 'kanban_boardstatistics' in query['sql']])
+
+    def test_board_delete_removes_statistics(self):
+        """Remover o board remove a linha de estatísticas em cascata."""
+        self.create_task(self.columns[0])
+        self.board.delete()
+        self.assertFalse(BoardStatistics.objects.exists())
+
+    def test_overdue_sweep(self):
+        """A varredura conta tasks que venceram desde a última verificação."""
+        task = self.create_task(self.columns[0], due_date=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(BoardStatistics.objects.get(board=self.board).overdue_tasks, 0)
+
+        statistics.sweep_overdue(now=task.due_date + timedelta(seconds=1))
+        stats = BoardStatistics.objects.get(board=self.board)
+        self.assertEqual(stats.overdue_tasks, 1)
+        self.assertMatchesRecompute(self.board)
+
+    def test_sweep_command(self):
+        """O comando de varredura e o --rebuild executam sem erros."""
+        self.create_task(self.columns[0], due_date=timezone.now() - timedelta(days=1))
+        BoardStatistics.objects.filter(board=self.board).update(total_tasks=99)
+
+        call_command('sweep_overdue_tasks', '--rebuild', stdout=open('/dev/null', 'w'))
+        self.assertMatchesRecompute(self.board)
+        self.assertEqual(BoardStatistics.objects.get(board=self.board).total_tasks, 1)
+
+
+class BoardStatisticsEndpointTest(BoardStatisticsTestMixin, TestCase):
+    """Testes para os endpoints de estatísticas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='stats', password='testpass123')
+        self.company = Company.objects.create(name='Stats Company')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_statistics_endpoint_reads_one_row(self):
+        """O endpoint individual lê a linha pré-calculada."""
+        board, columns = self.create_board()
+        self.create_task(columns[0], priority='urgent', due_date=timezone.now() - timedelta(hours=1))
+        self.create_task(columns[2])
+        statistics.refresh_board_statistics(board.id)
+
+        url = f'/api/kanban/boards/{board.id}/statistics/'
+        # board + linha de estatísticas
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_tasks'], 2)
+        self.assertEqual(response.data['overdue_tasks'], 1)
+        self.assertEqual(response.data['tasks_by_priority'], {'urgent': 1, 'medium': 1})
+        self.assertEqual(
+            [(entry['name'], entry['task_count']) for entry in response.data['tasks_by_column']],
+            [('A Fazer', 1), ('Em Progresso', 0), ('Concluído', 1)],
+        )
+
+    def test_column_reorder_updates_order(self):
+        """Reordenar colunas pelo endpoint reflete a nova ordem nas estatísticas."""
+        board, columns = self.create_board()
+        self.create_task(columns[0])
+        statistics.refresh_board_statistics(board.id)
+
+        response = self.client.patch(
+            f'/api/kanban/boards/{board.id}/columns/reorder/',
+            {'column_orders': [
+                {'id': str(columns[0].id), 'position': 2}, {'id': str(columns[2].id), 'position': 0},
+            ]},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertMatchesRecompute(board)
+        self.assertEqual(
+            [entry['name'] for entry in BoardStatistics.objects.get(board=board).tasks_by_column],
+            ['Concluído', 'Em Progresso', 'A Fazer'],
+        )
+
+    def test_statistics_created_on_first_read(self):
+        """Boards sem linha de estatísticas são calculados na primeira leitura."""
+        board, columns = self.create_board()
+        self.create_task(columns[1])
+        BoardStatistics.objects.all().delete()
+
+        response = self.client.get(f'/api/kanban/boards/{board.id}/statistics/')
+        self.assertEqual(response.data['total_tasks'], 1)
+        self.assertMatchesRecompute(board)
+
+    def test_bulk_statistics(self):
+        """O endpoint em lote retorna estatísticas de vários boards."""
+        board_a, columns_a = self.create_board('A')
+        board_b, columns_b = self.create_board('B')
+        self.create_task(columns_a[0])
+        self.create_task(columns_b[0])
+        self.create_task(columns_b[1])
+        BoardStatistics.objects.filter(board=board_b).delete()
+
+        response = self.client.get(
+            '/api/kanban/boards/statistics/', {'ids': f'{board_a.id},{board_b.id}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[str(board_a.id)]['total_tasks'], 1)
+        self.assertEqual(response.data[str(board_b.id)]['total_tasks'], 2)
+
+    def test_bulk_statistics_invalid_ids(self):
+        """IDs inválidos retornam 400."""
+        response = self.client.get('/api/kanban/boards/statistics/', {'ids': 'nao-e-uuid'})
+        self.assertEqual(response.status_code, 400)
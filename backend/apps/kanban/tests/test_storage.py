@@ -0,0 +1,210 @@
+"""
+Testes para os backends de storage dos anexos e o cache de URLs assinadas.
+
+Cobre:
+- Upload, URL assinada e remoção no storage local
+- Upload em blocos, deduplicação por conteúdo e envio paralelo
+- Seleção do backend pela setting
+- Validade das URLs assinadas pelo Firebase Storage
+- Endpoint de upload de anexos
+- Cache de URLs por firebase_path e geração em lote
+- Serialização da lista de anexos com uma única assinatura em lote
+"""
+
+import io
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from google.cloud.storage import _signing
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban import storage
+from apps.kanban.models import Board, Column, Task, TaskAttachment
+
+
+class LocalStorageServiceTest(TestCase):
+    """Testes para o substituto local do Firebase Storage."""
+
+    def setUp(self):
+        cache.clear()
+        self.service = storage.LocalStorageService(root=tempfile.mkdtemp(), base_url='/media/')
+
+    def test_upload_sign_and_delete(self):
+        """O arquivo é gravado, a URL assinada confere e a remoção apaga o arquivo."""
+        result = self.service.upload_task_attachment(b'conteudo', 'proposta.pdf', 'task-1', 1)
+
+        self.assertTrue(result['firebase_path'].startswith('kanban/attachments/'))
+        self.assertTrue(result['firebase_path'].endswith(f"{result['content_hash']}.pdf"))
+        self.assertEqual(result['file_size'], 8)
+        self.assertFalse(result['deduplicated'])
+        self.assertEqual(result['content_type'], 'application/pdf')
+        self.assertTrue((self.service.root / result['firebase_path']).exists())
+
+        url = self.service.get_download_url(result['firebase_path'])
+        query = dict(part.split('=') for part in url.split('?')[1].split('&'))
+        self.assertTrue(self.service.verify_signature(result['firebase_path'], query['expires'], query['signature']))
+        self.assertFalse(self.service.verify_signature('outro/arquivo', query['expires'], query['signature']))
+
+        self.assertTrue(self.service.delete_file(result['firebase_path']))
+        self.assertFalse((self.service.root / result['firebase_path']).exists())
+
+    def test_download_urls_are_cached(self):
+        """URLs já geradas vêm do cache; só as que faltam são assinadas, em lote."""
+        with mock.patch.object(self.service, 'get_download_urls', wraps=self.service.get_download_urls) as sign:
+            first = storage.get_download_urls(['a.pdf', 'b.pdf'], service=self.service)
+            second = storage.get_download_urls(['a.pdf', 'b.pdf', 'c.pdf'], service=self.service)
+
+        self.assertEqual(sign.call_count, 2)
+        self.assertEqual(sign.call_args_list[1].args[0], ['c.pdf'])
+        self.assertEqual(first['a.pdf'], second['a.pdf'])
+        self.assertEqual(len(second), 3)
+
+    def test_failed_urls_are_not_cached(self):
+        """Falhas na geração não entram no cache."""
+        with mock.patch.object(self.service, 'get_download_urls', return_value={'a.pdf': None}):
+            self.assertEqual(storage.get_download_urls(['a.pdf'], service=self.service), {})
+        self.assertIsNotNone(storage.get_download_url('a.pdf', service=self.service))
+
+
+class StorageBackendTest(TestCase):
+    """Testes para o comportamento comum dos backends."""
+
+    def setUp(self):
+        self.service = storage.InMemoryStorageService()
+
+    def test_same_content_is_stored_once(self):
+        """Arquivos com o mesmo conteúdo reaproveitam o caminho existente."""
+        first = self.service.upload_task_attachment(b'mesmo conteudo', 'a.txt')
+        with mock.patch.object(self.service, 'save_file') as save_file:
+            second = self.service.upload_task_attachment(io.BytesIO(b'mesmo conteudo'), 'b.txt')
+
+        self.assertEqual(first['firebase_path'], second['firebase_path'])
+        self.assertTrue(second['deduplicated'])
+        save_file.assert_not_called()
+        self.assertEqual(len(self.service.files), 1)
+
+    def test_streams_are_read_in_chunks(self):
+        """Streams sem seek são lidos em blocos e copiados para um temporário."""
+
+        class Stream(io.RawIOBase):
+            def __init__(self, data):
+                self.data = io.BytesIO(data)
+                self.reads = 0
+
+            def readable(self):
+                return True
+
+            def read(self, size=-1):
+                self.reads += 1
+                return self.data.read(size)
+
+        stream = Stream(b'x' * (storage.CHUNK_SIZE * 2 + 10))
+        result = self.service.upload_task_attachment(stream, 'grande.bin')
+
+        self.assertEqual(result['file_size'], storage.CHUNK_SIZE * 2 + 10)
+        self.assertEqual(stream.reads, 4)
+        self.assertEqual(len(self.service.files[result['firebase_path']][0]), result['file_size'])
+
+    def test_parallel_upload_preserves_order(self):
+        """O envio paralelo retorna os resultados na ordem dos arquivos."""
+        files = [(io.BytesIO(f'arquivo {index}'.encode()), f'{index}.txt') for index in range(6)]
+        results = self.service.upload_task_attachments(files)
+
+        self.assertEqual([item['filename'] for item in results], [f'{index}.txt' for index in range(6)])
+        self.assertEqual(len(self.service.files), 6)
+
+    def test_backend_selection(self):
+        """A setting aceita nomes conhecidos e caminhos pontuados."""
+        with mock.patch.object(storage, '_services', {}):
+            with override_settings(KANBAN_STORAGE_BACKEND='memory'):
+                self.assertIsInstance(storage.get_storage_service(), storage.InMemoryStorageService)
+            with override_settings(KANBAN_STORAGE_BACKEND='apps.kanban.storage.LocalStorageService'):
+                self.assertIsInstance(storage.get_storage_service(), storage.LocalStorageService)
+
+
+class FirebaseSignedUrlTest(TestCase):
+    """Testes para a validade das URLs assinadas pelo Firebase Storage."""
+
+    def test_signed_url_expires_after_cache_ttl(self):
+        """A expiração assinada fica no futuro e depois do prazo do cache."""
+        from apps.kanban.firebase_storage import FirebaseStorageService
+
+        with mock.patch('apps.kanban.firebase_storage.storage.bucket') as bucket:
+            service = FirebaseStorageService()
+            sign = bucket.return_value.blob.return_value.generate_signed_url
+            sign.return_value = 'https://signed'
+
+            self.assertEqual(service.get_download_url('kanban/attachments/a.pdf'), 'https://signed')
+
+        now = time.time()
+        expires_at = _signing.get_expiration_seconds_v2(sign.call_args.kwargs['expiration'])
+        self.assertGreater(expires_at, now)
+        self.assertGreater(expires_at, now + storage.URL_EXPIRATION - storage.URL_CACHE_MARGIN)
+
+
+class TaskAttachmentSerializationTest(TestCase):
+    """Testes para a listagem de anexos com URLs de download."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='storage', password='testpass123')
+        company = Company.objects.create(name='Storage Company')
+        self.board = Board.objects.create(name='Vendas', company=company, created_by=self.user)
+        self.column = Column.objects.create(board=self.board, name='A Fazer', position=0)
+        self.task = Task.objects.create(title='Deal', column=self.column, created_by=self.user)
+        for index in range(5):
+            TaskAttachment.objects.create(
+                task=self.task, firebase_path=f'kanban/tasks/{self.task.id}/attachments/{index}.pdf',
+                filename=f'{index}.pdf', file_size=10, content_type='application/pdf', uploaded_by=self.user,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_signs_urls_in_one_batch(self):
+        """A lista de anexos gera todas as URLs com uma única chamada ao storage."""
+        service = storage.get_storage_service()
+        url = (
+            f'/api/kanban/boards/{self.board.id}/columns/{self.column.id}'
+            f'/tasks/{self.task.id}/attachments/'
+        )
+        with mock.patch.object(service, 'get_download_urls', wraps=service.get_download_urls) as sign:
+            response = self.client.get(url)
+            self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(item['download_url'] for item in results))
+        self.assertEqual(sign.call_count, 1)
+
+    def test_upload_endpoint(self):
+        """O upload grava os arquivos no storage e cria os anexos com o hash."""
+        url = (
+            f'/api/kanban/boards/{self.board.id}/columns/{self.column.id}'
+            f'/tasks/{self.task.id}/attachments/upload/'
+        )
+        files = [
+            SimpleUploadedFile('proposta.pdf', b'%PDF proposta'),
+            SimpleUploadedFile('copia.pdf', b'%PDF proposta'),
+        ]
+        response = self.client.post(url, {'files': files}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['filename'] for item in response.data], ['proposta.pdf', 'copia.pdf'])
+        self.assertEqual(response.data[0]['firebase_path'], response.data[1]['firebase_path'])
+        self.assertTrue(storage.get_storage_service().exists(response.data[0]['firebase_path']))
+        self.assertEqual(TaskAttachment.objects.filter(task=self.task, content_hash__gt='').count(), 2)
+
+    def test_upload_without_files(self):
+        """Envio sem arquivos é rejeitado."""
+        url = (
+            f'/api/kanban/boards/{self.board.id}/columns/{self.column.id}'
+            f'/tasks/{self.task.id}/attachments/upload/'
+        )
+        self.assertEqual(self.client.post(url, {}, format='multipart').status_code, 400)
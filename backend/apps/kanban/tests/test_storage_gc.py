@@ -0,0 +1,223 @@
+"""
+Testes para a limpeza dos arquivos de anexos.
+
+Cobre:
+- Remoção do arquivo após o commit quando o anexo é excluído
+- Arquivos deduplicados mantidos enquanto houver referência
+- Rollback mantém o arquivo
+- Varredura de órfãos (dry-run, idade mínima conferida antes de remover, remoção)
+- Anexos de chat removidos no soft delete da mensagem
+"""
+
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.chat.models import ChatAttachment, ChatMessage, ChatRoom
+from apps.companies.models import Company
+from apps.kanban import storage, storage_gc
+from apps.kanban.models import Board, Column, Task, TaskAttachment
+
+
+class StorageCleanupTest(TestCase):
+    """Testes para a limpeza imediata e a varredura de órfãos."""
+
+    def setUp(self):
+        self.service = storage.InMemoryStorageService()
+        patcher = mock.patch.object(storage_gc.KANBAN_ATTACHMENTS, 'get_storage', lambda: self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(username='cleanup', password='testpass123')
+        company = Company.objects.create(name='Cleanup Company')
+        self.board = Board.objects.create(name='Vendas', company=company, created_by=self.user)
+        self.column = Column.objects.create(board=self.board, name='A Fazer', position=0)
+        self.task = Task.objects.create(title='Deal', column=self.column, created_by=self.user)
+
+    def attach(self, content, filename='arquivo.pdf', task=None):
+        uploaded = self.service.upload_task_attachment(content, filename)
+        return TaskAttachment.objects.create(
+            task=task or self.task, uploaded_by=self.user, firebase_path=uploaded['firebase_path'],
+            filename=filename, file_size=uploaded['file_size'], content_type=uploaded['content_type'],
+            content_hash=uploaded['content_hash'],
+        )
+
+    def age_files(self, days=2):
+        old = timezone.now() - timedelta(days=days)
+        for path, (content, content_type, _) in list(self.service.files.items()):
+            self.service.files[path] = (content, content_type, old)
+
+    def test_file_deleted_after_commit(self):
+        """O arquivo só é removido depois do commit."""
+        attachment = self.attach(b'proposta')
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment.delete()
+            self.assertTrue(self.service.exists(attachment.firebase_path))
+        self.assertFalse(self.service.exists(attachment.firebase_path))
+
+    def test_shared_file_kept_while_referenced(self):
+        """Um arquivo deduplicado continua no storage enquanto outro anexo aponta para ele."""
+        other_task = Task.objects.create(title='Outro', column=self.column, created_by=self.user)
+        first = self.attach(b'mesmo conteudo')
+        second = self.attach(b'mesmo conteudo', task=other_task)
+        self.assertEqual(first.firebase_path, second.firebase_path)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(self.service.exists(first.firebase_path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other_task.delete()
+        self.assertFalse(self.service.exists(first.firebase_path))
+
+    def test_task_delete_checks_references_once(self):
+        """Os anexos removidos em cascata são conferidos com uma única query."""
+        for index in range(5):
+            self.attach(f'arquivo {index}'.encode(), f'{index}.pdf')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.task.delete()
+        with self.assertNumQueries(1):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(self.service.files, {})
+
+    def run_cleanup_later(self):
+        """Captura a remoção enviada à thread de fundo para executá-la depois"""
+        jobs = []
+        patcher = mock.patch.object(storage_gc._executor, 'submit', lambda fn, *args: jobs.append((fn, args)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return jobs
+
+    @override_settings(KANBAN_STORAGE_CLEANUP_ASYNC=True)
+    def test_reupload_before_cleanup_runs_keeps_file(self):
+        """Um upload do mesmo conteúdo entre o agendamento e a remoção mantém o arquivo."""
+        jobs = self.run_cleanup_later()
+        attachment = self.attach(b'proposta')
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment.delete()
+        self.assertEqual(len(jobs), 1)
+
+        reuploaded = self.attach(b'proposta', 'proposta-v2.pdf')
+        self.assertEqual(reuploaded.firebase_path, attachment.firebase_path)
+        for fn, args in jobs:
+            fn(*args)
+
+        self.assertTrue(self.service.exists(attachment.firebase_path))
+
+    @override_settings(KANBAN_STORAGE_CLEANUP_ASYNC=True)
+    def test_touched_file_kept_until_its_row_is_committed(self):
+        """Um arquivo reaproveitado cuja linha ainda não foi gravada não é removido."""
+        jobs = self.run_cleanup_later()
+        attachment = self.attach(b'proposta')
+        self.age_files()
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment.delete()
+
+        self.service.upload_task_attachment(b'proposta', 'proposta-v2.pdf')
+        for fn, args in jobs:
+            fn(*args)
+
+        self.assertTrue(self.service.exists(attachment.firebase_path))
+
+    @override_settings(KANBAN_STORAGE_CLEANUP_ASYNC=True)
+    def test_deferred_cleanup_deletes_untouched_file(self):
+        """Sem novo upload, a remoção adiada apaga o arquivo."""
+        jobs = self.run_cleanup_later()
+        attachment = self.attach(b'proposta')
+        self.age_files()
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment.delete()
+
+        for fn, args in jobs:
+            fn(*args)
+
+        self.assertFalse(self.service.exists(attachment.firebase_path))
+
+    def test_rollback_keeps_file(self):
+        """Se a transação é desfeita, o arquivo permanece."""
+        attachment = self.attach(b'proposta')
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    TaskAttachment.objects.get(pk=attachment.pk).delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertTrue(self.service.exists(attachment.firebase_path))
+
+    def test_collect_orphans(self):
+        """A varredura respeita dry-run e a idade mínima e remove só os órfãos."""
+        kept = self.attach(b'referenciado')
+        orphan = self.service.upload_task_attachment(b'orfao', 'orfao.pdf')['firebase_path']
+        self.age_files()
+        recent = self.service.upload_task_attachment(b'recente', 'recente.pdf')['firebase_path']
+
+        report = storage_gc.collect_orphans(storage_gc.KANBAN_ATTACHMENTS, dry_run=True, batch_size=2)
+        self.assertEqual(report['scanned'], 3)
+        self.assertEqual(report['orphans'], 1)
+        self.assertEqual(report['sample'], [orphan])
+        self.assertTrue(self.service.exists(orphan))
+
+        call_command('collect_orphan_attachments', source=['kanban'], rate=0, stdout=mock.MagicMock())
+        self.assertFalse(self.service.exists(orphan))
+        self.assertTrue(self.service.exists(kept.firebase_path))
+        self.assertTrue(self.service.exists(recent))
+
+
+    def test_collect_orphans_keeps_files_touched_during_the_scan(self):
+        """Um arquivo renovado depois da listagem (upload deduplicado em curso) não é removido."""
+        orphan = self.service.upload_task_attachment(b'orfao', 'orfao.pdf')['firebase_path']
+        self.age_files()
+        referenced = storage_gc.KANBAN_ATTACHMENTS.referenced
+
+        def touch_then_check(paths):
+            self.service.touch(orphan)
+            return referenced(paths)
+
+        with mock.patch.object(storage_gc.KANBAN_ATTACHMENTS, 'referenced', side_effect=touch_then_check):
+            report = storage_gc.collect_orphans(storage_gc.KANBAN_ATTACHMENTS, rate=0)
+
+        self.assertEqual((report['orphans'], report['deleted'], report['kept']), (1, 0, 1))
+        self.assertTrue(self.service.exists(orphan))
+
+    def test_new_cleanup_batch_after_flush(self):
+        """Depois do flush, as remoções seguintes vão para um novo lote."""
+        first = self.attach(b'primeiro')
+        second = self.attach(b'segundo')
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+
+        self.assertFalse(self.service.exists(first.firebase_path))
+        self.assertFalse(self.service.exists(second.firebase_path))
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ChatAttachmentCleanupTest(TestCase):
+    """Testes para a limpeza dos anexos de chat."""
+
+    def test_soft_delete_removes_attachment_files(self):
+        """O soft delete da mensagem remove os anexos e seus arquivos."""
+        user = User.objects.create_user(username='chat', password='testpass123')
+        room = ChatRoom.objects.create(name='Privado', room_type='private', created_by=user)
+        message = ChatMessage.objects.create(room=room, sender=user, content='Segue o arquivo')
+        attachment = ChatAttachment(message=message, original_name='a.txt', file_size=3, content_type='text/plain')
+        attachment.file.save('a.txt', ContentFile(b'abc'))
+        storage_adapter = storage_gc.DjangoStorageAdapter()
+        self.assertTrue(storage_adapter.storage.exists(attachment.file.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            message.soft_delete()
+
+        self.assertFalse(ChatAttachment.objects.filter(message=message).exists())
+        self.assertFalse(storage_adapter.storage.exists(attachment.file.name))
+        message.refresh_from_db()
+        self.assertTrue(message.is_deleted)
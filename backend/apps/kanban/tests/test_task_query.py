@@ -0,0 +1,105 @@
+"""
+Testes para a consulta de tasks entre boards.
+
+Cobre:
+- Filtros de TaskFilter aplicados a todos os boards
+- Paginação por cursor
+- Número de queries independente do tamanho da página
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban.models import Board, Column, Task, TaskComment
+
+
+class TaskQueryViewSetTest(TestCase):
+    """Testes para GET /api/kanban/tasks/."""
+
+    url = '/api/kanban/tasks/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rep', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.company = Company.objects.create(name='Query Company')
+        self.columns = []
+        for name in ['Pipeline A', 'Pipeline B']:
+            board = Board.objects.create(name=name, company=self.company, created_by=self.user)
+            self.columns.append(Column.objects.create(board=board, name='Aberto'))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_task(self, column, **kwargs):
+        kwargs.setdefault('title', 'Task')
+        return Task.objects.create(column=column, created_by=self.user, **kwargs)
+
+    def test_my_urgent_tasks_due_this_week_across_boards(self):
+        """Filtros combinados retornam tasks de todos os boards."""
+        soon = timezone.now() + timedelta(days=2)
+        expected = [
+            self.create_task(self.columns[0], assigned_to=self.user, priority='urgent', due_date=soon),
+            self.create_task(self.columns[1], assigned_to=self.user, priority='urgent', due_date=soon),
+        ]
+        self.create_task(self.columns[0], assigned_to=self.other, priority='urgent', due_date=soon)
+        self.create_task(self.columns[1], assigned_to=self.user, priority='low', due_date=soon)
+        self.create_task(self.columns[1], assigned_to=self.user, priority='urgent',
+                         due_date=soon + timedelta(days=30))
+        self.create_task(self.columns[0], assigned_to=self.user, priority='urgent', due_date=soon,
+                         is_active=False)
+
+        response = self.client.get(self.url, {
+            'assigned_to_me': 'true',
+            'priority': 'urgent',
+            'due_date_to': (timezone.now() + timedelta(days=7)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {item['id'] for item in response.data['results']},
+            {str(task.id) for task in expected},
+        )
+        self.assertEqual(
+            {item['board_name'] for item in response.data['results']},
+            {'Pipeline A', 'Pipeline B'},
+        )
+
+    def test_board_filter(self):
+        """O filtro board restringe a um único board."""
+        task = self.create_task(self.columns[0])
+        self.create_task(self.columns[1])
+
+        response = self.client.get(self.url, {'board': str(self.columns[0].board_id)})
+        self.assertEqual([item['id'] for item in response.data['results']], [str(task.id)])
+
+    def test_cursor_pagination_walks_all_tasks(self):
+        """O cursor percorre todas as tasks sem repetir nenhuma."""
+        created = {str(self.create_task(self.columns[i % 2], title=f'T{i}').id) for i in range(7)}
+
+        seen = []
+        response = self.client.get(self.url, {'page_size': 3})
+        while True:
+            self.assertNotIn('count', response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(set(seen), created)
+
+    def test_counts_are_annotated(self):
+        """Contagens de comentários vêm anotadas, sem query por task."""
+        for i in range(5):
+            task = self.create_task(self.columns[0], title=f'T{i}')
+            TaskComment.objects.create(task=task, user=self.user, content='Oi')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(
+            [item['comments_count'] for item in response.data['results']], [1] * 5
+        )
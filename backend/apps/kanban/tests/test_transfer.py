@@ -0,0 +1,199 @@
+"""
+Testes para a exportação e importação de boards.
+
+Cobre:
+- Ida e volta com colunas, tasks, comentários, anexos e datas originais
+- IDs remapeados e índices derivados (labels, busca, estatísticas)
+- Lotes colunares de tamanho limitado
+- Arquivos inválidos ou truncados não gravam nada
+- Referências a colunas/tasks ausentes do arquivo são rejeitadas
+- Endpoints e comandos de gerenciamento
+"""
+
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.companies.models import Company
+from apps.kanban import search, transfer
+from apps.kanban.models import Board, Column, Task, TaskAttachment, TaskComment, TaskLabel
+from apps.kanban.statistics import get_board_statistics
+
+
+class BoardTransferTest(TestCase):
+    """Testes para export_board/import_board."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='export', password='testpass123')
+        self.seller = User.objects.create_user(username='vendedor', password='testpass123')
+        self.company = Company.objects.create(name='Transfer Company')
+        self.board = Board.objects.create(name='Vendas', company=self.company, created_by=self.user)
+        self.todo = Column.objects.create(board=self.board, name='A Fazer', position=0, max_tasks=10)
+        self.done = Column.objects.create(board=self.board, name='Feito', position=1)
+
+        self.task = Task.objects.create(
+            title='Proposta comercial', column=self.todo, created_by=self.user, assigned_to=self.seller,
+            priority='high', labels=['VIP'], due_date=timezone.now() + timedelta(days=2),
+        )
+        Task.objects.create(title='Arquivada', column=self.done, created_by=self.user, is_active=False)
+        TaskComment.objects.create(task=self.task, user=self.seller, content='Cliente respondeu')
+        TaskAttachment.objects.create(
+            task=self.task, uploaded_by=self.user, firebase_path='kanban/attachments/ab/abc.pdf',
+            filename='proposta.pdf', file_size=10, content_type='application/pdf', content_hash='abc',
+        )
+        self.original_created_at = timezone.now() - timedelta(days=30)
+        Task.objects.filter(pk=self.task.pk).update(created_at=self.original_created_at)
+
+    def round_trip(self, **kwargs):
+        lines = list(transfer.export_board(self.board))
+        return transfer.import_board(lines, self.user, self.company, **kwargs)
+
+    def test_round_trip(self):
+        """A importação recria o board com novos IDs e o mesmo conteúdo."""
+        board, counts = self.round_trip(name='Vendas (restaurado)')
+
+        self.assertEqual(counts, {'columns': 2, 'tasks': 2, 'comments': 1, 'attachments': 1})
+        self.assertNotEqual(board.id, self.board.id)
+        self.assertEqual(list(board.columns.values_list('name', 'max_tasks')), [('A Fazer', 10), ('Feito', None)])
+
+        task = Task.objects.get(column__board=board, title='Proposta comercial')
+        self.assertNotEqual(task.id, self.task.id)
+        self.assertEqual(task.assigned_to, self.seller)
+        self.assertEqual((task.priority, task.labels, task.due_date), ('high', ['VIP'], self.task.due_date))
+        self.assertEqual(task.created_at, self.original_created_at)
+        self.assertEqual(task.comments.get().user, self.seller)
+        self.assertEqual(task.attachments.get().firebase_path, 'kanban/attachments/ab/abc.pdf')
+        self.assertFalse(Task.objects.get(column__board=board, title='Arquivada').is_active)
+
+        self.assertEqual(list(TaskLabel.objects.filter(board=board).values_list('slug', flat=True)), ['vip'])
+        self.assertEqual([row['task_id'] for row in search.search_tasks('propo', board_id=board.id)], [task.id])
+        self.assertEqual(get_board_statistics(board.id).total_tasks, 1)
+
+    def test_original_dates_are_written_by_the_insert(self):
+        """As datas originais entram no próprio INSERT, sem UPDATE posterior das linhas importadas."""
+        commented_at = timezone.now() - timedelta(days=20)
+        uploaded_at = timezone.now() - timedelta(days=10)
+        TaskComment.objects.update(created_at=commented_at)
+        TaskAttachment.objects.update(uploaded_at=uploaded_at)
+        Task.objects.filter(pk=self.task.pk).update(updated_at=self.original_created_at + timedelta(days=1))
+        lines = list(transfer.export_board(self.board))
+
+        with CaptureQueriesContext(connection) as queries:
+            board, _ = transfer.import_board(lines, self.user, self.company, name='Datas')
+
+        task = Task.objects.get(column__board=board, title='Proposta comercial')
+        self.assertEqual(
+            (task.created_at, task.updated_at), (self.original_created_at, self.original_created_at + timedelta(days=1))
+        )
+        self.assertEqual(task.comments.get().created_at, commented_at)
+        self.assertEqual(task.attachments.get().uploaded_at, uploaded_at)
+        tables = [Task._meta.db_table, TaskComment._meta.db_table, TaskAttachment._meta.db_table]
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE') and any(f'"{table}"' in query['sql'] for table in tables)
+        ]
+        self.assertEqual(updates, [])
+
+    def test_unknown_users_fall_back(self):
+        """Usuários inexistentes no destino viram o importador ou ficam sem responsável."""
+        lines = list(transfer.export_board(self.board))
+        self.seller.delete()
+        board, _ = transfer.import_board(lines, self.user, self.company, name='Outro ambiente')
+
+        task = Task.objects.get(column__board=board, title='Proposta comercial')
+        self.assertIsNone(task.assigned_to_id)
+        self.assertEqual(task.comments.get().user, self.user)
+
+    def test_chunks_are_bounded(self):
+        """Cada linha traz no máximo CHUNK_SIZE registros de uma tabela."""
+        Task.objects.bulk_create([
+            Task(title=f'Task {index}', column=self.todo, created_by=self.user) for index in range(5)
+        ])
+        with mock.patch.object(transfer, 'CHUNK_SIZE', 2):
+            records = [json.loads(line) for line in transfer.export_board(self.board)]
+
+        task_chunks = [record for record in records if record['type'] == 'tasks']
+        self.assertEqual([len(record['rows']) for record in task_chunks], [2, 2, 2, 1])
+        self.assertEqual(records[-1], {
+            'type': 'end', 'counts': {'columns': 2, 'tasks': 7, 'comments': 1, 'attachments': 1},
+        })
+
+    def test_invalid_files_are_rolled_back(self):
+        """Arquivos truncados, de outro formato ou com nome repetido não gravam nada."""
+        lines = list(transfer.export_board(self.board))
+        boards = Board.objects.count()
+
+        with self.assertRaisesMessage(transfer.BoardImportError, 'Arquivo incompleto'):
+            transfer.import_board(lines[:-2], self.user, self.company, name='Truncado')
+        with self.assertRaisesMessage(transfer.BoardImportError, 'Já existe um board'):
+            transfer.import_board(lines, self.user, self.company)
+        with self.assertRaisesMessage(transfer.BoardImportError, 'não é JSON'):
+            transfer.import_board(['{"type": '], self.user, self.company)
+
+        self.assertEqual(Board.objects.count(), boards)
+
+    def test_dangling_references_are_rejected(self):
+        """Tasks com coluna e comentários/anexos com task fora do arquivo não são importados."""
+        records = [json.loads(line) for line in transfer.export_board(self.board)]
+        boards = Board.objects.count()
+        cases = [('tasks', 'column_id', 'coluna'), ('comments', 'task_id', 'task'), ('attachments', 'task_id', 'task')]
+
+        for record_type, field, label in cases:
+            with self.subTest(record_type):
+                changed = json.loads(json.dumps(records))
+                record = next(record for record in changed if record['type'] == record_type)
+                record['rows'][0][record['fields'].index(field)] = str(self.company.pk)
+                lines = [json.dumps(record) for record in changed]
+
+                with self.assertRaisesMessage(transfer.BoardImportError, f'{field} sem {label}'):
+                    transfer.import_board(lines, self.user, self.company, name='Referências')
+
+        self.assertEqual(Board.objects.count(), boards)
+
+    def test_api_export_and_import(self):
+        """O export é streaming e o arquivo pode ser reimportado via upload."""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(f'/api/kanban/boards/{self.board.id}/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content)
+
+        upload = SimpleUploadedFile('board.ndjson', content, content_type='application/x-ndjson')
+        response = client.post('/api/kanban/boards/import/', {'file': upload, 'name': 'Importado'}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['board']['name'], 'Importado')
+        self.assertEqual(response.data['imported']['tasks'], 2)
+
+        upload = SimpleUploadedFile('board.ndjson', b'{"type": "tasks"}\n')
+        response = client.post('/api/kanban/boards/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    def test_commands_round_trip(self):
+        """Os comandos exportam para .gz, importam e informam a vazão."""
+        path = os.path.join(tempfile.mkdtemp(), 'board.ndjson.gz')
+        stderr = StringIO()
+        call_command('export_board', str(self.board.id), output=path, stderr=stderr)
+        self.assertIn('6 registros exportados', stderr.getvalue())
+        self.assertIn('registros/s', stderr.getvalue())
+
+        stdout = StringIO()
+        call_command(
+            'import_board', path, company=str(self.company.id), user='export', name='Copia', stdout=stdout
+        )
+        self.assertIn('2 tasks', stdout.getvalue())
+        self.assertIn('registros/s', stdout.getvalue())
+        self.assertTrue(Board.objects.filter(name='Copia', company=self.company).exists())
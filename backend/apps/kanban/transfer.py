@@ -0,0 +1,331 @@
+"""
+Exportação e importação de um board completo.
+
+O arquivo é NDJSON (uma linha JSON por registro) em layout colunar: depois
+do cabeçalho, cada linha traz um lote de até ``CHUNK_SIZE`` linhas de uma
+tabela, com os nomes dos campos uma única vez::
+
+    {"type": "board", "format": "kanban-board", "version": 1, "board": {...}}
+    {"type": "columns", "fields": ["id", "name", ...], "rows": [[...], ...]}
+    {"type": "tasks", "fields": [...], "rows": [[...], ...]}
+    {"type": "comments", ...}
+    {"type": "attachments", ...}
+    {"type": "end", "counts": {"columns": 3, "tasks": 100000, ...}}
+
+Exportação e importação processam um lote por vez, então a memória usada
+não depende do tamanho do board. Na importação os IDs são remapeados com
+``uuid5(novo_board, id_original)``: o novo ID de uma task é calculado a
+partir do ID original sem manter um dicionário com todas as tasks. Usuários
+são referenciados pelo username; quem não existe no ambiente de destino
+vira o usuário que importa (criador/autor) ou fica sem responsável.
+
+Anexos levam apenas os metadados: o caminho no storage é mantido, então os
+arquivos precisam existir no storage do ambiente de destino.
+"""
+import json
+import logging
+import uuid
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.dashboard.feed import invalidate_feeds
+
+from . import search
+from .labels import build_task_labels
+from .models import Board, Column, Task, TaskAttachment, TaskComment, TaskLabel
+from .statistics import refresh_board_statistics
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = 'kanban-board'
+FORMAT_VERSION = 1
+CHUNK_SIZE = 1000
+
+COLUMN_FIELDS = ['id', 'name', 'position', 'color', 'max_tasks']
+TASK_FIELDS = [
+    'id', 'column_id', 'title', 'description', 'assigned_to__username', 'created_by__username',
+    'priority', 'status', 'due_date', 'position', 'labels', 'is_active', 'created_at', 'updated_at',
+]
+COMMENT_FIELDS = ['id', 'task_id', 'user__username', 'content', 'created_at']
+ATTACHMENT_FIELDS = [
+    'id', 'task_id', 'firebase_path', 'filename', 'file_size', 'content_type', 'content_hash',
+    'uploaded_by__username', 'uploaded_at',
+]
+
+
+class BoardImportError(ValueError):
+    """Arquivo de exportação inválido ou incompatível"""
+
+
+def insert_rows(model, objs):
+    """
+    INSERT em lote que grava os valores das instâncias como estão, inclusive
+    os campos ``auto_now``/``auto_now_add`` (``raw=True``, como o loaddata):
+    as datas originais entram já no INSERT, sem um UPDATE em seguida
+    """
+    # bulk_create chama pre_save() de cada campo e troca created_at/updated_at
+    # (auto_now_add/auto_now) pelo horário atual mesmo com valores explícitos;
+    # restaurar as datas exigiria um bulk_update de todas as linhas. Não há API
+    # pública de INSERT em lote com raw=True, então usamos a mesma do
+    # Model.save_base(raw=True) do loaddata; test_original_dates_are_written_by_the_insert
+    # acusa se ela mudar numa atualização do Django.
+    fields = model._meta.concrete_fields
+    batch_size = connection.ops.bulk_batch_size(fields, objs) or len(objs)
+    for start in range(0, len(objs), batch_size):
+        model._base_manager._insert(objs[start:start + batch_size], fields=fields, raw=True)
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = connection.alias
+
+
+def _encode(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _line(record):
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _chunks(record_type, queryset, fields, counts):
+    rows = []
+    counts[record_type] = 0
+    for row in queryset.values_list(*fields).order_by().iterator(chunk_size=CHUNK_SIZE):
+        rows.append([_encode(value) for value in row])
+        if len(rows) >= CHUNK_SIZE:
+            counts[record_type] += len(rows)
+            yield _line({'type': record_type, 'fields': fields, 'rows': rows})
+            rows = []
+    if rows:
+        counts[record_type] += len(rows)
+        yield _line({'type': record_type, 'fields': fields, 'rows': rows})
+
+
+def export_board(board, include_archived=True, counts=None):
+    """
+    Gera as linhas NDJSON da exportação de ``board``.
+
+    É um gerador: pode ser escrito em arquivo ou enviado em uma resposta
+    HTTP streaming sem montar o arquivo inteiro em memória. Se ``counts``
+    for passado, recebe o número de linhas exportadas por tabela.
+    """
+    counts = {} if counts is None else counts
+    yield _line({
+        'type': 'board',
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'board': {
+            'id': str(board.id),
+            'name': board.name,
+            'description': board.description,
+            'is_template': board.is_template,
+            'position': board.position,
+        },
+    })
+
+    tasks = Task.objects.filter(column__board=board)
+    if not include_archived:
+        tasks = tasks.filter(is_active=True)
+
+    yield from _chunks('columns', Column.objects.filter(board=board), COLUMN_FIELDS, counts)
+    yield from _chunks('tasks', tasks, TASK_FIELDS, counts)
+    yield from _chunks(
+        'comments', TaskComment.objects.filter(task__in=tasks.values('id')), COMMENT_FIELDS, counts
+    )
+    yield from _chunks(
+        'attachments', TaskAttachment.objects.filter(task__in=tasks.values('id')), ATTACHMENT_FIELDS, counts
+    )
+    yield _line({'type': 'end', 'counts': counts})
+
+
+class _BoardImporter:
+    """Estado da importação de um arquivo: o board criado e os usuários resolvidos"""
+
+    def __init__(self, user, company, name=None):
+        self.user = user
+        self.company = company
+        self.name = name
+        self.board = None
+        self.users = {}
+        self.assignees = set()
+        self.counts = {'columns': 0, 'tasks': 0, 'comments': 0, 'attachments': 0}
+        self.finished = False
+
+    def map_id(self, original_id):
+        return uuid.uuid5(self.board.id, str(original_id))
+
+    def check_references(self, queryset, rows, field, label):
+        """
+        Garante que os IDs de ``field`` apontam para registros importados
+        deste arquivo (já gravados, pois o arquivo vem em ordem); a busca é
+        por lote, sem guardar todos os IDs importados em memória
+        """
+        references = {self.map_id(row[field]): row[field] for row in rows}
+        found = set(queryset.filter(id__in=references).values_list('id', flat=True))
+        missing = sorted(str(original) for mapped, original in references.items() if mapped not in found)
+        if missing:
+            raise BoardImportError(f"{field} sem {label} correspondente no arquivo: {', '.join(missing[:5])}")
+
+    def resolve_users(self, usernames):
+        missing = {name for name in usernames if name and name not in self.users}
+        if missing:
+            found = dict(User.objects.filter(username__in=missing).values_list('username', 'id'))
+            for name in missing:
+                self.users[name] = found.get(name)
+
+    def user_id(self, username, default=None):
+        return self.users.get(username) or default
+
+    def start(self, record):
+        if record.get('format') != FORMAT_NAME:
+            raise BoardImportError("Arquivo não é uma exportação de board")
+        if record.get('version') != FORMAT_VERSION:
+            raise BoardImportError(f"Versão de exportação não suportada: {record.get('version')}")
+        data = record['board']
+        name = (self.name or data['name']).strip()
+        if Board.objects.filter(company=self.company, name=name).exists():
+            raise BoardImportError(f'Já existe um board chamado "{name}"')
+        self.board = Board.objects.create(
+            name=name, description=data.get('description', ''), company=self.company,
+            created_by=self.user, is_template=data.get('is_template', False),
+            position=data.get('position', 0),
+        )
+
+    def import_columns(self, rows):
+        Column.objects.bulk_create([
+            Column(
+                id=self.map_id(row['id']), board=self.board, name=row['name'], position=row['position'],
+                color=row['color'], max_tasks=row['max_tasks'],
+            )
+            for row in rows
+        ])
+
+    def import_tasks(self, rows):
+        self.check_references(Column.objects.filter(board=self.board), rows, 'column_id', 'coluna')
+        self.resolve_users(
+            {row['assigned_to__username'] for row in rows} | {row['created_by__username'] for row in rows}
+        )
+        tasks = [
+            Task(
+                id=self.map_id(row['id']), column_id=self.map_id(row['column_id']),
+                title=row['title'], description=row['description'],
+                assigned_to_id=self.user_id(row['assigned_to__username']),
+                created_by_id=self.user_id(row['created_by__username'], self.user.id),
+                priority=row['priority'], status=row['status'], due_date=parse_datetime(row['due_date'] or ''),
+                position=row['position'], labels=row['labels'], is_active=row['is_active'],
+                created_at=parse_datetime(row['created_at']), updated_at=parse_datetime(row['updated_at']),
+            )
+            for row in rows
+        ]
+        insert_rows(Task, tasks)
+
+        TaskLabel.objects.bulk_create([
+            label for task in tasks if task.is_active
+            for label in build_task_labels(task.id, self.board.id, task.labels)
+        ])
+        search.index_rows(
+            (task.id, self.board.id, task.title, task.description) for task in tasks if task.is_active
+        )
+        self.assignees.update(task.assigned_to_id for task in tasks if task.is_active)
+
+    def import_comments(self, rows):
+        self.check_references(Task.objects.filter(column__board=self.board), rows, 'task_id', 'task')
+        self.resolve_users({row['user__username'] for row in rows})
+        comments = [
+            TaskComment(
+                id=self.map_id(row['id']), task_id=self.map_id(row['task_id']),
+                user_id=self.user_id(row['user__username'], self.user.id), content=row['content'],
+                created_at=parse_datetime(row['created_at']),
+            )
+            for row in rows
+        ]
+        # updated_at (auto_now) não é exportado: a última alteração passa a ser a importação
+        now = timezone.now()
+        for comment in comments:
+            comment.updated_at = now
+        insert_rows(TaskComment, comments)
+
+    def import_attachments(self, rows):
+        self.check_references(Task.objects.filter(column__board=self.board), rows, 'task_id', 'task')
+        self.resolve_users({row['uploaded_by__username'] for row in rows})
+        attachments = [
+            TaskAttachment(
+                id=self.map_id(row['id']), task_id=self.map_id(row['task_id']),
+                firebase_path=row['firebase_path'], filename=row['filename'], file_size=row['file_size'],
+                content_type=row['content_type'], content_hash=row['content_hash'],
+                uploaded_by_id=self.user_id(row['uploaded_by__username'], self.user.id),
+                uploaded_at=parse_datetime(row['uploaded_at']),
+            )
+            for row in rows
+        ]
+        insert_rows(TaskAttachment, attachments)
+
+    def feed(self, record):
+        record_type = record.get('type')
+        if self.board is None:
+            if record_type != 'board':
+                raise BoardImportError("O arquivo deve começar com o cabeçalho do board")
+            self.start(record)
+            return
+        if record_type == 'end':
+            expected = {key: value for key, value in record.get('counts', {}).items() if value}
+            if expected != {key: value for key, value in self.counts.items() if value}:
+                raise BoardImportError("Arquivo incompleto: contagens não conferem com o registro final")
+            self.finished = True
+            return
+
+        handler = {
+            'columns': self.import_columns,
+            'tasks': self.import_tasks,
+            'comments': self.import_comments,
+            'attachments': self.import_attachments,
+        }.get(record_type)
+        if handler is None:
+            raise BoardImportError(f"Tipo de registro desconhecido: {record_type}")
+        fields = record['fields']
+        rows = [dict(zip(fields, row)) for row in record['rows']]
+        handler(rows)
+        self.counts[record_type] += len(rows)
+
+
+def import_board(lines, user, company, name=None):
+    """
+    Importa um board a partir das linhas de uma exportação.
+
+    ``lines`` pode ser qualquer iterável de linhas (``str`` ou ``bytes``),
+    como um arquivo aberto ou um upload. Tudo roda em uma transação; um
+    arquivo inválido ou truncado não deixa nada gravado. Retorna
+    ``(board, counts)``.
+    """
+    importer = _BoardImporter(user, company, name)
+    with transaction.atomic():
+        for number, line in enumerate(lines, start=1):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise BoardImportError(f"Linha {number} não é JSON válido")
+            try:
+                importer.feed(record)
+            except (KeyError, TypeError) as e:
+                raise BoardImportError(f"Linha {number} inválida: {e}")
+
+        if not importer.finished:
+            raise BoardImportError("Arquivo incompleto: registro final não encontrado")
+
+        refresh_board_statistics(importer.board.id)
+        invalidate_feeds(importer.assignees)
+
+    logger.info(f"Board {importer.board.name} importado: {importer.counts}")
+    return importer.board, importer.counts
+
@@ -3,13 +3,15 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_nested.routers import NestedDefaultRouter
 
 from .views import (
-    BoardViewSet, ColumnViewSet, TaskViewSet, 
+    BoardViewSet, ColumnViewSet, TaskViewSet, TaskQueryViewSet, TaskLabelViewSet,
     TaskCommentViewSet, TaskAttachmentViewSet
 )
 
-# Router principal para boards
+# Router principal para boards e consulta global de tasks
 router = DefaultRouter()
 router.register(r'boards', BoardViewSet, basename='boards')
+router.register(r'tasks', TaskQueryViewSet, basename='tasks')
+router.register(r'labels', TaskLabelViewSet, basename='labels')
 
 # Router aninhado para colunas dentro de boards
 boards_router = NestedDefaultRouter(router, r'boards', lookup='board')
@@ -2,36 +2,84 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Q, Max
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, IntegerField, Max, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.utils import timezone
 import logging
+import uuid
 
-from .models import Board, Column, Task, TaskComment, TaskAttachment
+from .models import Board, Column, Task, TaskComment, TaskAttachment, TaskEvent
 from .serializers import (
     BoardListSerializer, BoardDetailSerializer, BoardCreateUpdateSerializer,
     ColumnSerializer, ColumnCreateUpdateSerializer,
     TaskListSerializer, TaskDetailSerializer, TaskCreateUpdateSerializer,
-    TaskCommentSerializer, TaskAttachmentSerializer
+    TaskSearchSerializer, TaskCommentSerializer, TaskAttachmentSerializer,
+    BulkTaskOperationSerializer, BoardCloneSerializer, TaskEventSerializer
 )
 from .filters import TaskFilter, BoardFilter
+from .pagination import TaskCommentCursorPagination, TaskCursorPagination, TaskEventCursorPagination
+from .analytics import cumulative_flow, flow_report
+from .bulk import run_bulk_operation
+from .cloning import clone_board, create_default_columns
+from .events import flow_metrics
+from . import search
+from .labels import label_usage
+from .statistics import apply_column_changes, get_board_statistics, get_statistics
+from .storage import get_storage_service
+from .transfer import BoardImportError, export_board, import_board
 
 logger = logging.getLogger(__name__)
 
+
+def paginated_events(view, queryset):
+    """Página de eventos com cursor (keyset) para feeds e timelines"""
+    paginator = TaskEventCursorPagination()
+    # Sem a view: a ordenação do cursor não deve vir do OrderingFilter de tasks
+    page = paginator.paginate_queryset(queryset.select_related('actor'), view.request)
+    return paginator.get_paginated_response(TaskEventSerializer(page, many=True).data)
+
+
+def _related_count(model):
+    """Subquery que conta linhas relacionadas à task sem join na query principal"""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(task=OuterRef('pk')).order_by().values('task').annotate(
+                total=Count('id')
+            ).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def annotate_task_counts(queryset):
+    """Anota comments_total e attachments_total usados por TaskListSerializer"""
+    return queryset.annotate(
+        comments_total=_related_count(TaskComment),
+        attachments_total=_related_count(TaskAttachment),
+    )
+
 class BoardViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_class = BoardFilter
     search_fields = ['name', 'description']
+    MAX_BULK_STATISTICS = 200
     
     def get_queryset(self):
         """Retorna boards ativos. Por enquanto permite acesso a todos os boards para usuários autenticados."""
-        return Board.objects.filter(
-            is_active=True
-        ).select_related('created_by', 'company').prefetch_related('columns')
+        queryset = Board.objects.filter(is_active=True)
+        if self.action == 'list' and 'is_template' not in self.request.query_params:
+            queryset = queryset.filter(is_template=False)
+        if self.action in ['statistics', 'bulk_statistics', 'labels', 'activity', 'metrics', 'cfd', 'flow', 'export']:
+            return queryset
+        return queryset.select_related('created_by', 'company').prefetch_related('columns')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -53,39 +101,168 @@ class BoardViewSet(viewsets.ModelViewSet):
         )
         
         # Criar colunas padrão
-        default_columns = [
-            {'name': 'A Fazer', 'position': 0, 'color': '#e6f3ff'},
-            {'name': 'Em Progresso', 'position': 1, 'color': '#fff2e6'},
-            {'name': 'Concluído', 'position': 2, 'color': '#e6ffe6'},
-        ]
-        
-        for col_data in default_columns:
-            Column.objects.create(board=board, **col_data)
+        create_default_columns(board)
         
         logger.info(f"Board criado: {board.name} com colunas padrão")
 
+    @action(detail=False, methods=['get'])
+    def templates(self, request):
+        """
+        Lista os modelos de pipeline disponíveis
+        GET /api/kanban/boards/templates/
+        """
+        queryset = self.get_queryset().filter(is_template=True)
+        serializer = BoardListSerializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def clone(self, request, pk=None):
+        """
+        Clona um board (ou cria um board a partir de um modelo)
+        POST /api/kanban/boards/{id}/clone/
+        {"name": "...", "include_tasks": true, "include_comments": false}
+        """
+        source = self.get_object()
+        serializer = BoardCloneSerializer(data=request.data, context={'source': source})
+        serializer.is_valid(raise_exception=True)
+
+        board = clone_board(source, user=request.user, **serializer.validated_data)
+        board = self.get_queryset().get(pk=board.pk)
+        return Response(BoardDetailSerializer(board).data, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['get'])
     def statistics(self, request, pk=None):
         board = self.get_object()
-        stats = {
-            'total_tasks': Task.objects.filter(column__board=board, is_active=True).count(),
-            'tasks_by_priority': dict(
-                Task.objects.filter(
-                    column__board=board, is_active=True
-                ).values('priority').annotate(count=Count('id')).values_list('priority', 'count')
-            ),
-            'tasks_by_column': list(
-                board.columns.annotate(
-                    task_count=Count('tasks', filter=Q(tasks__is_active=True))
-                ).values('name', 'task_count')
-            ),
-            'overdue_tasks': Task.objects.filter(
-                column__board=board,
-                is_active=True,
-                due_date__lt=timezone.now()
-            ).count()
-        }
-        return Response(stats)
+        stats = get_board_statistics(board.id)
+        return Response(stats.as_dict())
+
+    @action(detail=False, methods=['get'], url_path='statistics')
+    def bulk_statistics(self, request):
+        """
+        Estatísticas de vários boards em uma chamada
+        GET /api/kanban/boards/statistics/?ids=<uuid>,<uuid>
+        """
+        ids = [value for value in request.query_params.get('ids', '').split(',') if value]
+        if len(ids) > self.MAX_BULK_STATISTICS:
+            return Response(
+                {'error': f'Máximo de {self.MAX_BULK_STATISTICS} boards por requisição'},
+                status=400
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if ids:
+            try:
+                queryset = queryset.filter(id__in=ids)
+            except DjangoValidationError:
+                return Response({'error': 'ids inválidos'}, status=400)
+        board_ids = list(queryset.values_list('id', flat=True)[:self.MAX_BULK_STATISTICS])
+
+        stats = get_statistics(board_ids)
+        return Response({
+            str(board_id): stats[board_id].as_dict()
+            for board_id in board_ids if board_id in stats
+        })
+
+    @action(detail=True, methods=['get'])
+    def labels(self, request, pk=None):
+        """
+        Labels usadas nas tasks ativas do board com a contagem de cada uma
+        GET /api/kanban/boards/{id}/labels/
+        """
+        board = self.get_object()
+        return Response(label_usage(board_id=board.id))
+
+    @action(detail=True, methods=['get'])
+    def activity(self, request, pk=None):
+        """
+        Feed de eventos do board, do mais recente para o mais antigo
+        GET /api/kanban/boards/{id}/activity/?event_type=moved
+        """
+        board = self.get_object()
+        queryset = TaskEvent.objects.filter(board=board)
+        event_type = request.query_params.get('event_type')
+        if event_type:
+            queryset = queryset.filter(event_type=event_type)
+        return paginated_events(self, queryset)
+
+    @action(detail=True, methods=['get'])
+    def metrics(self, request, pk=None):
+        """
+        Vazão diária e cycle time calculados a partir do log de eventos
+        GET /api/kanban/boards/{id}/metrics/?days=30
+        """
+        board = self.get_object()
+        try:
+            days = min(max(int(request.query_params.get('days', 30)), 1), 365)
+        except ValueError:
+            return Response({'error': 'days inválido'}, status=400)
+        return Response(flow_metrics(board.id, days=days))
+
+    @action(detail=True, methods=['get'])
+    def cfd(self, request, pk=None):
+        """
+        Diagrama de fluxo cumulativo a partir dos snapshots diários por coluna
+        GET /api/kanban/boards/{id}/cfd/?days=365
+        """
+        board = self.get_object()
+        try:
+            days = min(max(int(request.query_params.get('days', 365)), 1), 730)
+        except ValueError:
+            return Response({'error': 'days inválido'}, status=400)
+        return Response(cumulative_flow(board.id, days=days))
+
+    @action(detail=True, methods=['get'])
+    def flow(self, request, pk=None):
+        """
+        Percentis de lead time, cycle time e tempo por coluna
+        GET /api/kanban/boards/{id}/flow/?days=90
+        """
+        board = self.get_object()
+        try:
+            days = min(max(int(request.query_params.get('days', 90)), 1), 365)
+        except ValueError:
+            return Response({'error': 'days inválido'}, status=400)
+        return Response(flow_report(board.id, days=days))
+
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """
+        Exporta o board (colunas, tasks, comentários e metadados de anexos) em NDJSON
+        GET /api/kanban/boards/{id}/export/?include_archived=false
+        """
+        board = self.get_object()
+        include_archived = request.query_params.get('include_archived', 'true').lower() != 'false'
+        response = StreamingHttpResponse(
+            export_board(board, include_archived=include_archived), content_type='application/x-ndjson'
+        )
+        response['Content-Disposition'] = f'attachment; filename="board-{board.id}.ndjson"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """
+        Importa um board exportado por /export/
+        POST /api/kanban/boards/import/ (multipart: file, name opcional)
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Nenhum arquivo enviado'}, status=status.HTTP_400_BAD_REQUEST)
+
+        company = getattr(request.user, 'company', None)
+        if not company:
+            from apps.companies.models import Company
+            company = Company.objects.first()
+
+        try:
+            board, counts = import_board(upload, request.user, company, name=request.data.get('name'))
+        except BoardImportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        board = self.get_queryset().get(pk=board.pk)
+        return Response(
+            {'board': BoardDetailSerializer(board).data, 'imported': counts},
+            status=status.HTTP_201_CREATED,
+        )
 
 class ColumnViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
@@ -125,6 +302,7 @@ class ColumnViewSet(viewsets.ModelViewSet):
                 id=order_data['id'],
                 board_id=board_pk
             ).update(position=order_data['position'])
+        apply_column_changes(board_pk)
         
         logger.info(f"Colunas reordenadas no board {board_pk}")
         return Response({'status': 'success'})
@@ -139,14 +317,24 @@ class TaskViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         column_id = self.kwargs.get('column_pk')
-        if column_id:
-            return Task.objects.filter(
-                column_id=column_id,
-                is_active=True
-            ).select_related('assigned_to', 'created_by', 'column__board').prefetch_related(
-                'comments__user', 'attachments'
+        if not column_id:
+            return Task.objects.none()
+
+        queryset = Task.objects.filter(column_id=column_id, is_active=True)
+        if self.action == 'list':
+            # Listas só exibem contagens: nenhum comentário ou anexo é carregado
+            return annotate_task_counts(queryset.select_related('assigned_to'))
+        if self.action == 'retrieve':
+            latest_comments = TaskComment.objects.select_related('user').order_by(
+                '-created_at', '-id'
+            )[:TaskDetailSerializer.LATEST_COMMENTS]
+            return queryset.select_related('assigned_to', 'created_by', 'column__board').annotate(
+                comments_total=_related_count(TaskComment),
+            ).prefetch_related(
+                Prefetch('comments', queryset=latest_comments, to_attr='latest_comments'),
+                'attachments__uploaded_by',
             )
-        return Task.objects.none()
+        return queryset.select_related('assigned_to', 'created_by', 'column__board')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -175,8 +363,12 @@ class TaskViewSet(viewsets.ModelViewSet):
         
         logger.info(f"Task criada: {task.title} na coluna {column.name}")
 
+    def perform_update(self, serializer):
+        serializer.instance._event_actor_id = self.request.user.id
+        serializer.save()
+
     @action(detail=True, methods=['patch'])
-    def move(self, request, column_pk=None, pk=None):
+    def move(self, request, board_pk=None, column_pk=None, pk=None):
         """Move task entre colunas (drag & drop)"""
         task = self.get_object()
         new_column_id = request.data.get('column_id')
@@ -204,6 +396,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         old_column_id = task.column.id
         task.column = new_column
         task.position = new_position
+        task._event_actor_id = request.user.id
         task.save()
         
         # Reorganizar posições nas colunas afetadas
@@ -222,17 +415,143 @@ class TaskViewSet(viewsets.ModelViewSet):
                 task.save(update_fields=['position'])
 
     @action(detail=True, methods=['patch'])
-    def archive(self, request, column_pk=None, pk=None):
+    def archive(self, request, board_pk=None, column_pk=None, pk=None):
         """Arquiva uma task"""
         task = self.get_object()
         task.is_active = False
         task.status = 'archived'
+        task._event_actor_id = request.user.id
         task.save()
         return Response({'status': 'archived'})
 
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, board_pk=None, column_pk=None, pk=None):
+        """Histórico de eventos da task, do mais recente para o mais antigo"""
+        task = self.get_object()
+        return paginated_events(self, TaskEvent.objects.filter(task=task))
+
+class TaskQueryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Consulta de tasks entre todos os boards
+
+    GET /api/kanban/tasks/?assigned_to_me=true&priority=urgent&due_date_to=...
+    Aceita os mesmos filtros de TaskFilter e pagina por cursor.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = TaskSearchSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TaskFilter
+    pagination_class = TaskCursorPagination
+
+    def get_queryset(self):
+        queryset = Task.objects.filter(is_active=True).select_related(
+            'assigned_to', 'column__board'
+        )
+        return annotate_task_counts(queryset)
+
+    MAX_SEARCH_RESULTS = 50
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Busca textual por título e descrição, ordenada por relevância
+        GET /api/kanban/tasks/search/?q=propo&board={id}&limit=20
+        Cada termo casa por prefixo; o título e um trecho da descrição vêm destacados com <mark>.
+        """
+        query = request.query_params.get('q', '')
+        if not search.parse_terms(query):
+            return Response({'error': 'Parâmetro q é obrigatório'}, status=status.HTTP_400_BAD_REQUEST)
+        board_id = request.query_params.get('board')
+        if board_id:
+            try:
+                board_id = uuid.UUID(board_id)
+            except ValueError:
+                return Response({'error': 'board inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.MAX_SEARCH_RESULTS)
+        except ValueError:
+            return Response({'error': 'limit inválido'}, status=status.HTTP_400_BAD_REQUEST)
+
+        matches = search.search_tasks(query, board_id=board_id, limit=limit)
+        tasks = self.get_queryset().in_bulk([match['task_id'] for match in matches])
+        results = []
+        for match in matches:
+            task = tasks.get(match['task_id'])
+            if task is None:
+                continue
+            data = TaskSearchSerializer(task).data
+            data.update(rank=match['rank'], title_highlight=match['title_highlight'], snippet=match['snippet'])
+            results.append(data)
+        return Response({'query': query, 'count': len(results), 'results': results})
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Aplica uma operação a várias tasks em uma transação
+        POST /api/kanban/tasks/bulk/
+        {"operation": "assign", "ids": [...], "assigned_to_id": 7}
+        {"operation": "move", "filter": {"assigned_to": 3}, "column_id": "..."}
+        """
+        serializer = BulkTaskOperationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = Task.objects.all()
+        if 'ids' in data:
+            queryset = queryset.filter(id__in=data['ids'])
+        else:
+            task_filter = TaskFilter(data=data['filter'], queryset=queryset, request=request)
+            if not task_filter.is_valid():
+                return Response({'filter': task_filter.errors}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = task_filter.qs
+
+        limit = BulkTaskOperationSerializer.MAX_TASKS
+        if queryset.filter(is_active=True).count() > limit:
+            return Response(
+                {'error': f'A operação afeta mais de {limit} tasks'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = {
+            'assigned_to_id': data.get('assigned_to_id'),
+            'column_id': data.get('column_id'),
+            **data.get('labels', {}),
+        }
+        summary = run_bulk_operation(
+            queryset, data['operation'], params, requested_ids=data.get('ids'), actor=request.user
+        )
+        return Response(summary)
+
+class TaskLabelViewSet(viewsets.ViewSet):
+    """
+    Autocomplete de labels
+
+    GET /api/kanban/labels/?q=prefixo&board=<uuid>
+    """
+    permission_classes = [IsAuthenticated]
+    AUTOCOMPLETE_LIMIT = 20
+
+    def list(self, request):
+        board_id = request.query_params.get('board') or None
+        if board_id:
+            try:
+                board_id = uuid.UUID(board_id)
+            except ValueError:
+                return Response({'error': 'board inválido'}, status=400)
+        return Response(label_usage(
+            board_id=board_id,
+            prefix=request.query_params.get('q', ''),
+            limit=self.AUTOCOMPLETE_LIMIT,
+        ))
+
 class TaskCommentViewSet(viewsets.ModelViewSet):
+    """
+    Comentários de uma task, paginados por cursor do mais recente para o mais antigo
+    GET .../tasks/{id}/comments/?cursor=...&page_size=20
+    """
     permission_classes = [IsAuthenticated]
     serializer_class = TaskCommentSerializer
+    pagination_class = TaskCommentCursorPagination
     
     def get_queryset(self):
         task_id = self.kwargs.get('task_pk')
@@ -252,4 +571,43 @@ class TaskAttachmentViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         task = get_object_or_404(Task, id=self.kwargs['task_pk'])
-        serializer.save(task=task, uploaded_by=self.request.user)
\ No newline at end of file
+        serializer.save(task=task, uploaded_by=self.request.user)
+
+    MAX_UPLOAD_FILES = 20
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def upload(self, request, board_pk=None, column_pk=None, task_pk=None):
+        """
+        Envia um ou mais arquivos (campo ``files``) ao storage, em paralelo, e cria os anexos
+        POST /api/kanban/boards/{board}/columns/{column}/tasks/{task}/attachments/upload/
+        """
+        task = get_object_or_404(Task, id=task_pk)
+        files = request.FILES.getlist('files')
+        if not files:
+            return Response({'error': 'Nenhum arquivo enviado'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(files) > self.MAX_UPLOAD_FILES:
+            return Response(
+                {'error': f'Máximo de {self.MAX_UPLOAD_FILES} arquivos por envio'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            uploaded = get_storage_service().upload_task_attachments(
+                [(file, file.name) for file in files], task.id, request.user.id
+            )
+        except Exception as e:
+            logger.error(f"Erro ao enviar anexos da task {task.id}: {e}")
+            return Response({'error': 'Erro ao enviar arquivos'}, status=status.HTTP_502_BAD_GATEWAY)
+
+        attachments = TaskAttachment.objects.bulk_create([
+            TaskAttachment(
+                task=task, uploaded_by=request.user,
+                firebase_path=item['firebase_path'], filename=item['filename'],
+                file_size=item['file_size'], content_type=item['content_type'],
+                content_hash=item['content_hash'],
+            )
+            for item in uploaded
+        ])
+        logger.info(f"{len(attachments)} anexos enviados para a task {task.id}")
+        serializer = self.get_serializer(attachments, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
\ No newline at end of file
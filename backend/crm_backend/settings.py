@@ -422,6 +422,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Firebase Configuration
 FIREBASE_CREDENTIALS_PATH = os.path.join(BASE_DIR.parent, 'crm-system-ff0eb-firebase-adminsdk-fbsvc-bc12dede9b.json')
 
+# Storage dos anexos do Kanban: 'firebase' ou 'local' (disco, sem rede)
+KANBAN_STORAGE_BACKEND = os.getenv('KANBAN_STORAGE_BACKEND', 'firebase')
+KANBAN_LOCAL_STORAGE_ROOT = BASE_DIR / 'media' / 'storage'
+# Validade das URLs assinadas e folga do cache antes da expiração (segundos)
+KANBAN_SIGNED_URL_EXPIRATION = 3600
+KANBAN_SIGNED_URL_CACHE_MARGIN = 300
+# Arquivos sem referência mais novos que isso (segundos) não são removidos pela varredura
+KANBAN_STORAGE_ORPHAN_MIN_AGE = 3600
+
+# Importação de empresas: linhas por lote e processamento em thread de fundo
+COMPANY_IMPORT_CHUNK_SIZE = 1000
+COMPANY_IMPORT_ASYNC = True
+# Exportação de empresas/contatos: linhas lidas por lote (.iterator)
+COMPANY_EXPORT_CHUNK_SIZE = 2000
+# Validade (segundos) do resumo de estatísticas; ele é descartado a cada mudança
+COMPANY_STATISTICS_CACHE_TTL = 60 * 60
+# Empresas duplicadas: score mínimo de um par e maior bloco comparado (tokens muito comuns são ignorados)
+COMPANY_DEDUP_THRESHOLD = 0.6
+COMPANY_DEDUP_MAX_BLOCK_SIZE = 100
+# ?count=estimated: limite da contagem nos bancos sem estimativa do planejador (PostgreSQL usa EXPLAIN)
+COMPANY_ESTIMATED_COUNT_CAP = 10000
+# Identificadores (e-mails + telefones) aceitos por chamada de /contacts/lookup/
+COMPANY_LOOKUP_MAX_IDENTIFIERS = 1000
+
 # Swagger Configuration
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
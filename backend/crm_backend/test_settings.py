@@ -81,6 +81,17 @@ CACHES = {
 # Configurações Firebase para testes (usar valores mock)
 FIREBASE_CREDENTIALS_PATH = None  # Forçar uso de mocking
 
+# Anexos do Kanban no disco local, sem acesso à rede
+import os
+import tempfile
+KANBAN_STORAGE_BACKEND = 'local'
+KANBAN_LOCAL_STORAGE_ROOT = os.path.join(tempfile.gettempdir(), 'crm_test_storage')
+KANBAN_STORAGE_CLEANUP_ASYNC = False  # Remover arquivos na própria thread
+
+# Uploads (planilhas de importação) fora do projeto; importação na própria thread
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'crm_test_media')
+COMPANY_IMPORT_ASYNC = False
+
 # Configurações JWT para testes (tokens de vida mais curta)
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
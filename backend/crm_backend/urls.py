@@ -29,6 +29,7 @@ urlpatterns = [
     
     # Health checks and dashboard
     path('api/health/', include('apps.dashboard.urls')),
+    path('api/dashboard/', include('apps.dashboard.feed_urls')),
     
     # API routes
     path('api/auth/', include('apps.authentication.urls')),